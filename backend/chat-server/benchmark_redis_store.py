@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Benchmark RedisStore hot paths against the old one-command-per-await versions.
+
+Runs over a single connection (as one chat-server coroutine would see it)
+and reports operations per second for:
+
+- add_message:            RPUSH + EXPIRE
+- create_chat/delete_chat: HSET + EXPIRE + SADD per participant,
+                           then HGETALL + DEL + SREM per participant
+
+"before" replays the sequential commands RedisStore used to issue; "after"
+calls the current pipelined / Lua implementations. All keys are created
+under fresh chat ids and deleted afterwards.
+
+Usage:
+    python benchmark_redis_store.py [--messages 5000] [--chats 1000]
+
+Environment variables:
+    REDIS_URL: Redis connection string (use a local Redis for meaningful numbers)
+"""
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+
+import redis.asyncio as redis
+
+from chat_server.config import config
+from chat_server.services.redis_store import RedisStore
+
+
+# ---------- Previous implementation (one round trip per command) ----------
+
+async def add_message_sequential(r, chat_id, sender_id, content):
+    key = config.CHAT_MESSAGES_KEY.format(chat_id=chat_id)
+    message = {
+        "id": str(uuid.uuid4()),
+        "senderId": sender_id,
+        "type": "text",
+        "content": content,
+        "targetId": None,
+        "timestamp": datetime.utcnow().isoformat(),
+    }
+    await r.rpush(key, json.dumps(message))
+    await r.expire(key, config.REDIS_MESSAGE_TTL)
+
+
+async def create_chat_sequential(r, chat_id, participant_ids):
+    key = config.CHAT_METADATA_KEY.format(chat_id=chat_id)
+    await r.hset(key, mapping={
+        "chatId": chat_id,
+        "participantIds": json.dumps(participant_ids),
+        "startTime": datetime.utcnow().isoformat(),
+    })
+    await r.expire(key, config.REDIS_MESSAGE_TTL)
+    for user_id in participant_ids:
+        await r.sadd(config.USER_ACTIVE_CHATS_KEY.format(user_id=user_id), chat_id)
+
+
+async def delete_chat_sequential(r, chat_id):
+    metadata = await r.hgetall(config.CHAT_METADATA_KEY.format(chat_id=chat_id))
+    await r.delete(
+        config.CHAT_MESSAGES_KEY.format(chat_id=chat_id),
+        config.CHAT_POSITIONS_KEY.format(chat_id=chat_id),
+        config.CHAT_CLOSURE_KEY.format(chat_id=chat_id),
+        config.CHAT_METADATA_KEY.format(chat_id=chat_id),
+    )
+    if metadata:
+        for user_id in json.loads(metadata["participantIds"]):
+            await r.srem(config.USER_ACTIVE_CHATS_KEY.format(user_id=user_id), chat_id)
+
+
+# ---------- Benchmarks ----------
+
+async def bench_messages(r, store, count):
+    sender = str(uuid.uuid4())
+    results = {}
+    for label in ("before", "after"):
+        chat_id = str(uuid.uuid4())
+        start = time.perf_counter()
+        for i in range(count):
+            if label == "before":
+                await add_message_sequential(r, chat_id, sender, f"message {i}")
+            else:
+                await store.add_message(chat_id, sender, f"message {i}")
+        results[label] = count / (time.perf_counter() - start)
+        await r.delete(config.CHAT_MESSAGES_KEY.format(chat_id=chat_id))
+    return results
+
+
+async def bench_chat_lifecycle(r, store, count):
+    results = {}
+    for label in ("before", "after"):
+        start = time.perf_counter()
+        for _ in range(count):
+            chat_id = str(uuid.uuid4())
+            participants = [str(uuid.uuid4()), str(uuid.uuid4())]
+            if label == "before":
+                await create_chat_sequential(r, chat_id, participants)
+                await delete_chat_sequential(r, chat_id)
+            else:
+                await store.create_chat(chat_id, participants)
+                await store.delete_chat(chat_id)
+        results[label] = count / (time.perf_counter() - start)
+    return results
+
+
+def report(name, results):
+    speedup = results["after"] / results["before"]
+    print(f"  {name:<24} before {results['before']:>9.0f}/s   "
+          f"after {results['after']:>9.0f}/s   ({speedup:.2f}x)")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Benchmark RedisStore round trips')
+    parser.add_argument('--messages', type=int, default=5000,
+                        help='Messages to append per variant (default: 5000)')
+    parser.add_argument('--chats', type=int, default=1000,
+                        help='Chats to create and delete per variant (default: 1000)')
+    args = parser.parse_args()
+
+    r = redis.from_url(config.REDIS_URL, encoding="utf-8", decode_responses=True)
+    await r.ping()
+    store = RedisStore()
+    store._redis = r
+
+    print(f"Redis: {config.REDIS_URL} (single connection)")
+    report("add_message", await bench_messages(r, store, args.messages))
+    report("create + delete chat", await bench_chat_lifecycle(r, store, args.chats))
+
+    await r.aclose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -26,6 +26,13 @@ async def health_check(request: web.Request) -> web.Response:
     return web.json_response({"status": "healthy", "service": "chat-server"})
 
 
+async def metrics(request: web.Request) -> web.Response:
+    """Operational metrics for this node (chat export throughput and lag)."""
+    from .services import get_export_writer
+
+    return web.json_response({"export": await get_export_writer().stats()})
+
+
 def create_app() -> web.Application:
     """Create and configure a new application instance."""
     global _sio, _app
@@ -33,11 +40,20 @@ def create_app() -> web.Application:
     from .handlers import register_handlers
     from .services import initialize_services
 
+    # Rooms and emits fan out to every chat-server node through Redis, so a
+    # message emitted on one node reaches sockets connected to any other
+    client_manager = None
+    if config.SOCKETIO_REDIS_ENABLED:
+        client_manager = socketio.AsyncRedisManager(
+            config.REDIS_URL, channel=config.SOCKETIO_CHANNEL
+        )
+
     # Create Socket.IO server
     # CORS is "*" because real security is token auth at the handshake level,
     # not origin checking.  Every connect must pass a valid JWT in auth.token.
     sio = socketio.AsyncServer(
         async_mode="aiohttp",
+        client_manager=client_manager,
         cors_allowed_origins="*",
         logger=False,
         engineio_logger=False,
@@ -52,6 +68,7 @@ def create_app() -> web.Application:
 
     # Add health check route
     app.router.add_get("/health", health_check)
+    app.router.add_get("/metrics", metrics)
 
     # Initialize services (Redis, PostgreSQL connections)
     app.on_startup.append(initialize_services)
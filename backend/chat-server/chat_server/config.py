@@ -3,6 +3,8 @@ Configuration settings for the chat server.
 """
 
 import os
+import socket
+import uuid
 
 
 class Config:
@@ -20,6 +22,14 @@ class Config:
     # Redis settings
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
 
+    # Multi-node settings: Socket.IO rooms fan out through Redis when enabled
+    SOCKETIO_REDIS_ENABLED: bool = os.getenv("SOCKETIO_REDIS_ENABLED", "true").lower() == "true"
+    SOCKETIO_CHANNEL: str = os.getenv("SOCKETIO_CHANNEL", "socketio")
+    # Unique per process; identifies which node owns a socket in presence data
+    NODE_ID: str = os.getenv("NODE_ID") or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    PRESENCE_NODE_TTL: int = int(os.getenv("PRESENCE_NODE_TTL", "90"))  # Seconds without a heartbeat before a node is considered dead
+    EVENT_CLAIM_TTL: int = int(os.getenv("EVENT_CLAIM_TTL", "300"))  # Seconds a handled pub/sub event id is remembered
+
     # Keycloak settings
     KEYCLOAK_URL: str = os.getenv("KEYCLOAK_URL", "http://keycloak:8180")
     KEYCLOAK_REALM: str = os.getenv("KEYCLOAK_REALM", "candid")
@@ -34,5 +44,19 @@ class Config:
     # Message TTL in Redis (24 hours as backup - normally exported on chat end)
     REDIS_MESSAGE_TTL: int = 86400
 
+    # In-process cache of chat participants (participants never change; entries
+    # are dropped when a chat is deleted on any node, TTL is a safety net)
+    CHAT_PARTICIPANT_CACHE_SIZE: int = int(os.getenv("CHAT_PARTICIPANT_CACHE_SIZE", "10000"))
+    CHAT_PARTICIPANT_CACHE_TTL: int = int(os.getenv("CHAT_PARTICIPANT_CACHE_TTL", "300"))
+
+    # Write-behind export of ended chats to PostgreSQL
+    EXPORT_BATCH_SIZE: int = int(os.getenv("EXPORT_BATCH_SIZE", "50"))
+    EXPORT_FLUSH_INTERVAL: float = float(os.getenv("EXPORT_FLUSH_INTERVAL", "1.0"))  # Seconds between flushes when the queue is short
+    EXPORT_RETRY_DELAY: int = int(os.getenv("EXPORT_RETRY_DELAY", "30"))  # Seconds before a failed batch is retried
+    EXPORT_MAX_ATTEMPTS: int = int(os.getenv("EXPORT_MAX_ATTEMPTS", "20"))  # Failed writes before an entry is dead-lettered
+
+    # Maximum messages returned per join_chat / get_messages call
+    CHAT_HISTORY_PAGE_SIZE: int = int(os.getenv("CHAT_HISTORY_PAGE_SIZE", "100"))
+
 
 config = Config()
@@ -389,10 +389,10 @@ async def _end_chat_with_closure(
     closure_content: str,
 ) -> dict[str, Any]:
     """End a chat with an agreed closure."""
-    from ..services import get_room_manager, get_chat_exporter
+    from ..services import get_room_manager, get_export_writer
 
     room_manager = get_room_manager()
-    chat_exporter = get_chat_exporter()
+    export_writer = get_export_writer()
 
     # Get metadata
     metadata = await redis_store.get_chat_metadata(chat_id)
@@ -400,12 +400,8 @@ async def _end_chat_with_closure(
     # Get export data
     export_data = await redis_store.get_chat_export_data(chat_id)
 
-    # Export to PostgreSQL
-    success = await chat_exporter.export_chat(
-        chat_id=chat_id,
-        export_data=export_data,
-        end_type="agreed_closure",
-    )
+    # Queue for export to PostgreSQL (written in the background)
+    success = await export_writer.enqueue(chat_id, export_data, end_type="agreed_closure")
 
     if not success:
         return {
@@ -429,7 +425,7 @@ async def _end_chat_with_closure(
     # Remove all users from chat room
     if metadata:
         for participant_id in metadata.participant_ids:
-            for participant_sid in room_manager.get_user_sids(participant_id):
+            for participant_sid in await room_manager.get_user_sids(participant_id):
                 await sio.leave_room(participant_sid, chat_room)
 
     # Delete Redis data
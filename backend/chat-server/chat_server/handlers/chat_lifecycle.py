@@ -7,7 +7,7 @@ from typing import Any
 
 import socketio
 
-from ..services import get_redis_store, get_room_manager, get_chat_exporter
+from ..services import get_redis_store, get_room_manager, get_chat_exporter, get_export_writer
 
 logger = logging.getLogger(__name__)
 
@@ -70,7 +70,7 @@ def register_lifecycle_handlers(sio: socketio.AsyncServer) -> None:
         # Join both participants to the chat room
         chat_room = room_manager.chat_room(chat_id)
         for participant_id in participants:
-            for participant_sid in room_manager.get_user_sids(participant_id):
+            for participant_sid in await room_manager.get_user_sids(participant_id):
                 await sio.enter_room(participant_sid, chat_room)
 
         # Notify all participants that chat has started
@@ -122,7 +122,7 @@ def register_lifecycle_handlers(sio: socketio.AsyncServer) -> None:
             }
 
         redis_store = get_redis_store()
-        chat_exporter = get_chat_exporter()
+        export_writer = get_export_writer()
 
         # Verify user is a participant
         metadata = await redis_store.get_chat_metadata(chat_id)
@@ -139,12 +139,8 @@ def register_lifecycle_handlers(sio: socketio.AsyncServer) -> None:
         # Add who ended the chat
         export_data["endedByUserId"] = user_id
 
-        # Export to PostgreSQL
-        success = await chat_exporter.export_chat(
-            chat_id=chat_id,
-            export_data=export_data,
-            end_type="user_exit",
-        )
+        # Queue for export to PostgreSQL (written in the background)
+        success = await export_writer.enqueue(chat_id, export_data, end_type="user_exit")
 
         if not success:
             return {
@@ -184,7 +180,7 @@ def register_lifecycle_handlers(sio: socketio.AsyncServer) -> None:
 
         # Remove all users from chat room
         for participant_id in metadata.participant_ids:
-            for participant_sid in room_manager.get_user_sids(participant_id):
+            for participant_sid in await room_manager.get_user_sids(participant_id):
                 await sio.leave_room(participant_sid, chat_room)
 
         # Delete Redis data
@@ -9,11 +9,17 @@ import socketio
 from socketio.exceptions import ConnectionRefusedError
 
 from ..auth import validate_token
+from ..config import config
 from ..services import get_redis_store, get_room_manager, get_chat_exporter
 
 logger = logging.getLogger(__name__)
 
 
+def _is_index(value: Any) -> bool:
+    """True for a non-negative int (bool excluded)."""
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
 def register_connection_handlers(sio: socketio.AsyncServer) -> None:
     """Register connection-related event handlers."""
 
@@ -48,7 +54,7 @@ def register_connection_handlers(sio: socketio.AsyncServer) -> None:
 
         # --- Session setup ---
         room_manager = get_room_manager()
-        room_manager.add_session(sid, user_id)
+        await room_manager.add_session(sid, user_id)
 
         # Join user's personal room for notifications
         await sio.enter_room(sid, room_manager.user_room(user_id))
@@ -88,7 +94,7 @@ def register_connection_handlers(sio: socketio.AsyncServer) -> None:
     async def disconnect(sid: str) -> None:
         """Handle socket disconnection."""
         room_manager = get_room_manager()
-        session = room_manager.remove_session(sid)
+        session = await room_manager.remove_session(sid)
 
         if session:
             logger.info(f"User {session.user_id} disconnected (sid: {sid})")
@@ -100,7 +106,12 @@ def register_connection_handlers(sio: socketio.AsyncServer) -> None:
         """
         Join a chat room (used when accepting a chat request).
 
-        Expected data: {"chatId": "UUID"}
+        Expected data: {"chatId": "UUID", "fromIndex"?: int, "beforeIndex"?: int, "limit"?: int}
+
+        History is paged (at most CHAT_HISTORY_PAGE_SIZE messages). Without a
+        cursor the most recent page is returned. A reconnecting client passes
+        fromIndex = the messageCount it last saw to receive only newer
+        messages; beforeIndex = firstIndex loads the page before that.
         """
         room_manager = get_room_manager()
         user_id = room_manager.get_user_id(sid)
@@ -112,6 +123,14 @@ def register_connection_handlers(sio: socketio.AsyncServer) -> None:
         if not chat_id:
             return {"status": "error", "code": "MISSING_CHAT_ID", "message": "Missing chatId"}
 
+        from_index = data.get("fromIndex")
+        before_index = data.get("beforeIndex")
+        limit = data.get("limit", config.CHAT_HISTORY_PAGE_SIZE)
+        if not all(_is_index(v) for v in (from_index, before_index) if v is not None) \
+                or not _is_index(limit) or limit == 0:
+            return {"status": "error", "code": "INVALID_CURSOR", "message": "Invalid history cursor"}
+        limit = min(limit, config.CHAT_HISTORY_PAGE_SIZE)
+
         redis_store = get_redis_store()
 
         # Verify user is a participant
@@ -129,24 +148,26 @@ def register_connection_handlers(sio: socketio.AsyncServer) -> None:
         room_manager.update_activity(sid)
 
         # Get chat history
-        messages = await redis_store.get_messages(chat_id)
+        page = await redis_store.get_message_page(chat_id, limit, from_index, before_index)
         positions = await redis_store.get_all_agreed_positions(chat_id)
 
         # Check if other participant is connected
-        metadata = await redis_store.get_chat_metadata(chat_id)
+        participants = await redis_store.get_participants(chat_id)
         other_user_connected = False
-        if metadata:
-            for participant_id in metadata.participant_ids:
-                if participant_id != user_id and room_manager.is_user_connected(participant_id):
+        if participants:
+            for participant_id in participants:
+                if participant_id != user_id and await room_manager.is_user_connected(participant_id):
                     other_user_connected = True
                     break
 
-        logger.info(f"User {user_id} joined chat {chat_id}, other user connected: {other_user_connected}, returning {len(messages)} messages")
+        logger.info(f"User {user_id} joined chat {chat_id}, other user connected: {other_user_connected}, returning {len(page.messages)} of {page.total} messages")
 
         return {
             "status": "joined",
             "chatId": chat_id,
-            "messages": [m.to_dict() for m in messages],
+            "messages": page.messages,
+            "firstIndex": page.first_index,
+            "messageCount": page.total,
             "agreedPositions": [p.to_dict() for p in positions],
             "otherUserConnected": other_user_connected,
         }
@@ -7,11 +7,26 @@ from typing import Any
 
 import socketio
 
+from ..config import config
 from ..services import get_redis_store, get_room_manager
+from .connection import _is_index
 
 logger = logging.getLogger(__name__)
 
 
+def _cap_range(start: int, end: int) -> tuple[int, int]:
+    """Limit an LRANGE-style (start, end) range to one history page."""
+    page = config.CHAT_HISTORY_PAGE_SIZE
+    if start < 0:
+        if end < 0:
+            return max(start, end - page + 1), end
+        # Only indexes 0..end can match, so this bounds the count too
+        return start, min(end, page - 1)
+    if end < 0 or end - start + 1 > page:
+        end = start + page - 1
+    return start, end
+
+
 def register_message_handlers(sio: socketio.AsyncServer) -> None:
     """Register message-related event handlers."""
 
@@ -121,6 +136,15 @@ def register_message_handlers(sio: socketio.AsyncServer) -> None:
         Get message history for a chat.
 
         Expected data: {"chatId": "UUID", "start": 0, "end": -1}
+                    or {"chatId": "UUID", "beforeIndex"|"fromIndex": int, "limit"?: int}
+
+        At most CHAT_HISTORY_PAGE_SIZE messages are returned, counted from
+        `start` (or back from `end` when `start` is negative).
+
+        With a join_chat cursor (beforeIndex to scroll back, fromIndex to
+        catch up) messages are returned as stored, like join_chat, together
+        with firstIndex and messageCount. Unlike join_chat it does not
+        re-enter the room or reload agreed positions.
 
         Returns: {"status": "ok", "messages": [...]}
         """
@@ -152,8 +176,24 @@ def register_message_handlers(sio: socketio.AsyncServer) -> None:
                 "message": "Not a participant in this chat",
             }
 
-        start = data.get("start", 0)
-        end = data.get("end", -1)
+        from_index = data.get("fromIndex")
+        before_index = data.get("beforeIndex")
+        if from_index is not None or before_index is not None:
+            limit = data.get("limit", config.CHAT_HISTORY_PAGE_SIZE)
+            if not all(_is_index(v) for v in (from_index, before_index) if v is not None) \
+                    or not _is_index(limit) or limit == 0:
+                return {"status": "error", "code": "INVALID_CURSOR", "message": "Invalid history cursor"}
+            page = await redis_store.get_message_page(
+                chat_id, min(limit, config.CHAT_HISTORY_PAGE_SIZE), from_index, before_index
+            )
+            return {
+                "status": "ok",
+                "messages": page.messages,
+                "firstIndex": page.first_index,
+                "messageCount": page.total,
+            }
+
+        start, end = _cap_range(data.get("start", 0), data.get("end", -1))
 
         messages = await redis_store.get_messages(chat_id, start, end)
 
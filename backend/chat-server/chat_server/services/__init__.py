@@ -8,26 +8,31 @@ from aiohttp import web
 
 from .redis_store import RedisStore
 from .chat_export import ChatExporter
+from .export_writer import ExportWriter
 from .room_manager import RoomManager, SESSION_TIMEOUT_SECONDS
 from .pubsub import PubSubService
+from ..config import config
 
 logger = logging.getLogger(__name__)
 
 # Global service instances
 redis_store: RedisStore = None
 chat_exporter: ChatExporter = None
+export_writer: ExportWriter = None
 room_manager: RoomManager = None
 pubsub_service: PubSubService = None
 _sio = None  # Socket.IO server reference
 _timeout_check_task = None  # Background task for checking timed-out sessions
 
-# How often to check for timed-out sessions (30 seconds)
-TIMEOUT_CHECK_INTERVAL = 30
+# How often to check for timed-out sessions (30 seconds). The same loop
+# refreshes the presence heartbeat, so it must fire several times per
+# PRESENCE_NODE_TTL or live nodes would be reaped as dead.
+TIMEOUT_CHECK_INTERVAL = max(1, min(30, config.PRESENCE_NODE_TTL // 3))
 
 
 async def initialize_services(app: web.Application) -> None:
     """Initialize all services on application startup."""
-    global redis_store, chat_exporter, room_manager, pubsub_service, _sio, _timeout_check_task
+    global redis_store, chat_exporter, export_writer, room_manager, pubsub_service, _sio, _timeout_check_task
 
     logger.info("Initializing services...")
 
@@ -42,8 +47,13 @@ async def initialize_services(app: web.Application) -> None:
     chat_exporter = ChatExporter()
     await chat_exporter.connect()
 
-    # Initialize room manager
+    # Initialize write-behind export of ended chats
+    export_writer = ExportWriter(chat_exporter)
+    await export_writer.connect()
+
+    # Initialize room manager (cluster-wide presence in Redis)
     room_manager = RoomManager()
+    await room_manager.connect()
 
     # Initialize pub/sub service and start listener
     pubsub_service = PubSubService()
@@ -52,6 +62,7 @@ async def initialize_services(app: web.Application) -> None:
         on_chat_accepted=_handle_chat_accepted,
         on_chat_request_response=_handle_chat_request_response,
         on_chat_request_received=_handle_chat_request_received,
+        on_chat_invalidated=redis_store.invalidate_chat,
     )
 
     # Start background task for checking timed-out sessions
@@ -60,6 +71,7 @@ async def initialize_services(app: web.Application) -> None:
     # Store services in app for access
     app["redis_store"] = redis_store
     app["chat_exporter"] = chat_exporter
+    app["export_writer"] = export_writer
     app["room_manager"] = room_manager
     app["pubsub_service"] = pubsub_service
 
@@ -71,7 +83,7 @@ async def initialize_services(app: web.Application) -> None:
 
 async def cleanup_services(app: web.Application) -> None:
     """Cleanup services on application shutdown."""
-    global redis_store, chat_exporter, pubsub_service, _timeout_check_task
+    global redis_store, chat_exporter, export_writer, room_manager, pubsub_service, _timeout_check_task
 
     logger.info("Cleaning up services...")
 
@@ -85,8 +97,13 @@ async def cleanup_services(app: web.Application) -> None:
 
     if pubsub_service:
         await pubsub_service.close()
+    if room_manager:
+        await room_manager.close()
     if redis_store:
         await redis_store.close()
+    # Before the exporter: the writer flushes what is queued on shutdown
+    if export_writer:
+        await export_writer.close()
     if chat_exporter:
         await chat_exporter.close()
 
@@ -94,7 +111,11 @@ async def cleanup_services(app: web.Application) -> None:
 
 
 async def _check_timed_out_sessions() -> None:
-    """Background task to check for and disconnect timed-out sessions."""
+    """Background task to check for and disconnect timed-out sessions.
+
+    Also refreshes this node's presence heartbeat, which must run more often
+    than PRESENCE_NODE_TTL.
+    """
     logger.info(f"Starting session timeout checker (interval: {TIMEOUT_CHECK_INTERVAL}s, timeout: {SESSION_TIMEOUT_SECONDS}s)")
 
     while True:
@@ -104,6 +125,8 @@ async def _check_timed_out_sessions() -> None:
             if not room_manager or not _sio:
                 continue
 
+            await room_manager.heartbeat()
+
             timed_out = room_manager.get_timed_out_sessions()
 
             for session in timed_out:
@@ -162,7 +185,7 @@ async def _handle_chat_accepted(data: dict) -> None:
     chat_room = room_manager.chat_room(chat_log_id)
 
     for user_id in participants:
-        for sid in room_manager.get_user_sids(user_id):
+        for sid in await room_manager.get_user_sids(user_id):
             if _sio:
                 await _sio.enter_room(sid, chat_room)
 
@@ -274,6 +297,13 @@ def get_chat_exporter() -> ChatExporter:
     return chat_exporter
 
 
+def get_export_writer() -> ExportWriter:
+    """Get the chat export writer instance."""
+    if export_writer is None:
+        raise RuntimeError("Export writer not initialized")
+    return export_writer
+
+
 def get_room_manager() -> RoomManager:
     """Get the room manager instance."""
     if room_manager is None:
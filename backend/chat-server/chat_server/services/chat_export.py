@@ -4,7 +4,7 @@ Service for exporting chat data to PostgreSQL when a chat ends.
 
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Any, Optional
 
 import asyncpg
@@ -56,52 +56,63 @@ class ChatExporter:
             await self._pool.close()
             logger.info("PostgreSQL connection closed")
 
-    async def export_chat(
-        self,
-        chat_id: str,
-        export_data: dict[str, Any],
-        end_type: str,
-    ) -> bool:
+    async def export_chats(self, entries: list[dict[str, Any]]) -> None:
         """
-        Export chat data to PostgreSQL.
+        Write a batch of ended chats to PostgreSQL in one transaction.
+
+        The batch is COPYed into a temporary staging table and applied to
+        chat_log with a single UPDATE, so a batch costs one round trip per
+        statement rather than one per chat. Re-applying an entry is harmless.
 
         Args:
-            chat_id: The chat log ID
-            export_data: Dict containing messages, agreedPositions, agreedClosure, etc.
-            end_type: Either 'user_exit' or 'agreed_closure'
+            entries: Export entries as queued by ExportWriter.enqueue:
+                {"chatId", "endType", "endTime" (unix time), "log" (export data)}
 
-        Returns:
-            True if successful, False otherwise
+        Raises:
+            Exception: if the batch could not be written (nothing is written)
         """
         if not self._pool:
-            logger.error("PostgreSQL pool not initialized")
-            return False
+            raise RuntimeError("PostgreSQL pool not initialized")
+
+        records = [
+            (
+                entry["chatId"],
+                json.dumps(entry["log"]),
+                datetime.fromtimestamp(entry["endTime"], timezone.utc),
+                entry["endType"],
+            )
+            for entry in entries
+        ]
 
-        try:
-            async with self._pool.acquire() as conn:
-                # Update the chat_log row with the exported data
+        async with self._pool.acquire() as conn:
+            async with conn.transaction():
                 await conn.execute(
                     """
-                    UPDATE chat_log
-                    SET log = $1::jsonb,
-                        end_time = $2,
-                        end_type = $3,
+                    CREATE TEMP TABLE chat_export_staging (
+                        id UUID,
+                        log JSONB,
+                        end_time TIMESTAMPTZ,
+                        end_type VARCHAR(50)
+                    ) ON COMMIT DROP
+                    """
+                )
+                await conn.copy_records_to_table(
+                    "chat_export_staging",
+                    records=records,
+                    columns=["id", "log", "end_time", "end_type"],
+                )
+                await conn.execute(
+                    """
+                    UPDATE chat_log cl
+                    SET log = s.log,
+                        end_time = s.end_time,
+                        end_type = s.end_type,
                         status = 'archived'
-                    WHERE id = $4::uuid
-                    """,
-                    json.dumps(export_data),
-                    datetime.utcnow(),
-                    end_type,
-                    chat_id,
+                    FROM chat_export_staging s
+                    WHERE cl.id = s.id
+                    """
                 )
 
-                logger.info(f"Exported chat {chat_id} to PostgreSQL with end_type={end_type}")
-                return True
-
-        except Exception as e:
-            logger.error(f"Failed to export chat {chat_id}: {e}")
-            return False
-
     async def create_chat_log(
         self,
         chat_request_id: str,
@@ -172,10 +183,7 @@ class ChatExporter:
                         u.trust_score as initiator_trust_score,
                         u.avatar_url as initiator_avatar_url,
                         u.avatar_icon_url as initiator_avatar_icon_url,
-                        COALESCE((
-                            SELECT COUNT(*) FROM kudos k
-                            WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-                        ), 0) as initiator_kudos_count,
+                        u.kudos_received_count as initiator_kudos_count,
                         p.id as position_id,
                         p.statement as position_statement,
                         pc.label as position_category_name,
@@ -188,10 +196,7 @@ class ChatExporter:
                         author.trust_score as author_trust_score,
                         author.avatar_url as author_avatar_url,
                         author.avatar_icon_url as author_avatar_icon_url,
-                        COALESCE((
-                            SELECT COUNT(*) FROM kudos k
-                            WHERE k.receiver_user_id = author.id AND k.status = 'sent'
-                        ), 0) as author_kudos_count
+                        author.kudos_received_count as author_kudos_count
                     FROM chat_request cr
                     JOIN user_position up ON cr.user_position_id = up.id
                     JOIN users u ON cr.initiator_user_id = u.id
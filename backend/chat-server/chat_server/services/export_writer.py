@@ -0,0 +1,297 @@
+"""
+Write-behind export of ended chats to PostgreSQL.
+
+Ending a chat snapshots its Redis data onto a durable Redis queue and
+returns, so chat teardown never waits on Postgres. A background task on
+every chat-server node claims batches from the queue and writes each batch
+to chat_log in one transaction (see ChatExporter.export_chats).
+
+Redis layout:
+- chat:export:queue     LIST of JSON export entries, oldest first
+- chat:export:inflight  ZSET entry -> unix time it was claimed
+- chat:export:attempts  HASH chat id -> failed write attempts so far
+- chat:export:dead      LIST of entries that failed EXPORT_MAX_ATTEMPTS times
+
+A batch that fails to write is retried one entry at a time, so a single
+bad entry cannot hold back the rest of its batch. Entries that still fail
+stay in chat:export:inflight and are put back on the queue
+EXPORT_RETRY_DELAY seconds later by whichever node looks first, so a
+Postgres outage (or a node crash mid-write) only delays exports. After
+EXPORT_MAX_ATTEMPTS failures an entry moves to chat:export:dead for
+inspection; RPOPLPUSH it back onto the queue to replay it. Writing an
+entry twice is harmless: the chat_log UPDATE is idempotent.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+from typing import Any, Optional
+
+import redis.asyncio as redis
+
+from ..config import config
+from .chat_export import ChatExporter
+
+logger = logging.getLogger(__name__)
+
+QUEUE_KEY = "chat:export:queue"
+INFLIGHT_KEY = "chat:export:inflight"
+ATTEMPTS_KEY = "chat:export:attempts"
+DEAD_LETTER_KEY = "chat:export:dead"
+
+# A claimed queue entry: (raw JSON as stored in Redis, decoded entry)
+Claimed = tuple[str, dict[str, Any]]
+
+# Window for the exported-chats-per-second figure in stats()
+THROUGHPUT_WINDOW_SECONDS = 60
+
+# KEYS: queue, inflight. ARGV: batch size, now.
+CLAIM_BATCH_LUA = """
+local items = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #items > 0 then
+    redis.call('LTRIM', KEYS[1], #items, -1)
+    for _, item in ipairs(items) do
+        redis.call('ZADD', KEYS[2], ARGV[2], item)
+    end
+end
+return items
+"""
+
+# KEYS: queue, inflight. ARGV: claimed-before cutoff.
+REQUEUE_STALE_LUA = """
+local items = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[1])
+for _, item in ipairs(items) do
+    redis.call('ZREM', KEYS[2], item)
+    redis.call('RPUSH', KEYS[1], item)
+end
+return #items
+"""
+
+# KEYS: inflight, attempts, dead letter. ARGV: max attempts, then chat id /
+# entry pairs. Entries that reach max attempts leave inflight for the dead
+# letter list. Returns the number dead-lettered.
+RECORD_FAILURES_LUA = """
+local dead = 0
+for i = 2, #ARGV, 2 do
+    local attempts = redis.call('HINCRBY', KEYS[2], ARGV[i], 1)
+    if attempts >= tonumber(ARGV[1]) then
+        redis.call('ZREM', KEYS[1], ARGV[i + 1])
+        redis.call('HDEL', KEYS[2], ARGV[i])
+        redis.call('RPUSH', KEYS[3], ARGV[i + 1])
+        dead = dead + 1
+    end
+end
+return dead
+"""
+
+
+class ExportWriter:
+    """Queues ended chats in Redis and writes them to PostgreSQL in batches."""
+
+    def __init__(self, exporter: ChatExporter):
+        self._exporter = exporter
+        self._redis: Optional[redis.Redis] = None
+        self._claim_batch = None
+        self._requeue_stale = None
+        self._record_failures = None
+        self._task: Optional[asyncio.Task] = None
+
+        self._exported_total = 0
+        self._batches_total = 0
+        self._failed_batches_total = 0
+        self._requeued_total = 0
+        self._dead_lettered_total = 0
+        self._last_batch_size = 0
+        self._last_batch_seconds = 0.0
+        self._last_lag_seconds = 0.0
+        self._recent: deque[tuple[float, int]] = deque()  # (time, chats written)
+
+    async def connect(self) -> None:
+        """Connect to Redis and start the background flush task."""
+        self._redis = redis.from_url(
+            config.REDIS_URL,
+            encoding="utf-8",
+            decode_responses=True,
+        )
+        self._claim_batch = self._redis.register_script(CLAIM_BATCH_LUA)
+        self._requeue_stale = self._redis.register_script(REQUEUE_STALE_LUA)
+        self._record_failures = self._redis.register_script(RECORD_FAILURES_LUA)
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"Started chat export writer (batch size {config.EXPORT_BATCH_SIZE}, "
+            f"flush interval {config.EXPORT_FLUSH_INTERVAL}s)"
+        )
+
+    async def close(self) -> None:
+        """Stop the flush task, write what is queued, and close Redis."""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._redis:
+            try:
+                while await self.flush_once() == config.EXPORT_BATCH_SIZE:
+                    pass
+            except Exception as e:
+                logger.warning(f"Final chat export flush failed, entries stay queued: {e}")
+            await self._redis.close()
+            self._redis = None
+
+    # ===== Enqueue (chat teardown path) =====
+
+    async def enqueue(self, chat_id: str, export_data: dict[str, Any], end_type: str) -> bool:
+        """Queue a chat snapshot for export.
+
+        Returns:
+            True if queued, False if Redis is unavailable
+        """
+        entry = {
+            "chatId": chat_id,
+            "endType": end_type,
+            "endTime": time.time(),
+            "log": export_data,
+        }
+        try:
+            await self._redis.rpush(QUEUE_KEY, json.dumps(entry))
+            return True
+        except Exception as e:
+            logger.error(f"Failed to queue export for chat {chat_id}: {e}")
+            return False
+
+    # ===== Flushing =====
+
+    async def _run(self) -> None:
+        """Flush loop: drain full batches back to back, otherwise wait."""
+        while True:
+            try:
+                await self.requeue_stale()
+                written = await self.flush_once()
+                if written < config.EXPORT_BATCH_SIZE:
+                    await asyncio.sleep(config.EXPORT_FLUSH_INTERVAL)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Chat export writer error: {e}")
+                await asyncio.sleep(config.EXPORT_FLUSH_INTERVAL)
+
+    async def requeue_stale(self, now: Optional[float] = None) -> int:
+        """Put batches that failed (or whose node died) back on the queue."""
+        cutoff = (now or time.time()) - config.EXPORT_RETRY_DELAY
+        requeued = await self._requeue_stale(keys=[QUEUE_KEY, INFLIGHT_KEY], args=[cutoff])
+        if requeued:
+            self._requeued_total += requeued
+            logger.info(f"Requeued {requeued} chat exports for retry")
+        return requeued
+
+    async def flush_once(self) -> int:
+        """Claim one batch and write it. Returns the number of chats written."""
+        raw = await self._claim_batch(
+            keys=[QUEUE_KEY, INFLIGHT_KEY],
+            args=[config.EXPORT_BATCH_SIZE, time.time()],
+        )
+        if not raw:
+            return 0
+
+        batch = [(item, json.loads(item)) for item in raw]
+        started = time.time()
+        try:
+            await self._exporter.export_chats([entry for _, entry in batch])
+            written, failed = batch, []
+        except Exception as e:
+            self._failed_batches_total += 1
+            if len(batch) == 1:
+                written, failed = [], batch
+            else:
+                logger.warning(f"Failed to export {len(batch)} chats, retrying one by one: {e}")
+                written, failed = await self._export_one_by_one(batch)
+            if failed:
+                logger.warning(
+                    f"Failed to export {len(failed)} chats, retrying in "
+                    f"{config.EXPORT_RETRY_DELAY}s: {e}"
+                )
+
+        if failed:
+            await self._record_failed(failed)
+        if not written:
+            return 0
+
+        pipe = self._redis.pipeline()
+        pipe.zrem(INFLIGHT_KEY, *[item for item, _ in written])
+        pipe.hdel(ATTEMPTS_KEY, *[entry["chatId"] for _, entry in written])
+        await pipe.execute()
+
+        finished = time.time()
+        self._exported_total += len(written)
+        self._batches_total += 1
+        self._last_batch_size = len(written)
+        self._last_batch_seconds = finished - started
+        self._last_lag_seconds = max(finished - e["endTime"] for _, e in written)
+        self._recent.append((finished, len(written)))
+        logger.info(
+            f"Exported {len(written)} chats to PostgreSQL in {self._last_batch_seconds:.3f}s "
+            f"(max lag {self._last_lag_seconds:.1f}s)"
+        )
+        return len(written)
+
+    async def _export_one_by_one(self, batch: list[Claimed]) -> tuple[list[Claimed], list[Claimed]]:
+        """Write a failed batch entry by entry. Returns (written, failed)."""
+        written, failed = [], []
+        for item, entry in batch:
+            try:
+                await self._exporter.export_chats([entry])
+                written.append((item, entry))
+            except Exception:
+                failed.append((item, entry))
+        return written, failed
+
+    async def _record_failed(self, failed: list[Claimed]) -> None:
+        """Count a failed attempt per entry and dead-letter exhausted ones."""
+        args: list[Any] = [config.EXPORT_MAX_ATTEMPTS]
+        for item, entry in failed:
+            args.extend([entry["chatId"], item])
+        dead = await self._record_failures(
+            keys=[INFLIGHT_KEY, ATTEMPTS_KEY, DEAD_LETTER_KEY], args=args
+        )
+        if dead:
+            self._dead_lettered_total += dead
+            logger.error(
+                f"Moved {dead} chat exports to {DEAD_LETTER_KEY} after "
+                f"{config.EXPORT_MAX_ATTEMPTS} failed attempts"
+            )
+
+    # ===== Metrics =====
+
+    async def stats(self) -> dict[str, Any]:
+        """Throughput, lag and backlog figures for the /metrics endpoint."""
+        now = time.time()
+        while self._recent and self._recent[0][0] < now - THROUGHPUT_WINDOW_SECONDS:
+            self._recent.popleft()
+
+        pipe = self._redis.pipeline()
+        pipe.llen(QUEUE_KEY)
+        pipe.zcard(INFLIGHT_KEY)
+        pipe.lindex(QUEUE_KEY, 0)
+        pipe.llen(DEAD_LETTER_KEY)
+        queued, inflight, oldest, dead_lettered = await pipe.execute()
+
+        return {
+            "exportedTotal": self._exported_total,
+            "batchesTotal": self._batches_total,
+            "failedBatchesTotal": self._failed_batches_total,
+            "requeuedTotal": self._requeued_total,
+            "deadLetteredTotal": self._dead_lettered_total,
+            "chatsPerSecond": sum(n for _, n in self._recent) / THROUGHPUT_WINDOW_SECONDS,
+            "lastBatchSize": self._last_batch_size,
+            "lastBatchSeconds": self._last_batch_seconds,
+            "lastExportLagSeconds": self._last_lag_seconds,
+            "queued": queued,
+            "inflight": inflight,
+            "deadLettered": dead_lettered,
+            "oldestQueuedSeconds": now - json.loads(oldest)["endTime"] if oldest else 0.0,
+        }
@@ -3,11 +3,22 @@ Redis pub/sub service for inter-service communication.
 
 The REST API publishes events when chat requests are accepted,
 and this service handles setting up the chat and notifying users.
+
+Redis pub/sub delivers every event to every chat-server node. Each node
+claims an event with SET NX on chat:events:claimed:{eventId} before handling
+it, so exactly one node acts on it. Its emits then reach sockets on all nodes
+through the Socket.IO Redis client manager. Events without an eventId (from
+older publishers) are keyed by a hash of the raw message.
+
+chat:invalidate carries the ids of deleted chats. Every node handles it (no
+claim) to drop the chat from its in-process participant cache.
 """
 
 import asyncio
+import hashlib
 import json
 import logging
+import uuid
 from typing import Optional
 
 import redis.asyncio as redis
@@ -18,6 +29,8 @@ logger = logging.getLogger(__name__)
 
 # Channel names
 CHAT_EVENTS_CHANNEL = "chat:events"
+CHAT_INVALIDATE_CHANNEL = "chat:invalidate"
+EVENT_CLAIM_PREFIX = "chat:events:claimed:"
 
 
 class PubSubService:
@@ -37,17 +50,37 @@ class PubSubService:
             decode_responses=True,
         )
         self._pubsub = self._redis.pubsub()
-        await self._pubsub.subscribe(CHAT_EVENTS_CHANNEL)
-        logger.info(f"Subscribed to channel: {CHAT_EVENTS_CHANNEL}")
+        await self._pubsub.subscribe(CHAT_EVENTS_CHANNEL, CHAT_INVALIDATE_CHANNEL)
+        logger.info(f"Subscribed to channels: {CHAT_EVENTS_CHANNEL}, {CHAT_INVALIDATE_CHANNEL}")
 
-    async def start_listener(self, on_chat_accepted, on_chat_request_response=None, on_chat_request_received=None) -> None:
+    async def claim_event(self, data: dict, raw: str) -> bool:
+        """Return True if this node should handle the event (first to claim it).
+
+        Fails open: if Redis can't record the claim, the event is handled
+        rather than dropped.
+        """
+        event_id = data.get("eventId") or hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        try:
+            return bool(await self._redis.set(
+                f"{EVENT_CLAIM_PREFIX}{event_id}",
+                config.NODE_ID,
+                nx=True,
+                ex=config.EVENT_CLAIM_TTL,
+            ))
+        except Exception as e:
+            logger.warning(f"Could not claim pub/sub event {event_id}: {e}")
+            return True
+
+    async def start_listener(self, on_chat_accepted, on_chat_request_response=None, on_chat_request_received=None,
+                             on_chat_invalidated=None) -> None:
         """Start the background listener task."""
         self._listener_task = asyncio.create_task(
-            self._listen(on_chat_accepted, on_chat_request_response, on_chat_request_received)
+            self._listen(on_chat_accepted, on_chat_request_response, on_chat_request_received, on_chat_invalidated)
         )
         logger.info("Started pub/sub listener task")
 
-    async def _listen(self, on_chat_accepted, on_chat_request_response=None, on_chat_request_received=None) -> None:
+    async def _listen(self, on_chat_accepted, on_chat_request_response=None, on_chat_request_received=None,
+                      on_chat_invalidated=None) -> None:
         """Listen for messages and dispatch to handlers.
 
         Auto-reconnects with exponential backoff on connection failures.
@@ -61,10 +94,19 @@ class PubSubService:
                     if message["type"] != "message":
                         continue
 
+                    if message["channel"] == CHAT_INVALIDATE_CHANNEL:
+                        if on_chat_invalidated:
+                            on_chat_invalidated(message["data"])
+                        continue
+
                     try:
                         data = json.loads(message["data"])
                         event_type = data.get("event")
 
+                        if not await self.claim_event(data, message["data"]):
+                            logger.debug(f"Event {event_type} already handled by another node")
+                            continue
+
                         if event_type == "chat_accepted":
                             await on_chat_accepted(data)
                         elif event_type == "chat_request_response":
@@ -109,7 +151,7 @@ class PubSubService:
             decode_responses=True,
         )
         self._pubsub = self._redis.pubsub()
-        await self._pubsub.subscribe(CHAT_EVENTS_CHANNEL)
+        await self._pubsub.subscribe(CHAT_EVENTS_CHANNEL, CHAT_INVALIDATE_CHANNEL)
         logger.info("Pub/sub reconnected successfully")
 
     async def close(self) -> None:
@@ -122,7 +164,7 @@ class PubSubService:
                 pass
 
         if self._pubsub:
-            await self._pubsub.unsubscribe(CHAT_EVENTS_CHANNEL)
+            await self._pubsub.unsubscribe(CHAT_EVENTS_CHANNEL, CHAT_INVALIDATE_CHANNEL)
             await self._pubsub.close()
 
         if self._redis:
@@ -158,6 +200,7 @@ async def publish_chat_accepted(
     try:
         event = {
             "event": "chat_accepted",
+            "eventId": uuid.uuid4().hex,
             "chatLogId": chat_log_id,
             "chatRequestId": chat_request_id,
             "initiatorUserId": initiator_user_id,
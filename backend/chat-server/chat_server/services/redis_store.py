@@ -1,10 +1,21 @@
 """
 Redis storage service for active chat data.
+
+Every write is a single round trip: multi-key writes go through a
+transactional (MULTI/EXEC) pipeline, and read-modify-write operations run
+as Lua scripts so they are atomic without WATCH retries.
+
+Chat participants are cached in process, since every message, join and
+typing event checks them and they never change for the life of a chat.
+delete_chat publishes the chat id on chat:invalidate so every node drops
+its entry.
 """
 
 import json
 import logging
+import time
 import uuid
+from collections import OrderedDict
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Any, Optional
@@ -12,9 +23,43 @@ from typing import Any, Optional
 import redis.asyncio as redis
 
 from ..config import config
+from .pubsub import CHAT_INVALIDATE_CHANNEL
 
 logger = logging.getLogger(__name__)
 
+# KEYS: positions hash. ARGV: position id, new status.
+# Returns the updated position JSON, or nil if it doesn't exist.
+UPDATE_POSITION_STATUS_LUA = """
+local data = redis.call('HGET', KEYS[1], ARGV[1])
+if not data then
+    return nil
+end
+local position = cjson.decode(data)
+position['status'] = ARGV[2]
+data = cjson.encode(position)
+redis.call('HSET', KEYS[1], ARGV[1], data)
+return data
+"""
+
+# KEYS: messages, positions, closure, metadata.
+# ARGV: chat id, active-chats key template containing {user_id}, invalidation channel.
+# Returns the number of participants the chat was removed from.
+DELETE_CHAT_LUA = """
+local ids = redis.call('HGET', KEYS[4], 'participantIds')
+    or redis.call('HGET', KEYS[4], 'participant_ids')
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[3], KEYS[4])
+redis.call('PUBLISH', ARGV[3], ARGV[1])
+if not ids then
+    return 0
+end
+local participants = cjson.decode(ids)
+for _, user_id in ipairs(participants) do
+    local key = string.gsub(ARGV[2], '{user_id}', user_id)
+    redis.call('SREM', key, ARGV[1])
+end
+return #participants
+"""
+
 
 @dataclass
 class ChatMessage:
@@ -136,11 +181,35 @@ class ChatMetadata:
         )
 
 
+@dataclass
+class MessagePage:
+    """A contiguous slice of a chat's message list.
+
+    Messages are only ever appended to a chat's list, so a message's index
+    is a stable cursor: a client that has seen ``first_index + len(messages)``
+    messages can ask for the rest starting from that index.
+    """
+
+    messages: list[dict]  # Stored message dicts (ChatMessage.to_dict() shape)
+    first_index: int  # List index of messages[0]
+    total: int  # Total messages in the chat
+
+
+def decode_messages(raw: list[str]) -> list[dict]:
+    """Decode stored message JSON strings in a single parse."""
+    if not raw:
+        return []
+    return json.loads("[" + ",".join(raw) + "]")
+
+
 class RedisStore:
     """Redis storage for active chat data."""
 
     def __init__(self):
         self._redis: Optional[redis.Redis] = None
+        self._scripts: dict[str, Any] = {}
+        # chat_id -> (expires_at, participant ids), least recently used first
+        self._participants: OrderedDict[str, tuple[float, frozenset[str]]] = OrderedDict()
 
     async def connect(self) -> None:
         """Connect to Redis."""
@@ -160,6 +229,14 @@ class RedisStore:
             await self._redis.close()
             logger.info("Redis connection closed")
 
+    def _script(self, source: str):
+        """Registered Lua script (EVALSHA, loading it on first use)."""
+        script = self._scripts.get(source)
+        if script is None or script.registered_client is not self._redis:
+            script = self._redis.register_script(source)
+            self._scripts[source] = script
+        return script
+
     def _messages_key(self, chat_id: str) -> str:
         return config.CHAT_MESSAGES_KEY.format(chat_id=chat_id)
 
@@ -175,6 +252,32 @@ class RedisStore:
     def _user_chats_key(self, user_id: str) -> str:
         return config.USER_ACTIVE_CHATS_KEY.format(user_id=user_id)
 
+    # ===== Participant Cache =====
+
+    def _cache_participants(self, chat_id: str, participant_ids: list[str]) -> frozenset[str]:
+        participants = frozenset(participant_ids)
+        self._participants[chat_id] = (time.monotonic() + config.CHAT_PARTICIPANT_CACHE_TTL, participants)
+        self._participants.move_to_end(chat_id)
+        while len(self._participants) > config.CHAT_PARTICIPANT_CACHE_SIZE:
+            self._participants.popitem(last=False)
+        return participants
+
+    def invalidate_chat(self, chat_id: str) -> None:
+        """Drop a chat from the participant cache (called on every node when it is deleted)."""
+        self._participants.pop(chat_id, None)
+
+    async def get_participants(self, chat_id: str) -> Optional[frozenset[str]]:
+        """Participant ids for a chat, from cache when possible. None if the chat doesn't exist."""
+        entry = self._participants.get(chat_id)
+        if entry and entry[0] > time.monotonic():
+            self._participants.move_to_end(chat_id)
+            return entry[1]
+        metadata = await self.get_chat_metadata(chat_id)
+        if not metadata:
+            self.invalidate_chat(chat_id)
+            return None
+        return self._participants[chat_id][1]
+
     # ===== Chat Metadata =====
 
     async def create_chat(
@@ -187,8 +290,8 @@ class RedisStore:
             start_time=datetime.utcnow().isoformat(),
         )
 
-        # Store metadata
-        await self._redis.hset(
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(
             self._metadata_key(chat_id),
             mapping={
                 "chatId": metadata.chat_id,
@@ -196,22 +299,26 @@ class RedisStore:
                 "startTime": metadata.start_time,
             },
         )
-
-        # Set TTL
-        await self._redis.expire(
-            self._metadata_key(chat_id), config.REDIS_MESSAGE_TTL
-        )
-
+        pipe.expire(self._metadata_key(chat_id), config.REDIS_MESSAGE_TTL)
         # Add chat to each user's active chats
         for user_id in participant_ids:
-            await self._redis.sadd(self._user_chats_key(user_id), chat_id)
+            pipe.sadd(self._user_chats_key(user_id), chat_id)
+        await pipe.execute()
+        self._cache_participants(chat_id, participant_ids)
 
         logger.info(f"Created chat {chat_id} with participants {participant_ids}")
         return metadata
 
     async def get_chat_metadata(self, chat_id: str) -> Optional[ChatMetadata]:
-        """Get chat metadata."""
-        data = await self._redis.hgetall(self._metadata_key(chat_id))
+        """Get chat metadata (and refresh the participant cache)."""
+        metadata = self._parse_metadata(await self._redis.hgetall(self._metadata_key(chat_id)))
+        if metadata:
+            self._cache_participants(chat_id, metadata.participant_ids)
+        return metadata
+
+    @staticmethod
+    def _parse_metadata(data: dict) -> Optional[ChatMetadata]:
+        """Build ChatMetadata from the stored hash (None if it doesn't exist)."""
         if not data:
             return None
 
@@ -227,10 +334,8 @@ class RedisStore:
 
     async def is_chat_participant(self, chat_id: str, user_id: str) -> bool:
         """Check if a user is a participant in a chat."""
-        metadata = await self.get_chat_metadata(chat_id)
-        if not metadata:
-            return False
-        return user_id in metadata.participant_ids
+        participants = await self.get_participants(chat_id)
+        return participants is not None and user_id in participants
 
     # ===== Messages =====
 
@@ -252,15 +357,10 @@ class RedisStore:
             timestamp=datetime.utcnow().isoformat(),
         )
 
-        await self._redis.rpush(
-            self._messages_key(chat_id),
-            json.dumps(message.to_dict()),
-        )
-
-        # Refresh TTL
-        await self._redis.expire(
-            self._messages_key(chat_id), config.REDIS_MESSAGE_TTL
-        )
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.rpush(self._messages_key(chat_id), json.dumps(message.to_dict()))
+        pipe.expire(self._messages_key(chat_id), config.REDIS_MESSAGE_TTL)
+        await pipe.execute()
 
         return message
 
@@ -273,6 +373,40 @@ class RedisStore:
         )
         return [ChatMessage.from_dict(json.loads(m)) for m in messages_json]
 
+    async def get_message_page(
+        self,
+        chat_id: str,
+        limit: int,
+        from_index: Optional[int] = None,
+        before_index: Optional[int] = None,
+    ) -> MessagePage:
+        """Get up to `limit` messages in one round trip.
+
+        - from_index:   messages from that index onwards (catch-up after reconnect)
+        - before_index: the messages just before that index (scrolling back)
+        - neither:      the most recent messages
+
+        Messages are returned as stored, without building ChatMessage objects.
+        """
+        if from_index is not None:
+            start, end = from_index, from_index + limit - 1
+        elif before_index is not None:
+            if before_index <= 0:
+                # Already at the start; LRANGE 0 -1 would read the whole list
+                total = await self._redis.llen(self._messages_key(chat_id))
+                return MessagePage(messages=[], first_index=0, total=total)
+            start, end = max(0, before_index - limit), before_index - 1
+        else:
+            start, end = -limit, -1
+
+        pipe = self._redis.pipeline()
+        pipe.llen(self._messages_key(chat_id))
+        pipe.lrange(self._messages_key(chat_id), start, end)
+        total, raw = await pipe.execute()
+
+        first_index = max(0, total - limit) if start < 0 else min(start, total)
+        return MessagePage(messages=decode_messages(raw), first_index=first_index, total=total)
+
     # ===== Agreed Positions =====
 
     async def add_agreed_position(
@@ -294,16 +428,10 @@ class RedisStore:
             timestamp=datetime.utcnow().isoformat(),
         )
 
-        await self._redis.hset(
-            self._positions_key(chat_id),
-            position.id,
-            json.dumps(position.to_dict()),
-        )
-
-        # Refresh TTL
-        await self._redis.expire(
-            self._positions_key(chat_id), config.REDIS_MESSAGE_TTL
-        )
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.hset(self._positions_key(chat_id), position.id, json.dumps(position.to_dict()))
+        pipe.expire(self._positions_key(chat_id), config.REDIS_MESSAGE_TTL)
+        await pipe.execute()
 
         return position
 
@@ -327,20 +455,13 @@ class RedisStore:
     async def update_agreed_position_status(
         self, chat_id: str, position_id: str, status: str
     ) -> Optional[AgreedPosition]:
-        """Update the status of an agreed position."""
-        position = await self.get_agreed_position(chat_id, position_id)
-        if not position:
-            return None
-
-        position.status = status
-
-        await self._redis.hset(
-            self._positions_key(chat_id),
-            position_id,
-            json.dumps(position.to_dict()),
+        """Update the status of an agreed position (atomic read-modify-write)."""
+        data = await self._script(UPDATE_POSITION_STATUS_LUA)(
+            keys=[self._positions_key(chat_id)], args=[position_id, status]
         )
-
-        return position
+        if not data:
+            return None
+        return AgreedPosition.from_dict(json.loads(data))
 
     # ===== Closure Proposal =====
 
@@ -377,11 +498,18 @@ class RedisStore:
     # ===== Chat Export / Cleanup =====
 
     async def get_chat_export_data(self, chat_id: str) -> dict[str, Any]:
-        """Get all chat data for export to PostgreSQL."""
-        messages = await self.get_messages(chat_id)
-        positions = await self.get_all_agreed_positions(chat_id)
-        metadata = await self.get_chat_metadata(chat_id)
-        closure = await self.get_closure_proposal(chat_id)
+        """Get all chat data for export to PostgreSQL (one consistent snapshot)."""
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.lrange(self._messages_key(chat_id), 0, -1)
+        pipe.hgetall(self._positions_key(chat_id))
+        pipe.hgetall(self._metadata_key(chat_id))
+        pipe.get(self._closure_key(chat_id))
+        messages_json, positions_data, metadata_data, closure_data = await pipe.execute()
+
+        messages = [ChatMessage.from_dict(json.loads(m)) for m in messages_json]
+        positions = [AgreedPosition.from_dict(json.loads(d)) for d in positions_data.values()]
+        metadata = self._parse_metadata(metadata_data)
+        closure = ClosureProposal.from_dict(json.loads(closure_data)) if closure_data else None
 
         return {
             "messages": [m.to_dict() for m in messages],
@@ -392,20 +520,21 @@ class RedisStore:
         }
 
     async def delete_chat(self, chat_id: str) -> None:
-        """Delete all Redis data for a chat after export."""
-        metadata = await self.get_chat_metadata(chat_id)
-
-        # Delete all chat keys
-        await self._redis.delete(
-            self._messages_key(chat_id),
-            self._positions_key(chat_id),
-            self._closure_key(chat_id),
-            self._metadata_key(chat_id),
+        """Delete all Redis data for a chat after export.
+
+        The chat keys and the participants' active-chat entries are removed
+        atomically in one round trip, and other nodes are told to drop the
+        chat from their participant caches.
+        """
+        await self._script(DELETE_CHAT_LUA)(
+            keys=[
+                self._messages_key(chat_id),
+                self._positions_key(chat_id),
+                self._closure_key(chat_id),
+                self._metadata_key(chat_id),
+            ],
+            args=[chat_id, config.USER_ACTIVE_CHATS_KEY, CHAT_INVALIDATE_CHANNEL],
         )
-
-        # Remove chat from users' active chats
-        if metadata:
-            for user_id in metadata.participant_ids:
-                await self._redis.srem(self._user_chats_key(user_id), chat_id)
+        self.invalidate_chat(chat_id)
 
         logger.info(f"Deleted chat {chat_id} from Redis")
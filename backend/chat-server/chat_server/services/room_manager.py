@@ -1,5 +1,19 @@
 """
 Socket.IO room management service.
+
+Sessions are owned by the node their socket is connected to, so the
+sid -> session map (activity, timeouts) stays in process. Presence is
+mirrored to Redis so every chat-server node can see every user's sockets:
+
+- presence:user:{user_id}   HASH sid -> node id
+- presence:node:{node_id}   HASH sid -> user id (for cleaning up after a crash)
+- presence:node:{node_id}:alive  STRING, refreshed by heartbeat() with a TTL
+- presence:nodes            SET of node ids that have registered sessions
+
+Room membership itself is handled by Socket.IO's Redis client manager, which
+forwards enter_room/leave_room/emit for sockets on other nodes.
+
+A RoomManager created without connect() tracks sessions locally only.
 """
 
 import logging
@@ -7,11 +21,17 @@ import time
 from dataclasses import dataclass, field
 from typing import Optional
 
+import redis.asyncio as redis
+
+from ..config import config
+
 logger = logging.getLogger(__name__)
 
 # Timeout for inactive sessions (2 minutes)
 SESSION_TIMEOUT_SECONDS = 120
 
+NODES_KEY = "presence:nodes"
+
 
 @dataclass
 class UserSession:
@@ -25,13 +45,44 @@ class UserSession:
 class RoomManager:
     """Manages Socket.IO rooms and user sessions."""
 
-    def __init__(self):
+    def __init__(self, node_id: Optional[str] = None):
+        self.node_id = node_id or config.NODE_ID
+        self._redis: Optional[redis.Redis] = None
         # sid -> UserSession
         self._sessions: dict[str, UserSession] = {}
         # user_id -> set of sids (user can have multiple connections)
         self._user_sids: dict[str, set[str]] = {}
 
-    def add_session(self, sid: str, user_id: str) -> UserSession:
+    async def connect(self) -> None:
+        """Connect to Redis for cluster-wide presence."""
+        self._redis = redis.from_url(
+            config.REDIS_URL,
+            encoding="utf-8",
+            decode_responses=True,
+        )
+        await self.heartbeat()
+        logger.info(f"Room manager registered node {self.node_id}")
+
+    async def close(self) -> None:
+        """Drop this node's presence entries and close the Redis connection."""
+        if self._redis:
+            await self._forget_node(self.node_id)
+            await self._redis.close()
+            self._redis = None
+
+    @staticmethod
+    def _user_key(user_id: str) -> str:
+        return f"presence:user:{user_id}"
+
+    @staticmethod
+    def _node_key(node_id: str) -> str:
+        return f"presence:node:{node_id}"
+
+    @staticmethod
+    def _alive_key(node_id: str) -> str:
+        return f"presence:node:{node_id}:alive"
+
+    async def add_session(self, sid: str, user_id: str) -> UserSession:
         """Register a new user session."""
         session = UserSession(user_id=user_id, sid=sid)
         self._sessions[sid] = session
@@ -40,10 +91,17 @@ class RoomManager:
             self._user_sids[user_id] = set()
         self._user_sids[user_id].add(sid)
 
+        if self._redis:
+            pipe = self._redis.pipeline()
+            pipe.hset(self._user_key(user_id), sid, self.node_id)
+            pipe.hset(self._node_key(self.node_id), sid, user_id)
+            pipe.sadd(NODES_KEY, self.node_id)
+            await pipe.execute()
+
         logger.info(f"Added session {sid} for user {user_id}")
         return session
 
-    def remove_session(self, sid: str) -> Optional[UserSession]:
+    async def remove_session(self, sid: str) -> Optional[UserSession]:
         """Remove a user session."""
         session = self._sessions.pop(sid, None)
         if session:
@@ -52,25 +110,42 @@ class RoomManager:
                 user_sids.discard(sid)
                 if not user_sids:
                     del self._user_sids[session.user_id]
+
+            if self._redis:
+                pipe = self._redis.pipeline()
+                pipe.hdel(self._user_key(session.user_id), sid)
+                pipe.hdel(self._node_key(self.node_id), sid)
+                await pipe.execute()
+
             logger.info(f"Removed session {sid} for user {session.user_id}")
         return session
 
     def get_session(self, sid: str) -> Optional[UserSession]:
-        """Get session by socket ID."""
+        """Get session by socket ID (sockets on this node only)."""
         return self._sessions.get(sid)
 
     def get_user_id(self, sid: str) -> Optional[str]:
-        """Get user ID for a socket session."""
+        """Get user ID for a socket session on this node."""
         session = self._sessions.get(sid)
         return session.user_id if session else None
 
-    def get_user_sids(self, user_id: str) -> set[str]:
-        """Get all socket IDs for a user."""
+    def get_local_user_sids(self, user_id: str) -> set[str]:
+        """Get a user's socket IDs on this node."""
         return self._user_sids.get(user_id, set()).copy()
 
-    def is_user_connected(self, user_id: str) -> bool:
-        """Check if a user has any active connections."""
-        return bool(self._user_sids.get(user_id))
+    async def get_user_sids(self, user_id: str) -> set[str]:
+        """Get all socket IDs for a user, across every node."""
+        if not self._redis:
+            return self.get_local_user_sids(user_id)
+        return set(await self._redis.hkeys(self._user_key(user_id)))
+
+    async def is_user_connected(self, user_id: str) -> bool:
+        """Check if a user has any active connections on any node."""
+        if self._user_sids.get(user_id):
+            return True
+        if not self._redis:
+            return False
+        return await self._redis.hlen(self._user_key(user_id)) > 0
 
     def update_activity(self, sid: str) -> None:
         """Update the last activity timestamp for a session."""
@@ -79,7 +154,7 @@ class RoomManager:
             session.last_activity = time.time()
 
     def get_timed_out_sessions(self) -> list[UserSession]:
-        """Get all sessions that have timed out due to inactivity."""
+        """Get all sessions on this node that have timed out due to inactivity."""
         now = time.time()
         timed_out = []
         for session in self._sessions.values():
@@ -88,9 +163,53 @@ class RoomManager:
         return timed_out
 
     def get_all_sessions(self) -> list[UserSession]:
-        """Get all active sessions."""
+        """Get all active sessions on this node."""
         return list(self._sessions.values())
 
+    # ===== Node liveness =====
+
+    async def heartbeat(self) -> None:
+        """Refresh this node's liveness key and clean up after dead nodes.
+
+        A node that crashes never removes its sessions; once its alive key
+        expires, the next heartbeat on any surviving node removes them.
+        If this node's own key had expired (e.g. a long event loop stall),
+        another node may already have removed its sessions, so they are
+        registered again.
+        """
+        if not self._redis:
+            return
+        was_alive = await self._redis.set(
+            self._alive_key(self.node_id), "1", ex=config.PRESENCE_NODE_TTL, get=True
+        )
+        await self._redis.sadd(NODES_KEY, self.node_id)
+        if was_alive is None and self._sessions:
+            logger.warning(f"Presence for node {self.node_id} expired, re-registering sessions")
+            await self._register_sessions()
+
+        for node_id in await self._redis.smembers(NODES_KEY):
+            if node_id != self.node_id and not await self._redis.exists(self._alive_key(node_id)):
+                logger.warning(f"Removing presence for dead chat-server node {node_id}")
+                await self._forget_node(node_id)
+
+    async def _register_sessions(self) -> None:
+        """Write every local session to the presence hashes."""
+        pipe = self._redis.pipeline()
+        for sid, session in self._sessions.items():
+            pipe.hset(self._user_key(session.user_id), sid, self.node_id)
+            pipe.hset(self._node_key(self.node_id), sid, session.user_id)
+        await pipe.execute()
+
+    async def _forget_node(self, node_id: str) -> None:
+        """Remove every presence entry registered by a node."""
+        sessions = await self._redis.hgetall(self._node_key(node_id))
+        pipe = self._redis.pipeline()
+        for sid, user_id in sessions.items():
+            pipe.hdel(self._user_key(user_id), sid)
+        pipe.delete(self._node_key(node_id), self._alive_key(node_id))
+        pipe.srem(NODES_KEY, node_id)
+        await pipe.execute()
+
     @staticmethod
     def user_room(user_id: str) -> str:
         """Get the personal room name for a user."""
@@ -0,0 +1,93 @@
+"""
+Multi-process harness: runs several chat-server nodes against one Redis.
+
+Each node is a separate ``python -m chat_server`` process on its own port
+with its own NODE_ID, sharing REDIS_URL, DATABASE_URL and Keycloak settings
+with the test process.
+"""
+
+import os
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+CHAT_SERVER_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class ChatServerNode:
+    """One chat-server process."""
+
+    def __init__(self, node_id: str, port: int, env: dict):
+        self.node_id = node_id
+        self.port = port
+        self.url = f"http://127.0.0.1:{port}"
+        self._env = {**env, "PORT": str(port), "HOST": "127.0.0.1", "NODE_ID": node_id}
+        self._process = None
+
+    def start(self) -> None:
+        self._process = subprocess.Popen(
+            [sys.executable, "-m", "chat_server"],
+            cwd=CHAT_SERVER_ROOT,
+            env=self._env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+        )
+
+    def wait_ready(self, timeout: float = 20.0) -> None:
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self._process.poll() is not None:
+                stderr = self._process.stderr.read().decode(errors="replace")
+                raise RuntimeError(f"Node {self.node_id} exited during startup:\n{stderr[-2000:]}")
+            try:
+                with urllib.request.urlopen(f"{self.url}/health", timeout=1):
+                    return
+            except OSError:
+                time.sleep(0.2)
+        raise TimeoutError(f"Node {self.node_id} not healthy after {timeout}s")
+
+    def stop(self) -> None:
+        if self._process and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+class ChatCluster:
+    """N chat-server nodes sharing one Redis."""
+
+    def __init__(self, size: int = 2, env: dict | None = None):
+        base_env = {**os.environ, **(env or {})}
+        self.nodes = [
+            ChatServerNode(f"test-node-{i}", _free_port(), base_env)
+            for i in range(size)
+        ]
+
+    def __enter__(self) -> "ChatCluster":
+        for node in self.nodes:
+            node.start()
+        try:
+            for node in self.nodes:
+                node.wait_ready()
+        except Exception:
+            self.stop()
+            raise
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def stop(self) -> None:
+        for node in self.nodes:
+            node.stop()
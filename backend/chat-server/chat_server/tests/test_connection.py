@@ -225,3 +225,44 @@ class TestJoinChat:
         assert response["messages"][0]["content"] == "Message 0"
 
         await client.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_join_chat_returns_only_new_messages_from_cursor(
+        self, test_server, redis_client, user1_id, user1_token, setup_chat
+    ):
+        """Test that a reconnecting client receives only messages after its cursor."""
+        import json
+
+        for i in range(5):
+            msg = {
+                "id": str(uuid.uuid4()),
+                "senderId": user1_id,
+                "type": "text",
+                "content": f"Message {i}",
+                "targetId": None,
+                "timestamp": "2024-01-01T00:00:00",
+            }
+            await redis_client.rpush(f"chat:{setup_chat}:messages", json.dumps(msg))
+
+        client = socketio.AsyncClient()
+        url = f"http://{test_server.host}:{test_server.port}"
+        await client.connect(url)
+        await client.call("authenticate", {"token": user1_token})
+
+        response = await client.call("join_chat", {"chatId": setup_chat, "fromIndex": 3})
+
+        assert [m["content"] for m in response["messages"]] == ["Message 3", "Message 4"]
+        assert response["firstIndex"] == 3
+        assert response["messageCount"] == 5
+
+        await client.disconnect()
+
+    @pytest.mark.asyncio
+    async def test_join_chat_invalid_cursor(self, authenticated_client, setup_chat):
+        """Test that a negative or non-integer cursor is rejected."""
+        client, _ = authenticated_client
+
+        response = await client.call("join_chat", {"chatId": setup_chat, "fromIndex": -1})
+
+        assert response["status"] == "error"
+        assert response["code"] == "INVALID_CURSOR"
@@ -0,0 +1,190 @@
+"""
+Tests for the write-behind chat export queue.
+"""
+
+import json
+import time
+import uuid
+from typing import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+import pytest_asyncio
+
+from chat_server.config import config
+from chat_server.services.chat_export import ChatExporter
+from chat_server.services.export_writer import (
+    ATTEMPTS_KEY,
+    DEAD_LETTER_KEY,
+    INFLIGHT_KEY,
+    QUEUE_KEY,
+    ExportWriter,
+)
+
+EXPORT_KEYS = (QUEUE_KEY, INFLIGHT_KEY, ATTEMPTS_KEY, DEAD_LETTER_KEY)
+
+
+@pytest_asyncio.fixture
+async def writer(redis_client) -> AsyncGenerator[tuple[ExportWriter, AsyncMock], None]:
+    """An export writer over a mock exporter, with flushes driven by the test."""
+    exporter = AsyncMock()
+    export_writer = ExportWriter(exporter)
+    await export_writer.connect()
+    export_writer._task.cancel()
+    await redis_client.delete(*EXPORT_KEYS)
+
+    yield export_writer, exporter
+
+    await redis_client.delete(*EXPORT_KEYS)
+    await export_writer.close()
+
+
+def _export_data(content: str = "Hello") -> dict:
+    return {"messages": [{"content": content}], "agreedPositions": [], "agreedClosure": None}
+
+
+class TestEnqueue:
+    """Tests for queueing ended chats."""
+
+    async def test_enqueue_does_not_touch_postgres(self, writer, redis_client):
+        """Test that ending a chat only writes to Redis."""
+        export_writer, exporter = writer
+        chat_id = str(uuid.uuid4())
+
+        assert await export_writer.enqueue(chat_id, _export_data(), "user_exit") is True
+
+        exporter.export_chats.assert_not_awaited()
+        entry = json.loads(await redis_client.lindex(QUEUE_KEY, 0))
+        assert entry["chatId"] == chat_id
+        assert entry["endType"] == "user_exit"
+        assert entry["log"] == _export_data()
+
+
+class TestFlush:
+    """Tests for batched writes."""
+
+    async def test_flush_writes_one_batch(self, writer, redis_client, monkeypatch):
+        """Test that queued chats are written in batches of EXPORT_BATCH_SIZE."""
+        monkeypatch.setattr(config, "EXPORT_BATCH_SIZE", 3)
+        export_writer, exporter = writer
+        chat_ids = [str(uuid.uuid4()) for _ in range(5)]
+        for chat_id in chat_ids:
+            await export_writer.enqueue(chat_id, _export_data(), "user_exit")
+
+        assert await export_writer.flush_once() == 3
+        assert await export_writer.flush_once() == 2
+        assert await export_writer.flush_once() == 0
+
+        batches = [c.args[0] for c in exporter.export_chats.await_args_list]
+        assert [[e["chatId"] for e in b] for b in batches] == [chat_ids[:3], chat_ids[3:]]
+        assert await redis_client.zcard(INFLIGHT_KEY) == 0
+
+    async def test_failed_batch_retried_after_delay(self, writer, redis_client):
+        """Test that a batch Postgres rejects is kept and requeued later."""
+        export_writer, exporter = writer
+        exporter.export_chats.side_effect = ConnectionError("postgres down")
+        await export_writer.enqueue(str(uuid.uuid4()), _export_data(), "user_exit")
+
+        assert await export_writer.flush_once() == 0
+        assert await redis_client.zcard(INFLIGHT_KEY) == 1
+        assert await redis_client.llen(QUEUE_KEY) == 0
+
+        # Not yet due
+        assert await export_writer.requeue_stale() == 0
+
+        exporter.export_chats.side_effect = None
+        assert await export_writer.requeue_stale(time.time() + config.EXPORT_RETRY_DELAY + 1) == 1
+        assert await export_writer.flush_once() == 1
+        assert await redis_client.zcard(INFLIGHT_KEY) == 0
+
+    async def test_failing_entry_split_from_batch(self, writer, redis_client):
+        """Test that one bad entry does not hold back the rest of its batch."""
+        export_writer, exporter = writer
+        good_id, bad_id = str(uuid.uuid4()), str(uuid.uuid4())
+
+        async def export_chats(entries):
+            if any(e["chatId"] == bad_id for e in entries):
+                raise ValueError("bad entry")
+
+        exporter.export_chats.side_effect = export_chats
+        await export_writer.enqueue(good_id, _export_data(), "user_exit")
+        await export_writer.enqueue(bad_id, _export_data(), "user_exit")
+
+        assert await export_writer.flush_once() == 1
+        inflight = [json.loads(item)["chatId"] for item in await redis_client.zrange(INFLIGHT_KEY, 0, -1)]
+        assert inflight == [bad_id]
+        assert await redis_client.hget(ATTEMPTS_KEY, bad_id) == "1"
+        assert await redis_client.hget(ATTEMPTS_KEY, good_id) is None
+
+    async def test_exhausted_entry_dead_lettered(self, writer, redis_client, monkeypatch):
+        """Test that an entry failing EXPORT_MAX_ATTEMPTS times stops being retried."""
+        monkeypatch.setattr(config, "EXPORT_MAX_ATTEMPTS", 2)
+        export_writer, exporter = writer
+        exporter.export_chats.side_effect = ValueError("bad entry")
+        chat_id = str(uuid.uuid4())
+        await export_writer.enqueue(chat_id, _export_data(), "user_exit")
+
+        assert await export_writer.flush_once() == 0
+        await export_writer.requeue_stale(time.time() + config.EXPORT_RETRY_DELAY + 1)
+        assert await export_writer.flush_once() == 0
+
+        assert await redis_client.zcard(INFLIGHT_KEY) == 0
+        assert await redis_client.hget(ATTEMPTS_KEY, chat_id) is None
+        assert json.loads(await redis_client.lindex(DEAD_LETTER_KEY, 0))["chatId"] == chat_id
+        assert await export_writer.requeue_stale(time.time() + config.EXPORT_RETRY_DELAY + 1) == 0
+        stats = await export_writer.stats()
+        assert stats["deadLettered"] == 1
+        assert stats["deadLetteredTotal"] == 1
+
+    async def test_stats(self, writer):
+        """Test throughput, lag and backlog figures."""
+        export_writer, _ = writer
+        await export_writer.enqueue(str(uuid.uuid4()), _export_data(), "user_exit")
+        await export_writer.flush_once()
+        await export_writer.enqueue(str(uuid.uuid4()), _export_data(), "agreed_closure")
+
+        stats = await export_writer.stats()
+
+        assert stats["exportedTotal"] == 1
+        assert stats["batchesTotal"] == 1
+        assert stats["lastBatchSize"] == 1
+        assert stats["queued"] == 1
+        assert stats["inflight"] == 0
+        assert stats["chatsPerSecond"] > 0
+        assert stats["lastExportLagSeconds"] >= 0
+        assert stats["oldestQueuedSeconds"] >= 0
+
+
+class TestExportChats:
+    """Tests for the bulk PostgreSQL write."""
+
+    async def test_batch_copied_and_applied_in_one_transaction(self):
+        """Test that a batch is COPYed into staging and applied with one UPDATE."""
+        conn = MagicMock()
+        conn.execute = AsyncMock()
+        conn.copy_records_to_table = AsyncMock()
+        pool = MagicMock()
+        pool.acquire.return_value.__aenter__.return_value = conn
+        exporter = ChatExporter()
+        exporter._pool = pool
+
+        entries = [
+            {"chatId": str(uuid.uuid4()), "endType": "user_exit", "endTime": 1700000000.0,
+             "log": _export_data("a")},
+            {"chatId": str(uuid.uuid4()), "endType": "agreed_closure", "endTime": 1700000001.0,
+             "log": _export_data("b")},
+        ]
+        await exporter.export_chats(entries)
+
+        conn.transaction.assert_called_once()
+        records = conn.copy_records_to_table.await_args.kwargs["records"]
+        assert [r[0] for r in records] == [e["chatId"] for e in entries]
+        assert json.loads(records[1][1]) == _export_data("b")
+        assert records[0][2].timestamp() == 1700000000.0
+        updates = [c.args[0] for c in conn.execute.await_args_list if "UPDATE chat_log" in c.args[0]]
+        assert len(updates) == 1
+
+    async def test_raises_without_pool(self):
+        """Test that a batch is not silently dropped when Postgres isn't connected."""
+        with pytest.raises(RuntimeError):
+            await ChatExporter().export_chats([])
@@ -8,6 +8,8 @@ import json
 import pytest
 import socketio
 
+from chat_server.handlers.messages import _cap_range
+
 from .conftest import EventCollector
 
 
@@ -323,6 +325,41 @@ class TestGetMessages:
 
         await client.disconnect()
 
+    @pytest.mark.asyncio
+    async def test_get_messages_before_index(
+        self, test_server, redis_client, user1_id, user1_token, setup_chat
+    ):
+        """Test scrolling back with a join_chat cursor."""
+        for i in range(10):
+            msg = {
+                "id": f"msg-{i}",
+                "sender_id": user1_id,
+                "type": "text",
+                "content": f"Message {i}",
+                "target_id": None,
+                "timestamp": "2024-01-01T00:00:00",
+            }
+            await redis_client.rpush(f"chat:{setup_chat}:messages", json.dumps(msg))
+
+        client = socketio.AsyncClient()
+        url = f"http://{test_server.host}:{test_server.port}"
+        await client.connect(url)
+        await client.call("authenticate", {"token": user1_token})
+
+        response = await client.call(
+            "get_messages", {"chatId": setup_chat, "beforeIndex": 6, "limit": 4}
+        )
+
+        assert response["status"] == "ok"
+        assert [m["id"] for m in response["messages"]] == ["msg-2", "msg-3", "msg-4", "msg-5"]
+        assert response["firstIndex"] == 2
+        assert response["messageCount"] == 10
+
+        invalid = await client.call("get_messages", {"chatId": setup_chat, "beforeIndex": -1})
+        assert invalid["code"] == "INVALID_CURSOR"
+
+        await client.disconnect()
+
     @pytest.mark.asyncio
     async def test_get_messages_with_range(
         self, test_server, redis_client, user1_id, user1_token, setup_chat
@@ -355,3 +392,26 @@ class TestGetMessages:
         assert response["messages"][-1]["content"] == "Message 5"
 
         await client.disconnect()
+
+
+class TestHistoryPageCap:
+    """Tests for capping get_messages ranges to one page."""
+
+    def test_open_ended_range_capped(self, monkeypatch):
+        """Test that start..end-of-list returns at most one page."""
+        monkeypatch.setattr("chat_server.handlers.messages.config.CHAT_HISTORY_PAGE_SIZE", 50)
+        assert _cap_range(0, -1) == (0, 49)
+        assert _cap_range(100, -1) == (100, 149)
+
+    def test_large_range_capped(self, monkeypatch):
+        """Test that an explicit range longer than a page is shortened."""
+        monkeypatch.setattr("chat_server.handlers.messages.config.CHAT_HISTORY_PAGE_SIZE", 50)
+        assert _cap_range(0, 999) == (0, 49)
+        assert _cap_range(10, 20) == (10, 20)
+
+    def test_negative_range_capped_from_end(self, monkeypatch):
+        """Test that ranges counted from the end keep the newest messages."""
+        monkeypatch.setattr("chat_server.handlers.messages.config.CHAT_HISTORY_PAGE_SIZE", 50)
+        assert _cap_range(-500, -1) == (-50, -1)
+        assert _cap_range(-10, -1) == (-10, -1)
+        assert _cap_range(-500, 999) == (-500, 49)
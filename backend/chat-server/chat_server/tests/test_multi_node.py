@@ -0,0 +1,156 @@
+"""
+Integration tests for running several chat-server nodes against one Redis.
+
+Starts two real chat-server processes (see multi_node.py) and connects
+clients to different nodes. Requires Redis, Postgres and Keycloak with the
+seeded test users; skipped when Redis or Keycloak is unreachable.
+"""
+
+import asyncio
+import json
+import urllib.parse
+import urllib.request
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncGenerator, Generator
+
+import pytest
+import pytest_asyncio
+import redis
+import socketio
+
+from chat_server.config import config
+from chat_server.services.pubsub import CHAT_EVENTS_CHANNEL
+
+from .conftest import EventCollector
+from .multi_node import ChatCluster
+
+# Seeded users (see backend/tests/conftest.py)
+NORMAL1_ID = "6c9344ed-0313-4b25-a616-5ac08967e84f"
+NORMAL3_ID = "735565c1-93d9-4813-b227-3d9c06b78c8f"
+TEST_PASSWORD = "password"
+
+
+def _login(username: str) -> str:
+    """Get a Keycloak ROPC token for a seeded test user."""
+    url = f"{config.KEYCLOAK_URL}/realms/{config.KEYCLOAK_REALM}/protocol/openid-connect/token"
+    body = urllib.parse.urlencode({
+        "grant_type": "password",
+        "client_id": "candid-app",
+        "username": username,
+        "password": TEST_PASSWORD,
+    }).encode()
+    with urllib.request.urlopen(url, data=body, timeout=5) as resp:
+        return json.loads(resp.read())["access_token"]
+
+
+@pytest.fixture(scope="module")
+def tokens() -> dict[str, str]:
+    """Tokens for normal1 and normal3, or skip if Keycloak is unavailable."""
+    try:
+        return {"normal1": _login("normal1"), "normal3": _login("normal3")}
+    except OSError as e:
+        pytest.skip(f"Keycloak not reachable: {e}")
+
+
+@pytest.fixture(scope="module")
+def cluster(tokens) -> Generator[ChatCluster, None, None]:
+    """Two chat-server nodes sharing one Redis."""
+    try:
+        redis.from_url(config.REDIS_URL).ping()
+    except redis.RedisError as e:
+        pytest.skip(f"Redis not reachable: {e}")
+    with ChatCluster(size=2) as running:
+        yield running
+
+
+@pytest.fixture
+def shared_chat(cluster) -> Generator[str, None, None]:
+    """A chat between normal1 and normal3, stored in the shared Redis."""
+    chat_id = str(uuid.uuid4())
+    r = redis.from_url(config.REDIS_URL, decode_responses=True)
+    r.hset(f"chat:{chat_id}:metadata", mapping={
+        "chat_id": chat_id,
+        "participant_ids": json.dumps([NORMAL1_ID, NORMAL3_ID]),
+        "start_time": datetime.now(timezone.utc).isoformat(),
+    })
+    yield chat_id
+    r.delete(f"chat:{chat_id}:messages", f"chat:{chat_id}:metadata", f"chat:{chat_id}:positions")
+
+
+@pytest_asyncio.fixture
+async def clients(
+    cluster, tokens
+) -> AsyncGenerator[tuple[socketio.AsyncClient, socketio.AsyncClient], None]:
+    """normal1 connected to node 0 and normal3 connected to node 1."""
+    client1 = socketio.AsyncClient()
+    client3 = socketio.AsyncClient()
+    await client1.connect(cluster.nodes[0].url, auth={"token": tokens["normal1"]})
+    await client3.connect(cluster.nodes[1].url, auth={"token": tokens["normal3"]})
+    yield client1, client3
+    for client in (client1, client3):
+        if client.connected:
+            await client.disconnect()
+
+
+class TestCrossNodePresence:
+    """Tests that presence is visible from every node."""
+
+    async def test_other_user_connected_on_other_node(self, clients, shared_chat):
+        """Test that join_chat sees a participant connected to another node."""
+        client1, client3 = clients
+
+        result = await client1.call("join_chat", {"chatId": shared_chat})
+
+        assert result["status"] == "joined"
+        assert result["otherUserConnected"] is True
+
+    async def test_disconnect_visible_on_other_node(self, clients, shared_chat):
+        """Test that a disconnect on one node is seen by the other."""
+        client1, client3 = clients
+        await client3.disconnect()
+        await asyncio.sleep(0.3)
+
+        result = await client1.call("join_chat", {"chatId": shared_chat})
+
+        assert result["otherUserConnected"] is False
+
+
+class TestCrossNodeRooms:
+    """Tests that room emits reach sockets on other nodes."""
+
+    async def test_message_fans_out_across_nodes(self, clients, shared_chat):
+        """Test that a message sent on node 0 reaches a participant on node 1."""
+        client1, client3 = clients
+        collector = EventCollector()
+        client3.on("message", collector.handler("message"))
+
+        await client1.call("join_chat", {"chatId": shared_chat})
+        await client3.call("join_chat", {"chatId": shared_chat})
+        await client1.call("message", {
+            "chatId": shared_chat,
+            "content": "hello from node 0",
+            "messageType": "text",
+        })
+        await asyncio.sleep(0.5)
+
+        received = collector.get("message")
+        assert len(received) == 1
+        assert received[0]["content"] == "hello from node 0"
+
+    async def test_pubsub_event_delivered_once(self, clients):
+        """Test that a REST API event is handled by one node and delivered once."""
+        client1, _ = clients
+        collector = EventCollector()
+        client1.on("chat_request_received", collector.handler("chat_request_received"))
+
+        r = redis.from_url(config.REDIS_URL)
+        r.publish(CHAT_EVENTS_CHANNEL, json.dumps({
+            "event": "chat_request_received",
+            "eventId": uuid.uuid4().hex,
+            "recipientUserId": NORMAL1_ID,
+            "card": {"type": "chat_request", "data": {"id": str(uuid.uuid4())}},
+        }))
+        await asyncio.sleep(0.5)
+
+        assert len(collector.get("chat_request_received")) == 1
@@ -0,0 +1,95 @@
+"""
+Tests for pub/sub event handling across multiple chat-server nodes.
+"""
+
+import asyncio
+import json
+import uuid
+from typing import AsyncGenerator
+
+import pytest_asyncio
+
+from chat_server.services.pubsub import (
+    CHAT_EVENTS_CHANNEL,
+    CHAT_INVALIDATE_CHANNEL,
+    PubSubService,
+)
+
+
+@pytest_asyncio.fixture
+async def two_listeners() -> AsyncGenerator[tuple[list, list], None]:
+    """Two pub/sub services subscribed to the same channel, as on two nodes."""
+    received: tuple[list, list] = ([], [])
+    services = []
+    for handled in received:
+        service = PubSubService()
+        await service.connect()
+
+        async def on_event(data, handled=handled):
+            handled.append(data)
+
+        await service.start_listener(on_event, on_event, on_event, handled.append)
+        services.append(service)
+
+    yield received
+
+    for service in services:
+        await service.close()
+
+
+async def _publish(redis_client, event: dict) -> None:
+    await redis_client.publish(CHAT_EVENTS_CHANNEL, json.dumps(event))
+    await asyncio.sleep(0.3)
+
+
+class TestEventClaims:
+    """Tests that each event is handled by exactly one node."""
+
+    async def test_event_handled_once(self, two_listeners, redis_client):
+        """Test that two subscribed nodes handle an event only once between them."""
+        node_a, node_b = two_listeners
+        event = {
+            "event": "chat_request_received",
+            "eventId": uuid.uuid4().hex,
+            "recipientUserId": str(uuid.uuid4()),
+        }
+
+        await _publish(redis_client, event)
+
+        assert len(node_a) + len(node_b) == 1
+
+    async def test_distinct_events_all_handled(self, two_listeners, redis_client):
+        """Test that claims don't suppress different events."""
+        node_a, node_b = two_listeners
+        for _ in range(5):
+            await redis_client.publish(CHAT_EVENTS_CHANNEL, json.dumps({
+                "event": "chat_request_response",
+                "eventId": uuid.uuid4().hex,
+            }))
+        await asyncio.sleep(0.3)
+
+        assert len(node_a) + len(node_b) == 5
+
+    async def test_event_without_id_claimed_by_content(self, two_listeners, redis_client):
+        """Test that events from older publishers are still handled once."""
+        node_a, node_b = two_listeners
+        event = {"event": "chat_accepted", "chatLogId": str(uuid.uuid4())}
+
+        await _publish(redis_client, event)
+
+        assert len(node_a) + len(node_b) == 1
+
+
+class TestChatInvalidation:
+    """Tests for cache invalidation broadcasts."""
+
+    async def test_invalidation_reaches_every_node(self, two_listeners, redis_client):
+        """Test that chat invalidations are not claimed: all nodes handle them."""
+        node_a, node_b = two_listeners
+        chat_id = str(uuid.uuid4())
+
+        await redis_client.publish(CHAT_INVALIDATE_CHANNEL, chat_id)
+        await asyncio.sleep(0.3)
+
+        assert node_a == [chat_id]
+        assert node_b == [chat_id]
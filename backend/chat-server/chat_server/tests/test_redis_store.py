@@ -4,6 +4,7 @@ Unit tests for Redis store service.
 
 import json
 import uuid
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
@@ -13,6 +14,7 @@ from chat_server.services.redis_store import (
     AgreedPosition,
     ClosureProposal,
     ChatMetadata,
+    decode_messages,
 )
 from chat_server.config import config
 
@@ -233,6 +235,173 @@ class TestMessages:
         await store.delete_chat(chat_id)
 
 
+class TestMessagePages:
+    """Tests for paged message history."""
+
+    @pytest.mark.asyncio
+    async def test_latest_page(self, redis_client):
+        """Test that without a cursor the most recent messages are returned."""
+        store = RedisStore()
+        store._redis = redis_client
+
+        chat_id = str(uuid.uuid4())
+        user_id = str(uuid.uuid4())
+        await store.create_chat(chat_id, [user_id, str(uuid.uuid4())])
+        for i in range(10):
+            await store.add_message(chat_id, user_id, f"Message {i}")
+
+        page = await store.get_message_page(chat_id, limit=4)
+
+        assert [m["content"] for m in page.messages] == [f"Message {i}" for i in range(6, 10)]
+        assert page.first_index == 6
+        assert page.total == 10
+        assert page.messages[0]["senderId"] == user_id
+
+        await store.delete_chat(chat_id)
+
+    @pytest.mark.asyncio
+    async def test_from_index_returns_delta(self, redis_client):
+        """Test catching up from a cursor."""
+        store = RedisStore()
+        store._redis = redis_client
+
+        chat_id = str(uuid.uuid4())
+        user_id = str(uuid.uuid4())
+        await store.create_chat(chat_id, [user_id, str(uuid.uuid4())])
+        for i in range(10):
+            await store.add_message(chat_id, user_id, f"Message {i}")
+
+        page = await store.get_message_page(chat_id, limit=4, from_index=8)
+        assert [m["content"] for m in page.messages] == ["Message 8", "Message 9"]
+        assert page.first_index == 8
+
+        caught_up = await store.get_message_page(chat_id, limit=4, from_index=10)
+        assert caught_up.messages == []
+        assert caught_up.first_index == 10
+
+        await store.delete_chat(chat_id)
+
+    @pytest.mark.asyncio
+    async def test_before_index_pages_back(self, redis_client):
+        """Test scrolling back from the oldest loaded message."""
+        store = RedisStore()
+        store._redis = redis_client
+
+        chat_id = str(uuid.uuid4())
+        user_id = str(uuid.uuid4())
+        await store.create_chat(chat_id, [user_id, str(uuid.uuid4())])
+        for i in range(10):
+            await store.add_message(chat_id, user_id, f"Message {i}")
+
+        page = await store.get_message_page(chat_id, limit=4, before_index=3)
+        assert [m["content"] for m in page.messages] == ["Message 0", "Message 1", "Message 2"]
+        assert page.first_index == 0
+
+        start = await store.get_message_page(chat_id, limit=4, before_index=0)
+        assert start.messages == []
+        assert start.first_index == 0
+        assert start.total == 10
+
+        await store.delete_chat(chat_id)
+
+
+def _store_with_metadata(participant_ids):
+    """RedisStore over a mock client whose metadata hash lists participant_ids."""
+    store = RedisStore()
+    store._redis = AsyncMock()
+    store._redis.hgetall.return_value = {
+        "chatId": "chat-1",
+        "participantIds": json.dumps(participant_ids),
+        "startTime": "2024-01-01T00:00:00",
+    }
+    return store
+
+
+class TestParticipantCache:
+    """Tests for the in-process participant cache."""
+
+    @pytest.mark.asyncio
+    async def test_participant_check_hits_redis_once(self):
+        """Test that repeated checks for a chat are served from cache."""
+        store = _store_with_metadata(["u1", "u2"])
+
+        assert await store.is_chat_participant("chat-1", "u1") is True
+        assert await store.is_chat_participant("chat-1", "u2") is True
+        assert await store.is_chat_participant("chat-1", "u3") is False
+
+        assert store._redis.hgetall.await_count == 1
+
+    @pytest.mark.asyncio
+    async def test_missing_chat_not_cached(self):
+        """Test that a chat that doesn't exist yet is looked up again."""
+        store = _store_with_metadata(["u1", "u2"])
+        store._redis.hgetall.return_value = {}
+
+        assert await store.is_chat_participant("chat-1", "u1") is False
+        assert await store.is_chat_participant("chat-1", "u1") is False
+        assert store._redis.hgetall.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_chat(self):
+        """Test that an invalidated chat is re-read from Redis."""
+        store = _store_with_metadata(["u1", "u2"])
+        await store.is_chat_participant("chat-1", "u1")
+
+        store.invalidate_chat("chat-1")
+        store._redis.hgetall.return_value = {}
+
+        assert await store.is_chat_participant("chat-1", "u1") is False
+
+    @pytest.mark.asyncio
+    async def test_entries_expire(self, monkeypatch):
+        """Test that cached entries are re-read after the TTL."""
+        monkeypatch.setattr(config, "CHAT_PARTICIPANT_CACHE_TTL", 0)
+        store = _store_with_metadata(["u1", "u2"])
+
+        await store.is_chat_participant("chat-1", "u1")
+        await store.is_chat_participant("chat-1", "u1")
+
+        assert store._redis.hgetall.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_cache_is_bounded(self, monkeypatch):
+        """Test that the least recently used chats are evicted."""
+        monkeypatch.setattr(config, "CHAT_PARTICIPANT_CACHE_SIZE", 2)
+        store = _store_with_metadata(["u1", "u2"])
+
+        for chat_id in ("a", "b", "a", "c"):
+            await store.is_chat_participant(chat_id, "u1")
+
+        assert list(store._participants) == ["a", "c"]
+
+    @pytest.mark.asyncio
+    async def test_create_chat_populates_cache(self):
+        """Test that a chat created on this node needs no lookup."""
+        store = RedisStore()
+        store._redis = AsyncMock()
+        pipe = MagicMock()
+        pipe.execute = AsyncMock()
+        store._redis.pipeline = MagicMock(return_value=pipe)
+
+        await store.create_chat("chat-1", ["u1", "u2"])
+
+        assert await store.is_chat_participant("chat-1", "u2") is True
+        store._redis.hgetall.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_delete_chat_invalidates_and_publishes(self):
+        """Test that deleting a chat clears the local entry and notifies other nodes."""
+        store = _store_with_metadata(["u1", "u2"])
+        script = AsyncMock()
+        store._redis.register_script = lambda source: script
+        await store.is_chat_participant("chat-1", "u1")
+
+        await store.delete_chat("chat-1")
+
+        assert "chat-1" not in store._participants
+        assert script.await_args.kwargs["args"][2] == "chat:invalidate"
+
+
 class TestAgreedPositions:
     """Tests for agreed position operations."""
 
@@ -384,6 +553,38 @@ class TestAgreedPositions:
         # Cleanup
         await store.delete_chat(chat_id)
 
+    @pytest.mark.asyncio
+    async def test_update_status_preserves_other_fields(self, redis_client):
+        """Test that the server-side status update keeps the rest of the position."""
+        store = RedisStore()
+        store._redis = redis_client
+
+        chat_id = str(uuid.uuid4())
+        user_id = str(uuid.uuid4())
+        await store.create_chat(chat_id, [user_id, str(uuid.uuid4())])
+
+        parent = await store.add_agreed_position(chat_id, user_id, "Original")
+        child = await store.add_agreed_position(
+            chat_id, user_id, "Modified / closure", is_closure=True, parent_id=parent.id
+        )
+
+        updated = await store.update_agreed_position_status(chat_id, child.id, "rejected")
+
+        assert updated.to_dict() == {**child.to_dict(), "status": "rejected"}
+        assert (await store.get_agreed_position(chat_id, parent.id)).parent_id is None
+
+        await store.delete_chat(chat_id)
+
+    @pytest.mark.asyncio
+    async def test_update_status_nonexistent(self, redis_client):
+        """Test updating a position that doesn't exist."""
+        store = RedisStore()
+        store._redis = redis_client
+
+        assert await store.update_agreed_position_status(
+            str(uuid.uuid4()), str(uuid.uuid4()), "accepted"
+        ) is None
+
 
 class TestClosureProposals:
     """Tests for closure proposal operations."""
@@ -529,6 +730,48 @@ class TestChatExport:
         assert chat_id not in await store.get_user_active_chats(user1)
         assert chat_id not in await store.get_user_active_chats(user2)
 
+    @pytest.mark.asyncio
+    async def test_delete_chat_keeps_other_active_chats(self, redis_client):
+        """Test that deleting a chat leaves the participants' other chats alone."""
+        store = RedisStore()
+        store._redis = redis_client
+
+        chat_id = str(uuid.uuid4())
+        other_chat_id = str(uuid.uuid4())
+        user1 = str(uuid.uuid4())
+        user2 = str(uuid.uuid4())
+
+        await store.create_chat(chat_id, [user1, user2])
+        await store.create_chat(other_chat_id, [user1, str(uuid.uuid4())])
+
+        await store.delete_chat(chat_id)
+
+        assert await store.get_user_active_chats(user1) == [other_chat_id]
+        assert await store.get_user_active_chats(user2) == []
+
+        await store.delete_chat(other_chat_id)
+
+    @pytest.mark.asyncio
+    async def test_writes_set_ttl(self, redis_client):
+        """Test that pipelined writes still refresh key TTLs."""
+        store = RedisStore()
+        store._redis = redis_client
+
+        chat_id = str(uuid.uuid4())
+        user_id = str(uuid.uuid4())
+        await store.create_chat(chat_id, [user_id, str(uuid.uuid4())])
+        await store.add_message(chat_id, user_id, "Hello")
+        await store.add_agreed_position(chat_id, user_id, "Agreement")
+
+        for key in (
+            f"chat:{chat_id}:metadata",
+            f"chat:{chat_id}:messages",
+            f"chat:{chat_id}:positions",
+        ):
+            assert 0 < await redis_client.ttl(key) <= config.REDIS_MESSAGE_TTL
+
+        await store.delete_chat(chat_id)
+
 
 class TestDataClasses:
     """Tests for data class serialization."""
@@ -634,3 +877,9 @@ class TestDataClasses:
         assert "chat_id" not in d
         assert "participant_ids" not in d
         assert "start_time" not in d
+
+    def test_decode_messages(self):
+        """Test decoding stored message JSON in bulk."""
+        raw = [json.dumps({"id": "a", "content": "x"}), json.dumps({"id": "b", "content": "y"})]
+        assert decode_messages(raw) == [{"id": "a", "content": "x"}, {"id": "b", "content": "y"}]
+        assert decode_messages([]) == []
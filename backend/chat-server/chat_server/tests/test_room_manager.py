@@ -5,8 +5,9 @@ Unit tests for room manager service.
 import uuid
 
 import pytest
+import pytest_asyncio
 
-from chat_server.services.room_manager import RoomManager, UserSession
+from chat_server.services.room_manager import NODES_KEY, RoomManager, UserSession
 
 
 class TestUserSession:
@@ -23,82 +24,82 @@ class TestUserSession:
 class TestRoomManagerSessions:
     """Tests for session management."""
 
-    def test_add_session(self):
+    async def test_add_session(self):
         """Test adding a session."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
         sid = "test-sid"
 
-        session = manager.add_session(sid, user_id)
+        session = await manager.add_session(sid, user_id)
 
         assert session.user_id == user_id
         assert session.sid == sid
 
-    def test_add_multiple_sessions_same_user(self):
+    async def test_add_multiple_sessions_same_user(self):
         """Test adding multiple sessions for same user."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
 
-        manager.add_session("sid1", user_id)
-        manager.add_session("sid2", user_id)
-        manager.add_session("sid3", user_id)
+        await manager.add_session("sid1", user_id)
+        await manager.add_session("sid2", user_id)
+        await manager.add_session("sid3", user_id)
 
-        sids = manager.get_user_sids(user_id)
+        sids = await manager.get_user_sids(user_id)
         assert len(sids) == 3
         assert "sid1" in sids
         assert "sid2" in sids
         assert "sid3" in sids
 
-    def test_remove_session(self):
+    async def test_remove_session(self):
         """Test removing a session."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
         sid = "test-sid"
 
-        manager.add_session(sid, user_id)
-        session = manager.remove_session(sid)
+        await manager.add_session(sid, user_id)
+        session = await manager.remove_session(sid)
 
         assert session is not None
         assert session.user_id == user_id
         assert manager.get_session(sid) is None
 
-    def test_remove_nonexistent_session(self):
+    async def test_remove_nonexistent_session(self):
         """Test removing a non-existent session."""
         manager = RoomManager()
-        session = manager.remove_session("nonexistent")
+        session = await manager.remove_session("nonexistent")
         assert session is None
 
-    def test_remove_last_session_clears_user(self):
+    async def test_remove_last_session_clears_user(self):
         """Test that removing last session clears user from tracking."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
 
-        manager.add_session("sid1", user_id)
-        manager.remove_session("sid1")
+        await manager.add_session("sid1", user_id)
+        await manager.remove_session("sid1")
 
-        assert manager.get_user_sids(user_id) == set()
+        assert await manager.get_user_sids(user_id) == set()
 
-    def test_remove_one_of_multiple_sessions(self):
+    async def test_remove_one_of_multiple_sessions(self):
         """Test removing one session when user has multiple."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
 
-        manager.add_session("sid1", user_id)
-        manager.add_session("sid2", user_id)
+        await manager.add_session("sid1", user_id)
+        await manager.add_session("sid2", user_id)
 
-        manager.remove_session("sid1")
+        await manager.remove_session("sid1")
 
-        sids = manager.get_user_sids(user_id)
+        sids = await manager.get_user_sids(user_id)
         assert len(sids) == 1
         assert "sid2" in sids
 
-    def test_get_session(self):
+    async def test_get_session(self):
         """Test getting a session by sid."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
         sid = "test-sid"
 
-        manager.add_session(sid, user_id)
+        await manager.add_session(sid, user_id)
         session = manager.get_session(sid)
 
         assert session is not None
@@ -111,13 +112,13 @@ class TestRoomManagerSessions:
         session = manager.get_session("nonexistent")
         assert session is None
 
-    def test_get_user_id(self):
+    async def test_get_user_id(self):
         """Test getting user ID from session."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
         sid = "test-sid"
 
-        manager.add_session(sid, user_id)
+        await manager.add_session(sid, user_id)
 
         assert manager.get_user_id(sid) == user_id
 
@@ -130,46 +131,46 @@ class TestRoomManagerSessions:
 class TestRoomManagerUserTracking:
     """Tests for user connection tracking."""
 
-    def test_is_user_connected(self):
+    async def test_is_user_connected(self):
         """Test checking if user is connected."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
 
-        assert manager.is_user_connected(user_id) is False
+        assert await manager.is_user_connected(user_id) is False
 
-        manager.add_session("sid1", user_id)
-        assert manager.is_user_connected(user_id) is True
+        await manager.add_session("sid1", user_id)
+        assert await manager.is_user_connected(user_id) is True
 
-    def test_is_user_connected_after_disconnect(self):
+    async def test_is_user_connected_after_disconnect(self):
         """Test that user is not connected after all sessions removed."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
 
-        manager.add_session("sid1", user_id)
-        manager.add_session("sid2", user_id)
+        await manager.add_session("sid1", user_id)
+        await manager.add_session("sid2", user_id)
 
-        manager.remove_session("sid1")
-        assert manager.is_user_connected(user_id) is True
+        await manager.remove_session("sid1")
+        assert await manager.is_user_connected(user_id) is True
 
-        manager.remove_session("sid2")
-        assert manager.is_user_connected(user_id) is False
+        await manager.remove_session("sid2")
+        assert await manager.is_user_connected(user_id) is False
 
-    def test_get_user_sids_empty(self):
+    async def test_get_user_sids_empty(self):
         """Test getting sids for user with no sessions."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
 
-        sids = manager.get_user_sids(user_id)
+        sids = await manager.get_user_sids(user_id)
         assert sids == set()
 
-    def test_get_user_sids_returns_copy(self):
+    async def test_get_user_sids_returns_copy(self):
         """Test that get_user_sids returns a copy."""
         manager = RoomManager()
         user_id = str(uuid.uuid4())
 
-        manager.add_session("sid1", user_id)
-        sids1 = manager.get_user_sids(user_id)
-        sids2 = manager.get_user_sids(user_id)
+        await manager.add_session("sid1", user_id)
+        sids1 = await manager.get_user_sids(user_id)
+        sids2 = await manager.get_user_sids(user_id)
 
         # Should be equal but not the same object
         assert sids1 == sids2
@@ -177,7 +178,7 @@ class TestRoomManagerUserTracking:
 
         # Modifying one shouldn't affect the other
         sids1.add("modified")
-        assert "modified" not in manager.get_user_sids(user_id)
+        assert "modified" not in await manager.get_user_sids(user_id)
 
 
 class TestRoomNames:
@@ -205,7 +206,7 @@ class TestRoomNames:
 class TestMultipleUsers:
     """Tests for multiple users scenario."""
 
-    def test_multiple_users(self):
+    async def test_multiple_users(self):
         """Test managing multiple users."""
         manager = RoomManager()
 
@@ -213,31 +214,114 @@ class TestMultipleUsers:
         user2 = str(uuid.uuid4())
         user3 = str(uuid.uuid4())
 
-        manager.add_session("u1s1", user1)
-        manager.add_session("u1s2", user1)
-        manager.add_session("u2s1", user2)
-        manager.add_session("u3s1", user3)
+        await manager.add_session("u1s1", user1)
+        await manager.add_session("u1s2", user1)
+        await manager.add_session("u2s1", user2)
+        await manager.add_session("u3s1", user3)
 
-        assert len(manager.get_user_sids(user1)) == 2
-        assert len(manager.get_user_sids(user2)) == 1
-        assert len(manager.get_user_sids(user3)) == 1
+        assert len(await manager.get_user_sids(user1)) == 2
+        assert len(await manager.get_user_sids(user2)) == 1
+        assert len(await manager.get_user_sids(user3)) == 1
 
-        assert manager.is_user_connected(user1)
-        assert manager.is_user_connected(user2)
-        assert manager.is_user_connected(user3)
+        assert await manager.is_user_connected(user1)
+        assert await manager.is_user_connected(user2)
+        assert await manager.is_user_connected(user3)
 
-    def test_sessions_independent(self):
+    async def test_sessions_independent(self):
         """Test that sessions are independent between users."""
         manager = RoomManager()
 
         user1 = str(uuid.uuid4())
         user2 = str(uuid.uuid4())
 
-        manager.add_session("sid1", user1)
-        manager.add_session("sid2", user2)
+        await manager.add_session("sid1", user1)
+        await manager.add_session("sid2", user2)
 
         # Removing user1's session shouldn't affect user2
-        manager.remove_session("sid1")
+        await manager.remove_session("sid1")
 
-        assert not manager.is_user_connected(user1)
-        assert manager.is_user_connected(user2)
+        assert not await manager.is_user_connected(user1)
+        assert await manager.is_user_connected(user2)
+
+
+@pytest_asyncio.fixture
+async def two_nodes():
+    """Two room managers sharing Redis, as if on different chat-server nodes."""
+    node_a = RoomManager(node_id=f"test-a-{uuid.uuid4().hex[:8]}")
+    node_b = RoomManager(node_id=f"test-b-{uuid.uuid4().hex[:8]}")
+    await node_a.connect()
+    await node_b.connect()
+    yield node_a, node_b
+    await node_a.close()
+    await node_b.close()
+
+
+class TestClusterPresence:
+    """Tests for presence shared across nodes through Redis."""
+
+    async def test_user_visible_from_other_node(self, two_nodes):
+        """Test that a socket on one node is visible from another."""
+        node_a, node_b = two_nodes
+        user_id = str(uuid.uuid4())
+
+        await node_a.add_session("sid-a", user_id)
+
+        assert await node_b.is_user_connected(user_id) is True
+        assert await node_b.get_user_sids(user_id) == {"sid-a"}
+        # Session details stay with the owning node
+        assert node_b.get_session("sid-a") is None
+
+    async def test_user_sids_merged_across_nodes(self, two_nodes):
+        """Test that sockets on every node are returned."""
+        node_a, node_b = two_nodes
+        user_id = str(uuid.uuid4())
+
+        await node_a.add_session("sid-a", user_id)
+        await node_b.add_session("sid-b", user_id)
+
+        assert await node_a.get_user_sids(user_id) == {"sid-a", "sid-b"}
+        assert node_a.get_local_user_sids(user_id) == {"sid-a"}
+
+        await node_b.remove_session("sid-b")
+        assert await node_a.get_user_sids(user_id) == {"sid-a"}
+
+    async def test_close_removes_node_presence(self, two_nodes):
+        """Test that a node shutting down removes its sockets."""
+        node_a, node_b = two_nodes
+        user_id = str(uuid.uuid4())
+
+        await node_b.add_session("sid-b", user_id)
+        await node_b.close()
+
+        assert await node_a.is_user_connected(user_id) is False
+
+    async def test_heartbeat_reaps_dead_node(self, two_nodes, redis_client):
+        """Test that presence from a crashed node is removed once it expires."""
+        node_a, node_b = two_nodes
+        user_id = str(uuid.uuid4())
+
+        await node_b.add_session("sid-b", user_id)
+        # Simulate a crash: the alive key expires, nothing else is cleaned up
+        await redis_client.delete(f"presence:node:{node_b.node_id}:alive")
+
+        await node_a.heartbeat()
+
+        assert await node_a.is_user_connected(user_id) is False
+        assert not await redis_client.sismember(NODES_KEY, node_b.node_id)
+        assert await redis_client.sismember(NODES_KEY, node_a.node_id)
+
+    async def test_heartbeat_reregisters_after_own_expiry(self, two_nodes, redis_client):
+        """Test that a node reaped while stalled restores its presence."""
+        node_a, node_b = two_nodes
+        user_id = str(uuid.uuid4())
+
+        await node_b.add_session("sid-b", user_id)
+        # node_b stalled past its TTL and node_a reaped it
+        await redis_client.delete(f"presence:node:{node_b.node_id}:alive")
+        await node_a.heartbeat()
+        assert await node_a.is_user_connected(user_id) is False
+
+        await node_b.heartbeat()
+
+        assert await node_a.get_user_sids(user_id) == {"sid-b"}
+        assert await redis_client.sismember(NODES_KEY, node_b.node_id)
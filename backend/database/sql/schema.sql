@@ -42,7 +42,9 @@ CREATE TABLE users (
     -- Diagnostics consent: NULL = never asked, true = opted in, false = opted out
     diagnostics_consent BOOLEAN DEFAULT NULL,
     -- Role badge visibility: whether to display role badge on posts and comments
-    show_role_badge BOOLEAN NOT NULL DEFAULT true
+    show_role_badge BOOLEAN NOT NULL DEFAULT true,
+    -- Denormalized count of kudos received with status 'sent' (maintained by trg_kudos_received_count)
+    kudos_received_count INTEGER NOT NULL DEFAULT 0
 );
 
 COMMENT ON COLUMN users.chat_request_likelihood IS '0=off, 1=rarely, 2=less, 3=normal, 4=more, 5=often';
@@ -567,6 +569,8 @@ CREATE TABLE post (
     weighted_upvotes DOUBLE PRECISION NOT NULL DEFAULT 0,
     weighted_downvotes DOUBLE PRECISION NOT NULL DEFAULT 0,
     score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    hot_score DOUBLE PRECISION NOT NULL DEFAULT 0,
+    controversial_score DOUBLE PRECISION NOT NULL DEFAULT 0,
     mf_intercept DOUBLE PRECISION,
     comment_count INTEGER NOT NULL DEFAULT 0,
     created_time TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP,
@@ -579,6 +583,16 @@ CREATE INDEX idx_post_category ON post(location_id, category_id);
 CREATE INDEX idx_post_creator ON post(creator_user_id);
 CREATE INDEX idx_post_score ON post(location_id, score DESC);
 CREATE INDEX idx_post_created ON post(location_id, created_time DESC);
+-- Feed sorts: hot_score/controversial_score are written on every vote and
+-- hot_score decay is refreshed by helpers/feed_scores.py
+CREATE INDEX idx_post_hot ON post(location_id, hot_score DESC, id DESC)
+    WHERE status IN ('active', 'locked');
+CREATE INDEX idx_post_category_hot ON post(location_id, category_id, hot_score DESC, id DESC)
+    WHERE status IN ('active', 'locked');
+CREATE INDEX idx_post_controversial ON post(location_id, controversial_score DESC, id DESC)
+    WHERE status IN ('active', 'locked');
+CREATE INDEX idx_post_category_controversial ON post(location_id, category_id, controversial_score DESC, id DESC)
+    WHERE status IN ('active', 'locked');
 
 -- ========== Comments ==========
 
@@ -677,6 +691,10 @@ CREATE TABLE mf_training_log (
     final_loss DOUBLE PRECISION,
     epochs_run INTEGER,
     duration_seconds DOUBLE PRECISION,
+    load_seconds DOUBLE PRECISION,
+    fit_seconds DOUBLE PRECISION,
+    store_seconds DOUBLE PRECISION,
+    mode VARCHAR(20) CHECK (mode IS NULL OR mode IN ('full', 'incremental')),
     error_message TEXT,
     created_time TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
 );
@@ -684,6 +702,15 @@ CREATE TABLE mf_training_log (
 CREATE INDEX idx_mf_training_log_conversation ON mf_training_log(polis_conversation_id);
 CREATE INDEX idx_mf_training_log_created ON mf_training_log(created_time DESC);
 
+-- Last fitted MF model per conversation (npz: ids, intercepts, factors, mu),
+-- used to warm-start the next training run. trained_time is the database
+-- time taken before that run read its votes (the incremental watermark).
+CREATE TABLE mf_model_state (
+    polis_conversation_id VARCHAR(255) PRIMARY KEY,
+    state BYTEA NOT NULL,
+    trained_time TIMESTAMPTZ NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
 -- Create indexes for performance
 CREATE INDEX idx_users_username ON users(username);
 CREATE INDEX idx_users_email ON users(email);
@@ -692,6 +719,10 @@ CREATE INDEX idx_user_activity_user_id ON user_activity(user_id);
 CREATE INDEX idx_position_creator_user_id ON position(creator_user_id);
 CREATE INDEX idx_position_category_id ON position(category_id);
 CREATE INDEX idx_position_status ON position(status);
+-- HNSW index for cosine nearest-neighbour search (ORDER BY embedding <=> q LIMIT k).
+-- Query-time recall/latency is tuned with hnsw.ef_search (VECTOR_EF_SEARCH).
+CREATE INDEX idx_position_embedding_hnsw ON position
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
 CREATE INDEX idx_user_position_user_id ON user_position(user_id);
 CREATE INDEX idx_user_position_position_id ON user_position(position_id);
 CREATE INDEX idx_user_chatting_list_user_id ON user_chatting_list(user_id);
@@ -866,6 +897,36 @@ CREATE TRIGGER trg_comment_counts
     AFTER INSERT OR UPDATE OF status OR DELETE ON comment
     FOR EACH ROW EXECUTE FUNCTION update_comment_counts();
 
+-- Trigger: kudos insert/delete/status-change → update receiver's users.kudos_received_count
+-- Only 'sent' kudos are counted. A dismissed prompt later sent (ON CONFLICT DO UPDATE) increments.
+CREATE OR REPLACE FUNCTION update_kudos_received_count() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        IF NEW.status = 'sent' THEN
+            UPDATE users SET kudos_received_count = kudos_received_count + 1 WHERE id = NEW.receiver_user_id;
+        END IF;
+        RETURN NEW;
+    ELSIF TG_OP = 'UPDATE' AND OLD.status IS DISTINCT FROM NEW.status THEN
+        IF OLD.status = 'sent' AND NEW.status <> 'sent' THEN
+            UPDATE users SET kudos_received_count = GREATEST(kudos_received_count - 1, 0) WHERE id = NEW.receiver_user_id;
+        ELSIF OLD.status <> 'sent' AND NEW.status = 'sent' THEN
+            UPDATE users SET kudos_received_count = kudos_received_count + 1 WHERE id = NEW.receiver_user_id;
+        END IF;
+        RETURN NEW;
+    ELSIF TG_OP = 'DELETE' THEN
+        IF OLD.status = 'sent' THEN
+            UPDATE users SET kudos_received_count = GREATEST(kudos_received_count - 1, 0) WHERE id = OLD.receiver_user_id;
+        END IF;
+        RETURN OLD;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER trg_kudos_received_count
+    AFTER INSERT OR UPDATE OF status OR DELETE ON kudos
+    FOR EACH ROW EXECUTE FUNCTION update_kudos_received_count();
+
 -- ========== Counter Reconciliation ==========
 
 -- Recalculates all denormalized counters from source tables.
@@ -989,6 +1050,21 @@ BEGIN
     rows_fixed := fixed_count;
     RETURN NEXT;
 
+    -- 6. User kudos received (only sent kudos; users with none are reset to 0)
+    WITH counts AS (
+        SELECT receiver_user_id, COUNT(*) AS cnt FROM kudos WHERE status = 'sent' GROUP BY receiver_user_id
+    ), updated AS (
+        UPDATE users u SET kudos_received_count = COALESCE(c.cnt, 0)
+        FROM users u2
+        LEFT JOIN counts c ON c.receiver_user_id = u2.id
+        WHERE u.id = u2.id AND u.kudos_received_count IS DISTINCT FROM COALESCE(c.cnt, 0)
+        RETURNING 1
+    )
+    SELECT COUNT(*) INTO fixed_count FROM updated;
+    counter_name := 'users.kudos_received_count';
+    rows_fixed := fixed_count;
+    RETURN NEXT;
+
     RETURN;
 END;
 $$ LANGUAGE plpgsql;
@@ -0,0 +1,169 @@
+"""Request-coalescing inference queue for embedding generation."""
+
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBatcher:
+    """
+    Coalesce concurrent embed requests into one model call.
+
+    Requests are queued; a single runner task takes the first waiting request,
+    keeps collecting more for up to max_wait_ms (or until max_batch_size texts
+    are gathered), runs one encode in a dedicated worker thread, and slices the
+    results back to each caller. The event loop never blocks on the model, and
+    only one encode runs at a time.
+    """
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+    ):
+        """
+        Args:
+            embed_fn: Blocking function mapping texts to embedding vectors
+            max_batch_size: Texts per encode call; a single larger request
+                is still run whole
+            max_wait_ms: How long to wait for more requests once one arrives
+        """
+        self.embed_fn = embed_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._held = None  # request that did not fit in the previous batch
+        self._task: Optional[asyncio.Task] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        # Metrics
+        self.requests_total = 0
+        self.texts_total = 0
+        self.batches_total = 0
+        self.last_batch_size = 0
+        self.max_batch_size_seen = 0
+        self._wait_seconds_total = 0.0
+
+    async def start(self):
+        """Start the runner task on the current event loop."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the runner and fail any requests still waiting."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        pending = [self._held] if self._held else []
+        self._held = None
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for _, future, _ in pending:
+            if not future.done():
+                future.set_exception(RuntimeError("Embedding queue stopped"))
+        self._executor.shutdown(wait=False)
+        self._executor = None
+
+    async def submit(self, texts: List[str]) -> List[List[float]]:
+        """Queue texts for embedding and wait for their vectors."""
+        if not texts:
+            return []
+        if self._task is None:
+            raise RuntimeError("Embedding queue not started")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((texts, future, time.monotonic()))
+        return await future
+
+    @property
+    def queue_depth(self) -> int:
+        """Requests waiting for a batch."""
+        depth = self._queue.qsize() if self._queue is not None else 0
+        return depth + (1 if self._held else 0)
+
+    def metrics(self) -> dict:
+        """Queue and batching counters for /health."""
+        return {
+            "queue_depth": self.queue_depth,
+            "requests_total": self.requests_total,
+            "texts_total": self.texts_total,
+            "batches_total": self.batches_total,
+            "avg_batch_size": round(self.texts_total / self.batches_total, 2) if self.batches_total else 0.0,
+            "last_batch_size": self.last_batch_size,
+            "max_batch_size_seen": self.max_batch_size_seen,
+            "avg_queue_wait_ms": round(self._wait_seconds_total / self.requests_total * 1000, 2)
+            if self.requests_total else 0.0,
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000,
+        }
+
+    async def _next_request(self, timeout: Optional[float]):
+        if self._held is not None:
+            request, self._held = self._held, None
+            return request
+        if timeout is None:
+            return await self._queue.get()
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+    async def _collect(self) -> list:
+        """Wait for one request, then gather more until full or max_wait passes."""
+        batch = [await self._next_request(None)]
+        size = len(batch[0][0])
+        deadline = time.monotonic() + self.max_wait
+        while size < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                request = await self._next_request(remaining)
+            except asyncio.TimeoutError:
+                break
+            if size + len(request[0]) > self.max_batch_size:
+                self._held = request
+                break
+            batch.append(request)
+            size += len(request[0])
+        return batch
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            batch = [r for r in batch if not r[1].cancelled()]
+            if not batch:
+                continue
+            texts = [t for r in batch for t in r[0]]
+
+            started = time.monotonic()
+            self.requests_total += len(batch)
+            self.texts_total += len(texts)
+            self.batches_total += 1
+            self.last_batch_size = len(texts)
+            self.max_batch_size_seen = max(self.max_batch_size_seen, len(texts))
+            self._wait_seconds_total += sum(started - r[2] for r in batch)
+
+            try:
+                embeddings = await loop.run_in_executor(self._executor, self.embed_fn, texts)
+            except Exception as e:
+                logger.error(f"Batched embedding failed ({len(texts)} texts): {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            offset = 0
+            for request_texts, future, _ in batch:
+                if not future.done():
+                    future.set_result(embeddings[offset:offset + len(request_texts)])
+                offset += len(request_texts)
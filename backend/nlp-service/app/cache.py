@@ -0,0 +1,89 @@
+"""In-process LRU cache for embeddings, keyed by normalized text hash."""
+
+import hashlib
+import re
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC, collapsed whitespace, trimmed.
+
+    Must match normalize_text in the API's helpers/nlp.py.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+class EmbeddingCache:
+    """
+    Bounded LRU of text -> embedding, stored as float32 arrays.
+
+    Keys are sha256(model name + normalized text), so a model change never
+    serves stale vectors. Thread-safe; hit/miss counters feed /health.
+    """
+
+    def __init__(self, model_name: str, maxsize: int = 10000):
+        self.model_name = model_name
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, text: str) -> str:
+        """Content-addressed key for a text under this model."""
+        return hashlib.sha256(
+            f"{self.model_name}\0{normalize_text(text)}".encode("utf-8")
+        ).hexdigest()
+
+    def get_many(self, texts: List[str]) -> List[Optional[List[float]]]:
+        """Return cached vectors in order, None for misses."""
+        results = []
+        with self._lock:
+            for text in texts:
+                key = self.key(text)
+                vector = self._entries.get(key)
+                if vector is None:
+                    self.misses += 1
+                    results.append(None)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    results.append(vector.tolist())
+        return results
+
+    def put_many(self, texts: List[str], vectors: List[List[float]]):
+        """Store vectors, evicting least recently used entries past maxsize."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            for text, vector in zip(texts, vectors):
+                key = self.key(text)
+                self._entries[key] = np.asarray(vector, dtype=np.float32)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop all entries and reset counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def metrics(self) -> Dict[str, float]:
+        """Hit/miss counters and occupancy for /health."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
@@ -1,12 +1,16 @@
 """FastAPI application for NLP service."""
 
 import logging
+import os
 from contextlib import asynccontextmanager
-from typing import List, Optional
+from typing import Dict, List, Optional
 
+import numpy as np
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel, Field
 
+from .batching import EmbeddingBatcher
+from .cache import EmbeddingCache
 from .embeddings import embedding_model
 from .nsfw_detector import decode_and_validate_image, check_nsfw, process_avatar
 
@@ -14,17 +18,43 @@ from .nsfw_detector import decode_and_validate_image, check_nsfw, process_avatar
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Coalesces concurrent /embed and /similarity requests into one encode call
+embed_batcher = EmbeddingBatcher(
+    embedding_model.embed,
+    max_batch_size=embedding_model.max_batch_size,
+    max_wait_ms=float(os.getenv("BATCH_MAX_WAIT_MS", "5")),
+)
+
+# Recently embedded texts, so repeated statements skip the model entirely
+embed_cache = EmbeddingCache(
+    embedding_model.model_name,
+    maxsize=int(os.getenv("EMBED_CACHE_SIZE", "10000")),
+)
+
+
+async def embed_cached(texts: List[str]) -> List[List[float]]:
+    """Embed texts, serving repeats from the LRU and batching the rest."""
+    results = embed_cache.get_many(texts)
+    missing = list(dict.fromkeys(t for t, r in zip(texts, results) if r is None))
+    if missing:
+        embedded = dict(zip(missing, await embed_batcher.submit(missing)))
+        embed_cache.put_many(missing, [embedded[t] for t in missing])
+        results = [r if r is not None else embedded[t] for t, r in zip(texts, results)]
+    return results
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Load model on startup."""
+    """Load model and start the inference queue on startup."""
     logger.info(f"Loading embedding model: {embedding_model.model_name}")
     embedding_model.load()
     logger.info(
         f"Model loaded. Dimension: {embedding_model.embedding_dimension}, "
         f"Device: {embedding_model.device}"
     )
+    await embed_batcher.start()
     yield
+    await embed_batcher.stop()
 
 
 app = FastAPI(
@@ -75,6 +105,12 @@ class HealthResponse(BaseModel):
     embedding_model: str = Field(..., description="Current embedding model")
     embedding_dimension: int = Field(..., description="Embedding dimension")
     device: str = Field(..., description="Computation device (cpu/cuda)")
+    embed_queue: Dict[str, float] = Field(
+        ..., description="Inference queue metrics (queue depth, batch sizes, wait times)"
+    )
+    embed_cache: Dict[str, float] = Field(
+        ..., description="Embedding LRU metrics (hits, misses, hit rate, size)"
+    )
 
 
 class NSFWCheckRequest(BaseModel):
@@ -120,6 +156,8 @@ async def health_check():
         embedding_model=embedding_model.model_name,
         embedding_dimension=embedding_model.embedding_dimension,
         device=embedding_model.device,
+        embed_queue=embed_batcher.metrics(),
+        embed_cache=embed_cache.metrics(),
     )
 
 
@@ -129,9 +167,11 @@ async def embed_texts(request: EmbedRequest):
     Generate embeddings for a list of texts.
 
     Returns normalized embedding vectors suitable for cosine similarity.
+    Repeated texts are served from the LRU; concurrent requests are batched
+    into a single model call.
     """
     try:
-        embeddings = embedding_model.embed(request.texts)
+        embeddings = await embed_cached(request.texts)
         return EmbedResponse(
             embeddings=embeddings,
             model=embedding_model.model_name,
@@ -149,9 +189,15 @@ async def compute_similarity(request: SimilarityRequest):
 
     Returns similarity scores between 0 and 1 for each candidate.
     """
+    if not request.candidates:
+        return SimilarityResponse(scores=[])
     try:
-        scores = embedding_model.similarity(request.query, request.candidates)
-        return SimilarityResponse(scores=scores)
+        embeddings = np.array(
+            await embed_cached([request.query] + request.candidates)
+        )
+        # Embeddings are already normalized
+        scores = np.dot(embeddings[1:], embeddings[0])
+        return SimilarityResponse(scores=scores.tolist())
     except Exception as e:
         logger.error(f"Error computing similarity: {e}")
         raise HTTPException(status_code=500, detail=str(e))
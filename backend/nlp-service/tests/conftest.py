@@ -103,10 +103,12 @@ def app_client(mock_sentence_transformer):
     embedding_model._model = mock_sentence_transformer
 
     from fastapi.testclient import TestClient
-    from app.main import app
+    from app.main import app, embed_cache
 
+    embed_cache.clear()
     with TestClient(app) as client:
         yield client
 
     # Clean up global state
     embedding_model._model = None
+    embed_cache.clear()
@@ -0,0 +1,115 @@
+"""Tests for EmbeddingBatcher request coalescing in batching.py."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.batching import EmbeddingBatcher
+
+
+def _fake_embed(calls):
+    """Embed function recording each call; vector = [len(text)]."""
+    def embed(texts):
+        calls.append((list(texts), threading.current_thread().name))
+        return [[float(len(t))] for t in texts]
+    return embed
+
+
+async def _with_batcher(batcher, coro_fn):
+    await batcher.start()
+    try:
+        return await coro_fn()
+    finally:
+        await batcher.stop()
+
+
+class TestEmbeddingBatcher:
+    """Test coalescing, fan-out, limits and metrics."""
+
+    def test_concurrent_requests_share_one_call(self):
+        calls = []
+        batcher = EmbeddingBatcher(_fake_embed(calls), max_batch_size=32, max_wait_ms=50)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.submit(["a"]), batcher.submit(["bb", "ccc"]), batcher.submit(["dddd"])
+            )
+
+        results = asyncio.run(_with_batcher(batcher, run))
+
+        assert results == [[[1.0]], [[2.0], [3.0]], [[4.0]]]
+        assert len(calls) == 1
+        assert calls[0][0] == ["a", "bb", "ccc", "dddd"]
+
+    def test_encode_runs_off_the_event_loop_thread(self):
+        calls = []
+        batcher = EmbeddingBatcher(_fake_embed(calls), max_wait_ms=1)
+
+        asyncio.run(_with_batcher(batcher, lambda: batcher.submit(["x"])))
+
+        assert calls[0][1] != threading.current_thread().name
+        assert calls[0][1].startswith("embed")
+
+    def test_batch_size_limit_splits_batches(self):
+        calls = []
+        batcher = EmbeddingBatcher(_fake_embed(calls), max_batch_size=3, max_wait_ms=50)
+
+        async def run():
+            return await asyncio.gather(*[batcher.submit([f"t{i}", f"u{i}"]) for i in range(3)])
+
+        results = asyncio.run(_with_batcher(batcher, run))
+
+        assert [len(r) for r in results] == [2, 2, 2]
+        # Requests are never split, so each 2-text request gets its own batch
+        assert [len(c[0]) for c in calls] == [2, 2, 2]
+
+    def test_oversized_request_runs_whole(self):
+        calls = []
+        batcher = EmbeddingBatcher(_fake_embed(calls), max_batch_size=2, max_wait_ms=1)
+
+        result = asyncio.run(_with_batcher(batcher, lambda: batcher.submit(["a", "b", "c"])))
+
+        assert len(result) == 3
+        assert len(calls) == 1
+
+    def test_error_propagates_to_every_caller(self):
+        def boom(texts):
+            raise RuntimeError("OOM")
+
+        batcher = EmbeddingBatcher(boom, max_wait_ms=20)
+
+        async def run():
+            return await asyncio.gather(
+                batcher.submit(["a"]), batcher.submit(["b"]), return_exceptions=True
+            )
+
+        results = asyncio.run(_with_batcher(batcher, run))
+
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+    def test_metrics(self):
+        calls = []
+        batcher = EmbeddingBatcher(_fake_embed(calls), max_batch_size=8, max_wait_ms=50)
+
+        async def run():
+            await asyncio.gather(batcher.submit(["a", "b"]), batcher.submit(["c"]))
+            return batcher.metrics()
+
+        metrics = asyncio.run(_with_batcher(batcher, run))
+
+        assert metrics["queue_depth"] == 0
+        assert metrics["requests_total"] == 2
+        assert metrics["texts_total"] == 3
+        assert metrics["batches_total"] == 1
+        assert metrics["avg_batch_size"] == 3.0
+        assert metrics["max_batch_size"] == 8
+
+    def test_submit_before_start_raises(self):
+        batcher = EmbeddingBatcher(_fake_embed([]))
+        with pytest.raises(RuntimeError):
+            asyncio.run(batcher.submit(["a"]))
+
+    def test_empty_texts(self):
+        batcher = EmbeddingBatcher(_fake_embed([]))
+        assert asyncio.run(batcher.submit([])) == []
@@ -0,0 +1,49 @@
+"""Tests for the in-process embedding LRU in cache.py."""
+
+from app.cache import EmbeddingCache, normalize_text
+
+
+class TestNormalizeText:
+    def test_collapses_whitespace(self):
+        assert normalize_text("  a \n\t b  ") == "a b"
+
+    def test_nfc(self):
+        assert normalize_text("café") == normalize_text("café")
+
+
+class TestEmbeddingCache:
+    """Test lookups, eviction and counters."""
+
+    def test_miss_then_hit(self):
+        cache = EmbeddingCache("m")
+        assert cache.get_many(["a"]) == [None]
+        cache.put_many(["a"], [[0.5, 0.25]])
+        assert cache.get_many(["a "]) == [[0.5, 0.25]]
+        assert cache.metrics()["hits"] == 1
+        assert cache.metrics()["misses"] == 1
+        assert cache.metrics()["hit_rate"] == 0.5
+
+    def test_key_depends_on_model(self):
+        assert EmbeddingCache("m1").key("a") != EmbeddingCache("m2").key("a")
+
+    def test_lru_eviction(self):
+        cache = EmbeddingCache("m", maxsize=2)
+        cache.put_many(["a", "b"], [[1.0], [2.0]])
+        cache.get_many(["a"])  # touch a
+        cache.put_many(["c"], [[3.0]])
+
+        assert cache.get_many(["a", "b", "c"]) == [[1.0], None, [3.0]]
+        assert cache.metrics()["size"] == 2
+
+    def test_zero_size_disables(self):
+        cache = EmbeddingCache("m", maxsize=0)
+        cache.put_many(["a"], [[1.0]])
+        assert cache.get_many(["a"]) == [None]
+
+    def test_clear(self):
+        cache = EmbeddingCache("m")
+        cache.put_many(["a"], [[1.0]])
+        cache.get_many(["a"])
+        cache.clear()
+        assert cache.metrics()["size"] == 0
+        assert cache.metrics()["hits"] == 0
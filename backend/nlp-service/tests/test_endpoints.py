@@ -11,6 +11,7 @@ NOTE: The following low-value tests were intentionally removed:
 - test_invalid_image_error in process-avatar (same duplication)
 """
 
+import asyncio
 import base64
 from unittest.mock import patch
 
@@ -28,12 +29,32 @@ class TestEmbedEndpoint:
         assert data["dimension"] == 384
         assert isinstance(data["model"], str)
 
+    def test_repeated_text_served_from_cache(self, app_client, mock_sentence_transformer):
+        first = app_client.post("/embed", json={"texts": ["same text"]}).json()
+        second = app_client.post("/embed", json={"texts": ["same  text "]}).json()
+        assert first["embeddings"] == second["embeddings"]
+        assert mock_sentence_transformer.encode.call_count == 1
+        assert app_client.get("/health").json()["embed_cache"]["hits"] == 1
+
     def test_model_error_500(self, app_client, mock_sentence_transformer):
         mock_sentence_transformer.encode.side_effect = RuntimeError("OOM")
         resp = app_client.post("/embed", json={"texts": ["boom"]})
         assert resp.status_code == 500
 
 
+class TestHealthEndpoint:
+    """Test GET /health."""
+
+    def test_reports_queue_metrics(self, app_client):
+        app_client.post("/embed", json={"texts": ["a", "b"]})
+        resp = app_client.get("/health")
+        assert resp.status_code == 200
+        queue = resp.json()["embed_queue"]
+        assert queue["queue_depth"] == 0
+        assert queue["texts_total"] >= 2
+        assert queue["batches_total"] >= 1
+
+
 class TestSimilarityEndpoint:
     """Test POST /similarity."""
 
@@ -46,6 +67,14 @@ class TestSimilarityEndpoint:
         data = resp.json()
         assert len(data["scores"]) == 2
 
+    def test_no_candidates_skips_embedding(self, app_client, mock_sentence_transformer):
+        from app.main import SimilarityRequest, compute_similarity
+
+        request = SimilarityRequest.model_construct(query="test", candidates=[])
+        response = asyncio.run(compute_similarity(request))
+        assert response.scores == []
+        mock_sentence_transformer.encode.assert_not_called()
+
 
 class TestNsfwCheckEndpoint:
     """Test POST /nsfw-check."""
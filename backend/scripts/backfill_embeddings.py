@@ -2,11 +2,20 @@
 """
 Backfill embeddings for existing positions.
 
-This script fetches all positions without embeddings and generates
-embeddings via the NLP service, then updates the database.
+Streams active positions without embeddings through a server-side cursor in
+id (keyset) order, embeds them via the NLP service and writes each batch by
+COPYing into a temporary staging table followed by a single UPDATE ... FROM.
+Up to --prefetch NLP requests stay in flight while the current batch is
+written, so the database and the NLP service work concurrently.
+
+After every committed batch the last position id is written to the
+checkpoint file; a crashed or interrupted run resumes after it. A run that
+reaches the end removes the checkpoint, so the next run starts over and
+retries any batches that failed.
 
 Usage:
-    python backfill_embeddings.py [--batch-size 32] [--dry-run]
+    python backfill_embeddings.py [--batch-size 64] [--prefetch 2] [--dry-run]
+                                  [--checkpoint PATH] [--restart]
 
 Environment variables:
     DATABASE_URL: PostgreSQL connection string
@@ -14,14 +23,21 @@ Environment variables:
 """
 
 import argparse
+import io
+import json
 import os
 import sys
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 import psycopg2
 import psycopg2.extras
 import requests
 
+DEFAULT_CHECKPOINT = '.backfill_embeddings.checkpoint'
+STAGING_TABLE = 'position_embedding_staging'
+
 
 def get_db_connection():
     """Create database connection."""
@@ -32,25 +48,88 @@ def get_db_connection():
     return psycopg2.connect(db_url)
 
 
-def get_positions_without_embeddings(conn, limit=None):
-    """Fetch all positions without embeddings."""
+def vector_literal(vec):
+    """Format a vector as a pgvector text literal."""
+    return '[' + ','.join(f'{x:.6f}' for x in vec) + ']'
+
+
+# ========== Checkpoint ==========
+
+def load_checkpoint(path):
+    """Return the last committed position id, or None to start from the beginning."""
+    try:
+        with open(path) as f:
+            return json.load(f).get('after_id')
+    except FileNotFoundError:
+        return None
+
+
+def save_checkpoint(path, after_id, processed):
+    """Atomically record progress so a crashed run can resume after after_id."""
+    tmp = f"{path}.tmp"
+    with open(tmp, 'w') as f:
+        json.dump({'after_id': after_id, 'processed': processed,
+                   'updated_at': time.time()}, f)
+    os.replace(tmp, path)
+
+
+def clear_checkpoint(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+# ========== Reading ==========
+
+def count_positions_without_embeddings(conn, after_id=None):
+    """Count remaining work (for progress and ETA)."""
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT COUNT(*)
+            FROM position
+            WHERE embedding IS NULL AND status = 'active'
+              AND (%s::uuid IS NULL OR id > %s::uuid)
+        """, (after_id, after_id))
+        count = cur.fetchone()[0]
+    conn.rollback()
+    return count
+
+
+def stream_positions_without_embeddings(conn, batch_size, after_id=None, limit=None):
+    """
+    Yield batches of {id, statement} in id order from a server-side cursor.
+
+    Only batch_size * 10 rows are held client-side at a time, however many
+    positions are missing embeddings.
+    """
     query = """
         SELECT id, statement
         FROM position
         WHERE embedding IS NULL AND status = 'active'
-        ORDER BY created_time DESC
+          AND (%s::uuid IS NULL OR id > %s::uuid)
+        ORDER BY id
     """
+    params = [after_id, after_id]
     if limit:
-        query += f" LIMIT {limit}"
+        query += " LIMIT %s"
+        params.append(limit)
+
+    with conn.cursor('backfill_embeddings', cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+        cur.itersize = batch_size * 10
+        cur.execute(query, params)
+        while True:
+            batch = cur.fetchmany(batch_size)
+            if not batch:
+                break
+            yield batch
 
-    with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
-        cur.execute(query)
-        return cur.fetchall()
 
+# ========== NLP ==========
 
-def get_embeddings_from_nlp(texts, nlp_url):
+def get_embeddings_from_nlp(session, texts, nlp_url):
     """Get embeddings from NLP service."""
-    response = requests.post(
+    response = session.post(
         f"{nlp_url}/embed",
         json={"texts": texts},
         timeout=60
@@ -59,24 +138,39 @@ def get_embeddings_from_nlp(texts, nlp_url):
     return response.json()["embeddings"]
 
 
-def update_position_embedding(conn, position_id, embedding):
-    """Update a single position's embedding."""
+# ========== Writing ==========
+
+def create_staging_table(conn):
+    """Session-local staging table, emptied at every commit."""
     with conn.cursor() as cur:
-        cur.execute(
-            "UPDATE position SET embedding = %s WHERE id = %s",
-            (embedding, position_id)
-        )
+        cur.execute(f"""
+            CREATE TEMP TABLE IF NOT EXISTS {STAGING_TABLE} (
+                id UUID PRIMARY KEY,
+                embedding vector(384)
+            ) ON COMMIT DELETE ROWS
+        """)
+    conn.commit()
 
 
 def batch_update_embeddings(conn, positions, embeddings):
-    """Update embeddings for a batch of positions."""
+    """COPY a batch into the staging table and apply it with one UPDATE. Returns rows updated."""
+    buf = io.StringIO()
+    for pos, emb in zip(positions, embeddings):
+        buf.write(f"{pos['id']}\t{vector_literal(emb)}\n")
+    buf.seek(0)
+
     with conn.cursor() as cur:
-        for pos, emb in zip(positions, embeddings):
-            cur.execute(
-                "UPDATE position SET embedding = %s WHERE id = %s",
-                (emb, pos['id'])
-            )
+        cur.copy_expert(f"COPY {STAGING_TABLE} (id, embedding) FROM STDIN", buf)
+        # Skip rows the API embedded since we read them
+        cur.execute(f"""
+            UPDATE position p
+            SET embedding = s.embedding
+            FROM {STAGING_TABLE} s
+            WHERE p.id = s.id AND p.embedding IS NULL
+        """)
+        updated = cur.rowcount
     conn.commit()
+    return updated
 
 
 def main():
@@ -86,8 +180,24 @@ def main():
     parser.add_argument(
         '--batch-size',
         type=int,
-        default=32,
-        help='Number of positions to process per batch (default: 32)'
+        default=64,
+        help='Number of positions to process per batch (default: 64)'
+    )
+    parser.add_argument(
+        '--prefetch',
+        type=int,
+        default=2,
+        help='NLP requests kept in flight while writing (default: 2)'
+    )
+    parser.add_argument(
+        '--checkpoint',
+        default=DEFAULT_CHECKPOINT,
+        help=f'Progress file for resuming a crashed run (default: {DEFAULT_CHECKPOINT})'
+    )
+    parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='Ignore an existing checkpoint and start from the beginning'
     )
     parser.add_argument(
         '--dry-run',
@@ -103,11 +213,12 @@ def main():
     args = parser.parse_args()
 
     nlp_url = os.environ.get('NLP_SERVICE_URL', 'http://nlp:5001')
+    session = requests.Session()
 
     # Check NLP service health
     print(f"Checking NLP service at {nlp_url}...")
     try:
-        response = requests.get(f"{nlp_url}/health", timeout=10)
+        response = session.get(f"{nlp_url}/health", timeout=10)
         response.raise_for_status()
         health = response.json()
         print(f"NLP service healthy: model={health['embedding_model']}, "
@@ -116,79 +227,107 @@ def main():
         print(f"Error: NLP service unavailable: {e}")
         sys.exit(1)
 
-    # Connect to database
+    # Separate connections: committing writes would close the streaming cursor
     print("Connecting to database...")
-    conn = get_db_connection()
+    read_conn = get_db_connection()
+    write_conn = get_db_connection()
+
+    after_id = None if args.restart else load_checkpoint(args.checkpoint)
+    if after_id:
+        print(f"Resuming after position {after_id} (checkpoint {args.checkpoint})")
 
-    # Get positions without embeddings
-    print("Fetching positions without embeddings...")
-    positions = get_positions_without_embeddings(conn, args.limit)
-    total = len(positions)
+    total = count_positions_without_embeddings(read_conn, after_id)
+    if args.limit:
+        total = min(total, args.limit)
     print(f"Found {total} positions without embeddings")
 
     if total == 0:
         print("Nothing to do!")
-        conn.close()
+        clear_checkpoint(args.checkpoint)
+        read_conn.close()
+        write_conn.close()
         return
 
+    batches = stream_positions_without_embeddings(
+        read_conn, args.batch_size, after_id, args.limit
+    )
+
     if args.dry_run:
         print("\nDry run - would process the following positions:")
-        for pos in positions[:10]:
+        for pos in next(batches)[:10]:
             print(f"  - {pos['id']}: {pos['statement'][:50]}...")
         if total > 10:
             print(f"  ... and {total - 10} more")
-        conn.close()
+        read_conn.close()
+        write_conn.close()
         return
 
-    # Process in batches
+    create_staging_table(write_conn)
+
     processed = 0
+    updated = 0
     errors = 0
+    nlp_wait = 0.0
+    write_time = 0.0
     start_time = time.time()
-
-    for i in range(0, total, args.batch_size):
-        batch = positions[i:i + args.batch_size]
-        batch_num = i // args.batch_size + 1
-        total_batches = (total + args.batch_size - 1) // args.batch_size
-
-        print(f"\nProcessing batch {batch_num}/{total_batches} "
-              f"({len(batch)} positions)...")
-
-        try:
-            # Get embeddings
-            statements = [p['statement'] for p in batch]
-            embeddings = get_embeddings_from_nlp(statements, nlp_url)
-
-            # Update database
-            batch_update_embeddings(conn, batch, embeddings)
+    in_flight = deque()
+
+    with ThreadPoolExecutor(max_workers=max(args.prefetch, 1)) as pool:
+        def submit_next():
+            batch = next(batches, None)
+            if batch is not None:
+                statements = [p['statement'] for p in batch]
+                in_flight.append((batch, pool.submit(get_embeddings_from_nlp, session, statements, nlp_url)))
+
+        for _ in range(max(args.prefetch, 1)):
+            submit_next()
+
+        while in_flight:
+            batch, future = in_flight.popleft()
+            # Keep the NLP service busy while this batch is written
+            submit_next()
+
+            try:
+                t0 = time.time()
+                embeddings = future.result()
+                t1 = time.time()
+                updated += batch_update_embeddings(write_conn, batch, embeddings)
+                nlp_wait += t1 - t0
+                write_time += time.time() - t1
+            except requests.exceptions.RequestException as e:
+                print(f"  Error getting embeddings: {e}")
+                errors += len(batch)
+            except psycopg2.Error as e:
+                print(f"  Database error: {e}")
+                write_conn.rollback()
+                errors += len(batch)
 
             processed += len(batch)
+            save_checkpoint(args.checkpoint, str(batch[-1]['id']), processed)
+
             elapsed = time.time() - start_time
             rate = processed / elapsed if elapsed > 0 else 0
             remaining = (total - processed) / rate if rate > 0 else 0
-
             print(f"  Processed {processed}/{total} "
                   f"({processed/total*100:.1f}%) - "
-                  f"{rate:.1f} pos/sec - "
+                  f"{rate:.1f} rows/sec - "
                   f"ETA: {remaining:.0f}s")
 
-        except requests.exceptions.RequestException as e:
-            print(f"  Error getting embeddings: {e}")
-            errors += len(batch)
-        except psycopg2.Error as e:
-            print(f"  Database error: {e}")
-            conn.rollback()
-            errors += len(batch)
+    clear_checkpoint(args.checkpoint)
 
     # Summary
     elapsed = time.time() - start_time
     print(f"\n{'='*50}")
     print(f"Backfill complete!")
     print(f"  Processed: {processed}/{total}")
-    print(f"  Errors: {errors}")
-    print(f"  Time: {elapsed:.1f}s")
-    print(f"  Rate: {processed/elapsed:.1f} positions/sec")
-
-    conn.close()
+    print(f"  Updated: {updated}")
+    print(f"  Errors: {errors}" + (" (rerun to retry them)" if errors else ""))
+    print(f"  Time: {elapsed:.1f}s "
+          f"(waiting on NLP {nlp_wait:.1f}s, writing {write_time:.1f}s)")
+    print(f"  Rate: {processed/elapsed:.1f} rows/sec")
+
+    read_conn.close()
+    write_conn.close()
 
 
 if __name__ == '__main__':
@@ -3132,6 +3132,20 @@ def phase_12_posts(location_id, category_map, dry_run=False):
         END
     """)
 
+    # Feed sort scores (helpers/scoring.py hot_score with gravity 1.5, controversial_score)
+    db_execute("""
+        UPDATE post SET
+            hot_score = SIGN(weighted_upvotes - weighted_downvotes)
+                * LOG(GREATEST(ABS(weighted_upvotes - weighted_downvotes), 1))
+                / POWER(EXTRACT(EPOCH FROM (now() - created_time)) / 3600 + 2, 1.5),
+            controversial_score = CASE
+                WHEN weighted_upvotes + weighted_downvotes = 0 THEN 0
+                ELSE (weighted_upvotes + weighted_downvotes)
+                     * LEAST(weighted_upvotes, weighted_downvotes)
+                     / GREATEST(weighted_upvotes, weighted_downvotes)
+            END
+    """)
+
     print("  Phase 12 complete")
 
 
@@ -14,14 +14,50 @@ else:
 db = Database(config)
 
 # Start Polis sync worker if enabled
-if config.POLIS_ENABLED:
+if config.BACKGROUND_WORKERS_ENABLED and config.POLIS_ENABLED:
     from candid.controllers.helpers.polis_worker import start_worker, stop_worker
     start_worker()
     atexit.register(stop_worker)
 
-# Start MF training worker if enabled
-if config.MF_ENABLED:
+# Start Polis math cache poller if enabled
+if config.BACKGROUND_WORKERS_ENABLED and config.POLIS_ENABLED:
+    from candid.controllers.helpers.polis_math import start_worker as start_polis_math_poller, \
+        stop_worker as stop_polis_math_poller
+    start_polis_math_poller()
+    atexit.register(stop_polis_math_poller)
+
+# Start MF training worker if enabled (MF_IN_PROCESS=false when the
+# standalone process pool in helpers/mf_worker.py does the training)
+if config.BACKGROUND_WORKERS_ENABLED and config.MF_ENABLED and config.MF_IN_PROCESS:
     from candid.controllers.helpers.mf_worker import start_worker as start_mf_worker, \
         stop_worker as stop_mf_worker
     start_mf_worker()
-    atexit.register(stop_mf_worker)
\ No newline at end of file
+    atexit.register(stop_mf_worker)
+
+# Start card queue refill worker if enabled
+if config.BACKGROUND_WORKERS_ENABLED and config.CARD_QUEUE_ENABLED:
+    from candid.controllers.helpers.card_queue import start_worker as start_card_queue_worker, \
+        stop_worker as stop_card_queue_worker
+    start_card_queue_worker()
+    atexit.register(stop_card_queue_worker)
+
+# Start push notification dispatcher if enabled
+if config.BACKGROUND_WORKERS_ENABLED and config.PUSH_OUTBOX_ENABLED:
+    from candid.controllers.helpers.push_dispatcher import start_worker as start_push_dispatcher, \
+        stop_worker as stop_push_dispatcher
+    start_push_dispatcher()
+    atexit.register(stop_push_dispatcher)
+
+# Start feed score (hot_score decay) refresher if enabled
+if config.BACKGROUND_WORKERS_ENABLED and config.FEED_SCORE_REFRESH_ENABLED:
+    from candid.controllers.helpers.feed_scores import start_worker as start_feed_score_refresher, \
+        stop_worker as stop_feed_score_refresher
+    start_feed_score_refresher()
+    atexit.register(stop_feed_score_refresher)
+
+# Start vote counter reconciler (repairs drift in incremental vote counters) if enabled
+if config.BACKGROUND_WORKERS_ENABLED and config.VOTE_RECONCILE_ENABLED:
+    from candid.controllers.helpers.vote_counters import start_worker as start_vote_reconciler, \
+        stop_worker as stop_vote_reconciler
+    start_vote_reconciler()
+    atexit.register(stop_vote_reconciler)
@@ -36,6 +36,9 @@ from candid.controllers.helpers.admin import (
     FACILITATOR_ASSIGNABLE as _FACILITATOR_ASSIGNABLE,
     ALL_ASSIGNABLE as _ALL_ASSIGNABLE,
 )
+from candid.controllers.helpers import card_queue
+from candid.controllers.helpers import nlp
+from candid.controllers.helpers import shared_cache
 
 
 def create_survey(body, token_info=None):  # noqa: E501
@@ -96,6 +99,9 @@ def create_survey(body, token_info=None):  # noqa: E501
                     VALUES (%s, %s, %s)
                 """, (option_id, question_id, option_text))
 
+    # Card queue survey cards come from the shared "surveys" cache
+    shared_cache.invalidate("surveys")
+
     return _build_survey_with_nested_data(survey_id), 201
 
 
@@ -129,6 +135,7 @@ def delete_survey(survey_id, token_info=None):  # noqa: E501
     db.execute_query("""
         UPDATE survey SET status = 'deleted', updated_time = CURRENT_TIMESTAMP WHERE id = %s
     """, (survey_id,))
+    shared_cache.invalidate("surveys")
 
     return '', 204
 
@@ -292,6 +299,7 @@ def update_survey(survey_id, body, token_info=None):  # noqa: E501
 
     query = f"UPDATE survey SET {', '.join(set_clauses)} WHERE id = %s"
     db.execute_query(query, tuple(params))
+    shared_cache.invalidate("surveys")
 
     return _build_survey_with_nested_data(survey_id)
 
@@ -712,11 +720,11 @@ def get_pending_role_requests(token_info=None):  # noqa: E501
                u_target.username AS target_username, u_target.display_name AS target_display_name,
                u_target.avatar_icon_url AS target_avatar_icon_url,
                u_target.status AS target_status, u_target.trust_score AS target_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u_target.id AND k.status = 'sent'), 0) AS target_kudos_count,
+               u_target.kudos_received_count AS target_kudos_count,
                u_req.username AS requester_username, u_req.display_name AS requester_display_name,
                u_req.avatar_icon_url AS requester_avatar_icon_url,
                u_req.status AS requester_status, u_req.trust_score AS requester_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u_req.id AND k.status = 'sent'), 0) AS requester_kudos_count,
+               u_req.kudos_received_count AS requester_kudos_count,
                l.name AS location_name, l.code AS location_code,
                pc.label AS category_label
         FROM role_change_request rcr
@@ -852,18 +860,18 @@ _ROLE_REQUEST_SELECT = """
            u_target.username AS target_username, u_target.display_name AS target_display_name,
            u_target.avatar_icon_url AS target_avatar_icon_url,
            u_target.status AS target_status, u_target.trust_score AS target_trust_score,
-           COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u_target.id AND k.status = 'sent'), 0) AS target_kudos_count,
+           u_target.kudos_received_count AS target_kudos_count,
            u_req.username AS requester_username, u_req.display_name AS requester_display_name,
            u_req.avatar_icon_url AS requester_avatar_icon_url,
            u_req.status AS requester_status, u_req.trust_score AS requester_trust_score,
-           COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u_req.id AND k.status = 'sent'), 0) AS requester_kudos_count,
+           u_req.kudos_received_count AS requester_kudos_count,
            l.name AS location_name, l.code AS location_code,
            pc.label AS category_label,
            u_rev.id AS reviewer_id, u_rev.username AS reviewer_username,
            u_rev.display_name AS reviewer_display_name,
            u_rev.avatar_icon_url AS reviewer_avatar_icon_url,
            u_rev.status AS reviewer_status, u_rev.trust_score AS reviewer_trust_score,
-           COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u_rev.id AND k.status = 'sent'), 0) AS reviewer_kudos_count
+           COALESCE(u_rev.kudos_received_count, 0) AS reviewer_kudos_count
     FROM role_change_request rcr
     JOIN users u_target ON rcr.target_user_id = u_target.id
     JOIN users u_req ON rcr.requested_by = u_req.id
@@ -967,8 +975,7 @@ def list_roles(user_id=None, location_id=None, role=None, token_info=None):  # n
         SELECT ur.id, ur.user_id, ur.role, ur.location_id, ur.position_category_id,
                ur.assigned_by, ur.created_time,
                u.username, u.display_name, u.avatar_icon_url, u.trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k
-                         WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS kudos_count,
+               u.kudos_received_count AS kudos_count,
                l.name AS location_name, l.code AS location_code,
                pc.label AS category_label
         FROM user_role ur
@@ -1307,6 +1314,8 @@ def create_category(body, token_info=None):  # noqa: E501
         INSERT INTO position_category (id, label, parent_position_category_id)
         VALUES (%s, %s, %s)
     """, (category_id, label, parent_id))
+    # Users without saved priorities get every category by default
+    shared_cache.invalidate("user_context")
 
     result = {
         'id': category_id,
@@ -1410,6 +1419,7 @@ def update_user_status(user_id, body, token_info=None):  # noqa: E501
         UPDATE users SET status = %s WHERE id = %s
     """, (new_status, user_id))
     invalidate_ban_cache(user_id)
+    card_queue.invalidate_user(user_id)
 
     db.execute_query("""
         INSERT INTO admin_action_log (id, action, target_user_id, performed_by, reason)
@@ -1434,11 +1444,11 @@ def get_admin_actions(token_info=None):  # noqa: E501
                u_target.username AS target_username, u_target.display_name AS target_display_name,
                u_target.avatar_icon_url AS target_avatar_icon_url,
                u_target.status AS target_status, u_target.trust_score AS target_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u_target.id AND k.status = 'sent'), 0) AS target_kudos_count,
+               u_target.kudos_received_count AS target_kudos_count,
                u_performer.username AS performer_username, u_performer.display_name AS performer_display_name,
                u_performer.avatar_icon_url AS performer_avatar_icon_url,
                u_performer.status AS performer_status, u_performer.trust_score AS performer_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u_performer.id AND k.status = 'sent'), 0) AS performer_kudos_count
+               u_performer.kudos_received_count AS performer_kudos_count
         FROM admin_action_log aal
         JOIN users u_target ON aal.target_user_id = u_target.id
         JOIN users u_performer ON aal.performed_by = u_performer.id
@@ -1473,3 +1483,23 @@ def get_admin_actions(token_info=None):  # noqa: E501
         }
         for r in (rows or [])
     ]
+
+
+def get_admin_metrics(token_info=None):  # noqa: E501
+    """Get operational metrics for this API process.
+
+    GET /admin/metrics
+    Auth: site admin.
+    """
+    authorized, auth_err = authorization_site_admin(token_info)
+    if not authorized:
+        return auth_err, auth_err.code
+
+    client = nlp.client_stats()
+    return {
+        'nlp': {
+            'circuitBreaker': client['circuit_breaker'],
+            'endpoints': client['endpoints'],
+            'embeddingCache': nlp.embedding_cache_stats(),
+        },
+    }
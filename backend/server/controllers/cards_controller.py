@@ -4,11 +4,13 @@ from typing import Dict, List, Tuple, Union
 
 from candid import util
 
-from candid.controllers import db
+from candid.controllers import db, config
 from candid.controllers.helpers.config import Config
 from candid.controllers.helpers.auth import authorization, authorization_allow_banned, token_to_user
 from candid.controllers.helpers import polis_sync
 from candid.controllers.helpers import presence
+from candid.controllers.helpers import card_queue
+from candid.controllers.helpers.shared_cache import SharedCache
 from candid.controllers.helpers.chat_availability import get_batch_availability
 from candid.controllers.helpers.card_builders import (
     DEMOGRAPHIC_QUESTIONS,
@@ -296,12 +298,23 @@ def get_card_queue(limit=None, token_info=None):  # noqa: E501
     remaining_slots = max(1, limit - len(priority_cards))
 
     if location_id:
-        positions = polis_sync.get_unvoted_positions_for_user(
-            user_id=str(user.id),
-            location_id=str(location_id),
-            category_priorities=priorities,
-            limit=remaining_slots
-        )
+        positions = []
+        if config.CARD_QUEUE_ENABLED:
+            # Serve from the precomputed buffer (refilled in the background)
+            positions = card_queue.pop_positions(str(user.id), remaining_slots)
+        if len(positions) < remaining_slots:
+            # Buffer cold or short: compute the shortfall inline
+            seen = {p["id"] for p in positions}
+            inline = polis_sync.get_unvoted_positions_for_user(
+                user_id=str(user.id),
+                location_id=str(location_id),
+                category_priorities=priorities,
+                limit=remaining_slots
+            )
+            inline = [p for p in inline if p["id"] not in seen]
+            positions = (positions + inline)[:remaining_slots]
+            if config.CARD_QUEUE_ENABLED:
+                card_queue.mark_served(str(user.id), [p["id"] for p in inline])
         for pos in positions:
             position_cards.append(_position_to_card(pos))
 
@@ -416,10 +429,7 @@ def _get_chatting_list_cards(user_id: str, limit: int = 3) -> List[dict]:
             u.trust_score as creator_trust_score,
             u.avatar_url as creator_avatar_url,
             u.avatar_icon_url as creator_avatar_icon_url,
-            COALESCE((
-                SELECT COUNT(*) FROM kudos k
-                WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-            ), 0) as creator_kudos_count,
+            u.kudos_received_count as creator_kudos_count,
             -- Category
             pc.label as category_name,
             -- Location
@@ -487,23 +497,23 @@ def _get_chatting_list_cards(user_id: str, limit: int = 3) -> List[dict]:
     return result
 
 
-# Per-user context cache: location + category priorities
-_user_context_cache = {}  # {user_id: {"location_id": str, "priorities": dict, "time": float}}
-USER_CONTEXT_TTL = 300  # 5 minutes
+# Per-user context cache: location, category priorities, chatting list likelihood
+USER_CONTEXT_TTL = 3600  # 1 hour; invalidate_user_context_cache() reaches every worker
+_user_context_cache = SharedCache("user_context", ttl=USER_CONTEXT_TTL)
 
 
 def invalidate_user_context_cache(user_id: str):
-    """Invalidate cached context for a user. Call after settings/location changes."""
-    _user_context_cache.pop(str(user_id), None)
+    """Invalidate cached context for a user. Call after settings/location changes.
 
+    Also drops the user's precomputed card buffer, which was built from the
+    old location/priorities.
+    """
+    _user_context_cache.invalidate(str(user_id))
+    card_queue.invalidate_user(str(user_id))
 
-def _get_chatting_list_likelihood(user_id: str) -> int:
-    """Read chatting_list_likelihood fresh from DB (not cached).
 
-    This is always read fresh because it can change frequently via settings
-    and the per-worker in-memory cache can't be reliably invalidated across
-    gunicorn workers.
-    """
+def _get_chatting_list_likelihood(user_id: str) -> int:
+    """Read chatting_list_likelihood from DB (defaults to 3)."""
     user_row = db.execute_query(
         "SELECT chatting_list_likelihood FROM users WHERE id = %s",
         (user_id,), fetchone=True)
@@ -512,19 +522,8 @@ def _get_chatting_list_likelihood(user_id: str) -> int:
     return 3
 
 
-def _get_user_context(user_id: str):
-    """Get user's location, category priorities, and chatting list likelihood.
-
-    Location and priorities are cached (change rarely). Chatting list likelihood
-    is always read fresh from DB.
-
-    Returns (location_id, priorities, chatting_list_likelihood).
-    """
-    uid = str(user_id)
-    cached = _user_context_cache.get(uid)
-    if cached and (time.time() - cached["time"]) < USER_CONTEXT_TTL:
-        return cached["location_id"], cached["priorities"], _get_chatting_list_likelihood(uid)
-
+def _load_user_context(user_id: str) -> dict:
+    """Fetch a user's location, category priorities and chatting list likelihood."""
     # Fetch location
     location = db.execute_query("""
         SELECT location_id FROM user_location
@@ -548,12 +547,24 @@ def _get_user_context(user_id: str):
         for c in (categories or []):
             priorities[str(c["id"])] = 3
 
-    _user_context_cache[uid] = {
+    return {
         "location_id": location_id,
         "priorities": priorities,
-        "time": time.time()
+        "chatting_list_likelihood": _get_chatting_list_likelihood(user_id),
     }
-    return location_id, priorities, _get_chatting_list_likelihood(uid)
+
+
+def _get_user_context(user_id: str):
+    """Get user's location, category priorities, and chatting list likelihood.
+
+    Cached in the shared cache; update_user_settings, location changes and
+    category creation invalidate it in every worker.
+
+    Returns (location_id, priorities, chatting_list_likelihood).
+    """
+    uid = str(user_id)
+    context = _user_context_cache.get(uid, lambda: _load_user_context(uid))
+    return context["location_id"], context["priorities"], context["chatting_list_likelihood"]
 
 
 def _get_unvoted_positions_fallback(user_id: str, location_id: str, limit: int = 10) -> List[dict]:
@@ -590,10 +601,7 @@ def _get_unvoted_positions_fallback(user_id: str, location_id: str, limit: int =
             u.trust_score as creator_trust_score,
             u.avatar_url as creator_avatar_url,
             u.avatar_icon_url as creator_avatar_icon_url,
-            COALESCE((
-                SELECT COUNT(*) FROM kudos k
-                WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-            ), 0) as creator_kudos_count,
+            u.kudos_received_count as creator_kudos_count,
             pc.label as category_name,
             l.code as location_code,
             l.name as location_name,
@@ -648,19 +656,22 @@ def _get_unvoted_positions_fallback(user_id: str, location_id: str, limit: int =
     return result
 
 
-# In-memory survey cache: all active surveys with questions and options
-_survey_cache = None
-_survey_cache_time = 0
+# Shared survey cache: all active surveys with questions and options
 SURVEY_CACHE_TTL = 3600  # 1 hour
+_survey_cache = SharedCache("surveys", ttl=SURVEY_CACHE_TTL)
 
 
 def _get_cached_surveys():
-    """Get all active surveys with questions and options (cached in-memory)."""
-    global _survey_cache, _survey_cache_time
-    now = time.time()
-    if _survey_cache is not None and (now - _survey_cache_time) < SURVEY_CACHE_TTL:
-        return _survey_cache
+    """Get all active surveys with questions and options (shared cache).
+
+    Admin survey writes invalidate the cache; the TTL also covers surveys
+    whose start/end time passes.
+    """
+    return _survey_cache.get("active", _load_surveys)
+
 
+def _load_surveys():
+    """Query all active surveys and group them into questions with options."""
     rows = db.execute_query("""
         SELECT sq.id as question_id, sq.survey_question as question,
                s.id as survey_id, s.survey_title, s.end_time,
@@ -689,13 +700,11 @@ def _get_cached_surveys():
             }
         if row.get("option_id"):
             questions[qid]["options"].append({
-                "id": row["option_id"],
+                "id": str(row["option_id"]),
                 "survey_question_option": row["option_text"]
             })
 
-    _survey_cache = list(questions.values())
-    _survey_cache_time = now
-    return _survey_cache
+    return list(questions.values())
 
 
 def _get_pending_surveys(user_id: str, limit: int = 2) -> List[dict]:
@@ -740,10 +749,7 @@ def _get_pending_chat_requests(user_id: str, limit: int = 2) -> List[dict]:
             u.trust_score as initiator_trust_score,
             u.avatar_url as initiator_avatar_url,
             u.avatar_icon_url as initiator_avatar_icon_url,
-            COALESCE((
-                SELECT COUNT(*) FROM kudos k
-                WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-            ), 0) as initiator_kudos_count,
+            u.kudos_received_count as initiator_kudos_count,
             -- Position details
             p.id as position_id,
             p.statement as position_statement,
@@ -758,10 +764,7 @@ def _get_pending_chat_requests(user_id: str, limit: int = 2) -> List[dict]:
             author.trust_score as author_trust_score,
             author.avatar_url as author_avatar_url,
             author.avatar_icon_url as author_avatar_icon_url,
-            COALESCE((
-                SELECT COUNT(*) FROM kudos k
-                WHERE k.receiver_user_id = author.id AND k.status = 'sent'
-            ), 0) as author_kudos_count
+            author.kudos_received_count as author_kudos_count
         FROM chat_request cr
         JOIN user_position up ON cr.user_position_id = up.id
         JOIN users u ON cr.initiator_user_id = u.id
@@ -816,12 +819,8 @@ def _get_pending_kudos_cards(user_id: str, limit: int = 2) -> List[dict]:
                 ELSE initiator.trust_score
             END as other_trust_score,
             CASE
-                WHEN cr.initiator_user_id = %s THEN (
-                    SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = responder.id AND k.status = 'sent'
-                )
-                ELSE (
-                    SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = initiator.id AND k.status = 'sent'
-                )
+                WHEN cr.initiator_user_id = %s THEN responder.kudos_received_count
+                ELSE initiator.kudos_received_count
             END as other_kudos_count,
             CASE
                 WHEN cr.initiator_user_id = %s THEN responder.avatar_url
@@ -846,7 +845,7 @@ def _get_pending_kudos_cards(user_id: str, limit: int = 2) -> List[dict]:
             responder.trust_score as position_author_trust_score,
             responder.avatar_url as position_author_avatar_url,
             responder.avatar_icon_url as position_author_avatar_icon_url,
-            (SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = responder.id AND k.status = 'sent') as position_author_kudos_count
+            responder.kudos_received_count as position_author_kudos_count
         FROM chat_log cl
         JOIN chat_request cr ON cl.chat_request_id = cr.id
         JOIN user_position up ON cr.user_position_id = up.id
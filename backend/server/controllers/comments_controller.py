@@ -12,10 +12,11 @@ from candid.models.error_model import ErrorModel
 from candid.controllers import db
 from candid.controllers.helpers.auth import (
     authorization, token_to_user, is_moderator_at_location,
-    has_qa_authority, get_highest_role_at_location,
+    has_qa_authority, get_highest_role_at_location, get_highest_roles_at_location,
 )
 from candid.controllers.helpers.rate_limiting import check_rate_limit_for
 from candid.controllers.helpers.scoring import wilson_score, vote_weight
+from candid.controllers.helpers.vote_counters import cast_vote, remove_vote, write_scores
 from candid.controllers.helpers.ideological_coords import (
     get_effective_coords, get_conversation_for_post,
 )
@@ -173,7 +174,7 @@ def get_comments(post_id, cursor=None, limit=None, token_info=None):  # noqa: E5
                u.avatar_icon_url AS creator_avatar_icon_url, u.status AS creator_status,
                u.trust_score AS creator_trust_score,
                u.show_role_badge AS creator_show_role_badge,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count
+               u.kudos_received_count AS creator_kudos_count
                {vote_select}
         FROM comment c
         JOIN users u ON c.creator_user_id = u.id
@@ -192,6 +193,11 @@ def get_comments(post_id, cursor=None, limit=None, token_info=None):  # noqa: E5
     post_location_id = str(post["location_id"])
     post_category_id = str(post["category_id"]) if post.get("category_id") else None
 
+    # Resolve every creator's role in one query (cached) instead of per comment
+    creator_roles = get_highest_roles_at_location(
+        [row["creator_user_id"] for row in rows], post_location_id, post_category_id
+    )
+
     # Post-process: handle deleted/removed, add role badges
     result = []
     for row in rows:
@@ -210,9 +216,7 @@ def get_comments(post_id, cursor=None, limit=None, token_info=None):  # noqa: E5
         row_dict = dict(row) if not isinstance(row, dict) else row
 
         # Role badge visibility: check both user-level and item-level flags
-        creator_role = get_highest_role_at_location(
-            str(row["creator_user_id"]), post_location_id, post_category_id
-        )
+        creator_role = creator_roles.get(str(row["creator_user_id"]))
         show_creator_role = row_dict.get("show_creator_role", False)
         creator_show_role_badge = row_dict.get("creator_show_role_badge", True)
         is_own = user_id and str(row["creator_user_id"]) == user_id
@@ -345,9 +349,9 @@ def create_comment(post_id, body, token_info=None):  # noqa: E501
                u.username AS creator_username, u.display_name AS creator_display_name,
                u.avatar_icon_url AS creator_avatar_icon_url, u.status AS creator_status,
                u.trust_score AS creator_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count,
+               u.kudos_received_count AS creator_kudos_count,
                u.trust_score AS creator_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count,
+               u.kudos_received_count AS creator_kudos_count,
                NULL AS user_vote_type, NULL AS user_vote_reason
         FROM comment c
         JOIN users u ON c.creator_user_id = u.id
@@ -408,9 +412,9 @@ def update_comment(comment_id, body, token_info=None):  # noqa: E501
                u.username AS creator_username, u.display_name AS creator_display_name,
                u.avatar_icon_url AS creator_avatar_icon_url, u.status AS creator_status,
                u.trust_score AS creator_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count,
+               u.kudos_received_count AS creator_kudos_count,
                u.trust_score AS creator_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count,
+               u.kudos_received_count AS creator_kudos_count,
                NULL AS user_vote_type, NULL AS user_vote_reason
         FROM comment c
         JOIN users u ON c.creator_user_id = u.id
@@ -510,10 +514,7 @@ def vote_on_comment(comment_id, body, token_info=None):  # noqa: E501
 
     if existing and existing["vote_type"] == vote_type:
         # Toggle off
-        db.execute_query(
-            "DELETE FROM comment_vote WHERE comment_id = %s AND user_id = %s",
-            (comment_id, user_id),
-        )
+        counters = remove_vote("comment", comment_id, user_id)
         user_vote = None
     else:
         # Compute weight
@@ -532,40 +533,18 @@ def vote_on_comment(comment_id, body, token_info=None):  # noqa: E501
             except Exception:
                 weight = 1.0
 
-        db.execute_query("""
-            INSERT INTO comment_vote (id, comment_id, user_id, vote_type, weight, downvote_reason)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (comment_id, user_id) DO UPDATE SET
-                vote_type = EXCLUDED.vote_type,
-                weight = EXCLUDED.weight,
-                downvote_reason = EXCLUDED.downvote_reason
-        """, (str(uuid.uuid4()), comment_id, user_id, vote_type, weight, downvote_reason))
+        counters = cast_vote("comment", comment_id, user_id, vote_type, weight, downvote_reason)
 
         user_vote = {"voteType": vote_type, "downvoteReason": downvote_reason}
 
-    # Recalc denormalized counts
-    counts = db.execute_query("""
-        SELECT
-            COUNT(*) FILTER (WHERE vote_type = 'upvote') AS up_count,
-            COUNT(*) FILTER (WHERE vote_type = 'downvote') AS down_count,
-            COALESCE(SUM(weight) FILTER (WHERE vote_type = 'upvote'), 0) AS weighted_up,
-            COALESCE(SUM(weight) FILTER (WHERE vote_type = 'downvote'), 0) AS weighted_down
-        FROM comment_vote WHERE comment_id = %s
-    """, (comment_id,), fetchone=True)
-
-    up_count = counts["up_count"] or 0
-    down_count = counts["down_count"] or 0
-    weighted_up = float(counts["weighted_up"] or 0)
-    weighted_down = float(counts["weighted_down"] or 0)
-    new_score = wilson_score(weighted_up, weighted_down)
+    if not counters:
+        return ErrorModel(500, "Failed to record vote"), 500
 
-    db.execute_query("""
-        UPDATE comment SET
-            upvote_count = %s, downvote_count = %s,
-            weighted_upvotes = %s, weighted_downvotes = %s,
-            score = %s
-        WHERE id = %s
-    """, (up_count, down_count, weighted_up, weighted_down, new_score, comment_id))
+    # Score from the counters the vote produced
+    new_score = wilson_score(float(counters["weighted_upvotes"]), float(counters["weighted_downvotes"]))
+    write_scores("comment", comment_id, counters, {"score": new_score})
+    up_count = counters["upvote_count"]
+    down_count = counters["downvote_count"]
 
     return {
         "userVote": user_vote,
@@ -621,7 +600,7 @@ def patch_comment(comment_id, body, token_info=None):  # noqa: E501
                u.username AS creator_username, u.display_name AS creator_display_name,
                u.avatar_icon_url AS creator_avatar_icon_url, u.status AS creator_status,
                u.trust_score AS creator_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count,
+               u.kudos_received_count AS creator_kudos_count,
                NULL AS user_vote_type, NULL AS user_vote_reason
         FROM comment c
         JOIN users u ON c.creator_user_id = u.id
@@ -8,7 +8,7 @@ import uuid
 import logging
 
 from candid.controllers import db
-from candid.controllers.helpers.auth import get_location_ancestors
+from candid.controllers.helpers.auth import get_location_ancestors, invalidate_role_cache
 from candid.models.user import User
 from candid.models.survey import Survey
 from candid.models.survey_question import SurveyQuestion
@@ -166,11 +166,11 @@ def build_pairwise_survey(survey_id):
 
 def get_group_user_ids(polis_conv_id, group_id):
     """Get user IDs for members of a specific Polis group."""
-    from candid.controllers.helpers.polis_client import get_client, PolisError
+    from candid.controllers.helpers.polis_client import PolisError
+    from candid.controllers.helpers.polis_math import get_math_data
 
     try:
-        client = get_client()
-        math_data = client.get_math_data(polis_conv_id)
+        math_data = get_math_data(polis_conv_id)
 
         if not math_data:
             return None
@@ -317,6 +317,7 @@ def apply_role_change(request_row):
             db.execute_query("""
                 DELETE FROM user_role WHERE id = %s
             """, (request_row['user_role_id'],))
+    invalidate_role_cache()
 
 
 def find_approval_peer(request_row):
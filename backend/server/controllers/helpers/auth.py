@@ -12,7 +12,6 @@ user_type is now only 'normal' or 'guest'. All privileged roles live in user_rol
 """
 
 import logging
-import time
 from datetime import datetime, timezone
 
 from candid.models.user import User
@@ -20,6 +19,7 @@ from candid.models.error_model import ErrorModel
 from candid.controllers import config, db
 from candid.controllers.helpers.constants import HIERARCHICAL_ROLES
 from candid.controllers.helpers.redis_pool import get_redis
+from candid.controllers.helpers.shared_cache import SharedCache
 
 logger = logging.getLogger(__name__)
 
@@ -42,90 +42,71 @@ _SCOPED_ROLE_HIERARCHY = {
 # HIERARCHICAL_ROLES imported from constants.py
 
 # ---------------------------------------------------------------------------
-# Location tree helpers (cached with TTL)
+# Location tree helpers (shared cache, invalidated on rearrangement)
 # ---------------------------------------------------------------------------
 
-_LOCATION_CACHE_TTL = 300  # 5 minutes
-_location_ancestor_cache = {}  # location_id -> (timestamp, [ancestor_ids])
-_location_descendant_cache = {}  # location_id -> (timestamp, [descendant_ids])
-_root_location_cache = {"value": None, "ts": 0}
+_LOCATION_CACHE_TTL = 3600  # 1 hour; invalidate_location_cache() reaches every worker
+_location_cache = SharedCache("location_tree", ttl=_LOCATION_CACHE_TTL)
 
 
 def invalidate_location_cache():
     """Invalidate all location tree caches. Call after location rearrangement."""
-    _location_ancestor_cache.clear()
-    _location_descendant_cache.clear()
-    _root_location_cache["value"] = None
-    _root_location_cache["ts"] = 0
-
-
-def _is_cache_valid(ts):
-    return (time.time() - ts) < _LOCATION_CACHE_TTL
+    _location_cache.invalidate()
 
 
 def get_root_location_id():
     """Get the root location (no parent). Cached."""
-    if _root_location_cache["value"] and _is_cache_valid(_root_location_cache["ts"]):
-        return _root_location_cache["value"]
+    def load():
+        row = db.execute_query(
+            "SELECT id FROM location WHERE parent_location_id IS NULL AND deleted_at IS NULL LIMIT 1",
+            fetchone=True,
+        )
+        return str(row["id"]) if row else None
 
-    row = db.execute_query(
-        "SELECT id FROM location WHERE parent_location_id IS NULL AND deleted_at IS NULL LIMIT 1",
-        fetchone=True,
-    )
-    if row:
-        _root_location_cache["value"] = str(row["id"])
-        _root_location_cache["ts"] = time.time()
-        return _root_location_cache["value"]
-    return None
+    return _location_cache.get("root", load)
 
 
 def get_location_ancestors(location_id):
     """Return [self, parent, ..., root] for the given location. Cached."""
     loc_str = str(location_id)
-    cached = _location_ancestor_cache.get(loc_str)
-    if cached and _is_cache_valid(cached[0]):
-        return cached[1]
 
-    rows = db.execute_query("""
-        WITH RECURSIVE ancestors AS (
-            SELECT id, parent_location_id, 0 AS depth
-            FROM location WHERE id = %s AND deleted_at IS NULL
-            UNION ALL
-            SELECT l.id, l.parent_location_id, a.depth + 1
-            FROM location l
-            JOIN ancestors a ON l.id = a.parent_location_id
-            WHERE l.deleted_at IS NULL
-        )
-        SELECT id FROM ancestors ORDER BY depth
-    """, (loc_str,))
+    def load():
+        rows = db.execute_query("""
+            WITH RECURSIVE ancestors AS (
+                SELECT id, parent_location_id, 0 AS depth
+                FROM location WHERE id = %s AND deleted_at IS NULL
+                UNION ALL
+                SELECT l.id, l.parent_location_id, a.depth + 1
+                FROM location l
+                JOIN ancestors a ON l.id = a.parent_location_id
+                WHERE l.deleted_at IS NULL
+            )
+            SELECT id FROM ancestors ORDER BY depth
+        """, (loc_str,))
+        return [str(r["id"]) for r in rows] if rows else []
 
-    result = [str(r["id"]) for r in rows] if rows else []
-    _location_ancestor_cache[loc_str] = (time.time(), result)
-    return result
+    return _location_cache.get(f"ancestors:{loc_str}", load)
 
 
 def get_location_descendants(location_id):
     """Return all descendants (including self) of the given location. Cached."""
     loc_str = str(location_id)
-    cached = _location_descendant_cache.get(loc_str)
-    if cached and _is_cache_valid(cached[0]):
-        return cached[1]
 
-    rows = db.execute_query("""
-        WITH RECURSIVE descendants AS (
-            SELECT id FROM location WHERE id = %s AND deleted_at IS NULL
-            UNION ALL
-            SELECT l.id
-            FROM location l
-            JOIN descendants d ON l.parent_location_id = d.id
-            WHERE l.deleted_at IS NULL
-        )
-        SELECT id FROM descendants
-    """, (loc_str,))
+    def load():
+        rows = db.execute_query("""
+            WITH RECURSIVE descendants AS (
+                SELECT id FROM location WHERE id = %s AND deleted_at IS NULL
+                UNION ALL
+                SELECT l.id
+                FROM location l
+                JOIN descendants d ON l.parent_location_id = d.id
+                WHERE l.deleted_at IS NULL
+            )
+            SELECT id FROM descendants
+        """, (loc_str,))
+        return [str(r["id"]) for r in rows] if rows else []
 
-    result = [str(r["id"]) for r in rows] if rows else []
-    _location_descendant_cache[loc_str] = (time.time(), result)
-    return result
+    return _location_cache.get(f"descendants:{loc_str}", load)
 
 
 # ---------------------------------------------------------------------------
@@ -327,6 +308,83 @@ def get_highest_role_at_location(user_id, location_id, category_id=None):
     return None
 
 
+# Short-lived cache for display-time role lookups (creator badges on posts and
+# comments). Authorization and moderation checks bypass it (cached=False).
+_ROLE_CACHE_TTL = 60
+_role_cache = SharedCache("highest_role", ttl=_ROLE_CACHE_TTL)
+
+# Rank used to pick one role per user: hierarchical roles at an ancestor win,
+# then roles at the exact location+category, then any category-scoped role
+# at the location (same precedence as get_highest_role_at_location).
+_HIGHEST_ROLES_SQL = """
+    SELECT DISTINCT ON (user_id) user_id, role
+    FROM user_role
+    WHERE user_id = ANY(%(user_ids)s::uuid[])
+      AND (
+        (role IN ('admin', 'moderator') AND location_id = ANY(%(ancestors)s::uuid[]))
+        OR (location_id = %(location_id)s AND position_category_id = %(category_id)s)
+        OR (location_id = %(location_id)s
+            AND role IN ('facilitator', 'assistant_moderator', 'expert', 'liaison'))
+      )
+    ORDER BY user_id,
+        CASE
+            WHEN role IN ('admin', 'moderator') AND location_id = ANY(%(ancestors)s::uuid[]) THEN 1
+            WHEN position_category_id = %(category_id)s THEN 2
+            ELSE 3
+        END,
+        CASE role
+            WHEN 'admin' THEN 1 WHEN 'moderator' THEN 2 WHEN 'facilitator' THEN 3
+            WHEN 'assistant_moderator' THEN 4 WHEN 'expert' THEN 5 WHEN 'liaison' THEN 6
+        END
+"""
+
+
+def invalidate_role_cache():
+    """Invalidate cached role lookups. Call after user_role changes."""
+    _role_cache.invalidate()
+
+
+def _query_highest_roles(user_ids, loc_str, cat_str):
+    """Run _HIGHEST_ROLES_SQL. Returns {user_id: role} for users with a role."""
+    rows = db.execute_query(_HIGHEST_ROLES_SQL, {
+        "user_ids": user_ids,
+        "ancestors": get_location_ancestors(loc_str),
+        "location_id": loc_str,
+        "category_id": cat_str,
+    })
+    return {str(r["user_id"]): r["role"] for r in (rows or [])}
+
+
+def get_highest_roles_at_location(user_ids, location_id, category_id=None, cached=True):
+    """Batch get_highest_role_at_location: one query for many users.
+
+    Cached for display use. Permission checks pass cached=False so a revoked
+    role stops counting immediately.
+
+    Returns {user_id: role name or None} for every requested user id.
+    """
+    user_ids = list(dict.fromkeys(str(u) for u in user_ids if u))
+    if not user_ids or not location_id:
+        return {uid: None for uid in user_ids}
+
+    loc_str = str(location_id)
+    cat_str = str(category_id) if category_id else None
+    if not cached:
+        found = _query_highest_roles(user_ids, loc_str, cat_str)
+        return {uid: found.get(uid) for uid in user_ids}
+
+    prefix = f"{loc_str}:{cat_str or ''}:"
+
+    def load(keys):
+        missing = [k[len(prefix):] for k in keys]
+        found = _query_highest_roles(missing, loc_str, cat_str)
+        # "" caches "no role" so role-less users don't miss every time
+        return {prefix + uid: found.get(uid, "") for uid in missing}
+
+    cached = _role_cache.get_many([prefix + uid for uid in user_ids], load)
+    return {uid: cached.get(prefix + uid) or None for uid in user_ids}
+
+
 # ---------------------------------------------------------------------------
 # Authorization functions
 # ---------------------------------------------------------------------------
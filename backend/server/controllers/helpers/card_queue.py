@@ -0,0 +1,329 @@
+"""
+Precomputed per-user card buffer.
+
+Position cards are the expensive part of the card queue (Polis nextComment
+calls plus several DB lookups), so they are computed ahead of time by a
+background worker and buffered per user in Redis. The card queue endpoint
+pops from the buffer, re-checks the popped positions with one cheap query,
+and asks for a refill when the buffer drops below the low-water mark.
+
+Redis layout (per user):
+- card_queue:{user_id}            LIST of position ids, in serve order
+- card_queue:{user_id}:cards      HASH position id -> position dict (JSON)
+- card_queue:{user_id}:gen        STRING global generation the buffer was built at
+- card_queue:{user_id}:served     SET of recently served position ids (short TTL)
+
+Global keys:
+- card_queue:refill               SET of user ids waiting for a refill
+- card_queue:generation           INCR'd to invalidate every buffer at once
+                                  (e.g. after a moderator removes a position)
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Dict, List, Optional
+
+from candid.controllers import db, config
+from candid.controllers.helpers.redis_pool import get_redis
+
+logger = logging.getLogger(__name__)
+
+QUEUE_PREFIX = "card_queue:"
+REFILL_SET = "card_queue:refill"
+GENERATION_KEY = "card_queue:generation"
+
+
+def _queue_key(user_id: str) -> str:
+    return f"{QUEUE_PREFIX}{user_id}"
+
+
+def _cards_key(user_id: str) -> str:
+    return f"{QUEUE_PREFIX}{user_id}:cards"
+
+
+def _gen_key(user_id: str) -> str:
+    return f"{QUEUE_PREFIX}{user_id}:gen"
+
+
+def _served_key(user_id: str) -> str:
+    return f"{QUEUE_PREFIX}{user_id}:served"
+
+
+# ========== Invalidation (called from write paths) ==========
+
+def invalidate_user(user_id: str):
+    """Drop a user's buffer. Call after location/priority changes or a ban."""
+    uid = str(user_id)
+    try:
+        r = get_redis()
+        pipe = r.pipeline()
+        pipe.delete(_queue_key(uid), _cards_key(uid), _gen_key(uid))
+        pipe.sadd(REFILL_SET, uid)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Error invalidating card queue for %s: %s", uid, e)
+
+
+def invalidate_all():
+    """Invalidate every user's buffer by bumping the global generation.
+
+    Buffers are lazily discarded on their next pop, so this is O(1)
+    regardless of the number of buffered users.
+    """
+    try:
+        get_redis().incr(GENERATION_KEY)
+    except Exception as e:
+        logger.warning("Error bumping card queue generation: %s", e)
+
+
+def discard_positions(user_id: str, position_ids: List[str]):
+    """Remove positions the user just responded to from their buffer."""
+    if not position_ids:
+        return
+    uid = str(user_id)
+    try:
+        r = get_redis()
+        pipe = r.pipeline()
+        for pid in position_ids:
+            pipe.lrem(_queue_key(uid), 0, str(pid))
+        pipe.hdel(_cards_key(uid), *[str(pid) for pid in position_ids])
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Error discarding card queue positions for %s: %s", uid, e)
+
+
+def mark_served(user_id: str, position_ids: List[str]):
+    """Record positions served outside the buffer so refills and pops skip them."""
+    if not position_ids:
+        return
+    uid = str(user_id)
+    try:
+        r = get_redis()
+        pipe = r.pipeline()
+        pipe.sadd(_served_key(uid), *[str(pid) for pid in position_ids])
+        pipe.expire(_served_key(uid), config.CARD_QUEUE_SERVED_TTL)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Error marking card queue positions served for %s: %s", uid, e)
+
+
+def request_refill(user_id: str):
+    """Ask the background worker to top up a user's buffer."""
+    try:
+        get_redis().sadd(REFILL_SET, str(user_id))
+    except Exception as e:
+        logger.warning("Error requesting card queue refill for %s: %s", user_id, e)
+
+
+# ========== Read path (called from get_card_queue) ==========
+
+def pop_positions(user_id: str, count: int) -> List[Dict]:
+    """Pop up to `count` buffered positions for a user.
+
+    Popped positions already in the served set (handed out by the inline
+    fallback after they were buffered) are skipped, and the rest are
+    re-checked against the DB in a single query so that positions removed by
+    moderation or already answered elsewhere are never served. Requests a refill when the buffer is stale or below the low-water
+    mark. Returns an empty list when nothing is buffered.
+    """
+    uid = str(user_id)
+    try:
+        r = get_redis()
+        pipe = r.pipeline()
+        pipe.get(GENERATION_KEY)
+        pipe.get(_gen_key(uid))
+        pipe.lrange(_queue_key(uid), 0, count - 1)
+        pipe.ltrim(_queue_key(uid), count, -1)
+        pipe.llen(_queue_key(uid))
+        pipe.smembers(_served_key(uid))
+        global_gen, user_gen, ids, _, remaining, served = pipe.execute()
+    except Exception as e:
+        logger.warning("Error reading card queue for %s: %s", uid, e)
+        return []
+
+    if (global_gen or "0") != (user_gen or "0"):
+        # Buffer predates a global invalidation — discard it entirely
+        invalidate_user(uid)
+        return []
+
+    positions = []
+    if ids:
+        # Ids the inline fallback served while they sat in the buffer are dropped
+        fresh = [pid for pid in ids if pid not in (served or ())]
+        try:
+            raw = r.hmget(_cards_key(uid), fresh) if fresh else []
+            pipe = r.pipeline()
+            pipe.hdel(_cards_key(uid), *ids)
+            if fresh:
+                pipe.sadd(_served_key(uid), *fresh)
+                pipe.expire(_served_key(uid), config.CARD_QUEUE_SERVED_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning("Error reading card queue entries for %s: %s", uid, e)
+            raw = []
+        positions = [json.loads(item) for item in raw if item]
+        positions = _filter_servable(uid, positions)
+
+    if remaining < config.CARD_QUEUE_LOW_WATER:
+        request_refill(uid)
+
+    return positions
+
+
+def _filter_servable(user_id: str, positions: List[Dict]) -> List[Dict]:
+    """Drop positions that are no longer active or that the user has answered."""
+    if not positions:
+        return []
+    rows = db.execute_query("""
+        SELECT p.id
+        FROM position p
+        LEFT JOIN response r ON r.position_id = p.id AND r.user_id = %s
+        WHERE p.id = ANY(%s::uuid[])
+          AND p.status = 'active'
+          AND r.id IS NULL
+    """, (user_id, [p["id"] for p in positions]))
+    servable = {str(row["id"]) for row in (rows or [])}
+    return [p for p in positions if p["id"] in servable]
+
+
+# ========== Write path (called by the worker) ==========
+
+def refill(user_id: str) -> int:
+    """Top up a user's buffer to the high-water mark.
+
+    Returns the number of positions added.
+    """
+    # Imported lazily: cards_controller imports this module
+    from candid.controllers.cards_controller import _get_user_context
+    from candid.controllers.helpers import polis_sync
+
+    uid = str(user_id)
+    r = get_redis()
+
+    pipe = r.pipeline()
+    pipe.get(GENERATION_KEY)
+    pipe.get(_gen_key(uid))
+    pipe.lrange(_queue_key(uid), 0, -1)
+    pipe.smembers(_served_key(uid))
+    global_gen, user_gen, buffered, served = pipe.execute()
+
+    global_gen = global_gen or "0"
+    if global_gen != (user_gen or "0"):
+        r.delete(_queue_key(uid), _cards_key(uid))
+        buffered = []
+
+    needed = config.CARD_QUEUE_HIGH_WATER - len(buffered)
+    if needed <= 0:
+        return 0
+
+    location_id, priorities, _ = _get_user_context(uid)
+    if not location_id:
+        return 0
+
+    # Over-fetch by the number of ids we will skip so the buffer still fills
+    exclude = set(buffered) | set(served or ())
+    positions = polis_sync.get_unvoted_positions_for_user(
+        user_id=uid,
+        location_id=str(location_id),
+        category_priorities=priorities,
+        limit=needed + len(exclude),
+    )
+    fresh = [p for p in positions if p["id"] not in exclude][:needed]
+
+    pipe = r.pipeline()
+    if fresh:
+        pipe.rpush(_queue_key(uid), *[p["id"] for p in fresh])
+        pipe.hset(_cards_key(uid), mapping={p["id"]: json.dumps(p) for p in fresh})
+    pipe.set(_gen_key(uid), global_gen)
+    for key in (_queue_key(uid), _cards_key(uid), _gen_key(uid)):
+        pipe.expire(key, config.CARD_QUEUE_TTL)
+    pipe.execute()
+
+    return len(fresh)
+
+
+class CardQueueWorker:
+    """Background worker that refills per-user card buffers."""
+
+    def __init__(self, poll_interval: float = 1.0, batch_size: int = 10):
+        """
+        Initialize the worker.
+
+        Args:
+            poll_interval: Seconds to wait when no refills are pending
+            batch_size: Maximum users to refill per cycle
+        """
+        self.poll_interval = poll_interval
+        self.batch_size = batch_size
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background worker thread."""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        print("Card queue worker started", flush=True)
+
+    def stop(self):
+        """Stop the background worker."""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        print("Card queue worker stopped", flush=True)
+
+    def _run_loop(self):
+        """Main worker loop."""
+        while self._running:
+            try:
+                processed = self.process_batch()
+                if processed == 0:
+                    time.sleep(self.poll_interval)
+            except Exception as e:
+                logger.error("Card queue worker error: %s", e, exc_info=True)
+                time.sleep(self.poll_interval)
+
+    def process_batch(self) -> int:
+        """Refill buffers for a batch of pending users.
+
+        SPOP claims each user atomically, so multiple gunicorn workers never
+        refill the same user concurrently. Returns the number of users handled.
+        """
+        user_ids = get_redis().spop(REFILL_SET, self.batch_size)
+        if not user_ids:
+            return 0
+
+        for uid in user_ids:
+            try:
+                refill(uid)
+            except Exception as e:
+                logger.error("Card queue refill failed for %s: %s", uid, e, exc_info=True)
+
+        return len(user_ids)
+
+
+# ========== Singleton Worker ==========
+
+_worker: Optional[CardQueueWorker] = None
+
+
+def start_worker():
+    """Start the singleton card queue worker."""
+    global _worker
+    if _worker is None:
+        _worker = CardQueueWorker()
+    _worker.start()
+
+
+def stop_worker():
+    """Stop the singleton card queue worker."""
+    global _worker
+    if _worker:
+        _worker.stop()
+        _worker = None
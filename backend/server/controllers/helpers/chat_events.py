@@ -1,10 +1,13 @@
 """
 Helper functions for publishing chat events to Redis pub/sub.
 
-These events are consumed by the chat WebSocket server.
+These events are consumed by the chat WebSocket server. Every event carries
+a unique eventId so that exactly one chat-server node handles it when
+several are running.
 """
 
 import json
+import uuid
 from .redis_pool import get_redis
 
 # Channel name (must match chat server)
@@ -36,6 +39,7 @@ def publish_chat_request_response(
 
         event = {
             "event": "chat_request_response",
+            "eventId": uuid.uuid4().hex,
             "requestId": request_id,
             "response": response,
             "initiatorUserId": initiator_user_id,
@@ -75,6 +79,7 @@ def publish_chat_request_received(
 
         event = {
             "event": "chat_request_received",
+            "eventId": uuid.uuid4().hex,
             "recipientUserId": recipient_user_id,
             "card": card_data,
         }
@@ -116,6 +121,7 @@ def publish_chat_accepted(
 
         event = {
             "event": "chat_accepted",
+            "eventId": uuid.uuid4().hex,
             "chatLogId": chat_log_id,
             "chatRequestId": chat_request_id,
             "initiatorUserId": initiator_user_id,
@@ -17,6 +17,8 @@ class Config:
 	SQLALCHEMY_TRACK_MODIFICATIONS = False
 	TIMESTAMP_FORMAT = 'YYYY-MM-DD"T"HH24:MI:SS"Z"' # ISO 8601
 	LONG_POLL_TIMEOUT = 10
+	# Start the Polis sync / MF / card queue threads on import (off for standalone workers)
+	BACKGROUND_WORKERS_ENABLED = os.environ.get('BACKGROUND_WORKERS_ENABLED', 'true').lower() == 'true'
 	# Redis for chat server communication
 	REDIS_URL = os.environ.get('REDIS_URL', 'redis://redis:6379')
 	# Keycloak
@@ -37,6 +39,11 @@ class Config:
 	POLIS_ENABLED = os.environ.get('POLIS_ENABLED', 'true').lower() == 'true'
 	POLIS_TIMEOUT = int(os.environ.get('POLIS_TIMEOUT', '10'))
 	POLIS_CONVERSATION_WINDOW_MONTHS = 6  # How long each conversation stays active
+	POLIS_FETCH_CONCURRENCY = int(os.environ.get('POLIS_FETCH_CONCURRENCY', '8'))  # Parallel category reads per card request
+	POLIS_PID_CACHE_SIZE = int(os.environ.get('POLIS_PID_CACHE_SIZE', '10000'))  # Participant pids kept in memory per process (LRU)
+	POLIS_MATH_POLL_INTERVAL = int(os.environ.get('POLIS_MATH_POLL_INTERVAL', '15'))  # Seconds between conditional math fetches per conversation
+	POLIS_MATH_WATCH_TTL = int(os.environ.get('POLIS_MATH_WATCH_TTL', '3600'))  # Stop polling conversations nobody read for this long
+	POLIS_MATH_CACHE_TTL = int(os.environ.get('POLIS_MATH_CACHE_TTL', '86400'))  # Redis TTL for cached math payloads
 
 	# Polis Admin Credentials (Keycloak ROPC via polis-admin client)
 	POLIS_ADMIN_CLIENT_SECRET = _require_secret('POLIS_ADMIN_CLIENT_SECRET', 'polis-admin-secret')
@@ -46,15 +53,30 @@ class Config:
 	# NLP service
 	NLP_SERVICE_URL = os.environ.get('NLP_SERVICE_URL', 'http://nlp:5001')
 	NLP_SERVICE_TIMEOUT = int(os.environ.get('NLP_SERVICE_TIMEOUT', '10'))
+	NLP_EMBEDDING_MODEL = os.environ.get('EMBEDDING_MODEL', 'all-MiniLM-L6-v2')  # Part of embedding cache keys; keep in sync with the NLP service
+	NLP_EMBED_CACHE_TTL = int(os.environ.get('NLP_EMBED_CACHE_TTL', '604800'))  # 7 days; 0 disables the Redis embedding cache
+	NLP_POOL_MAXSIZE = int(os.environ.get('NLP_POOL_MAXSIZE', '10'))  # Keep-alive connections per worker process
+	NLP_MAX_RETRIES = int(os.environ.get('NLP_MAX_RETRIES', '2'))  # Connect errors and 502/503/504 only
+	NLP_BREAKER_FAILURES = int(os.environ.get('NLP_BREAKER_FAILURES', '5'))  # Consecutive failures before failing fast
+	NLP_BREAKER_RESET = int(os.environ.get('NLP_BREAKER_RESET', '30'))  # Seconds before a trial request is let through
+	# Position embedding search (HNSW index, see helpers/vector_search.py)
+	VECTOR_EF_SEARCH = int(os.environ.get('VECTOR_EF_SEARCH', '100'))  # Higher = better recall, slower queries
+	VECTOR_SEARCH_OVERFETCH = int(os.environ.get('VECTOR_SEARCH_OVERFETCH', '10'))  # Candidates fetched per wanted result
 
 	# Role management
 	ROLE_APPROVAL_TIMEOUT_DAYS = int(os.environ.get('ROLE_APPROVAL_TIMEOUT_DAYS', '7'))
 
 	# Matrix Factorization (comment vote ideological coordinates)
 	MF_ENABLED = os.environ.get('MF_ENABLED', os.environ.get('POLIS_ENABLED', 'true')).lower() == 'true'
-	MF_TRAIN_INTERVAL = int(os.environ.get('MF_TRAIN_INTERVAL', '1800'))  # 30 min
+	MF_IN_PROCESS = os.environ.get('MF_IN_PROCESS', 'true').lower() == 'true'  # false when a standalone mf_worker runs
+	MF_WORKER_PROCESSES = int(os.environ.get('MF_WORKER_PROCESSES', str(os.cpu_count() or 2)))
+	MF_TRAIN_INTERVAL = int(os.environ.get('MF_TRAIN_INTERVAL', '300'))  # 5 min (runs are incremental)
+	MF_FULL_RETRAIN_INTERVAL = int(os.environ.get('MF_FULL_RETRAIN_INTERVAL', '86400'))  # 24h
+	MF_INCREMENTAL_EPOCHS = int(os.environ.get('MF_INCREMENTAL_EPOCHS', '5'))
+	MF_INCREMENTAL_OVERLAP = int(os.environ.get('MF_INCREMENTAL_OVERLAP', '60'))  # Seconds before the last run's watermark re-read for late-committing votes
 	MF_MIN_VOTERS = int(os.environ.get('MF_MIN_VOTERS', '20'))
 	MF_MIN_VOTES = int(os.environ.get('MF_MIN_VOTES', '50'))
+	MF_SOLVER = os.environ.get('MF_SOLVER', 'als')  # 'als' (batched least squares) or 'sgd' (per-vote reference)
 	MF_LATENT_DIM = 2          # matches 2D coord system
 	MF_LEARNING_RATE = 0.005
 	MF_LAMBDA_REG = 0.02       # L2 on all parameters
@@ -62,12 +84,39 @@ class Config:
 	MF_MAX_EPOCHS = 300
 	MF_CONVERGENCE_TOL = 1e-5
 
+	# Shared two-tier cache (in-process LRU in front of Redis, see helpers/shared_cache.py)
+	CACHE_LOCAL_TTL = int(os.environ.get('CACHE_LOCAL_TTL', '60'))  # Bound on staleness if a pub/sub message is missed
+	CACHE_LOCAL_MAXSIZE = int(os.environ.get('CACHE_LOCAL_MAXSIZE', '4096'))  # Entries per namespace per process
+	CACHE_PUBSUB_ENABLED = os.environ.get('CACHE_PUBSUB_ENABLED', 'true').lower() == 'true'
+	STATS_SNAPSHOT_TTL = int(os.environ.get('STATS_SNAPSHOT_TTL', '300'))  # Bound on staleness of closure counts in stats snapshots
+
+	# Precomputed card queue (per-user position buffer in Redis)
+	CARD_QUEUE_ENABLED = os.environ.get('CARD_QUEUE_ENABLED', 'true').lower() == 'true'
+	CARD_QUEUE_LOW_WATER = int(os.environ.get('CARD_QUEUE_LOW_WATER', '10'))
+	CARD_QUEUE_HIGH_WATER = int(os.environ.get('CARD_QUEUE_HIGH_WATER', '30'))
+	CARD_QUEUE_TTL = int(os.environ.get('CARD_QUEUE_TTL', '900'))  # 15 min
+	CARD_QUEUE_SERVED_TTL = int(os.environ.get('CARD_QUEUE_SERVED_TTL', '600'))  # 10 min
+
+	# Push notifications (Redis outbox drained by helpers/push_dispatcher.py)
+	PUSH_OUTBOX_ENABLED = os.environ.get('PUSH_OUTBOX_ENABLED', 'true').lower() == 'true'  # false sends inline from handlers
+	EXPO_PUSH_API_URL = os.environ.get('EXPO_PUSH_API_URL', 'https://exp.host/--/api/v2/push')
+	PUSH_BATCH_SIZE = int(os.environ.get('PUSH_BATCH_SIZE', '100'))  # Expo accepts at most 100 messages per request
+	PUSH_SEND_TIMEOUT = int(os.environ.get('PUSH_SEND_TIMEOUT', '10'))
+	PUSH_MAX_ATTEMPTS = int(os.environ.get('PUSH_MAX_ATTEMPTS', '5'))
+	PUSH_RETRY_BASE_DELAY = int(os.environ.get('PUSH_RETRY_BASE_DELAY', '30'))  # Seconds; doubles per attempt
+	PUSH_RECEIPT_DELAY = int(os.environ.get('PUSH_RECEIPT_DELAY', '900'))  # Expo recommends checking receipts after 15 min
+
 	# Scoring parameters (tunable via env vars)
 	SCORING_WILSON_Z = float(os.environ.get('SCORING_WILSON_Z', '1.96'))
 	SCORING_HOT_GRAVITY = float(os.environ.get('SCORING_HOT_GRAVITY', '1.5'))
 	SCORING_WEIGHT_MIN = float(os.environ.get('SCORING_WEIGHT_MIN', '1.0'))
 	SCORING_WEIGHT_MAX = float(os.environ.get('SCORING_WEIGHT_MAX', '2.0'))
 	SCORING_BRIDGING_THRESHOLD = float(os.environ.get('SCORING_BRIDGING_THRESHOLD', '0.3'))
+	FEED_SCORE_REFRESH_ENABLED = os.environ.get('FEED_SCORE_REFRESH_ENABLED', 'true').lower() == 'true'
+	SCORING_HOT_REFRESH_INTERVAL = int(os.environ.get('SCORING_HOT_REFRESH_INTERVAL', '300'))  # Seconds between hot_score decay refreshes
+	SCORING_HOT_REFRESH_WINDOW = int(os.environ.get('SCORING_HOT_REFRESH_WINDOW', '168'))  # Hours; older posts keep their last hot_score
+	VOTE_RECONCILE_ENABLED = os.environ.get('VOTE_RECONCILE_ENABLED', 'true').lower() == 'true'
+	VOTE_RECONCILE_INTERVAL = int(os.environ.get('VOTE_RECONCILE_INTERVAL', '3600'))  # Seconds between post/comment vote counter drift repairs
 
 class DevelopmentConfig(Config):
 	DEV = True
@@ -1,5 +1,6 @@
 import os
 import logging
+from contextlib import contextmanager
 import psycopg2
 import psycopg2.extras
 from psycopg2.pool import ThreadedConnectionPool
@@ -81,6 +82,32 @@ class Database:
 		finally:
 			self.pool.putconn(conn)
 
+	@contextmanager
+	def transaction(self):
+		"""Yields a cursor on one pooled connection; its statements commit together.
+
+		Use for bulk writes that would otherwise pay a commit per row. Rolls
+		back and raises DatabaseError if any statement fails.
+		"""
+		if self.pool is None:
+			logger.error("Database connection pool not established. Call connect_to_db() first.")
+			raise DatabaseError("Database connection pool not established")
+
+		conn = self.pool.getconn()
+		try:
+			with conn.cursor(cursor_factory=psycopg2.extras.RealDictCursor) as cur:
+				yield cur
+			conn.commit()
+		except psycopg2.Error as e:
+			logger.error(f"Error in transaction: {e}", exc_info=True)
+			conn.rollback()
+			raise DatabaseError(str(e)) from e
+		except BaseException:
+			conn.rollback()
+			raise
+		finally:
+			self.pool.putconn(conn)
+
 	def close_db_connection(self):
 		"""Closes all connections in the pool."""
 		if self.pool:
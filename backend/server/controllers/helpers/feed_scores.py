@@ -0,0 +1,170 @@
+"""
+Persisted feed scores for posts.
+
+post.hot_score and post.controversial_score back the "hot" and
+"controversial" feed sorts, so a feed page is a range scan of the
+(location_id[, category_id], score DESC, id DESC) indexes instead of
+scoring and sorting every post in the location per request.
+
+Both scores are computed with helpers/scoring.py:
+- vote_on_post writes them together with the vote counters
+- a background refresher re-applies hot_score's time decay every
+  SCORING_HOT_REFRESH_INTERVAL seconds to posts created within the last
+  SCORING_HOT_REFRESH_WINDOW hours (older posts have decayed to the bottom
+  of the feed and keep their last score)
+
+Redis layout:
+- feed:hot_refresh  STRING held (SET NX EX) by the one process that runs
+                    the refresh this interval
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from candid.controllers import db, config
+from candid.controllers.helpers.redis_pool import get_redis
+from candid.controllers.helpers.scoring import controversial_score, hot_score
+
+logger = logging.getLogger(__name__)
+
+REFRESH_LOCK_KEY = "feed:hot_refresh"
+
+
+def post_scores(weighted_up: float, weighted_down: float, created_time: datetime,
+                now: Optional[datetime] = None) -> Tuple[float, float]:
+    """Return (hot_score, controversial_score) for a post's weighted votes."""
+    return (
+        hot_score(weighted_up, weighted_down, created_time, now=now),
+        controversial_score(weighted_up, weighted_down),
+    )
+
+
+def _claim_refresh() -> bool:
+    """True if this process should run the refresh this interval."""
+    try:
+        return bool(get_redis().set(
+            REFRESH_LOCK_KEY, "1", nx=True, ex=config.SCORING_HOT_REFRESH_INTERVAL
+        ))
+    except Exception as e:
+        # Skip rather than have every process refresh every poll_interval
+        logger.warning(f"Feed score refresh lock unavailable, skipping: {e}")
+        return False
+
+
+def refresh_hot_scores(now: Optional[datetime] = None) -> int:
+    """
+    Recompute both scores for posts inside the refresh window.
+
+    Rows whose weighted votes changed after they were read are skipped:
+    the vote that changed them already wrote fresh scores.
+
+    Returns:
+        Number of posts updated
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now - timedelta(hours=config.SCORING_HOT_REFRESH_WINDOW)
+
+    rows = db.execute_query("""
+        SELECT id, weighted_upvotes, weighted_downvotes, created_time
+        FROM post
+        WHERE status IN ('active', 'locked')
+          AND created_time > %s
+    """, (cutoff,))
+    if not rows:
+        return 0
+
+    ids, ups, downs, hots, controversials = [], [], [], [], []
+    for row in rows:
+        up = float(row["weighted_upvotes"])
+        down = float(row["weighted_downvotes"])
+        hot, controversial = post_scores(up, down, row["created_time"], now=now)
+        ids.append(str(row["id"]))
+        ups.append(up)
+        downs.append(down)
+        hots.append(hot)
+        controversials.append(controversial)
+
+    updated = db.execute_query("""
+        UPDATE post p
+        SET hot_score = v.hot, controversial_score = v.controversial
+        FROM unnest(%s::uuid[], %s::float8[], %s::float8[], %s::float8[], %s::float8[])
+             AS v(id, up, down, hot, controversial)
+        WHERE p.id = v.id
+          AND p.weighted_upvotes = v.up
+          AND p.weighted_downvotes = v.down
+        RETURNING 1
+    """, (ids, ups, downs, hots, controversials))
+    return len(updated or [])
+
+
+class FeedScoreRefresher:
+    """Background worker that re-applies hot_score decay."""
+
+    def __init__(self, poll_interval: float = 5.0):
+        """
+        Initialize the refresher.
+
+        Args:
+            poll_interval: Seconds between attempts to claim the refresh
+                (it still runs at most once per SCORING_HOT_REFRESH_INTERVAL
+                across all processes)
+        """
+        self.poll_interval = poll_interval
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background refresher thread."""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        print("Feed score refresher started", flush=True)
+
+    def stop(self):
+        """Stop the background refresher."""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        print("Feed score refresher stopped", flush=True)
+
+    def _run_loop(self):
+        """Main refresher loop."""
+        while self._running:
+            try:
+                if _claim_refresh():
+                    started = time.time()
+                    updated = refresh_hot_scores()
+                    logger.info(
+                        f"Refreshed feed scores for {updated} posts in {time.time() - started:.2f}s"
+                    )
+            except Exception as e:
+                logger.error("Feed score refresher error: %s", e, exc_info=True)
+            time.sleep(self.poll_interval)
+
+
+# ========== Singleton Worker ==========
+
+_worker: Optional[FeedScoreRefresher] = None
+
+
+def start_worker():
+    """Start the singleton feed score refresher."""
+    global _worker
+    if _worker is None:
+        _worker = FeedScoreRefresher()
+    _worker.start()
+
+
+def stop_worker():
+    """Stop the singleton feed score refresher."""
+    global _worker
+    if _worker:
+        _worker.stop()
+        _worker = None
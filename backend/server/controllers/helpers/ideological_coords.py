@@ -11,20 +11,20 @@ votes. While the MF stub returns None, blending degrades gracefully to pure
 Polis coords.
 """
 
-import json
 import logging
 import math
+import threading
 
 from candid.controllers import db
-from candid.controllers.helpers.polis_client import get_client
-from candid.controllers.helpers.redis_pool import get_redis
+from candid.controllers.helpers.polis_math import get_math_data
 from candid.controllers.helpers.scoring import compute_max_distance
 from candid.controllers.helpers import matrix_factorization as mf
 
 logger = logging.getLogger(__name__)
 
-# Redis cache TTL for PCA components (seconds)
-PCA_CACHE_TTL = 300  # 5 minutes
+# PCA components derived per conversation, reused until the math_tick moves
+_pca_by_conversation = {}
+_pca_lock = threading.Lock()
 
 
 # ---------------------------------------------------------------------------
@@ -69,14 +69,15 @@ def project_user(user_votes, comps, center):
 
 
 # ---------------------------------------------------------------------------
-# PCA cache (Redis layer 1)
+# PCA components (from the shared Polis math cache)
 # ---------------------------------------------------------------------------
 
 def get_pca_cache(conversation_id):
-    """Get cached PCA components for a conversation.
+    """Get PCA components for a conversation.
 
     Returns dict with keys: comps, center, max_distance, math_tick.
-    Refreshes from Polis API if cache is missing or stale.
+    Derived from the shared Polis math cache (helpers/polis_math.py), so it
+    follows the math_tick the background poller last saw.
 
     Args:
         conversation_id: Polis conversation ID string.
@@ -84,33 +85,7 @@ def get_pca_cache(conversation_id):
     Returns:
         Dict with PCA data, or None if Polis has no math data yet.
     """
-    r = get_redis()
-    cache_key = f"pca:{conversation_id}"
-
-    # Check Redis cache
-    cached = r.get(cache_key)
-    if cached:
-        try:
-            return json.loads(cached)
-        except (json.JSONDecodeError, TypeError):
-            pass
-
-    # Cache miss — fetch from Polis
-    return _refresh_pca_cache(conversation_id)
-
-
-def _refresh_pca_cache(conversation_id):
-    """Fetch PCA data from Polis and cache in Redis.
-
-    Returns:
-        Dict with PCA data, or None if unavailable.
-    """
-    try:
-        client = get_client()
-        math_data = client.get_math_data(conversation_id)
-    except Exception as e:
-        logger.warning(f"Failed to fetch Polis math data for {conversation_id}: {e}")
-        return None
+    math_data = get_math_data(conversation_id)
 
     pca = math_data.get("pca", {})
     pca_pojo = pca.get("asPOJO", {}) if pca else {}
@@ -121,24 +96,22 @@ def _refresh_pca_cache(conversation_id):
     if not comps or not center:
         return None
 
-    base_clusters = pca_pojo.get("base-clusters", {})
-    max_dist = compute_max_distance(base_clusters)
-
     math_tick = math_data.get("math_tick")
+    with _pca_lock:
+        cached = _pca_by_conversation.get(conversation_id)
+    if cached and cached["math_tick"] == math_tick:
+        return cached
 
-    cache_data = {
+    base_clusters = pca_pojo.get("base-clusters", {})
+    pca_data = {
         "comps": comps,
         "center": center,
-        "max_distance": max_dist,
+        "max_distance": compute_max_distance(base_clusters),
         "math_tick": math_tick,
     }
-
-    # Store in Redis with TTL
-    r = get_redis()
-    cache_key = f"pca:{conversation_id}"
-    r.setex(cache_key, PCA_CACHE_TTL, json.dumps(cache_data))
-
-    return cache_data
+    with _pca_lock:
+        _pca_by_conversation[conversation_id] = pca_data
+    return pca_data
 
 
 # ---------------------------------------------------------------------------
@@ -58,7 +58,7 @@ def _ensure_root_admin_role(user_id):
 
     Called when a Keycloak user with 'admin' realm role logs in.
     """
-    from candid.controllers.helpers.auth import get_root_location_id
+    from candid.controllers.helpers.auth import get_root_location_id, invalidate_role_cache
     root_id = get_root_location_id()
     if not root_id:
         logger.warning("No root location found — cannot auto-create admin role")
@@ -75,6 +75,7 @@ def _ensure_root_admin_role(user_id):
             INSERT INTO user_role (user_id, role, location_id)
             VALUES (%s, 'admin', %s)
         """, (str(user_id), root_id))
+        invalidate_role_cache()
         logger.info(f"Auto-created admin role at root location for user {user_id}")
 
 
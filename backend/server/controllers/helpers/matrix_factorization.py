@@ -10,17 +10,29 @@ Community Notes-style factorization on the unified vote matrix:
 
 Items are posts and comments pooled into one matrix. Item IDs are prefixed
 with 'p:' or 'c:' to keep namespaces separate.
+
+Two solvers fit the same objective, selected by MF_SOLVER: 'als' (batched
+closed-form alternating least squares, the default) and 'sgd' (the original
+per-vote SGD, kept as a reference). Each run warm-starts from the model the
+previous run stored in mf_model_state; incremental runs refit only the
+users/items touched since then (see run_factorization).
 """
 
+import io
 import logging
 import time
+from datetime import timedelta
 
 import numpy as np
+from psycopg2.extras import execute_values
 
 from candid.controllers import db, config
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT statement when bulk-loading results into temp tables
+STORE_PAGE_SIZE = 1000
+
 
 # ---------------------------------------------------------------------------
 # Internal: data loading
@@ -146,11 +158,12 @@ def _load_polis_coords(user_id_to_idx, conversation_id):
 
 
 # ---------------------------------------------------------------------------
-# Internal: SGD fitting
+# Internal: fitting
 # ---------------------------------------------------------------------------
 
-def _fit_mf_model(votes, n_users, n_items, polis_coords, cfg=None):
-    """Fit the MF model via SGD.
+def _fit_mf_model(votes, n_users, n_items, polis_coords, cfg=None,
+                  init=None, active_users=None, active_items=None):
+    """Fit the MF model with the configured solver.
 
     Model: r_ui = mu + i_u + i_i + f_u . f_i
 
@@ -159,9 +172,15 @@ def _fit_mf_model(votes, n_users, n_items, polis_coords, cfg=None):
         n_users: Number of unique users.
         n_items: Number of unique items (posts + comments).
         polis_coords: Dict mapping user_idx -> np.array([x, y]).
-        cfg: Config dict overrides (for testing). Keys: latent_dim,
-             learning_rate, lambda_reg, lambda_polis, max_epochs,
-             convergence_tol.
+        cfg: Config dict overrides (for testing). Keys: solver ('als' or
+             'sgd'), latent_dim, learning_rate, lambda_reg, lambda_polis,
+             max_epochs, convergence_tol.
+        init: Optional warm-start state from a previous run (see
+              _warm_start_init). Rows it covers start from their previous
+              values instead of the seeded random init.
+        active_users: Optional bool mask of users to update. When given
+              (incremental mode), other users, and mu, stay fixed.
+        active_items: Optional bool mask of items to update.
 
     Returns:
         Dict with: mu, user_intercepts, item_intercepts,
@@ -170,6 +189,69 @@ def _fit_mf_model(votes, n_users, n_items, polis_coords, cfg=None):
     if cfg is None:
         cfg = {}
 
+    solver = cfg.get("solver", config.MF_SOLVER)
+    if solver == "als":
+        fit = _fit_mf_als
+    elif solver == "sgd":
+        fit = _fit_mf_sgd
+    else:
+        raise ValueError(f"Unknown MF solver: {solver}")
+
+    incremental = active_users is not None or active_items is not None
+    if active_users is None:
+        active_users = np.full(n_users, not incremental)
+    if active_items is None:
+        active_items = np.full(n_items, not incremental)
+
+    return fit(votes, n_users, n_items, polis_coords, cfg,
+               init, active_users, active_items, incremental)
+
+
+def _compute_loss(users, items, ratings, mu, i_u, i_c, f_u, f_c, lam):
+    """Mean squared error over all votes plus the L2 penalty."""
+    pred = mu + i_u[users] + i_c[items] + np.einsum("ij,ij->i", f_u[users], f_c[items])
+    loss = float(np.mean((ratings - pred) ** 2))
+    loss += lam * (np.sum(i_u ** 2) + np.sum(i_c ** 2) +
+                   np.sum(f_u ** 2) + np.sum(f_c ** 2)) / len(ratings)
+    return loss
+
+
+def _init_params(n_users, n_items, dim, polis_coords, ratings, init=None):
+    """Initial parameters, seeded for reproducible runs.
+
+    Cold start: mu is the mean rating, intercepts are zero, user factors
+    start at their Polis coords where available (else small random values)
+    and item factors are small random values. A warm-start `init`
+    overrides the rows it covers, and mu.
+
+    Returns:
+        (rng, mu, i_u, i_c, f_u, f_c)
+    """
+    rng = np.random.RandomState(42)
+    f_u = rng.randn(n_users, dim) * 0.01
+    for u_idx, polis_xy in polis_coords.items():
+        f_u[u_idx] = polis_xy
+
+    f_c = rng.randn(n_items, dim) * 0.01
+    mu = float(np.mean(ratings))
+    i_u = np.zeros(n_users)
+    i_c = np.zeros(n_items)
+
+    if init is not None:
+        known_u = init["known_users"]
+        known_c = init["known_items"]
+        i_u[known_u] = init["user_intercepts"][known_u]
+        f_u[known_u] = init["user_factors"][known_u]
+        i_c[known_c] = init["item_intercepts"][known_c]
+        f_c[known_c] = init["item_factors"][known_c]
+        mu = init["mu"]
+
+    return rng, mu, i_u, i_c, f_u, f_c
+
+
+def _fit_mf_sgd(votes, n_users, n_items, polis_coords, cfg,
+                init, active_users, active_items, incremental):
+    """Fit the MF model via per-vote SGD."""
     dim = cfg.get("latent_dim", config.MF_LATENT_DIM)
     lr = cfg.get("learning_rate", config.MF_LEARNING_RATE)
     lam = cfg.get("lambda_reg", config.MF_LAMBDA_REG)
@@ -179,24 +261,17 @@ def _fit_mf_model(votes, n_users, n_items, polis_coords, cfg=None):
 
     # Convert to numpy arrays for vectorized access
     vote_arr = np.array(votes, dtype=np.float64)  # (N, 3)
-    n_votes = len(votes)
+    users = vote_arr[:, 0].astype(np.intp)
+    items = vote_arr[:, 1].astype(np.intp)
 
     # Initialize
     ratings = vote_arr[:, 2]
-    mu = float(np.mean(ratings))
-    i_u = np.zeros(n_users)
-    i_c = np.zeros(n_items)
-
-    # User factors: init from Polis coords where available, else small random
-    rng = np.random.RandomState(42)
-    f_u = rng.randn(n_users, dim) * 0.01
-    for u_idx, polis_xy in polis_coords.items():
-        f_u[u_idx] = polis_xy
-
-    f_c = rng.randn(n_items, dim) * 0.01
+    rng, mu, i_u, i_c, f_u, f_c = _init_params(
+        n_users, n_items, dim, polis_coords, ratings, init)
 
     prev_loss = float("inf")
-    indices = np.arange(n_votes)
+    # Only votes touching an active user or item carry any update
+    indices = np.flatnonzero(active_users[users] | active_items[items])
 
     for epoch in range(max_epochs):
         rng.shuffle(indices)
@@ -210,37 +285,150 @@ def _fit_mf_model(votes, n_users, n_items, polis_coords, cfg=None):
             err = r - pred
 
             # Update global mean
-            mu += lr * err
+            if not incremental:
+                mu += lr * err
 
-            # Update intercepts with L2
-            i_u[u] += lr * (err - lam * i_u[u])
-            i_c[c] += lr * (err - lam * i_c[c])
-
-            # Update factors with L2
+            # Update intercepts and factors with L2
             f_u_old = f_u[u].copy()
-            f_u[u] += lr * (err * f_c[c] - lam * f_u[u])
-            f_c[c] += lr * (err * f_u_old - lam * f_c[c])
+            if active_users[u]:
+                i_u[u] += lr * (err - lam * i_u[u])
+                f_u[u] += lr * (err * f_c[c] - lam * f_u[u])
 
-            # Polis regularization: pull user factors toward PCA coords
-            if u in polis_coords:
-                f_u[u] -= lr * lam_polis * (f_u[u] - polis_coords[u])
+                # Polis regularization: pull user factors toward PCA coords
+                if u in polis_coords:
+                    f_u[u] -= lr * lam_polis * (f_u[u] - polis_coords[u])
+            if active_items[c]:
+                i_c[c] += lr * (err - lam * i_c[c])
+                f_c[c] += lr * (err * f_u_old - lam * f_c[c])
 
-        # Compute loss
-        loss = 0.0
-        for idx in range(n_votes):
-            u = int(vote_arr[idx, 0])
-            c = int(vote_arr[idx, 1])
-            r = vote_arr[idx, 2]
-            pred = mu + i_u[u] + i_c[c] + f_u[u] @ f_c[c]
-            loss += (r - pred) ** 2
+        loss = _compute_loss(users, items, ratings, mu, i_u, i_c, f_u, f_c, lam)
 
-        loss /= n_votes
+        # Convergence check
+        if abs(prev_loss - loss) < tol * max(abs(prev_loss), 1e-10):
+            return {
+                "mu": mu,
+                "user_intercepts": i_u,
+                "item_intercepts": i_c,
+                "user_factors": f_u,
+                "item_factors": f_c,
+                "final_loss": loss,
+                "epochs": epoch + 1,
+            }
 
-        # Add regularization terms to loss
-        loss += lam * (np.sum(i_u ** 2) + np.sum(i_c ** 2) +
-                       np.sum(f_u ** 2) + np.sum(f_c ** 2)) / n_votes
+        prev_loss = loss
+
+    return {
+        "mu": mu,
+        "user_intercepts": i_u,
+        "item_intercepts": i_c,
+        "user_factors": f_u,
+        "item_factors": f_c,
+        "final_loss": prev_loss,
+        "epochs": max_epochs,
+    }
+
+
+def _solve_side(rows, cols, target, col_factors, n_rows, reg, anchor=None, anchor_reg=None):
+    """Solve the ridge regression for every row of one side in a single batch.
+
+    For row k, finds [intercept_k, f_k] minimizing
+        sum_j (target_kj - intercept_k - f_k . g_j)^2
+        + reg_k * (intercept_k^2 + |f_k|^2)
+        + anchor_reg_k * |f_k - anchor_k|^2
+    where g_j are the fixed factors of the other side. The normal equations
+    are small (dim + 1 square), so they are accumulated per row with
+    bincount and solved together with a batched np.linalg.solve.
+
+    Returns:
+        (intercepts, factors) arrays of shape (n_rows,) and (n_rows, dim).
+    """
+    x = np.hstack([np.ones((len(cols), 1)), col_factors[cols]])  # (N, dim+1)
+    k = x.shape[1]
+
+    gram = np.empty((n_rows, k, k))
+    rhs = np.empty((n_rows, k))
+    for a in range(k):
+        rhs[:, a] = np.bincount(rows, weights=x[:, a] * target, minlength=n_rows)
+        for b in range(a, k):
+            gram[:, a, b] = np.bincount(rows, weights=x[:, a] * x[:, b], minlength=n_rows)
+            gram[:, b, a] = gram[:, a, b]
+
+    # Tiny jitter keeps rows with no votes (or reg=0) solvable
+    diag = reg + 1e-9
+    gram[:, np.arange(k), np.arange(k)] += diag[:, None]
+    if anchor is not None:
+        gram[:, np.arange(1, k), np.arange(1, k)] += anchor_reg[:, None]
+        rhs[:, 1:] += anchor_reg[:, None] * anchor
+
+    solution = np.linalg.solve(gram, rhs[:, :, None])[:, :, 0]
+    return solution[:, 0], solution[:, 1:]
+
+
+def _fit_mf_als(votes, n_users, n_items, polis_coords, cfg,
+                init, active_users, active_items, incremental):
+    """Fit the MF model via alternating least squares.
+
+    Minimizes the same per-vote objective as the SGD solver: squared error
+    plus L2 on intercepts and factors, and the Polis anchor pulling f_u
+    toward PCA coords, with both penalties counted once per vote (as SGD
+    applies them on every update). Each sweep solves the active users, then
+    the active items, in closed form, so it converges in a handful of sweeps
+    instead of hundreds of epochs.
+    """
+    dim = cfg.get("latent_dim", config.MF_LATENT_DIM)
+    lam = cfg.get("lambda_reg", config.MF_LAMBDA_REG)
+    lam_polis = cfg.get("lambda_polis", config.MF_LAMBDA_POLIS)
+    max_epochs = cfg.get("max_epochs", config.MF_MAX_EPOCHS)
+    tol = cfg.get("convergence_tol", config.MF_CONVERGENCE_TOL)
+
+    vote_arr = np.array(votes, dtype=np.float64)  # (N, 3)
+    users = vote_arr[:, 0].astype(np.intp)
+    items = vote_arr[:, 1].astype(np.intp)
+    ratings = vote_arr[:, 2]
+
+    _, mu, i_u, i_c, f_u, f_c = _init_params(
+        n_users, n_items, dim, polis_coords, ratings, init)
+
+    # Each side's solve only needs the votes of its active rows
+    user_votes = active_users[users]
+    item_votes = active_items[items]
+
+    user_counts = np.bincount(users, minlength=n_users).astype(np.float64)
+    item_counts = np.bincount(items, minlength=n_items).astype(np.float64)
+
+    # Polis anchor: per-vote weight for users with PCA coords, zero otherwise
+    anchor = np.zeros((n_users, dim))
+    anchor_reg = np.zeros(n_users)
+    for u_idx, polis_xy in polis_coords.items():
+        anchor[u_idx] = polis_xy
+        anchor_reg[u_idx] = lam_polis * user_counts[u_idx]
+
+    prev_loss = float("inf")
+
+    for epoch in range(max_epochs):
+        if user_votes.any():
+            u, c = users[user_votes], items[user_votes]
+            new_i_u, new_f_u = _solve_side(
+                u, c, ratings[user_votes] - mu - i_c[c], f_c, n_users,
+                lam * user_counts, anchor, anchor_reg,
+            )
+            i_u[active_users] = new_i_u[active_users]
+            f_u[active_users] = new_f_u[active_users]
+        if item_votes.any():
+            u, c = users[item_votes], items[item_votes]
+            new_i_c, new_f_c = _solve_side(
+                c, u, ratings[item_votes] - mu - i_u[u], f_u, n_items,
+                lam * item_counts,
+            )
+            i_c[active_items] = new_i_c[active_items]
+            f_c[active_items] = new_f_c[active_items]
+        if not incremental:
+            mu = float(np.mean(
+                ratings - i_u[users] - i_c[items] - np.einsum("ij,ij->i", f_u[users], f_c[items])
+            ))
+
+        loss = _compute_loss(users, items, ratings, mu, i_u, i_c, f_u, f_c, lam)
 
-        # Convergence check
         if abs(prev_loss - loss) < tol * max(abs(prev_loss), 1e-10):
             return {
                 "mu": mu,
@@ -265,157 +453,394 @@ def _fit_mf_model(votes, n_users, n_items, polis_coords, cfg=None):
     }
 
 
+# ---------------------------------------------------------------------------
+# Internal: warm-start state
+# ---------------------------------------------------------------------------
+
+def _serialize_model_state(model, vote_data):
+    """Pack the full fitted model, keyed by user/item ID, as npz bytes."""
+    n_users, n_items = vote_data["n_users"], vote_data["n_items"]
+    buf = io.BytesIO()
+    np.savez_compressed(
+        buf,
+        mu=np.array(model["mu"]),
+        user_ids=np.array([vote_data["idx_to_user_id"][i] for i in range(n_users)]),
+        item_ids=np.array([vote_data["idx_to_item_id"][i] for i in range(n_items)]),
+        user_intercepts=model["user_intercepts"],
+        item_intercepts=model["item_intercepts"],
+        user_factors=model["user_factors"],
+        item_factors=model["item_factors"],
+    )
+    return buf.getvalue()
+
+
+def _load_model_state(conversation_id):
+    """Load the model stored by the previous run for a conversation.
+
+    Returns:
+        Dict with trained_time and the model arrays keyed by user_ids /
+        item_ids, or None if there is no usable state.
+    """
+    row = db.execute_query("""
+        SELECT state, trained_time
+        FROM mf_model_state
+        WHERE polis_conversation_id = %s
+    """, (conversation_id,), fetchone=True)
+
+    if not row or row.get("state") is None:
+        return None
+
+    try:
+        with np.load(io.BytesIO(bytes(row["state"]))) as npz:
+            state = {key: npz[key] for key in npz.files}
+    except (ValueError, OSError) as e:
+        logger.warning("Discarding unreadable MF state for %s: %s", conversation_id, e)
+        return None
+
+    state["mu"] = float(state["mu"])
+    state["trained_time"] = row["trained_time"]
+    return state
+
+
+def _warm_start_init(state, vote_data, dim):
+    """Align a stored model with the current vote matrix indices.
+
+    Users and items absent from the stored model (new since the last run)
+    are flagged unknown and get the cold-start init.
+    """
+    def _align(ids, id_to_idx, n, intercepts, factors):
+        known = np.zeros(n, dtype=bool)
+        out_intercepts = np.zeros(n)
+        out_factors = np.zeros((n, dim))
+        if factors.ndim == 2 and factors.shape[1] == dim:
+            for old_idx, entity_id in enumerate(ids):
+                new_idx = id_to_idx.get(str(entity_id))
+                if new_idx is not None:
+                    known[new_idx] = True
+                    out_intercepts[new_idx] = intercepts[old_idx]
+                    out_factors[new_idx] = factors[old_idx]
+        return known, out_intercepts, out_factors
+
+    known_u, i_u, f_u = _align(
+        state["user_ids"], vote_data["user_id_to_idx"], vote_data["n_users"],
+        state["user_intercepts"], state["user_factors"])
+    known_c, i_c, f_c = _align(
+        state["item_ids"], vote_data["item_id_to_idx"], vote_data["n_items"],
+        state["item_intercepts"], state["item_factors"])
+
+    return {
+        "mu": state["mu"],
+        "known_users": known_u,
+        "known_items": known_c,
+        "user_intercepts": i_u,
+        "user_factors": f_u,
+        "item_intercepts": i_c,
+        "item_factors": f_c,
+    }
+
+
+def _db_now():
+    """Current database time, the clock vote created_time is stamped with."""
+    return db.execute_query("SELECT CURRENT_TIMESTAMP AS now", fetchone=True)["now"]
+
+
+def _load_touched(conversation_id, since):
+    """User and item IDs with post/comment votes cast after `since`.
+
+    Reads back MF_INCREMENTAL_OVERLAP seconds before `since`: a vote is
+    stamped when its transaction starts, so one still uncommitted when the
+    previous run read its data carries a time before that run's watermark.
+    """
+    since = since - timedelta(seconds=config.MF_INCREMENTAL_OVERLAP)
+    rows = db.execute_query("""
+        SELECT cv.user_id::text AS user_id,
+               ('c:' || cv.comment_id::text) AS item_id
+        FROM comment_vote cv
+        JOIN comment c ON cv.comment_id = c.id
+        JOIN post p ON c.post_id = p.id
+        JOIN polis_conversation pc ON p.location_id = pc.location_id
+             AND COALESCE(p.category_id::text, '') = COALESCE(pc.category_id::text, '')
+        WHERE pc.polis_conversation_id = %s
+          AND pc.status = 'active'
+          AND cv.created_time > %s
+
+        UNION ALL
+
+        SELECT pv.user_id::text AS user_id,
+               ('p:' || pv.post_id::text) AS item_id
+        FROM post_vote pv
+        JOIN post p ON pv.post_id = p.id
+        JOIN polis_conversation pc ON p.location_id = pc.location_id
+             AND COALESCE(p.category_id::text, '') = COALESCE(pc.category_id::text, '')
+        WHERE pc.polis_conversation_id = %s
+          AND pc.status = 'active'
+          AND pv.created_time > %s
+    """, (conversation_id, since, conversation_id, since))
+
+    rows = rows or []
+    return {r["user_id"] for r in rows}, {r["item_id"] for r in rows}
+
+
 # ---------------------------------------------------------------------------
 # Internal: store results
 # ---------------------------------------------------------------------------
 
 def _store_mf_results(conversation_id, model, idx_maps):
-    """Write MF results to database.
+    """Write MF results to database in a single transaction.
+
+    Bulk-loads user factors and item intercepts into temp tables with
+    execute_values, then applies them with one UPDATE ... FROM per target
+    table: user_ideological_coords.mf_x/mf_y/mf_computed_at,
+    comment.mf_intercept and post.mf_intercept. Only the users/items in
+    idx_maps are written (the touched ones, for incremental runs). Also
+    refreshes user_ideological_coords.n_comment_votes, saves the warm-start
+    state (idx_maps["model_state"], stamped with idx_maps["trained_time"])
+    and logs to mf_training_log with per-phase timings.
 
-    Updates user_ideological_coords.mf_x/mf_y/mf_computed_at,
-    comment.mf_intercept and post.mf_intercept, and
-    user_ideological_coords.n_comment_votes.
-    Logs to mf_training_log.
+    Returns:
+        Seconds spent writing results (the store phase).
     """
+    start = time.monotonic()
+
     idx_to_user_id = idx_maps["idx_to_user_id"]
     idx_to_item_id = idx_maps["idx_to_item_id"]
     user_factors = model["user_factors"]
     item_intercepts = model["item_intercepts"]
 
-    # Update user MF coordinates
-    for u_idx, user_id in idx_to_user_id.items():
-        db.execute_query("""
-            UPDATE user_ideological_coords
-            SET mf_x = %s, mf_y = %s, mf_computed_at = CURRENT_TIMESTAMP
-            WHERE user_id = %s AND polis_conversation_id = %s
-        """, (float(user_factors[u_idx, 0]), float(user_factors[u_idx, 1]),
-              user_id, conversation_id))
-
-    # Update item MF intercepts (comments and posts)
-    for i_idx, item_id in idx_to_item_id.items():
-        intercept = float(item_intercepts[i_idx])
-        if item_id.startswith("c:"):
-            db.execute_query("""
-                UPDATE comment SET mf_intercept = %s WHERE id = %s
-            """, (intercept, item_id[2:]))
-        elif item_id.startswith("p:"):
-            db.execute_query("""
-                UPDATE post SET mf_intercept = %s WHERE id = %s
-            """, (intercept, item_id[2:]))
-
-    # Bulk update n_comment_votes from actual vote counts (comment + post votes)
-    db.execute_query("""
-        UPDATE user_ideological_coords uic
-        SET n_comment_votes = sub.vote_count
-        FROM (
-            SELECT user_id, SUM(cnt) AS vote_count FROM (
-                SELECT cv.user_id, COUNT(*) AS cnt
-                FROM comment_vote cv
-                JOIN comment c ON cv.comment_id = c.id
-                JOIN post p ON c.post_id = p.id
-                JOIN polis_conversation pc ON p.location_id = pc.location_id
-                     AND COALESCE(p.category_id::text, '') = COALESCE(pc.category_id::text, '')
-                WHERE pc.polis_conversation_id = %s
-                  AND pc.status = 'active'
-                GROUP BY cv.user_id
-
-                UNION ALL
-
-                SELECT pv.user_id, COUNT(*) AS cnt
-                FROM post_vote pv
-                JOIN post p ON pv.post_id = p.id
-                JOIN polis_conversation pc ON p.location_id = pc.location_id
-                     AND COALESCE(p.category_id::text, '') = COALESCE(pc.category_id::text, '')
-                WHERE pc.polis_conversation_id = %s
-                  AND pc.status = 'active'
-                GROUP BY pv.user_id
-            ) combined
-            GROUP BY user_id
-        ) sub
-        WHERE uic.user_id = sub.user_id
-          AND uic.polis_conversation_id = %s
-    """, (conversation_id, conversation_id, conversation_id))
-
-    # Log training
-    conv_row = db.execute_query("""
-        SELECT location_id, category_id
-        FROM polis_conversation
-        WHERE polis_conversation_id = %s
-    """, (conversation_id,), fetchone=True)
-
-    location_id = conv_row["location_id"] if conv_row else None
-    category_id = conv_row.get("category_id") if conv_row else None
+    user_rows = [
+        (user_id, float(user_factors[u_idx, 0]), float(user_factors[u_idx, 1]))
+        for u_idx, user_id in idx_to_user_id.items()
+    ]
+    item_rows = [
+        (item_id[0], item_id[2:], float(item_intercepts[i_idx]))
+        for i_idx, item_id in idx_to_item_id.items()
+        if item_id[:2] in ("c:", "p:")
+    ]
 
-    db.execute_query("""
-        INSERT INTO mf_training_log
-            (polis_conversation_id, location_id, category_id,
-             n_users, n_comments, n_votes, final_loss, epochs_run,
-             duration_seconds)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
-    """, (conversation_id, location_id, category_id,
-          len(idx_to_user_id), len(idx_to_item_id),
-          idx_maps["n_votes"],
-          model["final_loss"], model["epochs"],
-          idx_maps.get("duration_seconds")))
+    with db.transaction() as cur:
+        # Update user MF coordinates
+        cur.execute("""
+            CREATE TEMP TABLE mf_user_factors (
+                user_id UUID, mf_x DOUBLE PRECISION, mf_y DOUBLE PRECISION
+            ) ON COMMIT DROP
+        """)
+        execute_values(cur, """
+            INSERT INTO mf_user_factors (user_id, mf_x, mf_y) VALUES %s
+        """, user_rows, page_size=STORE_PAGE_SIZE)
+        cur.execute("""
+            UPDATE user_ideological_coords uic
+            SET mf_x = f.mf_x, mf_y = f.mf_y, mf_computed_at = CURRENT_TIMESTAMP
+            FROM mf_user_factors f
+            WHERE uic.user_id = f.user_id AND uic.polis_conversation_id = %s
+        """, (conversation_id,))
+
+        # Update item MF intercepts (comments and posts)
+        cur.execute("""
+            CREATE TEMP TABLE mf_item_intercepts (
+                kind CHAR(1), item_id UUID, intercept DOUBLE PRECISION
+            ) ON COMMIT DROP
+        """)
+        execute_values(cur, """
+            INSERT INTO mf_item_intercepts (kind, item_id, intercept) VALUES %s
+        """, item_rows, page_size=STORE_PAGE_SIZE)
+        cur.execute("""
+            UPDATE comment c SET mf_intercept = i.intercept
+            FROM mf_item_intercepts i
+            WHERE i.kind = 'c' AND c.id = i.item_id
+        """)
+        cur.execute("""
+            UPDATE post p SET mf_intercept = i.intercept
+            FROM mf_item_intercepts i
+            WHERE i.kind = 'p' AND p.id = i.item_id
+        """)
+
+        # Bulk update n_comment_votes from actual vote counts (comment + post votes)
+        cur.execute("""
+            UPDATE user_ideological_coords uic
+            SET n_comment_votes = sub.vote_count
+            FROM (
+                SELECT user_id, SUM(cnt) AS vote_count FROM (
+                    SELECT cv.user_id, COUNT(*) AS cnt
+                    FROM comment_vote cv
+                    JOIN comment c ON cv.comment_id = c.id
+                    JOIN post p ON c.post_id = p.id
+                    JOIN polis_conversation pc ON p.location_id = pc.location_id
+                         AND COALESCE(p.category_id::text, '') = COALESCE(pc.category_id::text, '')
+                    WHERE pc.polis_conversation_id = %s
+                      AND pc.status = 'active'
+                    GROUP BY cv.user_id
+
+                    UNION ALL
+
+                    SELECT pv.user_id, COUNT(*) AS cnt
+                    FROM post_vote pv
+                    JOIN post p ON pv.post_id = p.id
+                    JOIN polis_conversation pc ON p.location_id = pc.location_id
+                         AND COALESCE(p.category_id::text, '') = COALESCE(pc.category_id::text, '')
+                    WHERE pc.polis_conversation_id = %s
+                      AND pc.status = 'active'
+                    GROUP BY pv.user_id
+                ) combined
+                GROUP BY user_id
+            ) sub
+            WHERE uic.user_id = sub.user_id
+              AND uic.polis_conversation_id = %s
+        """, (conversation_id, conversation_id, conversation_id))
+
+        # Log training
+        cur.execute("""
+            SELECT location_id, category_id
+            FROM polis_conversation
+            WHERE polis_conversation_id = %s
+        """, (conversation_id,))
+        conv_row = cur.fetchone()
+
+        location_id = conv_row["location_id"] if conv_row else None
+        category_id = conv_row.get("category_id") if conv_row else None
+
+        # Keep the full model for the next run's warm start
+        if idx_maps.get("model_state") is not None:
+            cur.execute("""
+                INSERT INTO mf_model_state (polis_conversation_id, state, trained_time)
+                VALUES (%s, %s, %s)
+                ON CONFLICT (polis_conversation_id) DO UPDATE SET
+                    state = EXCLUDED.state,
+                    trained_time = EXCLUDED.trained_time
+            """, (conversation_id, idx_maps["model_state"], idx_maps["trained_time"]))
+
+        load_seconds = idx_maps.get("load_seconds")
+        fit_seconds = idx_maps.get("fit_seconds")
+        store_seconds = time.monotonic() - start
+        duration = sum(t for t in (load_seconds, fit_seconds, store_seconds) if t is not None)
+
+        cur.execute("""
+            INSERT INTO mf_training_log
+                (polis_conversation_id, location_id, category_id,
+                 n_users, n_comments, n_votes, final_loss, epochs_run,
+                 duration_seconds, load_seconds, fit_seconds, store_seconds, mode)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """, (conversation_id, location_id, category_id,
+              len(idx_to_user_id), len(idx_to_item_id),
+              idx_maps["n_votes"],
+              model["final_loss"], model["epochs"],
+              duration, load_seconds, fit_seconds, store_seconds,
+              idx_maps.get("mode", "full")))
+
+    return store_seconds
 
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
-def run_factorization(conversation_id):
+def run_factorization(conversation_id, incremental=False):
     """Fit MF model on post+comment vote matrix for a conversation.
 
     Orchestrates: load vote matrix -> load Polis coords -> fit -> store.
 
+    Every run warm-starts from the model stored by the previous run. A full
+    run then refits every user and item to convergence. An incremental run
+    refits only users and items with votes since the previous run (plus any
+    new to the matrix) for MF_INCREMENTAL_EPOCHS sweeps, holding the rest
+    fixed, and writes only those rows. Incremental falls back to full when
+    there is no stored model.
+
+    The stored model is stamped with the database time taken before the
+    vote matrix is read, so votes cast while a run is in progress count as
+    touched in the next one.
+
     Args:
         conversation_id: Polis conversation ID string.
+        incremental: Refit only touched users/items.
 
     Returns:
         Dict with training stats, or None if below thresholds.
     """
     start = time.monotonic()
 
+    trained_time = _db_now()
     vote_data = _load_vote_matrix(conversation_id)
     if vote_data is None:
         return None
 
     polis_coords = _load_polis_coords(vote_data["user_id_to_idx"], conversation_id)
 
+    dim = config.MF_LATENT_DIM
+    state = _load_model_state(conversation_id)
+    init = _warm_start_init(state, vote_data, dim) if state is not None else None
+
+    mode = "incremental" if incremental and init is not None else "full"
+    fit_kwargs = {"init": init}
+    idx_to_user_id = vote_data["idx_to_user_id"]
+    idx_to_item_id = vote_data["idx_to_item_id"]
+
+    if mode == "incremental":
+        touched_users, touched_items = _load_touched(conversation_id, state["trained_time"])
+        active_users = ~init["known_users"]
+        active_items = ~init["known_items"]
+        for uid in touched_users:
+            if uid in vote_data["user_id_to_idx"]:
+                active_users[vote_data["user_id_to_idx"][uid]] = True
+        for iid in touched_items:
+            if iid in vote_data["item_id_to_idx"]:
+                active_items[vote_data["item_id_to_idx"][iid]] = True
+
+        fit_kwargs.update(
+            cfg={"max_epochs": config.MF_INCREMENTAL_EPOCHS},
+            active_users=active_users,
+            active_items=active_items,
+        )
+        idx_to_user_id = {i: uid for i, uid in idx_to_user_id.items() if active_users[i]}
+        idx_to_item_id = {i: iid for i, iid in idx_to_item_id.items() if active_items[i]}
+
+    load_seconds = time.monotonic() - start
+
+    fit_start = time.monotonic()
     model = _fit_mf_model(
         vote_data["votes"],
         vote_data["n_users"],
         vote_data["n_items"],
         polis_coords,
+        **fit_kwargs,
     )
-
-    duration = time.monotonic() - start
+    fit_seconds = time.monotonic() - fit_start
 
     idx_maps = {
-        "idx_to_user_id": vote_data["idx_to_user_id"],
-        "idx_to_item_id": vote_data["idx_to_item_id"],
+        "idx_to_user_id": idx_to_user_id,
+        "idx_to_item_id": idx_to_item_id,
         "n_votes": len(vote_data["votes"]),
-        "duration_seconds": duration,
+        "load_seconds": load_seconds,
+        "fit_seconds": fit_seconds,
+        "mode": mode,
+        "model_state": _serialize_model_state(model, vote_data),
+        "trained_time": trained_time,
     }
 
-    _store_mf_results(conversation_id, model, idx_maps)
+    store_seconds = _store_mf_results(conversation_id, model, idx_maps)
 
     stats = {
         "conversation_id": conversation_id,
+        "mode": mode,
         "n_users": vote_data["n_users"],
         "n_items": vote_data["n_items"],
+        "n_updated_users": len(idx_to_user_id),
+        "n_updated_items": len(idx_to_item_id),
         "n_votes": len(vote_data["votes"]),
         "final_loss": model["final_loss"],
         "epochs": model["epochs"],
-        "duration_seconds": duration,
+        "duration_seconds": time.monotonic() - start,
+        "load_seconds": load_seconds,
+        "fit_seconds": fit_seconds,
+        "store_seconds": store_seconds,
     }
 
     logger.info(
-        "MF training completed for conversation %s: %d users, %d items, "
-        "%d votes, loss=%.4f, epochs=%d, %.1fs",
-        conversation_id, stats["n_users"], stats["n_items"],
+        "MF %s training completed for conversation %s: %d/%d users, %d/%d items, "
+        "%d votes, loss=%.4f, epochs=%d, %.1fs (load %.1fs, fit %.1fs, store %.1fs)",
+        mode, conversation_id, stats["n_updated_users"], stats["n_users"],
+        stats["n_updated_items"], stats["n_items"],
         stats["n_votes"], stats["final_loss"], stats["epochs"],
-        stats["duration_seconds"],
+        stats["duration_seconds"], load_seconds, fit_seconds, store_seconds,
     )
 
     return stats
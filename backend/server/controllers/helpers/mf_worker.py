@@ -4,13 +4,32 @@ Matrix Factorization Background Worker
 Periodically trains MF models on comment vote matrices for all active
 Polis conversations. Runs as a daemon thread with advisory-lock
 concurrency control so multiple gunicorn workers don't duplicate training.
+
+Training is CPU-bound numpy code, so running it inside an API process
+competes with request handling for the GIL. It can instead run standalone:
+
+    MF_IN_PROCESS=false  (on the API processes)
+    BACKGROUND_WORKERS_ENABLED=false python -m candid.controllers.helpers.mf_worker
+
+The standalone worker trains each conversation in its own spawned process
+(MF_WORKER_PROCESSES at a time). Pool processes take the same advisory lock,
+so a standalone worker and in-process threads can safely overlap.
+
+Most runs are incremental (only users/items with new votes are refit from
+the stored model); a full warm-started retrain runs at most every
+MF_FULL_RETRAIN_INTERVAL seconds per conversation.
 """
 
+import argparse
 import hashlib
 import logging
+import multiprocessing
+import os
+import signal
 import threading
 import time
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional
 
 from candid.controllers import db, config
 from candid.controllers.helpers.matrix_factorization import run_factorization
@@ -24,6 +43,18 @@ def _advisory_lock_key(conversation_id):
     return int.from_bytes(h[:8], "big", signed=True)
 
 
+def _active_conversation_ids() -> List[str]:
+    """Polis conversation ids that are currently active."""
+    conversations = db.execute_query("""
+        SELECT polis_conversation_id
+        FROM polis_conversation
+        WHERE status = 'active'
+          AND active_from <= CURRENT_DATE
+          AND active_until > CURRENT_DATE
+    """)
+    return [conv["polis_conversation_id"] for conv in conversations or []]
+
+
 class MFWorker:
     """Background worker for periodic MF training."""
 
@@ -32,8 +63,10 @@ class MFWorker:
         train_interval: int = None,
         min_voters: int = None,
         min_votes: int = None,
+        full_retrain_interval: int = None,
     ):
         self.train_interval = train_interval or config.MF_TRAIN_INTERVAL
+        self.full_retrain_interval = full_retrain_interval or config.MF_FULL_RETRAIN_INTERVAL
         self.min_voters = min_voters or config.MF_MIN_VOTERS
         self.min_votes = min_votes or config.MF_MIN_VOTES
         self._running = False
@@ -76,21 +109,10 @@ class MFWorker:
 
     def _train_all_conversations(self):
         """Find active conversations and train MF models."""
-        conversations = db.execute_query("""
-            SELECT polis_conversation_id, location_id, category_id
-            FROM polis_conversation
-            WHERE status = 'active'
-              AND active_from <= CURRENT_DATE
-              AND active_until > CURRENT_DATE
-        """)
-
-        if not conversations:
-            return
-
-        for conv in conversations:
+        for conversation_id in _active_conversation_ids():
             if not self._running:
                 return
-            self._maybe_train(conv["polis_conversation_id"])
+            self._maybe_train(conversation_id)
 
     def _maybe_train(self, conversation_id):
         """Train MF for one conversation if new votes exist.
@@ -148,7 +170,10 @@ class MFWorker:
                 return  # No new votes since last training
 
             # Train
-            run_factorization(conversation_id)
+            run_factorization(
+                conversation_id,
+                incremental=not self._full_retrain_due(conversation_id),
+            )
 
         except Exception as e:
             # Log error to mf_training_log
@@ -178,6 +203,129 @@ class MFWorker:
                 (lock_key,)
             )
 
+    def _full_retrain_due(self, conversation_id):
+        """True if the last successful full retrain is older than the interval."""
+        row = db.execute_query("""
+            SELECT COALESCE(
+                MAX(created_time) < NOW() - make_interval(secs => %s),
+                TRUE
+            ) AS due
+            FROM mf_training_log
+            WHERE polis_conversation_id = %s
+              AND mode = 'full'
+              AND error_message IS NULL
+        """, (self.full_retrain_interval, conversation_id), fetchone=True)
+        return not row or bool(row.get("due"))
+
+
+# ========== Standalone Process Pool ==========
+
+def _train_conversation(conversation_id):
+    """Pool task: train one conversation in its own process."""
+    MFWorker()._maybe_train(conversation_id)
+    return conversation_id
+
+
+def _child_environment():
+    """Environment overrides inherited by spawned pool processes.
+
+    Each child imports candid.controllers afresh, so it must not start the
+    background threads, and it only needs a couple of DB connections.
+    """
+    return {
+        "BACKGROUND_WORKERS_ENABLED": "false",
+        "DB_POOL_MIN": "1",
+        "DB_POOL_MAX": "2",
+    }
+
+
+class MFProcessPool:
+    """Standalone MF trainer that runs each conversation in a separate process."""
+
+    def __init__(self, processes: int = None, train_interval: int = None):
+        """
+        Initialize the pool.
+
+        Args:
+            processes: Maximum conversations trained concurrently
+            train_interval: Seconds between training rounds
+        """
+        self.processes = processes or config.MF_WORKER_PROCESSES
+        self.train_interval = train_interval or config.MF_TRAIN_INTERVAL
+        self._running = False
+
+    def stop(self, *_):
+        """Finish the current round and exit. Usable as a signal handler."""
+        self._running = False
+
+    def run(self, once: bool = False):
+        """Train all active conversations every train_interval seconds.
+
+        Pool processes are spawned (not forked) so none inherits this
+        process's DB connections, and each handles a single conversation
+        before exiting so model memory is returned to the OS.
+        """
+        os.environ.update(_child_environment())
+        self._running = True
+        executor = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            max_tasks_per_child=1,
+        )
+        print(f"MF worker pool started ({self.processes} processes)", flush=True)
+        try:
+            while self._running:
+                try:
+                    self.run_round(executor)
+                except Exception as e:
+                    logger.error("MF worker pool error: %s", e, exc_info=True)
+
+                if once:
+                    break
+                for _ in range(self.train_interval):
+                    if not self._running:
+                        break
+                    time.sleep(1)
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+            self._running = False
+            print("MF worker pool stopped", flush=True)
+
+    def run_round(self, executor) -> int:
+        """Submit every active conversation and wait for the round to finish.
+
+        Returns the number of conversations submitted.
+        """
+        conversation_ids = _active_conversation_ids()
+        futures = {
+            executor.submit(_train_conversation, conversation_id): conversation_id
+            for conversation_id in conversation_ids
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error("MF training process failed for %s: %s",
+                             futures[future], e, exc_info=True)
+        return len(conversation_ids)
+
+
+def main(argv=None):
+    """Entry point for ``python -m candid.controllers.helpers.mf_worker``."""
+    parser = argparse.ArgumentParser(description="Run MF training in a process pool.")
+    parser.add_argument("--processes", type=int, default=None,
+                        help="Concurrent training processes (default: MF_WORKER_PROCESSES)")
+    parser.add_argument("--interval", type=int, default=None,
+                        help="Seconds between rounds (default: MF_TRAIN_INTERVAL)")
+    parser.add_argument("--once", action="store_true",
+                        help="Run a single training round and exit")
+    args = parser.parse_args(argv)
+
+    pool = MFProcessPool(processes=args.processes, train_interval=args.interval)
+    signal.signal(signal.SIGTERM, pool.stop)
+    signal.signal(signal.SIGINT, pool.stop)
+    pool.run(once=args.once)
+
 
 # ========== Singleton Worker ==========
 
@@ -198,3 +346,8 @@ def stop_worker():
     if _worker:
         _worker.stop()
         _worker = None
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
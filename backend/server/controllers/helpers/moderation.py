@@ -7,7 +7,7 @@ They have no request/response handling and can be reused across controllers.
 from candid.controllers import db
 from candid.controllers.helpers.constants import ROLE_HIERARCHY
 from candid.controllers.helpers.auth import (
-    get_highest_role_at_location, get_location_ancestors,
+    get_highest_roles_at_location, get_location_ancestors,
     is_admin_anywhere, invalidate_ban_cache,
 )
 from candid.models.user import User
@@ -54,7 +54,7 @@ def get_user_info(user_id):
     row = db.execute_query("""
         SELECT u.id, u.username, u.display_name, u.status,
                u.trust_score, u.avatar_url, u.avatar_icon_url,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id), 0) AS kudos_count
+               u.kudos_received_count AS kudos_count
         FROM users u WHERE u.id = %s
     """, (user_id,), fetchone=True)
     if row:
@@ -172,28 +172,73 @@ def get_content_scope(report_id):
     return None, None
 
 
+_ROLE_RANK = """CASE role
+            WHEN 'admin' THEN 1 WHEN 'moderator' THEN 2
+            WHEN 'facilitator' THEN 3 WHEN 'assistant_moderator' THEN 4
+            WHEN 'expert' THEN 5 WHEN 'liaison' THEN 6
+        END"""
+
+
+def _role_at_scope(user_id, content_loc, content_cat):
+    """Uncached single-user scoped role lookup for permission decisions."""
+    uid = str(user_id)
+    return get_highest_roles_at_location([uid], content_loc, content_cat, cached=False)[uid]
+
+
 def determine_actioner_role_level(user_id, content_loc, content_cat):
     """Determine the actioner's highest role relevant to the content scope.
 
     Returns one of: 'admin', 'moderator', 'facilitator', 'assistant_moderator', or None.
     """
     if content_loc:
-        role = get_highest_role_at_location(user_id, content_loc, content_cat)
+        role = _role_at_scope(user_id, content_loc, content_cat)
         if role:
             return role
     # Fallback: check if they have any role at all
-    row = db.execute_query("""
+    row = db.execute_query(f"""
         SELECT role FROM user_role WHERE user_id = %s
-        ORDER BY CASE role
-            WHEN 'admin' THEN 1 WHEN 'moderator' THEN 2
-            WHEN 'facilitator' THEN 3 WHEN 'assistant_moderator' THEN 4
-            WHEN 'expert' THEN 5 WHEN 'liaison' THEN 6
-        END
+        ORDER BY {_ROLE_RANK}
         LIMIT 1
     """, (str(user_id),), fetchone=True)
     return row['role'] if row else None
 
 
+def determine_actioner_role_levels(actions):
+    """Batch determine_actioner_role_level (uncached).
+
+    Args:
+        actions: Iterable of (user_id, content_loc, content_cat)
+
+    Returns {(user_id, content_loc, content_cat): role or None}, with user_id
+    as a string. Runs one role query per distinct scope plus at most one
+    fallback query, however many actions there are.
+    """
+    by_scope = {}
+    for user_id, content_loc, content_cat in actions:
+        by_scope.setdefault((content_loc, content_cat), set()).add(str(user_id))
+
+    levels = {}
+    for (content_loc, content_cat), user_ids in by_scope.items():
+        roles = get_highest_roles_at_location(
+            user_ids, content_loc, content_cat, cached=False) if content_loc else {}
+        for uid in user_ids:
+            levels[(uid, content_loc, content_cat)] = roles.get(uid)
+
+    # Fallback: any role at all, for actioners without one at the scope
+    unresolved = sorted({key[0] for key, role in levels.items() if not role})
+    if unresolved:
+        rows = db.execute_query(f"""
+            SELECT DISTINCT ON (user_id) user_id, role FROM user_role
+            WHERE user_id = ANY(%s::uuid[])
+            ORDER BY user_id, {_ROLE_RANK}
+        """, (unresolved,))
+        any_role = {str(r['user_id']): r['role'] for r in (rows or [])}
+        for key, role in levels.items():
+            if not role:
+                levels[key] = any_role.get(key[0])
+    return levels
+
+
 def find_appeal_reviewers(actioner_level, content_loc, content_cat, exclude_user_id):
     """Find eligible reviewers for an appeal based on hierarchical escalation.
 
@@ -336,7 +381,7 @@ def can_review_appeal_at_scope(user_id, content_loc, content_cat, actioner_level
 
     # Check if user has a role at any tier above the actioner
     if content_loc:
-        user_role = get_highest_role_at_location(user_id, content_loc, content_cat)
+        user_role = _role_at_scope(user_id, content_loc, content_cat)
         if user_role and user_role in _TIER_ORDER:
             user_idx = _TIER_ORDER.index(user_role)
             return user_idx > actioner_idx
@@ -455,7 +500,7 @@ def get_user_polis_group(user_id, report):
     Returns the group ID (int) or None if not determinable.
     """
     try:
-        from candid.controllers.helpers.polis_client import get_client, PolisError
+        from candid.controllers.helpers.polis_math import get_math_data
 
         # Get the position's category and location from the report target
         if report.get('target_object_type') != 'position':
@@ -490,8 +535,7 @@ def get_user_polis_group(user_id, report):
         user_pid = participant['polis_pid']
 
         # Get math data to find group membership
-        client = get_client()
-        math_data = client.get_math_data(polis_conv_id)
+        math_data = get_math_data(polis_conv_id)
         if not math_data:
             return None
 
@@ -509,7 +553,62 @@ def get_user_polis_group(user_id, report):
         return None
 
 
-def should_show_escalated_appeal(appeal_row, current_user_id):
+def resolve_appeal_routing(mod_action_ids):
+    """Look up routing for every appeal in a queue up front.
+
+    Fetches the original mod actions in one query and the actioners' role
+    levels with determine_actioner_role_levels, instead of one lookup per
+    appeal inside the queue loop. Pass the result to should_show_*.
+
+    Returns {mod_action_id: {"responder_user_id", "content_loc",
+    "content_cat", "actioner_level"}}; unknown mod actions are absent.
+    """
+    ids = list(dict.fromkeys(str(i) for i in mod_action_ids if i))
+    if not ids:
+        return {}
+
+    rows = db.execute_query("""
+        SELECT id, report_id, responder_user_id FROM mod_action
+        WHERE id = ANY(%s::uuid[])
+    """, (ids,))
+    routing = {}
+    for row in (rows or []):
+        content_loc, content_cat = get_content_scope(row['report_id'])
+        routing[str(row['id'])] = {
+            'responder_user_id': str(row['responder_user_id']),
+            'content_loc': content_loc,
+            'content_cat': content_cat,
+        }
+
+    levels = determine_actioner_role_levels(
+        (r['responder_user_id'], r['content_loc'], r['content_cat']) for r in routing.values())
+    for r in routing.values():
+        r['actioner_level'] = levels[(r['responder_user_id'], r['content_loc'], r['content_cat'])]
+    return routing
+
+
+def _appeal_route(mod_action_id, routing=None):
+    """Routing for one appeal, from resolve_appeal_routing output if given."""
+    if routing is not None:
+        return routing.get(str(mod_action_id))
+
+    mod_action = db.execute_query("""
+        SELECT report_id, responder_user_id FROM mod_action WHERE id = %s
+    """, (str(mod_action_id),), fetchone=True)
+    if not mod_action:
+        return None
+
+    content_loc, content_cat = get_content_scope(mod_action['report_id'])
+    return {
+        'responder_user_id': mod_action['responder_user_id'],
+        'content_loc': content_loc,
+        'content_cat': content_cat,
+        'actioner_level': determine_actioner_role_level(
+            mod_action['responder_user_id'], content_loc, content_cat),
+    }
+
+
+def should_show_escalated_appeal(appeal_row, current_user_id, routing=None):
     """Determine if an escalated appeal should be shown to the current user.
 
     Escalated appeals route to the next tier above the original actioner:
@@ -517,16 +616,15 @@ def should_show_escalated_appeal(appeal_row, current_user_id):
       facilitator -> moderator
       moderator -> admin
       admin -> parent location admin
+
+    routing: resolve_appeal_routing output for the queue being built
     """
-    mod_action = db.execute_query("""
-        SELECT report_id, responder_user_id FROM mod_action WHERE id = %s
-    """, (str(appeal_row['mod_action_id']),), fetchone=True)
-    if not mod_action:
+    route = _appeal_route(appeal_row['mod_action_id'], routing)
+    if not route:
         return False
 
-    content_loc, content_cat = get_content_scope(mod_action['report_id'])
-    actioner_level = determine_actioner_role_level(
-        mod_action['responder_user_id'], content_loc, content_cat)
+    content_loc, content_cat = route['content_loc'], route['content_cat']
+    actioner_level = route['actioner_level']
 
     if not actioner_level or not content_loc:
         # Fallback: show to any admin
@@ -534,16 +632,18 @@ def should_show_escalated_appeal(appeal_row, current_user_id):
 
     # Find eligible reviewers for the escalated appeal
     reviewers = find_appeal_reviewers(actioner_level, content_loc, content_cat,
-                                      mod_action['responder_user_id'])
+                                      route['responder_user_id'])
     return current_user_id in reviewers
 
 
-def should_show_appeal_to_reviewer(appeal_data, current_user_id, appeal_row):
+def should_show_appeal_to_reviewer(appeal_data, current_user_id, appeal_row, routing=None):
     """Determine if a pending appeal should be shown to the current user.
 
     Uses hierarchical routing: the appeal is shown to peers at the same role
     level as the original actioner, or to the next tier up if no peers exist.
     Never shown to the original actioner.
+
+    routing: resolve_appeal_routing output for the queue being built
     """
     original_action = appeal_data.get('originalAction') or {}
     original_responder = original_action.get('responder') or {}
@@ -558,22 +658,19 @@ def should_show_appeal_to_reviewer(appeal_data, current_user_id, appeal_row):
     if not mod_action_id:
         return True  # Fallback: show to any eligible reviewer
 
-    mod_action = db.execute_query("""
-        SELECT report_id, responder_user_id FROM mod_action WHERE id = %s
-    """, (str(mod_action_id),), fetchone=True)
-    if not mod_action:
+    route = _appeal_route(mod_action_id, routing)
+    if not route:
         return True
 
-    content_loc, content_cat = get_content_scope(mod_action['report_id'])
-    actioner_level = determine_actioner_role_level(
-        mod_action['responder_user_id'], content_loc, content_cat)
+    content_loc, content_cat = route['content_loc'], route['content_cat']
+    actioner_level = route['actioner_level']
 
     if not actioner_level or not content_loc:
         return True  # Fallback: show to any eligible reviewer
 
     # Check if this user is among the eligible peer reviewers
     reviewers = find_peer_reviewers(actioner_level, content_loc, content_cat,
-                                    mod_action['responder_user_id'])
+                                    route['responder_user_id'])
     return str(current_user_id) in reviewers
 
 
@@ -1,8 +1,48 @@
-"""NLP service client for embedding generation and similarity search."""
+"""NLP service client for embedding generation and similarity search.
 
+Embeddings are cached in Redis, content-addressed by
+sha256(model name + normalized text), so repeated searches for the same
+statement skip the NLP service. Vectors are stored as base64-encoded
+float32 bytes (~2 KB for 384 dimensions) with NLP_EMBED_CACHE_TTL; pair
+with Redis's allkeys-lru policy to bound memory. Hit/miss counters are kept
+in the nlp:embed_cache:stats hash (see embedding_cache_stats()).
+
+All calls share one pooled requests.Session per process, so search-as-you-type
+traffic reuses keep-alive connections instead of paying a TCP handshake per
+request. The pool keeps at most NLP_POOL_MAXSIZE idle connections; connect
+errors and 502/503/504 responses are retried NLP_MAX_RETRIES times with
+backoff. A circuit breaker opens after NLP_BREAKER_FAILURES consecutive
+failures and fails calls immediately for NLP_BREAKER_RESET seconds, after
+which one trial request decides whether it closes again. Per-endpoint latency
+histograms are kept in-process (see client_stats()).
+"""
+
+import base64
+import bisect
+import hashlib
+import logging
+import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
 import requests
-from typing import List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Any, Dict, List, Optional
 from candid.controllers.helpers.config import Config
+from candid.controllers.helpers.redis_pool import get_redis
+
+logger = logging.getLogger(__name__)
+
+EMBED_CACHE_PREFIX = "nlp:embed:"
+EMBED_CACHE_STATS_KEY = "nlp:embed_cache:stats"
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Upper bounds (ms) of the latency histogram buckets; a final +Inf bucket is implied
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
 
 
 class NLPServiceError(Exception):
@@ -10,25 +50,243 @@ class NLPServiceError(Exception):
     pass
 
 
-def get_embeddings(texts: List[str]) -> Optional[List[List[float]]]:
+class NLPCircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without contacting the service while the circuit breaker is open.
+
+    Subclasses ConnectionError so every caller's existing "service
+    unavailable" fallback applies unchanged.
     """
-    Get embeddings for a list of texts from the NLP service.
+    pass
 
-    Args:
-        texts: List of text strings to embed
 
-    Returns:
-        List of embedding vectors, or None if service unavailable
+# ========== Connection pool, circuit breaker, latency metrics ==========
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open)."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = 0.0
+            self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a request may go out now. In half-open state only one trial is let through."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout or self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_in_flight or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("NLP circuit breaker opened after %d failures", self._failures)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+
+class LatencyHistogram:
+    """Per-bucket (non-cumulative) latency counts plus count/sum for one endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.count = 0
+        self.sum_ms = 0.0
+        self.errors = 0
+
+    def observe(self, elapsed_ms: float, error: bool = False):
+        with self._lock:
+            self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+            self.count += 1
+            self.sum_ms += elapsed_ms
+            if error:
+                self.errors += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [str(b) for b in LATENCY_BUCKETS_MS] + ["+Inf"]
+            return {
+                "count": self.count,
+                "errors": self.errors,
+                "sum_ms": round(self.sum_ms, 3),
+                "avg_ms": round(self.sum_ms / self.count, 3) if self.count else 0.0,
+                "buckets": dict(zip(labels, self.buckets)),
+            }
+
+
+def _build_session() -> requests.Session:
+    """Session with a bounded keep-alive pool and retries on connect errors / gateway 5xx."""
+    retry = Retry(
+        total=Config.NLP_MAX_RETRIES,
+        connect=Config.NLP_MAX_RETRIES,
+        read=0,  # Never resend a request the service may already be working on
+        status=Config.NLP_MAX_RETRIES,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset({"GET", "POST"}),
+        backoff_factor=0.1,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.NLP_POOL_MAXSIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_session = _build_session()
+_breaker = CircuitBreaker(Config.NLP_BREAKER_FAILURES, Config.NLP_BREAKER_RESET)
+_histograms: Dict[str, LatencyHistogram] = {}
+_histograms_lock = threading.Lock()
+
+
+def _histogram(endpoint: str) -> LatencyHistogram:
+    with _histograms_lock:
+        hist = _histograms.get(endpoint)
+        if hist is None:
+            hist = _histograms[endpoint] = LatencyHistogram()
+        return hist
+
+
+def _request(method: str, endpoint: str, use_breaker: bool = True, **kwargs) -> requests.Response:
+    """
+    Send a request to the NLP service over the pooled session.
+
+    Records latency for the endpoint and feeds the circuit breaker:
+    connection errors, timeouts and 5xx responses count as failures.
 
     Raises:
-        NLPServiceError: If the service returns an error
+        NLPCircuitOpenError: If the breaker is open (no request is sent)
+        requests.exceptions.RequestException: As raised by requests
     """
-    if not texts:
-        return []
+    if use_breaker and not _breaker.allow():
+        raise NLPCircuitOpenError(f"NLP circuit breaker open - skipping {endpoint}")
 
+    start = time.perf_counter()
+    failed = True
     try:
-        response = requests.post(
-            f"{Config.NLP_SERVICE_URL}/embed",
+        response = _session.request(method, f"{Config.NLP_SERVICE_URL}{endpoint}", **kwargs)
+        failed = response.status_code >= 500
+        return response
+    finally:
+        _histogram(endpoint).observe((time.perf_counter() - start) * 1000, error=failed)
+        if use_breaker:
+            if failed:
+                _breaker.record_failure()
+            else:
+                _breaker.record_success()
+
+
+def client_stats() -> Dict[str, Any]:
+    """This process's NLP client metrics: breaker state and per-endpoint latency histograms."""
+    with _histograms_lock:
+        endpoints = dict(_histograms)
+    return {
+        "circuit_breaker": _breaker.state,
+        "endpoints": {name: hist.snapshot() for name, hist in endpoints.items()},
+    }
+
+
+def reset_client_stats():
+    """Clear latency histograms and close the breaker (tests, admin resets)."""
+    with _histograms_lock:
+        _histograms.clear()
+    _breaker.reset()
+
+
+# ========== Embedding cache ==========
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys: NFC, collapsed whitespace, trimmed."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def embedding_cache_key(text: str) -> str:
+    """Redis key for a text's embedding under the configured model."""
+    digest = hashlib.sha256(
+        f"{Config.NLP_EMBEDDING_MODEL}\0{normalize_text(text)}".encode("utf-8")
+    ).hexdigest()
+    return f"{EMBED_CACHE_PREFIX}{digest}"
+
+
+def _encode_vector(vector: List[float]) -> str:
+    return base64.b64encode(np.asarray(vector, dtype=np.float32).tobytes()).decode("ascii")
+
+
+def _decode_vector(raw: str) -> List[float]:
+    return np.frombuffer(base64.b64decode(raw), dtype=np.float32).tolist()
+
+
+def _cache_lookup(keys: List[str]) -> Dict[str, List[float]]:
+    """Return {key: vector} for cached keys; Redis errors count as misses."""
+    try:
+        raws = get_redis().mget(keys)
+    except Exception as e:
+        logger.warning("Embedding cache read failed: %s", e)
+        return {}
+    return {k: _decode_vector(raw) for k, raw in zip(keys, raws) if raw}
+
+
+def _cache_store(vectors: Dict[str, List[float]], hits: int, misses: int):
+    """Write fetched vectors and bump the hit/miss counters in one round trip."""
+    try:
+        pipe = get_redis().pipeline()
+        for key, vector in vectors.items():
+            pipe.setex(key, Config.NLP_EMBED_CACHE_TTL, _encode_vector(vector))
+        if hits:
+            pipe.hincrby(EMBED_CACHE_STATS_KEY, "hits", hits)
+        if misses:
+            pipe.hincrby(EMBED_CACHE_STATS_KEY, "misses", misses)
+        pipe.execute()
+    except Exception as e:
+        logger.warning("Embedding cache write failed: %s", e)
+
+
+def embedding_cache_stats() -> Dict[str, int]:
+    """Cluster-wide embedding cache hit/miss counters."""
+    try:
+        stats = get_redis().hgetall(EMBED_CACHE_STATS_KEY) or {}
+    except Exception as e:
+        logger.warning("Embedding cache stats read failed: %s", e)
+        stats = {}
+    return {"hits": int(stats.get("hits", 0)), "misses": int(stats.get("misses", 0))}
+
+
+def _fetch_embeddings(texts: List[str]) -> Optional[List[List[float]]]:
+    """Call the NLP service /embed endpoint."""
+    try:
+        response = _request(
+            "POST", "/embed",
             json={"texts": texts},
             timeout=Config.NLP_SERVICE_TIMEOUT
         )
@@ -45,6 +303,47 @@ def get_embeddings(texts: List[str]) -> Optional[List[List[float]]]:
         raise NLPServiceError(f"NLP service error: {e}")
 
 
+def get_embeddings(texts: List[str]) -> Optional[List[List[float]]]:
+    """
+    Get embeddings for a list of texts, from the cache or the NLP service.
+
+    Args:
+        texts: List of text strings to embed
+
+    Returns:
+        List of embedding vectors, or None if service unavailable
+
+    Raises:
+        NLPServiceError: If the service returns an error
+    """
+    if not texts:
+        return []
+
+    if Config.NLP_EMBED_CACHE_TTL <= 0:
+        return _fetch_embeddings(texts)
+
+    keys = [embedding_cache_key(t) for t in texts]
+    cached = _cache_lookup(list(dict.fromkeys(keys)))
+
+    # Embed each uncached text once, even if it appears several times
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in cached and key not in missing:
+            missing[key] = text
+
+    fetched = {}
+    if missing:
+        embeddings = _fetch_embeddings(list(missing.values()))
+        if embeddings is None:
+            return None
+        fetched = dict(zip(missing.keys(), embeddings))
+
+    misses = sum(1 for k in keys if k in missing)
+    _cache_store(fetched, hits=len(keys) - misses, misses=misses)
+    vectors = {**cached, **fetched}
+    return [vectors[k] for k in keys]
+
+
 def get_embedding(text: str) -> Optional[List[float]]:
     """
     Get embedding for a single text.
@@ -76,8 +375,8 @@ def compute_similarity(query: str, candidates: List[str]) -> Optional[List[float
         return []
 
     try:
-        response = requests.post(
-            f"{Config.NLP_SERVICE_URL}/similarity",
+        response = _request(
+            "POST", "/similarity",
             json={"query": query, "candidates": candidates},
             timeout=Config.NLP_SERVICE_TIMEOUT
         )
@@ -102,10 +401,7 @@ def health_check() -> bool:
         True if service is available and healthy
     """
     try:
-        response = requests.get(
-            f"{Config.NLP_SERVICE_URL}/health",
-            timeout=5
-        )
+        response = _request("GET", "/health", use_breaker=False, timeout=5)
         return response.status_code == 200
     except requests.exceptions.RequestException:
         return False
@@ -126,8 +422,8 @@ def check_nsfw(image_base64: str, threshold: float = 0.6) -> dict:
         NLPServiceError: If the service returns an error
     """
     try:
-        response = requests.post(
-            f"{Config.NLP_SERVICE_URL}/nsfw-check",
+        response = _request(
+            "POST", "/nsfw-check",
             json={"image_base64": image_base64, "threshold": threshold},
             timeout=30  # Longer timeout for image processing
         )
@@ -159,8 +455,8 @@ def process_avatar(image_base64: str, threshold: float = 0.6) -> dict:
         NLPServiceError: If the service returns an error
     """
     try:
-        response = requests.post(
-            f"{Config.NLP_SERVICE_URL}/process-avatar",
+        response = _request(
+            "POST", "/process-avatar",
             json={"image_base64": image_base64, "threshold": threshold},
             timeout=60  # Longer timeout for image processing
         )
@@ -249,7 +249,8 @@ def build_victory_matrix(items, all_responses):
     """Build victory matrix from all users' responses.
 
     :param items: list of item ID strings
-    :param all_responses: list of dicts with 'winner_item_id' and 'loser_item_id'
+    :param all_responses: list of dicts with 'winner_item_id' and 'loser_item_id',
+        optionally with 'n' when a dict stands for n identical responses
     :returns: dict where matrix[A][B] = number of users who chose A over B
     """
     item_set = set(items)
@@ -258,7 +259,7 @@ def build_victory_matrix(items, all_responses):
         w = str(r["winner_item_id"])
         l = str(r["loser_item_id"])
         if w in item_set and l in item_set:
-            matrix[w][l] += 1
+            matrix[w][l] += r.get("n", 1)
     return matrix
 
 
@@ -19,8 +19,9 @@ Authentication Flow:
 
 import requests
 import logging
+from collections import OrderedDict
 from datetime import datetime, timezone, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from threading import Lock
 from candid.controllers import config, db
 
@@ -68,6 +69,9 @@ class PolisClient:
         self._admin_token_lock = Lock()
         self._xid_tokens: Dict[str, Dict[str, str]] = {}  # {conversation_id: {xid: token}}
         self._xid_tokens_lock = Lock()
+        self._pids: "OrderedDict[Tuple[str, str], int]" = OrderedDict()  # {(conversation_id, xid): pid}, LRU
+        self._pids_maxsize = config.POLIS_PID_CACHE_SIZE
+        self._pids_lock = Lock()
 
     def _request(
         self,
@@ -75,8 +79,8 @@ class PolisClient:
         endpoint: str,
         auth_token: Optional[str] = None,
         **kwargs
-    ) -> Dict[str, Any]:
-        """Make an HTTP request to Polis API."""
+    ) -> Optional[Dict[str, Any]]:
+        """Make an HTTP request to Polis API. Returns None on 304 Not Modified."""
         url = f"{self.api_url}{endpoint}"
         kwargs.setdefault('timeout', self.timeout)
 
@@ -99,6 +103,10 @@ class PolisClient:
 
             response.raise_for_status()
 
+            # Not modified (conditional math fetches)
+            if response.status_code == 304:
+                return None
+
             if response.content:
                 return response.json()
             return {}
@@ -548,25 +556,30 @@ class PolisClient:
             logger.error(f"Failed to get votes: {e}")
             return []
 
-    def get_next_comment(self, conversation_id: str, xid: str,
-                         without_tids: Optional[List[int]] = None) -> Optional[Dict[str, Any]]:
+    def get_participant_pid(self, conversation_id: str, xid: str) -> Optional[int]:
         """
-        Get the next prioritized comment for this user from Polis.
+        Look up the stored Polis pid for a participant.
 
-        Uses Polis's server-side PCA math-based prioritization to return the
-        single most important unvoted comment via weighted probabilistic selection.
+        A participant's pid never changes within a conversation, so it is
+        cached in memory after the first lookup (least recently used entries
+        are evicted past POLIS_PID_CACHE_SIZE). Unknown participants are not
+        cached so a later participationInit is picked up.
 
         Args:
             conversation_id: The Polis conversation ID
             xid: External ID for the user (candid:{user_uuid})
-            without_tids: Optional list of tids to exclude (already fetched this request)
 
         Returns:
-            Comment dict with tid, txt, remaining, total — or None if no comments left
+            The pid, or None if the participant has not been initialized
         """
-        token = self._get_xid_token(conversation_id, xid)
+        key = (conversation_id, xid)
+        with self._pids_lock:
+            pid = self._pids.get(key)
+            if pid is not None:
+                self._pids.move_to_end(key)
+        if pid is not None:
+            return pid
 
-        # Look up the stored pid for this user+conversation
         user_id = xid.replace("candid:", "") if xid.startswith("candid:") else None
         if not user_id:
             return None
@@ -579,9 +592,42 @@ class PolisClient:
         if not stored or stored["polis_pid"] is None:
             return None
 
+        pid = stored["polis_pid"]
+        with self._pids_lock:
+            self._pids[key] = pid
+            self._pids.move_to_end(key)
+            while len(self._pids) > self._pids_maxsize:
+                self._pids.popitem(last=False)
+        return pid
+
+    def get_next_comment(self, conversation_id: str, xid: str,
+                         without_tids: Optional[List[int]] = None,
+                         pid: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the next prioritized comment for this user from Polis.
+
+        Uses Polis's server-side PCA math-based prioritization to return the
+        single most important unvoted comment via weighted probabilistic selection.
+
+        Args:
+            conversation_id: The Polis conversation ID
+            xid: External ID for the user (candid:{user_uuid})
+            without_tids: Optional list of tids to exclude (already fetched this request)
+            pid: Optional pre-resolved participant pid (skips the lookup)
+
+        Returns:
+            Comment dict with tid, txt, remaining, total — or None if no comments left
+        """
+        token = self._get_xid_token(conversation_id, xid)
+
+        if pid is None:
+            pid = self.get_participant_pid(conversation_id, xid)
+        if pid is None:
+            return None
+
         params = {
             "conversation_id": conversation_id,
-            "not_voted_by_pid": stored["polis_pid"]
+            "not_voted_by_pid": pid
         }
         if without_tids:
             params["without"] = without_tids
@@ -667,6 +713,30 @@ class PolisClient:
             logger.error(f"Failed to get math data: {e}")
             return {}
 
+    def get_math_pca(self, conversation_id: str, math_tick: int = -1) -> Optional[Dict[str, Any]]:
+        """
+        Conditionally fetch the PCA/clustering math for a conversation.
+
+        Uses /math/pca2, which answers 304 Not Modified unless Polis has
+        math newer than math_tick. The payload is the same pca.asPOJO dict
+        that participationInit returns, including its own math_tick.
+
+        Args:
+            conversation_id: The Polis conversation ID
+            math_tick: Tick of the math the caller already has (-1 for none)
+
+        Returns:
+            The asPOJO dict, or None if there is nothing newer than math_tick
+
+        Raises:
+            PolisError: If the request fails
+        """
+        params = {
+            "conversation_id": conversation_id,
+            "math_tick": math_tick,
+        }
+        return self._request("GET", "/math/pca2", params=params)
+
     # ========== Report Operations (Admin Auth) ==========
 
     def create_report(self, conversation_id: str) -> Optional[str]:
@@ -0,0 +1,270 @@
+"""
+Shared Redis cache of Polis conversation math.
+
+Stats, surveys, closures and ideological coordinates all read the same
+PCA/clustering payload. Instead of each request pulling it from Polis, they
+read the latest copy from Redis, and a background poller keeps that copy
+current with conditional fetches of /math/pca2 (Polis answers 304 until its
+math_tick moves past the cached one).
+
+Redis layout:
+- polis:math:{conv}:tick    STRING math_tick of the latest cached math
+- polis:math:{conv}:{tick}  STRING JSON math payload for that tick
+- polis:math:watched        ZSET conversation id -> unix time it was last read
+- polis:math:poll:{conv}    STRING held (SET NX EX) by the one process that
+                            polls the conversation this interval
+
+Payloads keep the participationInit shape ({"pca": {"asPOJO": ...},
+"math_tick": ...}) so existing extractors work unchanged. Each process keeps
+the decoded payload for the current tick, so a read is a single GET of the
+tick string until Polis publishes new math.
+
+Conversations nobody has read for POLIS_MATH_WATCH_TTL seconds drop out of
+polling. The first read of an unknown conversation fetches inline once; any
+reader that loses the poll lock meanwhile gets {} and falls back as it would
+without Polis math.
+"""
+
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from candid.controllers import config
+from candid.controllers.helpers.polis_client import get_client
+from candid.controllers.helpers.redis_pool import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "polis:math:"
+WATCHED_KEY = "polis:math:watched"
+
+# Superseded payloads linger this long for readers that just saw the old tick
+OLD_TICK_TTL = 60
+
+_local: Dict[str, Tuple[int, Dict[str, Any]]] = {}  # {conversation_id: (math_tick, math)}
+_local_lock = threading.Lock()
+
+
+def _tick_key(conversation_id: str) -> str:
+    return f"{KEY_PREFIX}{conversation_id}:tick"
+
+
+def _data_key(conversation_id: str, math_tick: int) -> str:
+    return f"{KEY_PREFIX}{conversation_id}:{math_tick}"
+
+
+def _poll_lock_key(conversation_id: str) -> str:
+    return f"{KEY_PREFIX}poll:{conversation_id}"
+
+
+def _remember(conversation_id: str, math_tick: int, math: Dict[str, Any]):
+    with _local_lock:
+        _local[conversation_id] = (math_tick, math)
+
+
+def _local_math(conversation_id: str, math_tick: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    with _local_lock:
+        cached = _local.get(conversation_id)
+    if cached and (math_tick is None or cached[0] == math_tick):
+        return cached[1]
+    return None
+
+
+# ========== Reads ==========
+
+def get_math(conversation_id: str) -> Dict[str, Any]:
+    """
+    Get the cached math for a conversation.
+
+    Never raises: Redis or Polis failures return the last copy this process
+    saw, or {} if there is none.
+
+    Args:
+        conversation_id: The Polis conversation ID
+
+    Returns:
+        Dict with pca and math_tick, or {} if no math is available yet
+    """
+    try:
+        r = get_redis()
+        pipe = r.pipeline()
+        pipe.get(_tick_key(conversation_id))
+        pipe.zadd(WATCHED_KEY, {conversation_id: time.time()})
+        tick, _ = pipe.execute()
+
+        if tick is None:
+            poll(conversation_id)
+            return _local_math(conversation_id) or {}
+
+        tick = int(tick)
+        math = _local_math(conversation_id, tick)
+        if math is not None:
+            return math
+
+        raw = r.get(_data_key(conversation_id, tick))
+        if raw is None:
+            return _local_math(conversation_id) or {}
+        math = json.loads(raw)
+        _remember(conversation_id, tick, math)
+        return math
+    except Exception as e:
+        logger.warning(f"Polis math cache read failed for {conversation_id}: {e}")
+        return _local_math(conversation_id) or {}
+
+
+def get_math_data(conversation_id: str, xid: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Cached drop-in for PolisClient.get_math_data.
+
+    With an xid, the participant's stored pid is added as ptpt.pid, which is
+    the only participant field callers read.
+
+    Args:
+        conversation_id: The Polis conversation ID
+        xid: Optional external ID for the user
+
+    Returns:
+        Dict with math data, or {} if no math is available yet
+    """
+    math = get_math(conversation_id)
+    if not xid or not math:
+        return math
+
+    pid = get_client().get_participant_pid(conversation_id, xid)
+    if pid is None:
+        return math
+    return {**math, "ptpt": {"pid": pid}}
+
+
+# ========== Polling ==========
+
+def poll(conversation_id: str) -> bool:
+    """
+    Conditionally re-fetch one conversation's math from Polis.
+
+    Skipped if another process (or this one) polled the conversation within
+    the last POLIS_MATH_POLL_INTERVAL seconds.
+
+    Returns:
+        True if new math was cached
+    """
+    r = get_redis()
+    if not r.set(_poll_lock_key(conversation_id), "1", nx=True, ex=config.POLIS_MATH_POLL_INTERVAL):
+        return False
+
+    tick_key = _tick_key(conversation_id)
+    old_tick = r.get(tick_key)
+    old_tick = int(old_tick) if old_tick is not None else None
+
+    pojo = get_client().get_math_pca(conversation_id, old_tick if old_tick is not None else -1)
+    if not pojo:
+        # Unchanged: keep the current copy alive while it is still being read
+        if old_tick is not None:
+            pipe = r.pipeline()
+            pipe.expire(tick_key, config.POLIS_MATH_CACHE_TTL)
+            pipe.expire(_data_key(conversation_id, old_tick), config.POLIS_MATH_CACHE_TTL)
+            pipe.execute()
+        return False
+
+    new_tick = int(pojo.get("math_tick", 0))
+    math = {"pca": {"asPOJO": pojo}, "math_tick": new_tick}
+
+    pipe = r.pipeline()
+    pipe.setex(_data_key(conversation_id, new_tick), config.POLIS_MATH_CACHE_TTL, json.dumps(math))
+    pipe.setex(tick_key, config.POLIS_MATH_CACHE_TTL, str(new_tick))
+    if old_tick is not None and old_tick != new_tick:
+        pipe.expire(_data_key(conversation_id, old_tick), OLD_TICK_TTL)
+    pipe.execute()
+
+    _remember(conversation_id, new_tick, math)
+    logger.info(f"Cached Polis math for {conversation_id} at tick {new_tick}")
+    return True
+
+
+def poll_watched(now: Optional[float] = None) -> int:
+    """
+    Poll every conversation read within the last POLIS_MATH_WATCH_TTL seconds.
+
+    Returns:
+        Number of conversations that got new math
+    """
+    now = now or time.time()
+    cutoff = now - config.POLIS_MATH_WATCH_TTL
+
+    r = get_redis()
+    r.zremrangebyscore(WATCHED_KEY, 0, cutoff)
+    updated = 0
+    for conversation_id in r.zrangebyscore(WATCHED_KEY, cutoff, float("inf")):
+        try:
+            if poll(conversation_id):
+                updated += 1
+        except Exception as e:
+            logger.warning(f"Polis math poll failed for {conversation_id}: {e}")
+    return updated
+
+
+class PolisMathPoller:
+    """Background worker that keeps watched conversations' math current."""
+
+    def __init__(self, poll_interval: float = 1.0):
+        """
+        Initialize the poller.
+
+        Args:
+            poll_interval: Seconds between passes over the watched set (each
+                conversation is still fetched at most once per
+                POLIS_MATH_POLL_INTERVAL across all processes)
+        """
+        self.poll_interval = poll_interval
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background poller thread."""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        print("Polis math poller started", flush=True)
+
+    def stop(self):
+        """Stop the background poller."""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        print("Polis math poller stopped", flush=True)
+
+    def _run_loop(self):
+        """Main poller loop."""
+        while self._running:
+            try:
+                poll_watched()
+            except Exception as e:
+                logger.error("Polis math poller error: %s", e, exc_info=True)
+            time.sleep(self.poll_interval)
+
+
+# ========== Singleton Worker ==========
+
+_worker: Optional[PolisMathPoller] = None
+
+
+def start_worker():
+    """Start the singleton Polis math poller."""
+    global _worker
+    if _worker is None:
+        _worker = PolisMathPoller()
+    _worker.start()
+
+
+def stop_worker():
+    """Stop the singleton Polis math poller."""
+    global _worker
+    if _worker:
+        _worker.stop()
+        _worker = None
@@ -5,9 +5,12 @@ Handles async syncing of positions and votes to Polis conversations.
 Uses a queue-based approach for reliability and graceful degradation.
 """
 
+import heapq
 import json
 import math
+import random
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date, timedelta
 from dateutil.relativedelta import relativedelta
 from typing import Optional, List, Dict, Any, Tuple
@@ -16,6 +19,7 @@ from candid.controllers import db, config
 from candid.controllers.helpers.polis_client import (
     PolisClient, PolisError, PolisUnavailableError, get_client
 )
+from candid.controllers.helpers.polis_math import get_math
 
 
 # Vote mapping: Candid response -> Polis vote value
@@ -459,7 +463,9 @@ def get_unvoted_positions_for_user(
 
     Uses Polis's nextComment endpoint for server-side PCA math-based
     prioritization. Pre-calculates how many positions to fetch per category
-    based on priority weights, and terminates early when enough are collected.
+    based on priority weights, then reads all categories concurrently so a
+    request costs one Polis round trip rather than one per card per category
+    (see _get_next_comment_tids).
 
     Args:
         user_id: The Candid user UUID
@@ -490,45 +496,134 @@ def get_unvoted_positions_for_user(
     sorted_cats = sorted(category_targets.items(),
                          key=lambda x: active_priorities[x[0]], reverse=True)
 
+    workers = max(1, min(len(sorted_cats), config.POLIS_FETCH_CONCURRENCY))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(_get_category_positions, client, user_id, xid, location_id,
+                        cat_id, active_priorities[cat_id], target)
+            for cat_id, target in sorted_cats
+        ]
+        results = [f.result() for f in futures]
+
     positions = []
-    for cat_id, target in sorted_cats:
+    for category_positions in results:
         if len(positions) >= limit:
-            break  # Early termination — already have enough
+            break
+        positions.extend(category_positions)
 
-        conv = get_oldest_active_conversation(location_id, cat_id)
-        if not conv:
-            # No Polis conversation, fall back to DB for this category
-            db_positions = _get_unvoted_positions_from_db(
-                user_id, location_id, {cat_id: active_priorities[cat_id]}, limit=target
-            )
-            positions.extend(db_positions)
-            continue
+    return positions[:limit]
 
-        try:
-            # Call nextComment up to `target` times for this category
-            tids = []
-            for _ in range(target):
-                comment = client.get_next_comment(
-                    conv["polis_conversation_id"], xid, without_tids=tids)
-                if not comment:
-                    break  # No more unvoted comments in this conversation
-                tids.append(comment["tid"])
-
-            if tids:
-                # Batch map all tids to positions in ONE query
-                mapped = _batch_polis_comments_to_positions(tids, cat_id)
-                for pos in mapped:
-                    pos["weight"] = active_priorities[cat_id]
-                positions.extend(mapped)
 
-        except PolisError as e:
-            print(f"Error fetching from Polis: {e}", flush=True)
-            db_positions = _get_unvoted_positions_from_db(
-                user_id, location_id, {cat_id: active_priorities[cat_id]}, limit=target
-            )
-            positions.extend(db_positions)
+def _get_category_positions(
+    client: PolisClient,
+    user_id: str,
+    xid: str,
+    location_id: str,
+    category_id: str,
+    priority: int,
+    target: int
+) -> List[Dict[str, Any]]:
+    """Fetch up to `target` unvoted positions for one category.
 
-    return positions[:limit]
+    Falls back to the Candid DB when the category has no active Polis
+    conversation or Polis is unavailable.
+    """
+    conv = get_oldest_active_conversation(location_id, category_id)
+    if not conv:
+        # No Polis conversation, fall back to DB for this category
+        return _get_unvoted_positions_from_db(
+            user_id, location_id, {category_id: priority}, limit=target
+        )
+
+    try:
+        tids = _get_next_comment_tids(
+            client, user_id, xid, conv["polis_conversation_id"], target)
+    except PolisError as e:
+        print(f"Error fetching from Polis: {e}", flush=True)
+        return _get_unvoted_positions_from_db(
+            user_id, location_id, {category_id: priority}, limit=target
+        )
+
+    # Batch map all tids to positions in ONE query
+    mapped = _batch_polis_comments_to_positions(tids, category_id)
+    for pos in mapped:
+        pos["weight"] = priority
+    return mapped
+
+
+def _get_next_comment_tids(
+    client: PolisClient,
+    user_id: str,
+    xid: str,
+    conversation_id: str,
+    target: int
+) -> List[int]:
+    """Pick up to `target` unvoted comment tids from a Polis conversation.
+
+    The first tid comes from Polis's nextComment. The rest are drawn locally
+    with the same weighted selection nextComment uses, from the cached
+    comment priorities minus the tids the user has already voted on. If the
+    conversation has no math yet, falls back to repeated nextComment calls.
+    """
+    head = client.get_next_comment(conversation_id, xid)
+    if not head:
+        return []  # No more unvoted comments in this conversation
+
+    tids = [head["tid"]]
+    if target <= 1:
+        return tids
+
+    priorities = _get_comment_priorities(conversation_id)
+    if priorities:
+        voted = _get_voted_tids(user_id, conversation_id)
+        candidates = {
+            tid: weight for tid, weight in priorities.items()
+            if weight > 0 and tid not in voted and tid != head["tid"]
+        }
+        tids.extend(_weighted_sample(candidates, target - 1))
+        return tids
+
+    pid = client.get_participant_pid(conversation_id, xid)
+    for _ in range(target - 1):
+        comment = client.get_next_comment(
+            conversation_id, xid, without_tids=tids, pid=pid)
+        if not comment:
+            break
+        tids.append(comment["tid"])
+    return tids
+
+
+def _get_comment_priorities(conversation_id: str) -> Dict[int, float]:
+    """Get comment priorities for a conversation from the shared math cache.
+
+    These are the weights Polis uses for nextComment's probabilistic
+    selection (pca.asPOJO["comment-priorities"]). Empty if the conversation
+    has no math yet.
+    """
+    pca = get_math(conversation_id).get("pca") or {}
+    priorities = (pca.get("asPOJO") or {}).get("comment-priorities") or {}
+    return {int(tid): float(p) for tid, p in priorities.items()}
+
+
+def _get_voted_tids(user_id: str, conversation_id: str) -> set:
+    """Get tids in a conversation the user responded to or authored."""
+    rows = db.execute_query("""
+        SELECT pc.polis_comment_tid
+        FROM polis_comment pc
+        JOIN position p ON pc.position_id = p.id
+        LEFT JOIN response r ON r.position_id = p.id AND r.user_id = %s
+        WHERE pc.polis_conversation_id = %s
+          AND (r.id IS NOT NULL OR p.creator_user_id = %s)
+    """, (user_id, conversation_id, user_id))
+    return {row["polis_comment_tid"] for row in (rows or [])}
+
+
+def _weighted_sample(weights: Dict[int, float], k: int) -> List[int]:
+    """Weighted random sample of k keys without replacement (Efraimidis-Spirakis)."""
+    if k <= 0 or not weights:
+        return []
+    keyed = ((random.random() ** (1.0 / w), tid) for tid, w in weights.items())
+    return [tid for _, tid in heapq.nlargest(k, keyed)]
 
 
 def _get_unvoted_positions_from_db(
@@ -562,10 +657,7 @@ def _get_unvoted_positions_from_db(
                u.status as creator_status, u.trust_score as creator_trust_score,
                u.avatar_url as creator_avatar_url,
                u.avatar_icon_url as creator_avatar_icon_url,
-               COALESCE((
-                   SELECT COUNT(*) FROM kudos k
-                   WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-               ), 0) as creator_kudos_count,
+               u.kudos_received_count as creator_kudos_count,
                pc.label as category_name, l.code as location_code, l.name as location_name,
                up.id as user_position_id
         FROM position p
@@ -625,10 +717,7 @@ def _batch_polis_comments_to_positions(
         SELECT pc.polis_comment_tid, pc.position_id, p.statement, p.creator_user_id,
                u.display_name, u.username, u.status, u.trust_score,
                u.avatar_url, u.avatar_icon_url,
-               COALESCE((
-                   SELECT COUNT(*) FROM kudos k
-                   WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-               ), 0) as kudos_count,
+               u.kudos_received_count as kudos_count,
                pcat.label as category_name, l.code as location_code, l.name as location_name,
                up.id as user_position_id
         FROM polis_comment pc
@@ -0,0 +1,361 @@
+"""
+Push notification outbox and batched Expo dispatcher.
+
+Request handlers never talk to Expo directly: they push a message onto a
+Redis outbox and return. A background dispatcher thread (one per process,
+all draining the same outbox) claims up to PUSH_BATCH_SIZE messages at a
+time and sends them in a single Expo batch request over a pooled
+keep-alive session.
+
+Redis layout:
+- push:outbox          LIST of JSON messages, in send order
+- push:retry           ZSET JSON message -> unix time it is due again
+- push:receipts        ZSET Expo ticket id -> unix time it was issued
+- push:receipt_tokens  HASH Expo ticket id -> push token it was sent to
+
+Failed sends (network errors, 429/5xx, MessageRateExceeded tickets) are
+retried with exponential backoff up to PUSH_MAX_ATTEMPTS. Receipts are
+checked PUSH_RECEIPT_DELAY seconds after sending, as Expo recommends; a
+DeviceNotRegistered ticket or receipt clears the user's push token.
+users.notifications_sent_today is updated once per batch for every
+recipient that Expo accepted.
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from candid.controllers import db, config
+from candid.controllers.helpers.redis_pool import get_redis
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_KEY = "push:outbox"
+RETRY_KEY = "push:retry"
+RECEIPTS_KEY = "push:receipts"
+RECEIPT_TOKENS_KEY = "push:receipt_tokens"
+
+RECEIPT_BATCH_SIZE = 1000  # Expo's getReceipts limit
+RETRYABLE_TICKET_ERRORS = {"MessageRateExceeded"}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> requests.Session:
+    """Keep-alive session shared by the dispatcher's send and receipt calls."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=4))
+            session.headers.update({
+                "Content-Type": "application/json",
+                "Accept": "application/json",
+            })
+            _session = session
+        return _session
+
+
+# ========== Enqueue (called from request handlers) ==========
+
+def enqueue(message: Dict, recipient_user_id: Optional[str] = None) -> bool:
+    """Add an Expo message to the outbox.
+
+    Args:
+        message: Expo push message ({"to", "title", "body", ...})
+        recipient_user_id: Recipient user ID (for the daily counter)
+
+    Returns:
+        True if queued, False if Redis is unavailable
+    """
+    entry = {
+        "id": uuid.uuid4().hex,
+        "message": message,
+        "user_id": str(recipient_user_id) if recipient_user_id else None,
+        "attempts": 0,
+    }
+    try:
+        get_redis().rpush(OUTBOX_KEY, json.dumps(entry))
+        return True
+    except Exception as e:
+        logger.warning("Error queueing push notification: %s", e)
+        return False
+
+
+def outbox_stats() -> Dict[str, int]:
+    """Backlog sizes, for health checks and dashboards."""
+    r = get_redis()
+    pipe = r.pipeline()
+    pipe.llen(OUTBOX_KEY)
+    pipe.zcard(RETRY_KEY)
+    pipe.zcard(RECEIPTS_KEY)
+    outbox, retry, receipts = pipe.execute()
+    return {"outbox": outbox, "retry": retry, "pending_receipts": receipts}
+
+
+# ========== Dispatch ==========
+
+def _claim_batch(batch_size: int) -> List[Dict]:
+    """Atomically pop up to batch_size entries; safe across processes."""
+    pipe = get_redis().pipeline()
+    pipe.lrange(OUTBOX_KEY, 0, batch_size - 1)
+    pipe.ltrim(OUTBOX_KEY, batch_size, -1)
+    raw, _ = pipe.execute()
+    return [json.loads(item) for item in raw or []]
+
+
+def _promote_due_retries(now: float) -> int:
+    """Move retries whose backoff has elapsed back onto the outbox."""
+    r = get_redis()
+    due = r.zrangebyscore(RETRY_KEY, 0, now)
+    promoted = 0
+    for item in due:
+        # ZREM decides which process owns the retry
+        if r.zrem(RETRY_KEY, item):
+            r.rpush(OUTBOX_KEY, item)
+            promoted += 1
+    return promoted
+
+
+def _schedule_retry(entries: List[Dict], reason: str, now: float):
+    """Back off and requeue entries, dropping those out of attempts."""
+    r = get_redis()
+    pipe = r.pipeline()
+    for entry in entries:
+        entry["attempts"] += 1
+        if entry["attempts"] >= config.PUSH_MAX_ATTEMPTS:
+            logger.error("Dropping push notification %s after %d attempts: %s",
+                         entry["id"], entry["attempts"], reason)
+            continue
+        delay = config.PUSH_RETRY_BASE_DELAY * (2 ** (entry["attempts"] - 1))
+        pipe.zadd(RETRY_KEY, {json.dumps(entry): now + delay})
+    pipe.execute()
+
+
+def _clear_push_tokens(tokens: List[str]):
+    """Forget tokens Expo reports as no longer registered."""
+    if not tokens:
+        return
+    db.execute_query(
+        "UPDATE users SET push_token = NULL WHERE push_token = ANY(%s)",
+        (list(set(tokens)),)
+    )
+
+
+def _increment_sent_counters(user_ids: List[str]):
+    """Bump notifications_sent_today for every delivered message in one statement."""
+    counts = Counter(uid for uid in user_ids if uid)
+    if not counts:
+        return
+    today = datetime.now().date()
+    db.execute_query("""
+        UPDATE users u
+        SET notifications_sent_today = CASE
+                WHEN u.notifications_sent_date = %s THEN u.notifications_sent_today + v.n
+                ELSE v.n
+            END,
+            notifications_sent_date = %s
+        FROM unnest(%s::uuid[], %s::int[]) AS v(id, n)
+        WHERE u.id = v.id
+    """, (today, today, list(counts.keys()), list(counts.values())))
+
+
+def send_batch(entries: List[Dict]) -> int:
+    """Send entries in one Expo request and process the tickets.
+
+    Returns the number of messages Expo accepted.
+    """
+    if not entries:
+        return 0
+    now = time.time()
+
+    try:
+        response = _get_session().post(
+            f"{config.EXPO_PUSH_API_URL}/send",
+            data=json.dumps([e["message"] for e in entries]),
+            timeout=config.PUSH_SEND_TIMEOUT,
+        )
+    except requests.exceptions.RequestException as e:
+        _schedule_retry(entries, f"request failed: {e}", now)
+        return 0
+
+    if response.status_code == 429 or response.status_code >= 500:
+        _schedule_retry(entries, f"HTTP {response.status_code}", now)
+        return 0
+    if response.status_code != 200:
+        logger.error("Expo rejected push batch of %d (HTTP %d): %s",
+                     len(entries), response.status_code, response.text[:500])
+        return 0
+
+    tickets = response.json().get("data") or []
+    delivered, retry, unregistered = [], [], []
+    pipe = get_redis().pipeline()
+    for entry, ticket in zip(entries, tickets):
+        if ticket.get("status") == "ok":
+            delivered.append(entry)
+            if ticket.get("id"):
+                pipe.zadd(RECEIPTS_KEY, {ticket["id"]: now})
+                pipe.hset(RECEIPT_TOKENS_KEY, ticket["id"], entry["message"]["to"])
+            continue
+        error = (ticket.get("details") or {}).get("error")
+        if error == "DeviceNotRegistered":
+            unregistered.append(entry["message"]["to"])
+        elif error in RETRYABLE_TICKET_ERRORS:
+            retry.append(entry)
+        else:
+            logger.error("Expo push ticket error for %s: %s", entry["id"], ticket.get("message"))
+    if len(tickets) < len(entries):
+        retry.extend(entries[len(tickets):])
+    pipe.execute()
+
+    if retry:
+        _schedule_retry(retry, "rejected by Expo", now)
+    _clear_push_tokens(unregistered)
+    _increment_sent_counters([e["user_id"] for e in delivered])
+    return len(delivered)
+
+
+def check_receipts(now: Optional[float] = None) -> int:
+    """Fetch receipts for tickets older than PUSH_RECEIPT_DELAY.
+
+    Returns the number of receipts processed.
+    """
+    now = now or time.time()
+    r = get_redis()
+    ids = r.zrangebyscore(RECEIPTS_KEY, 0, now - config.PUSH_RECEIPT_DELAY,
+                          start=0, num=RECEIPT_BATCH_SIZE)
+    if not ids:
+        return 0
+
+    pipe = r.pipeline()
+    for ticket_id in ids:
+        pipe.zrem(RECEIPTS_KEY, ticket_id)
+    claimed = [tid for tid, won in zip(ids, pipe.execute()) if won]
+    if not claimed:
+        return 0
+    tokens = dict(zip(claimed, r.hmget(RECEIPT_TOKENS_KEY, claimed)))
+    r.hdel(RECEIPT_TOKENS_KEY, *claimed)
+
+    try:
+        response = _get_session().post(
+            f"{config.EXPO_PUSH_API_URL}/getReceipts",
+            data=json.dumps({"ids": claimed}),
+            timeout=config.PUSH_SEND_TIMEOUT,
+        )
+        response.raise_for_status()
+        receipts = response.json().get("data") or {}
+    except (requests.exceptions.RequestException, ValueError) as e:
+        logger.warning("Error fetching push receipts: %s", e)
+        # Put them back to be checked on a later cycle
+        pipe = r.pipeline()
+        for ticket_id in claimed:
+            pipe.zadd(RECEIPTS_KEY, {ticket_id: now})
+            if tokens.get(ticket_id):
+                pipe.hset(RECEIPT_TOKENS_KEY, ticket_id, tokens[ticket_id])
+        pipe.execute()
+        return 0
+
+    unregistered = []
+    for ticket_id, receipt in receipts.items():
+        if receipt.get("status") == "ok":
+            continue
+        error = (receipt.get("details") or {}).get("error")
+        if error == "DeviceNotRegistered" and tokens.get(ticket_id):
+            unregistered.append(tokens[ticket_id])
+        else:
+            logger.warning("Push receipt error for ticket %s: %s", ticket_id, receipt.get("message"))
+    _clear_push_tokens(unregistered)
+    return len(claimed)
+
+
+# ========== Worker ==========
+
+class PushDispatcher:
+    """Background worker that drains the push outbox."""
+
+    def __init__(self, poll_interval: float = 1.0, receipt_interval: float = 60.0):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            poll_interval: Seconds to wait when the outbox is empty
+            receipt_interval: Seconds between receipt checks
+        """
+        self.poll_interval = poll_interval
+        self.receipt_interval = receipt_interval
+        self._last_receipt_check = 0.0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background dispatcher thread."""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        print("Push dispatcher started", flush=True)
+
+    def stop(self):
+        """Stop the background dispatcher."""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        print("Push dispatcher stopped", flush=True)
+
+    def _run_loop(self):
+        """Main dispatcher loop."""
+        while self._running:
+            try:
+                processed = self.process_batch()
+                if processed == 0:
+                    time.sleep(self.poll_interval)
+            except Exception as e:
+                logger.error("Push dispatcher error: %s", e, exc_info=True)
+                time.sleep(self.poll_interval)
+
+    def process_batch(self) -> int:
+        """Run one dispatch cycle. Returns the number of messages claimed."""
+        now = time.time()
+        _promote_due_retries(now)
+        if now - self._last_receipt_check >= self.receipt_interval:
+            self._last_receipt_check = now
+            check_receipts(now)
+
+        entries = _claim_batch(config.PUSH_BATCH_SIZE)
+        if entries:
+            send_batch(entries)
+        return len(entries)
+
+
+# ========== Singleton Worker ==========
+
+_worker: Optional[PushDispatcher] = None
+
+
+def start_worker():
+    """Start the singleton push dispatcher."""
+    global _worker
+    if _worker is None:
+        _worker = PushDispatcher()
+    _worker.start()
+
+
+def stop_worker():
+    """Stop the singleton push dispatcher."""
+    global _worker
+    if _worker:
+        _worker.stop()
+        _worker = None
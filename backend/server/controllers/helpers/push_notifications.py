@@ -1,5 +1,11 @@
 """
 Push notification helpers using the Expo Push API.
+
+Handlers call queue_push_notification (directly or via
+send_or_queue_notification), which hands the message to the Redis outbox in
+helpers/push_dispatcher.py and returns immediately. send_push_notification
+is the synchronous single-message path, used when PUSH_OUTBOX_ENABLED is off
+or Redis is unavailable.
 """
 
 import json
@@ -9,10 +15,13 @@ import urllib.error
 from datetime import datetime
 from zoneinfo import ZoneInfo
 
+from candid.controllers import config
+from candid.controllers.helpers import push_dispatcher
+
 
 logger = logging.getLogger(__name__)
 
-EXPO_PUSH_URL = "https://exp.host/--/api/v2/push/send"
+EXPO_PUSH_URL = f"{config.EXPO_PUSH_API_URL}/send"
 
 # Maps notification_frequency (0-5) to daily cap
 FREQUENCY_CAPS = {
@@ -25,8 +34,43 @@ FREQUENCY_CAPS = {
 }
 
 
+def _build_message(push_token, title, body, data=None):
+    """Expo push message with the body truncated for display."""
+    short_body = body[:120] + "..." if len(body) > 120 else body
+
+    payload = {
+        "to": push_token,
+        "sound": "default",
+        "title": title,
+        "body": short_body,
+    }
+    if data:
+        payload["data"] = data
+    return payload
+
+
+def queue_push_notification(push_token, title, body, data=None, db=None, recipient_user_id=None):
+    """Queue a push notification for the background dispatcher.
+
+    Falls back to sending inline when the outbox is disabled or Redis is
+    unavailable. Arguments are the same as send_push_notification.
+
+    Returns:
+        True if queued or sent, False otherwise
+    """
+    if not push_token:
+        return False
+
+    if config.PUSH_OUTBOX_ENABLED:
+        message = _build_message(push_token, title, body, data)
+        if push_dispatcher.enqueue(message, recipient_user_id):
+            return True
+
+    return send_push_notification(push_token, title, body, data, db, recipient_user_id)
+
+
 def send_push_notification(push_token, title, body, data=None, db=None, recipient_user_id=None):
-    """Send a push notification via Expo Push API.
+    """Send a push notification via Expo Push API, blocking until Expo responds.
 
     Args:
         push_token: The recipient's Expo push token
@@ -42,17 +86,7 @@ def send_push_notification(push_token, title, body, data=None, db=None, recipien
     if not push_token:
         return False
 
-    # Truncate body for notification
-    short_body = body[:120] + "..." if len(body) > 120 else body
-
-    payload = {
-        "to": push_token,
-        "sound": "default",
-        "title": title,
-        "body": short_body,
-    }
-    if data:
-        payload["data"] = data
+    payload = _build_message(push_token, title, body, data)
 
     try:
         encoded = json.dumps(payload).encode("utf-8")
@@ -90,10 +124,10 @@ def send_push_notification(push_token, title, body, data=None, db=None, recipien
 def send_chat_request_notification(push_token, initiator_display_name, position_statement, db=None, recipient_user_id=None):
     """Send a push notification for a new chat request.
 
-    Wrapper around send_push_notification for backward compatibility.
+    Wrapper around queue_push_notification for backward compatibility.
     """
     short_statement = position_statement[:80] + "..." if len(position_statement) > 80 else position_statement
-    return send_push_notification(
+    return queue_push_notification(
         push_token,
         f"{initiator_display_name} wants to chat",
         short_statement,
@@ -173,21 +207,24 @@ def _is_in_quiet_hours(user_row):
         return False
 
 
-def _is_under_frequency_cap(user_row):
-    """Check if user is under their daily notification frequency cap."""
+def _remaining_daily_quota(user_row):
+    """Number of notifications the user can still receive today."""
     freq = user_row.get("notification_frequency", 3)
     cap = FREQUENCY_CAPS.get(freq, 10)
-    if cap == 0:
-        return False
 
     today = datetime.now().date()
     sent_date = user_row.get("notifications_sent_date")
     sent_today = user_row.get("notifications_sent_today", 0)
 
     if sent_date and sent_date == today:
-        return sent_today < cap
+        return max(cap - (sent_today or 0), 0)
 
-    return True  # Different date, counter is effectively 0
+    return cap  # Different date, counter is effectively 0
+
+
+def _is_under_frequency_cap(user_row):
+    """Check if user is under their daily notification frequency cap."""
+    return _remaining_daily_quota(user_row) > 0
 
 
 def send_or_queue_notification(title, body, data, recipient_user_id, db):
@@ -196,7 +233,7 @@ def send_or_queue_notification(title, body, data, recipient_user_id, db):
     1. Load recipient's notification settings
     2. If notifications disabled or over cap → drop silently
     3. If in quiet hours → queue in notification_queue table
-    4. Otherwise → send immediately
+    4. Otherwise → queue for the push dispatcher
 
     Args:
         title: Notification title
@@ -232,10 +269,10 @@ def send_or_queue_notification(title, body, data, recipient_user_id, db):
         """, (str(recipient_user_id), title, body, json.dumps(data or {})))
         return
 
-    # Send immediately
+    # Send now (via the dispatcher outbox)
     push_token = user_row.get("push_token")
     if push_token:
-        send_push_notification(push_token, title, body, data, db, str(recipient_user_id))
+        queue_push_notification(push_token, title, body, data, db, str(recipient_user_id))
 
 
 def drain_notification_queue(user_id, db):
@@ -271,19 +308,21 @@ def drain_notification_queue(user_id, db):
         db.execute_query("DELETE FROM notification_queue WHERE user_id = %s", (str(user_id),))
         return
 
-    # Fetch and send queued notifications
+    remaining = _remaining_daily_quota(user_row)
+    if remaining <= 0:
+        return  # Hit daily cap, keep the rest queued for tomorrow
+
+    # Fetch and send queued notifications, oldest first, up to the daily cap
     queued = db.execute_query("""
         SELECT id, title, body, data FROM notification_queue
         WHERE user_id = %s ORDER BY created_time ASC
-    """, (str(user_id),))
+        LIMIT %s
+    """, (str(user_id), remaining))
 
     if not queued:
         return
 
     for notification in queued:
-        if not _is_under_frequency_cap(user_row):
-            break  # Hit daily cap, stop sending
-
         data = notification.get("data")
         if isinstance(data, str):
             try:
@@ -291,7 +330,7 @@ def drain_notification_queue(user_id, db):
             except Exception:
                 data = {}
 
-        send_push_notification(
+        queue_push_notification(
             push_token,
             notification["title"],
             notification["body"],
@@ -300,11 +339,7 @@ def drain_notification_queue(user_id, db):
             str(user_id),
         )
 
-        # Delete sent notification
-        db.execute_query("DELETE FROM notification_queue WHERE id = %s", (notification["id"],))
-
-        # Refresh user row for updated counter
-        user_row = db.execute_query("""
-            SELECT notification_frequency, notifications_sent_today, notifications_sent_date
-            FROM users WHERE id = %s
-        """, (str(user_id),), fetchone=True)
+    db.execute_query(
+        "DELETE FROM notification_queue WHERE id = ANY(%s::uuid[])",
+        ([str(n["id"]) for n in queued],)
+    )
@@ -0,0 +1,379 @@
+"""
+Two-tier shared cache: per-process LRU in front of Redis.
+
+Replaces module-level dict caches that lived separately in every gunicorn
+worker and could only expire by TTL. Each cache is a named namespace:
+
+- Tier 1: an in-process LRU (bounded by CACHE_LOCAL_MAXSIZE entries and
+  CACHE_LOCAL_TTL seconds) so hot keys cost no network round trip.
+- Tier 2: Redis, shared by all workers, holding JSON values under versioned
+  keys with the namespace's own TTL.
+
+Redis layout (per namespace):
+- cache:{namespace}:version          STRING, INCR'd to invalidate the whole namespace
+- cache:{namespace}:{version}:{key}  STRING, JSON-encoded value
+- cache:{namespace}:keyver:{key}     STRING, INCR'd when one key is invalidated
+
+A loader's result is only written back if neither version moved while it
+ran, so an invalidation that lands mid-load is not overwritten with the
+value read before it.
+
+Invalidations are published on the ``cache:invalidate`` channel. A daemon
+listener thread in every process drops the matching local entries as soon as
+the message arrives, so callers can raise TTLs without serving stale data.
+CACHE_LOCAL_TTL bounds staleness if a message is ever missed.
+
+Redis failures degrade to the local tier plus the loader, never to an error.
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from candid.controllers import config
+from candid.controllers.helpers.redis_pool import get_redis
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "cache:"
+INVALIDATE_CHANNEL = "cache:invalidate"
+
+# Per-key versions only need to outlive a load in progress
+KEY_VERSION_TTL = 3600
+
+_caches: Dict[str, "SharedCache"] = {}
+_caches_lock = threading.Lock()
+
+
+def _version_key(namespace: str) -> str:
+    return f"{KEY_PREFIX}{namespace}:version"
+
+
+def _value_key(namespace: str, version: str, key: str) -> str:
+    return f"{KEY_PREFIX}{namespace}:{version}:{key}"
+
+
+def _key_version_key(namespace: str, key: str) -> str:
+    return f"{KEY_PREFIX}{namespace}:keyver:{key}"
+
+
+def _bump_key_version(r, namespace: str, key: str):
+    pipe = r.pipeline()
+    pipe.incr(_key_version_key(namespace, key))
+    pipe.expire(_key_version_key(namespace, key), KEY_VERSION_TTL)
+    pipe.execute()
+
+
+class SharedCache:
+    """A named cache namespace with a local LRU tier and a Redis tier."""
+
+    def __init__(self, namespace: str, ttl: int, local_ttl: int = None, maxsize: int = None):
+        """
+        Initialize the cache and register it for pub/sub invalidation.
+
+        Args:
+            namespace: Unique name; part of every Redis key and message
+            ttl: Seconds values live in Redis
+            local_ttl: Seconds values live in the local tier (default CACHE_LOCAL_TTL)
+            maxsize: Maximum local entries (default CACHE_LOCAL_MAXSIZE)
+        """
+        self.namespace = namespace
+        self.ttl = ttl
+        self.local_ttl = min(local_ttl or config.CACHE_LOCAL_TTL, ttl)
+        self.maxsize = maxsize or config.CACHE_LOCAL_MAXSIZE
+        self._local: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, value)
+        self._version: Optional[str] = None
+        self._version_expires = 0.0
+        self._lock = threading.Lock()
+        with _caches_lock:
+            _caches[namespace] = self
+
+    # ----- local tier -----
+
+    def _local_get(self, key: str):
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.time():
+                del self._local[key]
+                return None
+            self._local.move_to_end(key)
+            return entry
+
+    def _local_set(self, key: str, value: Any):
+        with self._lock:
+            self._local[key] = (time.time() + self.local_ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.maxsize:
+                self._local.popitem(last=False)
+
+    def drop_local(self, key: Optional[str] = None):
+        """Drop one local entry, or the whole local tier when key is None."""
+        with self._lock:
+            if key is None:
+                self._local.clear()
+                self._version = None
+            else:
+                self._local.pop(key, None)
+
+    # ----- Redis tier -----
+
+    def _current_version(self, r) -> str:
+        """Namespace version, re-read from Redis at most every local_ttl."""
+        now = time.time()
+        if self._version is None or self._version_expires < now:
+            self._version = r.get(_version_key(self.namespace)) or "0"
+            self._version_expires = now + self.local_ttl
+        return self._version
+
+    def get(self, key: str, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, calling loader on a miss.
+
+        None results are returned but not cached.
+        """
+        key = str(key)
+        entry = self._local_get(key)
+        if entry is not None:
+            return entry[1]
+
+        _ensure_listener()
+        r = None
+        redis_key = None
+        versions_keys = [_version_key(self.namespace), _key_version_key(self.namespace, key)]
+        versions = None
+        try:
+            r = get_redis()
+            redis_key = _value_key(self.namespace, self._current_version(r), key)
+            raw, *versions = r.mget([redis_key] + versions_keys)
+            if raw is not None:
+                value = json.loads(raw)
+                self._local_set(key, value)
+                return value
+        except Exception as e:
+            logger.warning("Shared cache read failed for %s:%s: %s", self.namespace, key, e)
+            r = None
+
+        value = loader()
+        if value is None:
+            return None
+
+        if r is None:
+            self._local_set(key, value)
+            return value
+        try:
+            if r.mget(versions_keys) != versions:
+                # Invalidated while loading: the value may predate the change
+                return value
+            self._local_set(key, value)
+            r.setex(redis_key, self.ttl, json.dumps(value, default=str))
+        except Exception as e:
+            logger.warning("Shared cache write failed for %s:%s: %s", self.namespace, key, e)
+        return value
+
+    def get_many(self, keys, loader: Callable[[list], Dict[str, Any]]) -> Dict[str, Any]:
+        """Return {key: value} for keys, calling loader once for all misses.
+
+        loader receives the list of missing keys and returns a dict; keys it
+        omits (or maps to None) are left out of the result and not cached.
+        """
+        keys = list(dict.fromkeys(str(k) for k in keys))
+        result = {}
+        missing = []
+        for key in keys:
+            entry = self._local_get(key)
+            if entry is not None:
+                result[key] = entry[1]
+            else:
+                missing.append(key)
+        if not missing:
+            return result
+
+        _ensure_listener()
+        r = None
+        version = None
+        versions_keys = None
+        versions = None
+        try:
+            r = get_redis()
+            version = self._current_version(r)
+            raws = r.mget([_value_key(self.namespace, version, k) for k in missing])
+            versions_keys = [_version_key(self.namespace)] + [
+                _key_version_key(self.namespace, k) for k in missing
+            ]
+            versions = r.mget(versions_keys)
+            still_missing = []
+            for key, raw in zip(missing, raws):
+                if raw is None:
+                    still_missing.append(key)
+                else:
+                    result[key] = json.loads(raw)
+                    self._local_set(key, result[key])
+            missing = still_missing
+        except Exception as e:
+            logger.warning("Shared cache read failed for %s: %s", self.namespace, e)
+            r = None
+        if not missing:
+            return result
+
+        loaded = {k: v for k, v in (loader(missing) or {}).items() if v is not None}
+        result.update(loaded)
+        if r is None:
+            for key, value in loaded.items():
+                self._local_set(key, value)
+        elif loaded:
+            try:
+                # Skip keys invalidated while loading (all of them if the namespace was)
+                now_versions = dict(zip(versions_keys, r.mget(versions_keys)))
+                before = dict(zip(versions_keys, versions))
+                namespace_key = versions_keys[0]
+                pipe = r.pipeline()
+                for key, value in loaded.items():
+                    key_version_key = _key_version_key(self.namespace, key)
+                    if (now_versions[namespace_key] != before[namespace_key]
+                            or now_versions.get(key_version_key) != before.get(key_version_key)):
+                        continue
+                    self._local_set(key, value)
+                    pipe.setex(_value_key(self.namespace, version, key), self.ttl,
+                               json.dumps(value, default=str))
+                pipe.execute()
+            except Exception as e:
+                logger.warning("Shared cache write failed for %s: %s", self.namespace, e)
+        return result
+
+    def invalidate(self, key: Optional[str] = None):
+        """Invalidate one key, or the whole namespace when key is None.
+
+        The local tier is cleared synchronously; other processes drop their
+        entries when the pub/sub message arrives.
+        """
+        key = None if key is None else str(key)
+        self.drop_local(key)
+        try:
+            r = get_redis()
+            if key is None:
+                r.incr(_version_key(self.namespace))
+            else:
+                _bump_key_version(r, self.namespace, key)
+                r.delete(_value_key(self.namespace, self._current_version(r), key))
+            r.publish(INVALIDATE_CHANNEL, json.dumps({"namespace": self.namespace, "key": key}))
+        except Exception as e:
+            logger.warning("Shared cache invalidation failed for %s:%s: %s", self.namespace, key, e)
+
+
+def invalidate(namespace: str, key: Optional[str] = None):
+    """Invalidate a namespace (or one key in it) by name.
+
+    Lets write paths invalidate a cache without importing the module that owns it.
+    """
+    with _caches_lock:
+        cache = _caches.get(namespace)
+    if cache is not None:
+        cache.invalidate(key)
+        return
+    try:
+        r = get_redis()
+        if key is None:
+            r.incr(_version_key(namespace))
+        else:
+            _bump_key_version(r, namespace, str(key))
+            r.delete(_value_key(namespace, r.get(_version_key(namespace)) or "0", str(key)))
+        r.publish(INVALIDATE_CHANNEL, json.dumps({"namespace": namespace, "key": key}))
+    except Exception as e:
+        logger.warning("Shared cache invalidation failed for %s:%s: %s", namespace, key, e)
+
+
+def handle_message(data: str):
+    """Apply one invalidation message to this process's local tiers."""
+    try:
+        message = json.loads(data)
+    except (TypeError, ValueError):
+        return
+    with _caches_lock:
+        cache = _caches.get(message.get("namespace"))
+    if cache is not None:
+        cache.drop_local(message.get("key"))
+
+
+def _drop_all_local():
+    with _caches_lock:
+        caches = list(_caches.values())
+    for cache in caches:
+        cache.drop_local()
+
+
+# ========== Pub/Sub Listener ==========
+
+class InvalidationListener:
+    """Daemon thread applying invalidation messages from other processes."""
+
+    def __init__(self, reconnect_delay: float = 1.0):
+        self.reconnect_delay = reconnect_delay
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the listener thread."""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the listener."""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run_loop(self):
+        """Subscribe and apply messages, resubscribing after Redis errors."""
+        while self._running:
+            pubsub = None
+            try:
+                pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(INVALIDATE_CHANNEL)
+                # Messages may have been missed while disconnected
+                _drop_all_local()
+                while self._running:
+                    message = pubsub.get_message(timeout=1.0)
+                    if message and message.get("type") == "message":
+                        handle_message(message["data"])
+            except Exception as e:
+                logger.warning("Shared cache listener error: %s", e)
+                time.sleep(self.reconnect_delay)
+            finally:
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+
+
+_listener: Optional[InvalidationListener] = None
+_listener_lock = threading.Lock()
+
+
+def _ensure_listener():
+    """Start this process's listener on first use (after any gunicorn fork)."""
+    global _listener
+    if _listener is not None or not config.CACHE_PUBSUB_ENABLED:
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = InvalidationListener()
+            _listener.start()
+
+
+def stop_listener():
+    """Stop this process's listener, if running."""
+    global _listener
+    with _listener_lock:
+        if _listener:
+            _listener.stop()
+            _listener = None
@@ -3,10 +3,24 @@
 Data-fetching and aggregation helpers for stats endpoints.
 """
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from candid.controllers import db
 
+DEMOGRAPHIC_FIELDS = ("lean", "education", "geoLocale", "sex", "race", "ageRange", "incomeRange")
+
+# Maps a Polis pid -> group index assignment (two parallel int arrays) to the
+# Candid users in each group, so every group is handled by a single query.
+_GROUP_MEMBERS_CTE = """
+    WITH group_member AS (
+        SELECT DISTINCT a.group_idx, pp.user_id
+        FROM unnest(%s::int[], %s::int[]) AS a(pid, group_idx)
+        JOIN polis_participant pp
+          ON pp.polis_conversation_id = %s
+         AND pp.polis_pid = a.pid
+    )
+"""
+
 
 def empty_demographics(
     group_id: str, group_label: str = "All", member_count: int = 0
@@ -27,52 +41,6 @@ def empty_demographics(
     }
 
 
-def aggregate_demographics(
-    demographics: List[Dict],
-    group_id: str,
-    group_label: str,
-    member_count: int,
-) -> Dict[str, Any]:
-    """Aggregate demographic data into counts per category."""
-    lean_counts: Dict[str, int] = {}
-    education_counts: Dict[str, int] = {}
-    geo_locale_counts: Dict[str, int] = {}
-    sex_counts: Dict[str, int] = {}
-    race_counts: Dict[str, int] = {}
-    age_range_counts: Dict[str, int] = {}
-    income_range_counts: Dict[str, int] = {}
-
-    for d in demographics:
-        if d.get("lean"):
-            lean_counts[d["lean"]] = lean_counts.get(d["lean"], 0) + 1
-        if d.get("education"):
-            education_counts[d["education"]] = education_counts.get(d["education"], 0) + 1
-        if d.get("geo_locale"):
-            geo_locale_counts[d["geo_locale"]] = geo_locale_counts.get(d["geo_locale"], 0) + 1
-        if d.get("sex"):
-            sex_counts[d["sex"]] = sex_counts.get(d["sex"], 0) + 1
-        if d.get("race"):
-            race_counts[d["race"]] = race_counts.get(d["race"], 0) + 1
-        if d.get("age_range"):
-            age_range_counts[d["age_range"]] = age_range_counts.get(d["age_range"], 0) + 1
-        if d.get("income_range"):
-            income_range_counts[d["income_range"]] = income_range_counts.get(d["income_range"], 0) + 1
-
-    return {
-        "groupId": group_id,
-        "groupLabel": group_label,
-        "memberCount": member_count,
-        "respondentCount": len(demographics),
-        "lean": lean_counts,
-        "education": education_counts,
-        "geoLocale": geo_locale_counts,
-        "sex": sex_counts,
-        "race": race_counts,
-        "ageRange": age_range_counts,
-        "incomeRange": income_range_counts,
-    }
-
-
 def get_user_votes(
     user_id: str,
     category_id: Optional[str],
@@ -187,3 +155,108 @@ def get_overall_vote_dist(
             "pass": round(total_pass / total_saw, 3),
         }, total_votes
     return {"agree": 0, "disagree": 0, "pass": 0}, total_votes
+
+
+def group_assignment(group_clusters: List[Dict]) -> Tuple[List[int], List[int]]:
+    """Flatten Polis group-clusters into parallel (pids, group indexes) arrays."""
+    pids: List[int] = []
+    group_idxs: List[int] = []
+    for group_idx, cluster in enumerate(group_clusters):
+        if not cluster:
+            continue
+        members = cluster.get("members", [])
+        pids.extend(members)
+        group_idxs.extend([group_idx] * len(members))
+    return pids, group_idxs
+
+
+def get_demographic_counts_by_group(
+    polis_conv_id: str, group_clusters: List[Dict]
+) -> Dict[str, Dict[str, Any]]:
+    """Count demographics for every opinion group in one query.
+
+    Returns {group_id: {"respondentCount": n, "lean": {...}, ...}}. Every
+    user with a demographics row counts as a respondent; blank fields are
+    left out of that field's counts. Groups without any respondents are
+    omitted.
+    """
+    pids, group_idxs = group_assignment(group_clusters)
+    if not pids:
+        return {}
+
+    rows = db.execute_query(_GROUP_MEMBERS_CTE + """
+        SELECT gm.group_idx, f.field, f.value, COUNT(*) AS n
+        FROM group_member gm
+        JOIN user_demographics d ON d.user_id = gm.user_id
+        CROSS JOIN LATERAL (VALUES
+            ('respondentCount', ''),
+            ('lean', d.lean),
+            ('education', d.education),
+            ('geoLocale', d.geo_locale),
+            ('sex', d.sex),
+            ('race', d.race),
+            ('ageRange', d.age_range),
+            ('incomeRange', d.income_range)
+        ) AS f(field, value)
+        WHERE f.field = 'respondentCount' OR f.value <> ''
+        GROUP BY gm.group_idx, f.field, f.value
+        ORDER BY gm.group_idx
+    """, (pids, group_idxs, polis_conv_id))
+
+    counts: Dict[str, Dict[str, Any]] = {}
+    for row in rows or []:
+        group = counts.setdefault(
+            str(row["group_idx"]),
+            {"respondentCount": 0, **{field: {} for field in DEMOGRAPHIC_FIELDS}},
+        )
+        if row["field"] == "respondentCount":
+            group["respondentCount"] = row["n"]
+        else:
+            group[row["field"]][row["value"]] = row["n"]
+    return counts
+
+
+def merge_demographic_counts(counts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sum per-group demographic counts (e.g. for the 'all' groups view)."""
+    merged: Dict[str, Any] = {"respondentCount": 0, **{field: {} for field in DEMOGRAPHIC_FIELDS}}
+    for group in counts:
+        merged["respondentCount"] += group.get("respondentCount", 0)
+        for field in DEMOGRAPHIC_FIELDS:
+            for value, n in group.get(field, {}).items():
+                merged[field][value] = merged[field].get(value, 0) + n
+    return merged
+
+
+def get_pairwise_counts_by_group(
+    polis_conv_id: str, survey_id: str, group_clusters: List[Dict]
+) -> Dict[str, List[Dict]]:
+    """Tally a pairwise survey's responses per opinion group in one query.
+
+    Returns {group_id: [{"winner_item_id", "loser_item_id", "n"}, ...]},
+    ready for build_victory_matrix. Every group with at least one Candid
+    user is present, with an empty list if none of them responded.
+    """
+    pids, group_idxs = group_assignment(group_clusters)
+    if not pids:
+        return {}
+
+    rows = db.execute_query(_GROUP_MEMBERS_CTE + """
+        SELECT gm.group_idx, pr.winner_item_id, pr.loser_item_id, COUNT(pr.id) AS n
+        FROM group_member gm
+        LEFT JOIN pairwise_response pr
+          ON pr.user_id = gm.user_id
+         AND pr.survey_id = %s::uuid
+        GROUP BY gm.group_idx, pr.winner_item_id, pr.loser_item_id
+        ORDER BY gm.group_idx
+    """, (pids, group_idxs, polis_conv_id, survey_id))
+
+    tallies: Dict[str, List[Dict]] = {}
+    for row in rows or []:
+        group = tallies.setdefault(str(row["group_idx"]), [])
+        if row["winner_item_id"] is not None:
+            group.append({
+                "winner_item_id": row["winner_item_id"],
+                "loser_item_id": row["loser_item_id"],
+                "n": row["n"],
+            })
+    return tallies
@@ -0,0 +1,119 @@
+"""Materialized stats snapshots for get_stats / get_location_stats.
+
+The user-independent part of a stats response (opinion groups with their
+labels, representative and consensus positions with closure counts, report
+URL) only changes when Polis publishes new math or when pairwise labeling
+responses come in. It is built once per
+
+    (location, category, math_tick, responses version)
+
+and served from the shared cache; the controllers overlay the per-user
+fields (userPosition, userVotes, userPositionIds and the user's own
+positions) on top of the prebuilt dict.
+
+Redis layout:
+- stats:responses:{location_id}  STRING counter, INCR'd on every pairwise
+                                 response in the location, so labels
+                                 re-rank without waiting for a math tick
+- cache:stats_snapshot:...       snapshot dicts (see shared_cache.py)
+
+Position votes are not counted here: they reach the snapshot through Polis,
+which advances math_tick once it has recomputed.
+"""
+
+import logging
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from candid.controllers import config
+from candid.controllers.helpers.redis_pool import get_redis
+from candid.controllers.helpers.shared_cache import SharedCache
+
+logger = logging.getLogger(__name__)
+
+RESPONSES_KEY = "stats:responses:{location_id}"
+
+_snapshot_cache = SharedCache("stats_snapshot", ttl=config.STATS_SNAPSHOT_TTL)
+
+
+def note_responses(location_id: Optional[str]):
+    """Bump a location's responses version so its snapshots rebuild."""
+    if not location_id:
+        return
+    try:
+        get_redis().incr(RESPONSES_KEY.format(location_id=location_id))
+    except Exception as e:
+        logger.warning(f"Failed to bump stats responses version for {location_id}: {e}")
+
+
+def responses_version(location_id: Optional[str]) -> str:
+    """Current responses version of a location ("0" if none recorded)."""
+    if not location_id:
+        return "0"
+    try:
+        return get_redis().get(RESPONSES_KEY.format(location_id=location_id)) or "0"
+    except Exception as e:
+        logger.warning(f"Failed to read stats responses version for {location_id}: {e}")
+        return "0"
+
+
+def snapshot_key(location_id: str, category_id: Optional[str], math_tick: Any, version: str) -> str:
+    return f"{location_id}:{category_id or 'all'}:{math_tick}:{version}"
+
+
+def get_snapshot(
+    location_id: str,
+    category_id: Optional[str],
+    math_tick: Any,
+    builder: Callable[[], Dict[str, Any]],
+) -> Dict[str, Any]:
+    """
+    Get the stats snapshot for a location/category at a math tick.
+
+    Args:
+        location_id: Location UUID
+        category_id: Category UUID, or None for the location-wide conversation
+        math_tick: Polis math_tick of the math the snapshot is built from
+        builder: Builds the snapshot dict on a miss (camelCase, JSON-safe)
+
+    Returns:
+        The snapshot dict with builtAt added; treat it as read-only
+    """
+    def build():
+        snapshot = builder()
+        snapshot["mathTick"] = math_tick
+        snapshot["builtAt"] = datetime.now(timezone.utc).isoformat()
+        return snapshot
+
+    key = snapshot_key(location_id, category_id, math_tick, responses_version(location_id))
+    return _snapshot_cache.get(key, build)
+
+
+def overlay_user_fields(
+    snapshot: Dict[str, Any],
+    user_position: Optional[Dict[str, Any]] = None,
+    user_votes: Optional[Dict[str, str]] = None,
+    user_position_ids: Optional[List[str]] = None,
+    user_positions: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Build a stats response body from a snapshot plus one user's fields.
+
+    The snapshot is not modified. user_positions (the user's own positions
+    missing from the snapshot) go after the snapshot's positions, which is
+    where their zero representativeness sorts them.
+
+    Returns:
+        StatsResponse-shaped dict with None fields omitted
+    """
+    body = {
+        "conversationId": snapshot.get("conversationId"),
+        "polisReportUrl": snapshot.get("polisReportUrl"),
+        "computedAt": snapshot.get("builtAt"),
+        "groups": snapshot.get("groups", []),
+        "userPosition": user_position,
+        "positions": snapshot.get("positions", []) + (user_positions or []),
+        "userVotes": user_votes,
+        "userPositionIds": user_position_ids,
+    }
+    return {k: v for k, v in body.items() if v is not None}
@@ -0,0 +1,71 @@
+"""
+Approximate nearest-neighbour search over position embeddings.
+
+position.embedding has an HNSW index (vector_cosine_ops). Postgres only uses
+it for a plain ``ORDER BY embedding <=> q LIMIT k``; a similarity predicate in
+WHERE, or joins and filters ahead of the ordering, fall back to an exact
+sequential scan over every position. Searches therefore fetch the k nearest
+candidates first (CANDIDATES_SQL) and apply status, ownership, location and
+similarity filters to that small set afterwards.
+
+k is the requested page size times VECTOR_SEARCH_OVERFETCH, so filtered-out
+candidates rarely leave a page short; callers that page deep into results
+widen k step by step up to MAX_EF_SEARCH. hnsw.ef_search, the size of the index's
+candidate list (recall vs latency), is raised per transaction to at least k
+because HNSW never returns more than ef_search rows.
+"""
+
+import logging
+from typing import List, Optional
+
+from candid.controllers import db, config
+from candid.controllers.helpers.database import DatabaseError
+
+logger = logging.getLogger(__name__)
+
+# pgvector's upper bound for hnsw.ef_search
+MAX_EF_SEARCH = 1000
+
+# Nearest candidates by cosine distance; params: (embedding, embedding, k).
+# Embed as a CTE and join filters onto it. MATERIALIZED keeps the planner
+# from pushing outer predicates down into the index scan.
+CANDIDATES_SQL = """
+    SELECT id, embedding <=> %s::vector AS distance
+    FROM position
+    WHERE embedding IS NOT NULL
+    ORDER BY embedding <=> %s::vector
+    LIMIT %s
+"""
+
+
+def candidate_limit(wanted: int) -> int:
+    """Number of nearest candidates to fetch for `wanted` filtered results."""
+    return max(1, min(wanted * config.VECTOR_SEARCH_OVERFETCH, MAX_EF_SEARCH))
+
+
+def widen(k: int) -> int:
+    """Next candidate count to try when filters left a page short."""
+    return min(k * 2, MAX_EF_SEARCH)
+
+
+def ef_search_for(k: int) -> int:
+    """hnsw.ef_search to use when fetching k candidates."""
+    return min(max(config.VECTOR_EF_SEARCH, k), MAX_EF_SEARCH)
+
+
+def execute_search(query: str, params: tuple, k: int) -> Optional[List[dict]]:
+    """Run a query built on CANDIDATES_SQL with ef_search sized for k.
+
+    SET LOCAL only lasts for the transaction, so the setting never leaks to
+    other requests sharing the pooled connection. Returns None on database
+    errors, like db.execute_query.
+    """
+    try:
+        with db.transaction() as cur:
+            cur.execute("SELECT set_config('hnsw.ef_search', %s, true)",
+                        (str(ef_search_for(k)),))
+            cur.execute(query, params)
+            return cur.fetchall()
+    except DatabaseError as e:
+        logger.error("Vector search failed: %s", e)
+        return None
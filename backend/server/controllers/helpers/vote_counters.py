@@ -0,0 +1,366 @@
+"""
+Incremental vote counters for posts and comments.
+
+Casting, changing or removing a vote writes the vote row and applies the
+old -> new difference to the item's upvote_count, downvote_count,
+weighted_upvotes and weighted_downvotes in the same statement, which
+returns the new counters. Nothing re-aggregates the item's votes on the
+request path, so a vote costs the same on a post with 5 votes as on one
+with 50,000.
+
+Callers compute score (and the feed scores for posts) from the returned
+counters with helpers/scoring.py and store them with write_scores, which
+skips the write if another vote has moved the counters in the meantime
+(that vote writes its own, newer scores).
+
+Counters can still drift (e.g. two first votes by the same user racing
+on the unique constraint). Every vote records its item as touched, and
+VoteCounterReconciler re-aggregates the items touched since its last run
+every VOTE_RECONCILE_INTERVAL seconds, repairing drifted ones (scores
+included). Items nobody voted on are never re-read.
+
+Redis layout:
+- votes:reconcile          STRING held (SET NX EX) by the one process that
+                           runs the reconciliation this interval
+- votes:touched:{item}     SET of post/comment ids voted on since the last
+                           reconciliation
+"""
+
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, List, Optional
+
+from candid.controllers import db, config
+from candid.controllers.helpers.feed_scores import post_scores
+from candid.controllers.helpers.redis_pool import get_redis
+from candid.controllers.helpers.scoring import wilson_score
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_LOCK_KEY = "votes:reconcile"
+TOUCHED_KEY = "votes:touched:{item}"
+
+# Weighted sums drift by float rounding when applied as deltas
+WEIGHT_TOLERANCE = 1e-9
+
+# item table -> (vote table, foreign key column)
+_TARGETS = {
+    "post": ("post_vote", "post_id"),
+    "comment": ("comment_vote", "comment_id"),
+}
+
+# Applies the signed rows of the "change" CTE (new vote +1, old vote -1)
+_APPLY_DELTA = """
+    , delta AS (
+        SELECT
+            COALESCE(SUM(sign) FILTER (WHERE vote_type = 'upvote'), 0) AS up,
+            COALESCE(SUM(sign) FILTER (WHERE vote_type = 'downvote'), 0) AS down,
+            COALESCE(SUM(sign * weight) FILTER (WHERE vote_type = 'upvote'), 0) AS weighted_up,
+            COALESCE(SUM(sign * weight) FILTER (WHERE vote_type = 'downvote'), 0) AS weighted_down
+        FROM change
+    )
+    UPDATE {item} t SET
+        upvote_count = t.upvote_count + delta.up,
+        downvote_count = t.downvote_count + delta.down,
+        weighted_upvotes = GREATEST(t.weighted_upvotes + delta.weighted_up, 0),
+        weighted_downvotes = GREATEST(t.weighted_downvotes + delta.weighted_down, 0)
+    FROM delta
+    WHERE t.id = %s
+    RETURNING t.upvote_count, t.downvote_count, t.weighted_upvotes,
+              t.weighted_downvotes, t.created_time
+"""
+
+
+def cast_vote(item: str, item_id: str, user_id: str, vote_type: str,
+              weight: float, downvote_reason: Optional[str]) -> Optional[Dict]:
+    """
+    Insert or change a user's vote and apply the counter delta atomically.
+
+    Args:
+        item: "post" or "comment"
+
+    Returns:
+        The item's new counters (upvote_count, downvote_count,
+        weighted_upvotes, weighted_downvotes, created_time), or None if the
+        item no longer exists
+    """
+    vote_table, fk = _TARGETS[item]
+    counters = db.execute_query(f"""
+        WITH old AS (
+            SELECT vote_type, weight FROM {vote_table}
+            WHERE {fk} = %s AND user_id = %s
+            FOR UPDATE
+        ), new AS (
+            INSERT INTO {vote_table} (id, {fk}, user_id, vote_type, weight, downvote_reason)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            ON CONFLICT ({fk}, user_id) DO UPDATE SET
+                vote_type = EXCLUDED.vote_type,
+                weight = EXCLUDED.weight,
+                downvote_reason = EXCLUDED.downvote_reason
+            RETURNING vote_type, weight
+        ), change AS (
+            SELECT vote_type, weight, 1 AS sign FROM new
+            UNION ALL
+            SELECT vote_type, weight, -1 AS sign FROM old
+        )
+    """ + _APPLY_DELTA.format(item=item), (
+        item_id, user_id,
+        str(uuid.uuid4()), item_id, user_id, vote_type, weight, downvote_reason,
+        item_id,
+    ), fetchone=True)
+    _mark_touched(item, item_id)
+    return counters
+
+
+def remove_vote(item: str, item_id: str, user_id: str) -> Optional[Dict]:
+    """
+    Delete a user's vote and subtract it from the counters atomically.
+
+    Returns:
+        The item's new counters, as for cast_vote
+    """
+    vote_table, fk = _TARGETS[item]
+    counters = db.execute_query(f"""
+        WITH change AS (
+            DELETE FROM {vote_table}
+            WHERE {fk} = %s AND user_id = %s
+            RETURNING vote_type, weight, -1 AS sign
+        )
+    """ + _APPLY_DELTA.format(item=item), (item_id, user_id, item_id), fetchone=True)
+    _mark_touched(item, item_id)
+    return counters
+
+
+def _mark_touched(item: str, item_id: str):
+    """Queue an item for the next drift check."""
+    try:
+        get_redis().sadd(TOUCHED_KEY.format(item=item), str(item_id))
+    except Exception as e:
+        logger.warning(f"Could not mark {item} {item_id} for vote reconciliation: {e}")
+
+
+def write_scores(item: str, item_id: str, counters: Dict, scores: Dict[str, float]) -> bool:
+    """
+    Store scores computed from counters, unless the counters have moved on.
+
+    Args:
+        item: "post" or "comment"
+        counters: Row returned by cast_vote / remove_vote
+        scores: {column: value}, e.g. {"score": ..., "hot_score": ...}
+
+    Returns:
+        True if written
+    """
+    columns = list(scores)
+    assignments = ", ".join(f"{column} = %s" for column in columns)
+    written = db.execute_query(f"""
+        UPDATE {item} SET {assignments}
+        WHERE id = %s
+          AND weighted_upvotes = %s
+          AND weighted_downvotes = %s
+        RETURNING 1
+    """, (*[scores[c] for c in columns], item_id,
+          counters["weighted_upvotes"], counters["weighted_downvotes"]), fetchone=True)
+    return written is not None
+
+
+# ========== Reconciliation ==========
+
+def _take_touched(item: str) -> List[str]:
+    """Atomically read and clear the ids voted on since the last run."""
+    key = TOUCHED_KEY.format(item=item)
+    pipe = get_redis().pipeline()
+    pipe.smembers(key)
+    pipe.delete(key)
+    members, _ = pipe.execute()
+    return list(members or [])
+
+
+def _drifted(item: str, item_ids: List[str]) -> List[Dict]:
+    """Items among item_ids whose stored counters differ from their votes."""
+    vote_table, fk = _TARGETS[item]
+    return db.execute_query(f"""
+        WITH actual AS (
+            SELECT t.id,
+                COUNT(v.id) FILTER (WHERE v.vote_type = 'upvote') AS up_count,
+                COUNT(v.id) FILTER (WHERE v.vote_type = 'downvote') AS down_count,
+                COALESCE(SUM(v.weight) FILTER (WHERE v.vote_type = 'upvote'), 0) AS weighted_up,
+                COALESCE(SUM(v.weight) FILTER (WHERE v.vote_type = 'downvote'), 0) AS weighted_down
+            FROM {item} t
+            LEFT JOIN {vote_table} v ON v.{fk} = t.id
+            WHERE t.id = ANY(%s::uuid[])
+            GROUP BY t.id
+        )
+        SELECT a.*, t.created_time,
+               t.weighted_upvotes AS stored_up, t.weighted_downvotes AS stored_down
+        FROM actual a
+        JOIN {item} t ON t.id = a.id
+        WHERE t.upvote_count <> a.up_count
+           OR t.downvote_count <> a.down_count
+           OR abs(t.weighted_upvotes - a.weighted_up) > %s
+           OR abs(t.weighted_downvotes - a.weighted_down) > %s
+    """, (item_ids, WEIGHT_TOLERANCE, WEIGHT_TOLERANCE)) or []
+
+
+def reconcile(item: str) -> int:
+    """
+    Repair drifted counters and scores for items voted on since the last run.
+
+    Rows voted on after they were read are skipped; their vote already
+    wrote counters and scores from the then-current state.
+
+    Returns:
+        Number of items repaired
+    """
+    item_ids = _take_touched(item)
+    if not item_ids:
+        return 0
+    try:
+        return _repair(item, _drifted(item, item_ids))
+    except Exception:
+        # Check them again next run
+        get_redis().sadd(TOUCHED_KEY.format(item=item), *item_ids)
+        raise
+
+
+def _repair(item: str, rows: List[Dict]) -> int:
+    """Write re-aggregated counters and scores for drifted rows."""
+    if not rows:
+        return 0
+
+    ids, ups, downs, weighted_ups, weighted_downs = [], [], [], [], []
+    stored_ups, stored_downs, scores, hots, controversials = [], [], [], [], []
+    for row in rows:
+        weighted_up = float(row["weighted_up"])
+        weighted_down = float(row["weighted_down"])
+        ids.append(str(row["id"]))
+        ups.append(row["up_count"])
+        downs.append(row["down_count"])
+        weighted_ups.append(weighted_up)
+        weighted_downs.append(weighted_down)
+        stored_ups.append(float(row["stored_up"]))
+        stored_downs.append(float(row["stored_down"]))
+        scores.append(wilson_score(weighted_up, weighted_down))
+        if item == "post":
+            hot, controversial = post_scores(weighted_up, weighted_down, row["created_time"])
+            hots.append(hot)
+            controversials.append(controversial)
+
+    if item == "post":
+        feed_columns = ", hot_score = v.hot, controversial_score = v.controversial"
+        feed_arrays = ", %s::float8[], %s::float8[]"
+        feed_names = ", hot, controversial"
+        feed_params = (hots, controversials)
+    else:
+        feed_columns = feed_arrays = feed_names = ""
+        feed_params = ()
+
+    repaired = db.execute_query(f"""
+        UPDATE {item} t SET
+            upvote_count = v.up,
+            downvote_count = v.down,
+            weighted_upvotes = v.weighted_up,
+            weighted_downvotes = v.weighted_down,
+            score = v.score{feed_columns}
+        FROM unnest(%s::uuid[], %s::int[], %s::int[], %s::float8[], %s::float8[],
+                    %s::float8[], %s::float8[], %s::float8[]{feed_arrays})
+             AS v(id, up, down, weighted_up, weighted_down, stored_up, stored_down, score{feed_names})
+        WHERE t.id = v.id
+          AND t.weighted_upvotes = v.stored_up
+          AND t.weighted_downvotes = v.stored_down
+        RETURNING 1
+    """, (ids, ups, downs, weighted_ups, weighted_downs,
+          stored_ups, stored_downs, scores, *feed_params))
+    return len(repaired or [])
+
+
+def _claim_reconcile() -> bool:
+    """True if this process should reconcile this interval."""
+    try:
+        return bool(get_redis().set(
+            RECONCILE_LOCK_KEY, "1", nx=True, ex=config.VOTE_RECONCILE_INTERVAL
+        ))
+    except Exception as e:
+        # Skip rather than have every process reconcile at once
+        logger.warning(f"Vote reconcile lock unavailable, skipping: {e}")
+        return False
+
+
+def reconcile_all() -> Dict[str, int]:
+    """Reconcile post and comment vote counters. Returns {item: repaired}."""
+    return {item: reconcile(item) for item in _TARGETS}
+
+
+class VoteCounterReconciler:
+    """Background worker that repairs vote counter drift."""
+
+    def __init__(self, poll_interval: float = 60.0):
+        """
+        Initialize the reconciler.
+
+        Args:
+            poll_interval: Seconds between attempts to claim the run (it
+                still runs at most once per VOTE_RECONCILE_INTERVAL across
+                all processes)
+        """
+        self.poll_interval = poll_interval
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background reconciler thread."""
+        if self._running:
+            return
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, daemon=True)
+        self._thread.start()
+        print("Vote counter reconciler started", flush=True)
+
+    def stop(self):
+        """Stop the background reconciler."""
+        self._running = False
+        if self._thread:
+            self._thread.join(timeout=10)
+            self._thread = None
+        print("Vote counter reconciler stopped", flush=True)
+
+    def _run_loop(self):
+        """Main reconciler loop."""
+        while self._running:
+            try:
+                if _claim_reconcile():
+                    repaired = reconcile_all()
+                    if any(repaired.values()):
+                        logger.warning(f"Repaired vote counter drift: {repaired}")
+            except Exception as e:
+                logger.error("Vote counter reconciler error: %s", e, exc_info=True)
+
+            # Sleep in small increments so stop() is responsive
+            for _ in range(int(self.poll_interval)):
+                if not self._running:
+                    return
+                time.sleep(1)
+
+
+# ========== Singleton Worker ==========
+
+_worker: Optional[VoteCounterReconciler] = None
+
+
+def start_worker():
+    """Start the singleton vote counter reconciler."""
+    global _worker
+    if _worker is None:
+        _worker = VoteCounterReconciler()
+    _worker.start()
+
+
+def stop_worker():
+    """Stop the singleton vote counter reconciler."""
+    global _worker
+    if _worker:
+        _worker.stop()
+        _worker = None
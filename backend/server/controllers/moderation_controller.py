@@ -17,6 +17,7 @@ from candid import util
 from candid.controllers import db
 from candid.controllers.helpers.constants import ROLE_HIERARCHY
 from candid.controllers.helpers.rate_limiting import check_rate_limit_for
+from candid.controllers.helpers import card_queue
 from candid.controllers.helpers.auth import (
     authorization, authorization_allow_banned, authorization_scoped,
     token_to_user, invalidate_ban_cache,
@@ -42,6 +43,7 @@ from candid.controllers.helpers.moderation import (
     get_user_polis_group as _get_user_polis_group,
     should_show_escalated_appeal as _should_show_escalated_appeal,
     should_show_appeal_to_reviewer as _should_show_appeal_to_reviewer,
+    resolve_appeal_routing as _resolve_appeal_routing,
     get_admin_response_notifications as _get_admin_response_notifications,
     get_target_users as _get_target_users,
 )
@@ -464,6 +466,8 @@ def get_moderation_queue(token_info=None):  # noqa: E501
 
     # Add enriched appeals to queue
     if appeals:
+        # Original actions and actioner roles for every appeal, resolved up front
+        routing = _resolve_appeal_routing(a['mod_action_id'] for a in appeals)
         for a in appeals:
             # Fetch original mod action and report context
             mod_action = db.execute_query("""
@@ -573,7 +577,7 @@ def get_moderation_queue(token_info=None):  # noqa: E501
 
             # Filter: pending appeals shown to peer reviewers (hierarchical routing)
             if a['appeal_state'] == 'pending':
-                if not _should_show_appeal_to_reviewer(appeal_item['data'], str(user.id), a):
+                if not _should_show_appeal_to_reviewer(appeal_item['data'], str(user.id), a, routing):
                     continue
 
             # Overruled appeals: ONLY show to the original actioner
@@ -584,7 +588,7 @@ def get_moderation_queue(token_info=None):  # noqa: E501
 
             # Escalated appeals: show to next tier up (hierarchical routing)
             if a['appeal_state'] == 'escalated':
-                if not _should_show_escalated_appeal(a, str(user.id)):
+                if not _should_show_escalated_appeal(a, str(user.id), routing):
                     continue
 
             queue.append(appeal_item)
@@ -1037,6 +1041,7 @@ def respond_to_appeal(appeal_id, body, token_info=None):  # noqa: E501
                                 UPDATE users SET status = 'banned' WHERE id = %s
                             """, (target_user_id,))
                             invalidate_ban_cache(target_user_id)
+                            card_queue.invalidate_user(target_user_id)
 
                     # Enforce content removal
                     if action == 'removed' and report['target_object_type'] == 'position':
@@ -1047,6 +1052,8 @@ def respond_to_appeal(appeal_id, body, token_info=None):  # noqa: E501
                             UPDATE user_position SET status = 'removed'
                             WHERE position_id = %s AND status = 'active'
                         """, (report['target_object_id'],))
+                        # Drop the removed position from every buffered card queue
+                        card_queue.invalidate_all()
 
     # When escalation reviewer resolves an escalated appeal, notify prior responders
     if appeal['appeal_state'] == 'escalated' and db_appeal_state in ('approved', 'denied', 'modified'):
@@ -1240,6 +1247,7 @@ def take_moderator_action(report_id, body, token_info=None):  # noqa: E501
                         UPDATE users SET status = 'banned' WHERE id = %s
                     """, (target_user_id,))
                     invalidate_ban_cache(target_user_id)
+                    card_queue.invalidate_user(target_user_id)
 
             # Enforce content removal
             if action.action == 'removed' and report['target_object_type'] == 'position':
@@ -1250,6 +1258,8 @@ def take_moderator_action(report_id, body, token_info=None):  # noqa: E501
                     UPDATE user_position SET status = 'removed'
                     WHERE position_id = %s AND status = 'active'
                 """, (report['target_object_id'],))
+                # Drop the removed position from every buffered card queue
+                card_queue.invalidate_all()
 
     # Build response
     responder = _get_user_card(user.id)
@@ -18,11 +18,14 @@ from candid.controllers.helpers.auth import authorization, authorization_allow_b
 from candid.controllers.helpers import polis_sync
 from candid.controllers.helpers import presence
 from candid.controllers.helpers import nlp
+from candid.controllers.helpers import card_queue
+from candid.controllers.helpers import vector_search
 from candid.controllers.helpers.polis_sync import (
     get_oldest_active_conversation,
     generate_xid,
 )
-from candid.controllers.helpers.polis_client import get_client, PolisError
+from candid.controllers.helpers.polis_client import PolisError
+from candid.controllers.helpers.polis_math import get_math_data
 
 from candid.controllers.stats_controller import _get_cached_group_labels
 from candid.controllers.helpers.geometry import (
@@ -42,10 +45,7 @@ def _get_user_card(user_id):
             u.id,
             u.status,
             u.username,
-            COALESCE((
-                SELECT COUNT(*) FROM kudos k
-                WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-            ), 0) as kudos_count
+            u.kudos_received_count as kudos_count
         FROM users u
         WHERE u.id = %s
     """, (user_id,), fetchone=True)
@@ -258,6 +258,10 @@ def create_position_responses(body, token_info=None):  # noqa: E501
             response=resp.response
         )
 
+    # Answered positions must not be served again from the precomputed queue
+    card_queue.discard_positions(
+        str(user.id), [resp.position_id for resp in position_response.responses])
+
     # TODO: Update counts, change to have user respond to user_position rather than position
 
 
@@ -290,12 +294,13 @@ def search_similar_positions(body, token_info=None):  # noqa: E501
     if embedding is None:
         return ErrorModel(503, "NLP service unavailable"), 503
 
-    # Build the query with optional filters
-    # Using pgvector's <=> operator for cosine distance
+    # Fetch the nearest candidates through the HNSW index, then filter them.
     # Include positions that:
     # 1. User doesn't currently have (no active user_position)
     # 2. OR user previously had but deleted (user_position with status='deleted')
-    query_parts = ["""
+    k = vector_search.candidate_limit(limit)
+    query_parts = [f"""
+        WITH candidates AS MATERIALIZED ({vector_search.CANDIDATES_SQL})
         SELECT
             p.id,
             p.creator_user_id,
@@ -308,12 +313,13 @@ def search_similar_positions(body, token_info=None):  # noqa: E501
             p.pass_count,
             p.chat_count,
             TO_CHAR(p.created_time, %s) as created_time,
-            1 - (p.embedding <=> %s::vector) AS similarity,
+            1 - cand.distance AS similarity,
             c.label AS category_name,
             l.name AS location_name,
             l.code AS location_code,
             CASE WHEN up_deleted.id IS NOT NULL THEN true ELSE false END AS was_previously_held
-        FROM position p
+        FROM candidates cand
+        JOIN position p ON p.id = cand.id
         LEFT JOIN position_category c ON p.category_id = c.id
         LEFT JOIN location l ON p.location_id = l.id
         LEFT JOIN user_position up_active ON p.id = up_active.position_id
@@ -323,12 +329,11 @@ def search_similar_positions(body, token_info=None):  # noqa: E501
             AND up_deleted.user_id = %s
             AND up_deleted.status = 'deleted'
         WHERE p.status = 'active'
-          AND p.embedding IS NOT NULL
           AND p.creator_user_id != %s
           AND up_active.id IS NULL
-          AND (1 - (p.embedding <=> %s::vector)) >= 0.5
+          AND (1 - cand.distance) >= 0.5
     """]
-    params = [Config.TIMESTAMP_FORMAT, embedding, user.id, user.id, user.id, embedding]
+    params = [embedding, embedding, k, Config.TIMESTAMP_FORMAT, user.id, user.id, user.id]
 
     # Add optional category filter
     if category_id:
@@ -353,11 +358,11 @@ def search_similar_positions(body, token_info=None):  # noqa: E501
         params.append(location_id)
 
     # Order by similarity and limit
-    query_parts.append("ORDER BY p.embedding <=> %s::vector LIMIT %s")
-    params.extend([embedding, limit])
+    query_parts.append("ORDER BY cand.distance LIMIT %s")
+    params.append(limit)
 
     query = "\n".join(query_parts)
-    positions = db.execute_query(query, tuple(params))
+    positions = vector_search.execute_search(query, tuple(params), k)
 
     if positions is None:
         return ErrorModel(500, "Database error"), 500
@@ -456,31 +461,43 @@ def search_stats_positions(body, token_info=None):  # noqa: E501
             use_meaning = False  # NLP unavailable, fall back to text
 
     if use_meaning:
+        # The page is filtered out of the global nearest candidates, so the
+        # stats row (candidate count, farthest distance) tells whether a
+        # wider candidate set could still add matches
         sql = f"""
-            SELECT
-                p.id,
-                p.statement,
-                p.category_id,
-                p.location_id,
-                p.agree_count,
-                p.disagree_count,
-                p.pass_count,
-                p.creator_user_id,
-                c.label AS category_label,
-                l.name AS location_name,
-                l.code AS location_code,
-                1 - (p.embedding <=> %s::vector) AS similarity
-            FROM position p
-            LEFT JOIN position_category c ON p.category_id = c.id
-            LEFT JOIN location l ON p.location_id = l.id
-            WHERE p.status = 'active'
-              AND p.embedding IS NOT NULL
-              AND (1 - (p.embedding <=> %s::vector)) >= 0.5
-              AND {location_filter}
-            ORDER BY p.embedding <=> %s::vector
-            LIMIT %s OFFSET %s
+            WITH candidates AS MATERIALIZED ({vector_search.CANDIDATES_SQL}),
+            page AS (
+                SELECT
+                    p.id,
+                    p.statement,
+                    p.category_id,
+                    p.location_id,
+                    p.agree_count,
+                    p.disagree_count,
+                    p.pass_count,
+                    p.creator_user_id,
+                    c.label AS category_label,
+                    l.name AS location_name,
+                    l.code AS location_code,
+                    1 - cand.distance AS similarity
+                FROM candidates cand
+                JOIN position p ON p.id = cand.id
+                LEFT JOIN position_category c ON p.category_id = c.id
+                LEFT JOIN location l ON p.location_id = l.id
+                WHERE p.status = 'active'
+                  AND (1 - cand.distance) >= %s
+                  AND {location_filter}
+                ORDER BY cand.distance
+                LIMIT %s OFFSET %s
+            )
+            SELECT page.*, reach.candidate_count, reach.max_distance
+            FROM (
+                SELECT COUNT(*) AS candidate_count, MAX(distance) AS max_distance
+                FROM candidates
+            ) reach
+            LEFT JOIN page ON true
+            ORDER BY page.similarity DESC NULLS LAST
         """
-        params = (embedding, embedding, location_id, embedding, limit, offset)
     else:
         # Text fallback: ILIKE search
         like_pattern = f"%{query}%"
@@ -509,7 +526,30 @@ def search_stats_positions(body, token_info=None):  # noqa: E501
         """
         params = (like_pattern, location_id, limit, offset)
 
-    positions = db.execute_query(sql, params)
+    truncated = False
+    if use_meaning:
+        min_similarity = 0.5
+        # Widen the candidate set until the page fills, the candidates run
+        # out of matches, or k reaches the ef_search cap
+        k = vector_search.candidate_limit(offset + limit)
+        while True:
+            params = (embedding, embedding, k, min_similarity, location_id, limit, offset)
+            rows = vector_search.execute_search(sql, params, k)
+            if rows is None:
+                positions = None
+                break
+            positions = [row for row in rows if row["id"] is not None]
+            reach = rows[0]
+            exhausted = (reach["candidate_count"] < k
+                         or 1 - reach["max_distance"] < min_similarity)
+            if len(positions) >= limit or exhausted:
+                break
+            if k >= vector_search.MAX_EF_SEARCH:
+                truncated = True
+                break
+            k = vector_search.widen(k)
+    else:
+        positions = db.execute_query(sql, params)
     if positions is None:
         return ErrorModel(500, "Database error"), 500
 
@@ -582,6 +622,7 @@ def search_stats_positions(body, token_info=None):  # noqa: E501
     return {
         "results": results,
         "hasMore": len(results) == limit,
+        "truncated": truncated,
     }, 200
 
 
@@ -618,10 +659,7 @@ def get_position_agreed_closures(position_id, token_info=None):  # noqa: E501
             u.trust_score as creator_trust_score,
             u.avatar_url as creator_avatar_url,
             u.avatar_icon_url as creator_avatar_icon_url,
-            COALESCE((
-                SELECT COUNT(*) FROM kudos k
-                WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-            ), 0) as creator_kudos_count
+            COALESCE(u.kudos_received_count, 0) as creator_kudos_count
         FROM position p
         LEFT JOIN position_category c ON p.category_id = c.id
         LEFT JOIN location l ON p.location_id = l.id
@@ -647,20 +685,14 @@ def get_position_agreed_closures(position_id, token_info=None):  # noqa: E501
             ph.avatar_url as ph_avatar_url,
             ph.avatar_icon_url as ph_avatar_icon_url,
             ph.trust_score as ph_trust_score,
-            COALESCE((
-                SELECT COUNT(*) FROM kudos k
-                WHERE k.receiver_user_id = ph.id AND k.status = 'sent'
-            ), 0) as ph_kudos_count,
+            ph.kudos_received_count as ph_kudos_count,
             -- Initiator user info
             iu.display_name as iu_display_name,
             iu.username as iu_username,
             iu.avatar_url as iu_avatar_url,
             iu.avatar_icon_url as iu_avatar_icon_url,
             iu.trust_score as iu_trust_score,
-            COALESCE((
-                SELECT COUNT(*) FROM kudos k
-                WHERE k.receiver_user_id = iu.id AND k.status = 'sent'
-            ), 0) as iu_kudos_count,
+            iu.kudos_received_count as iu_kudos_count,
             -- Kudos sent status
             EXISTS(
                 SELECT 1 FROM kudos k
@@ -708,8 +740,7 @@ def get_position_agreed_closures(position_id, token_info=None):  # noqa: E501
         if conversation:
             polis_conv_id = conversation["polis_conversation_id"]
             try:
-                client = get_client()
-                math_data = client.get_math_data(polis_conv_id)
+                math_data = get_math_data(polis_conv_id)
                 if math_data:
                     groups = _extract_groups_for_closures(math_data, polis_conv_id)
             except PolisError as e:
@@ -723,8 +754,7 @@ def get_position_agreed_closures(position_id, token_info=None):  # noqa: E501
         if all_conv and all_conv["polis_conversation_id"] != polis_conv_id:
             all_categories_conv_id = all_conv["polis_conversation_id"]
             try:
-                all_client = get_client()
-                all_categories_math_data = all_client.get_math_data(all_categories_conv_id)
+                all_categories_math_data = get_math_data(all_categories_conv_id)
                 if all_categories_math_data:
                     all_categories_groups = _extract_groups_for_closures(all_categories_math_data, all_categories_conv_id)
             except PolisError as e:
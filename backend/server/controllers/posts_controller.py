@@ -12,11 +12,12 @@ from candid.models.error_model import ErrorModel
 from candid.controllers import db
 from candid.controllers.helpers.auth import (
     authorization, token_to_user, is_moderator_at_location,
-    get_highest_role_at_location,
+    get_highest_role_at_location, get_highest_roles_at_location,
 )
 from candid.controllers.helpers.rate_limiting import check_rate_limit_for
 from candid.controllers.helpers.scoring import wilson_score
-from candid.controllers.helpers.config import Config
+from candid.controllers.helpers.feed_scores import post_scores
+from candid.controllers.helpers.vote_counters import cast_vote, remove_vote, write_scores
 from candid.controllers.helpers.ideological_coords import (
     get_effective_coords, get_conversation_for_post,
 )
@@ -190,10 +191,14 @@ def create_post(body, token_info=None):  # noqa: E501
     post_id = str(uuid.uuid4())
     # Q&A posts default to showing role badge; discussion posts default to hiding it
     show_creator_role = post_type == "question"
+    created_time = datetime.now(timezone.utc)
+    hot, controversial = post_scores(0.0, 0.0, created_time)
     db.execute_query("""
-        INSERT INTO post (id, creator_user_id, location_id, category_id, post_type, title, body, show_creator_role)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-    """, (post_id, user_id, location_id, category_id, post_type, title, body_text, show_creator_role))
+        INSERT INTO post (id, creator_user_id, location_id, category_id, post_type, title, body,
+                          show_creator_role, created_time, hot_score, controversial_score)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    """, (post_id, user_id, location_id, category_id, post_type, title, body_text,
+          show_creator_role, created_time, hot, controversial))
 
     # Fetch the created post with joins
     row = db.execute_query("""
@@ -201,7 +206,7 @@ def create_post(body, token_info=None):  # noqa: E501
                u.username AS creator_username, u.display_name AS creator_display_name,
                u.avatar_icon_url AS creator_avatar_icon_url, u.status AS creator_status,
                u.trust_score AS creator_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count,
+               u.kudos_received_count AS creator_kudos_count,
                pc.label AS category_label,
                l.code AS location_code, l.name AS location_name
         FROM post p
@@ -253,18 +258,13 @@ def get_posts(location_id, category_id=None, post_type=None, sort=None,
 
     where = " AND ".join(conditions)
 
-    # Sort expressions
+    # Sort expressions ("hot" and "controversial" are persisted columns kept
+    # current by helpers/feed_scores.py, so pages are index range scans)
     sort_exprs = {
-        "hot": f"""(CASE WHEN (p.weighted_upvotes - p.weighted_downvotes) > 0 THEN 1
-                        WHEN (p.weighted_upvotes - p.weighted_downvotes) < 0 THEN -1
-                        ELSE 0 END
-                   * log(greatest(abs(p.weighted_upvotes - p.weighted_downvotes), 1) + 1))
-                  / power(extract(epoch from now() - p.created_time)/3600 + 2, {Config.SCORING_HOT_GRAVITY})""",
+        "hot": "p.hot_score",
         "new": "extract(epoch from p.created_time)",
         "top": "p.score",
-        "controversial": """(LEAST(p.weighted_upvotes, p.weighted_downvotes)
-                            / GREATEST(p.weighted_upvotes, p.weighted_downvotes, 0.001))
-                           * (p.weighted_upvotes + p.weighted_downvotes)""",
+        "controversial": "p.controversial_score",
     }
 
     sort_expr = sort_exprs[sort]
@@ -281,11 +281,8 @@ def get_posts(location_id, category_id=None, post_type=None, sort=None,
                 )
                 params.extend([cursor_val, cursor_val, cursor_id])
             else:
-                conditions.append(
-                    f"(({sort_expr}) < %s OR "
-                    f"(({sort_expr}) = %s AND p.id < %s::uuid))"
-                )
-                params.extend([float(cursor_val), float(cursor_val), cursor_id])
+                conditions.append(f"({sort_expr}, p.id) < (%s, %s::uuid)")
+                params.extend([float(cursor_val), cursor_id])
             where = " AND ".join(conditions)
 
     # User vote join
@@ -297,17 +294,7 @@ def get_posts(location_id, category_id=None, post_type=None, sort=None,
     else:
         vote_select = ", NULL AS user_vote_type, NULL AS user_vote_reason"
 
-    # Subqueries for creator role and is_answered
-    # Raw role lookup (without badge filters — filtering is done in Python for own/other distinction)
-    creator_role_subquery = """(SELECT ur_cr.role FROM user_role ur_cr
-        WHERE ur_cr.user_id = p.creator_user_id
-          AND ur_cr.location_id = p.location_id
-        ORDER BY CASE ur_cr.role
-          WHEN 'admin' THEN 1 WHEN 'moderator' THEN 2 WHEN 'facilitator' THEN 3
-          WHEN 'assistant_moderator' THEN 4 WHEN 'expert' THEN 5 WHEN 'liaison' THEN 6
-        END LIMIT 1
-    ) AS creator_role"""
-
+    # Subquery for is_answered (creator roles are resolved in one batch below)
     is_answered_subquery = """EXISTS(
         SELECT 1 FROM comment c2
         JOIN user_role ur2 ON ur2.user_id = c2.creator_user_id
@@ -322,11 +309,10 @@ def get_posts(location_id, category_id=None, post_type=None, sort=None,
                u.avatar_icon_url AS creator_avatar_icon_url, u.status AS creator_status,
                u.trust_score AS creator_trust_score,
                u.show_role_badge AS creator_show_role_badge,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count,
+               u.kudos_received_count AS creator_kudos_count,
                pc.label AS category_label,
                l.code AS location_code, l.name AS location_name,
                ({sort_expr}) AS sort_value,
-               {creator_role_subquery},
                {is_answered_subquery}
                {vote_select}
         FROM post p
@@ -335,7 +321,7 @@ def get_posts(location_id, category_id=None, post_type=None, sort=None,
         LEFT JOIN location l ON p.location_id = l.id
         {vote_join}
         WHERE {where}
-        ORDER BY sort_value DESC, p.id DESC
+        ORDER BY {sort_expr} DESC, p.id DESC
         LIMIT %s
     """
 
@@ -367,11 +353,24 @@ def get_posts(location_id, category_id=None, post_type=None, sort=None,
     if has_more:
         rows = rows[:limit]
 
+    # Raw role lookup (without badge filters — filtering is done in Python for
+    # own/other distinction): one batched, cached query per category on the page
+    creators_by_category = {}
+    for r in rows:
+        category = str(r["category_id"]) if r.get("category_id") else None
+        creators_by_category.setdefault(category, []).append(r["creator_user_id"])
+    roles_by_category = {
+        category: get_highest_roles_at_location(creator_ids, location_id, category)
+        for category, creator_ids in creators_by_category.items()
+    }
+
     posts = []
     for r in rows:
         r_dict = dict(r)
         is_own = user_id and str(r["creator_user_id"]) == user_id
-        creator_role = r_dict.get("creator_role")
+        category = str(r["category_id"]) if r.get("category_id") else None
+        creator_role = roles_by_category[category].get(str(r["creator_user_id"]))
+        r_dict["creator_role"] = creator_role
         show_creator_role = r_dict.get("show_creator_role", False)
         creator_show_role_badge = r_dict.get("creator_show_role_badge", True)
 
@@ -418,17 +417,9 @@ def get_post(post_id, token_info=None):  # noqa: E501
                u.avatar_icon_url AS creator_avatar_icon_url, u.status AS creator_status,
                u.trust_score AS creator_trust_score,
                u.show_role_badge AS creator_show_role_badge,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count,
+               u.kudos_received_count AS creator_kudos_count,
                pc.label AS category_label,
                l.code AS location_code, l.name AS location_name,
-               (SELECT ur_cr.role FROM user_role ur_cr
-                WHERE ur_cr.user_id = p.creator_user_id
-                  AND ur_cr.location_id = p.location_id
-                ORDER BY CASE ur_cr.role
-                  WHEN 'admin' THEN 1 WHEN 'moderator' THEN 2 WHEN 'facilitator' THEN 3
-                  WHEN 'assistant_moderator' THEN 4 WHEN 'expert' THEN 5 WHEN 'liaison' THEN 6
-                END LIMIT 1
-               ) AS creator_role,
                EXISTS(
                  SELECT 1 FROM comment c2
                  JOIN user_role ur2 ON ur2.user_id = c2.creator_user_id
@@ -456,7 +447,11 @@ def get_post(post_id, token_info=None):  # noqa: E501
     # Role visibility filtering for own vs other
     row_dict = dict(row)
     is_own = user_id and str(row["creator_user_id"]) == user_id
-    creator_role = row_dict.get("creator_role")
+    creator_id = str(row["creator_user_id"])
+    creator_role = get_highest_roles_at_location(
+        [creator_id], row["location_id"], row.get("category_id")
+    )[creator_id]
+    row_dict["creator_role"] = creator_role
     show_creator_role = row_dict.get("show_creator_role", False)
     creator_show_role_badge = row_dict.get("creator_show_role_badge", True)
 
@@ -537,7 +532,7 @@ def update_post(post_id, body, token_info=None):  # noqa: E501
                u.username AS creator_username, u.display_name AS creator_display_name,
                u.avatar_icon_url AS creator_avatar_icon_url, u.status AS creator_status,
                u.trust_score AS creator_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count,
+               u.kudos_received_count AS creator_kudos_count,
                pc.label AS category_label,
                l.code AS location_code, l.name AS location_name,
                NULL AS user_vote_type, NULL AS user_vote_reason
@@ -627,10 +622,7 @@ def vote_on_post(post_id, body, token_info=None):  # noqa: E501
 
     if existing and existing["vote_type"] == vote_type:
         # Toggle off — remove the vote
-        db.execute_query(
-            "DELETE FROM post_vote WHERE post_id = %s AND user_id = %s",
-            (post_id, user_id),
-        )
+        counters = remove_vote("post", post_id, user_id)
         user_vote = None
     else:
         # Compute vote weight
@@ -651,40 +643,25 @@ def vote_on_post(post_id, body, token_info=None):  # noqa: E501
                 weight = 1.0
 
         # Upsert vote
-        db.execute_query("""
-            INSERT INTO post_vote (id, post_id, user_id, vote_type, weight, downvote_reason)
-            VALUES (%s, %s, %s, %s, %s, %s)
-            ON CONFLICT (post_id, user_id) DO UPDATE SET
-                vote_type = EXCLUDED.vote_type,
-                weight = EXCLUDED.weight,
-                downvote_reason = EXCLUDED.downvote_reason
-        """, (str(uuid.uuid4()), post_id, user_id, vote_type, weight, downvote_reason))
+        counters = cast_vote("post", post_id, user_id, vote_type, weight, downvote_reason)
 
         user_vote = {"voteType": vote_type, "downvoteReason": downvote_reason}
 
-    # Recalc denormalized counts
-    counts = db.execute_query("""
-        SELECT
-            COUNT(*) FILTER (WHERE vote_type = 'upvote') AS up_count,
-            COUNT(*) FILTER (WHERE vote_type = 'downvote') AS down_count,
-            COALESCE(SUM(weight) FILTER (WHERE vote_type = 'upvote'), 0) AS weighted_up,
-            COALESCE(SUM(weight) FILTER (WHERE vote_type = 'downvote'), 0) AS weighted_down
-        FROM post_vote WHERE post_id = %s
-    """, (post_id,), fetchone=True)
+    if not counters:
+        return ErrorModel(500, "Failed to record vote"), 500
 
-    up_count = counts["up_count"] or 0
-    down_count = counts["down_count"] or 0
-    weighted_up = float(counts["weighted_up"] or 0)
-    weighted_down = float(counts["weighted_down"] or 0)
+    # Scores from the counters the vote produced
+    weighted_up = float(counters["weighted_upvotes"])
+    weighted_down = float(counters["weighted_downvotes"])
     new_score = wilson_score(weighted_up, weighted_down)
-
-    db.execute_query("""
-        UPDATE post SET
-            upvote_count = %s, downvote_count = %s,
-            weighted_upvotes = %s, weighted_downvotes = %s,
-            score = %s
-        WHERE id = %s
-    """, (up_count, down_count, weighted_up, weighted_down, new_score, post_id))
+    new_hot, new_controversial = post_scores(weighted_up, weighted_down, counters["created_time"])
+    write_scores("post", post_id, counters, {
+        "score": new_score,
+        "hot_score": new_hot,
+        "controversial_score": new_controversial,
+    })
+    up_count = counters["upvote_count"]
+    down_count = counters["downvote_count"]
 
     return {
         "userVote": user_vote,
@@ -752,7 +729,7 @@ def patch_post(post_id, body, token_info=None):  # noqa: E501
                u.username AS creator_username, u.display_name AS creator_display_name,
                u.avatar_icon_url AS creator_avatar_icon_url, u.status AS creator_status,
                u.trust_score AS creator_trust_score,
-               COALESCE((SELECT COUNT(*) FROM kudos k WHERE k.receiver_user_id = u.id AND k.status = 'sent'), 0) AS creator_kudos_count,
+               u.kudos_received_count AS creator_kudos_count,
                pc.label AS category_label,
                l.code AS location_code, l.name AS location_name,
                NULL AS user_vote_type, NULL AS user_vote_reason
@@ -4,7 +4,6 @@ Stats Controller
 Handles Polis opinion group statistics and visualization data.
 """
 import math
-import time
 from datetime import datetime, timezone
 from typing import Dict, List, Tuple, Union, Optional, Any
 
@@ -22,6 +21,13 @@ from candid.controllers.helpers.polis_sync import (
     generate_xid,
 )
 from candid.controllers.helpers.polis_client import get_client, PolisError
+from candid.controllers.helpers.polis_math import get_math_data
+from candid.controllers.helpers.shared_cache import SharedCache
+from candid.controllers.helpers.stats_snapshot import (
+    get_snapshot as get_stats_snapshot,
+    overlay_user_fields as overlay_user_stats,
+    responses_version as stats_responses_version,
+)
 from candid.controllers.helpers.cache_headers import add_cache_headers
 from candid.controllers.helpers.pairwise_graph import (
     build_victory_matrix,
@@ -34,16 +40,20 @@ from candid.controllers.helpers.geometry import (
 )
 from candid.controllers.helpers.stats import (
     empty_demographics as _empty_demographics,
-    aggregate_demographics as _aggregate_demographics,
+    get_demographic_counts_by_group as _get_demographic_counts_by_group,
+    merge_demographic_counts as _merge_demographic_counts,
+    get_pairwise_counts_by_group as _get_pairwise_counts_by_group,
     get_user_votes as _get_user_votes,
     get_user_position_ids as _get_user_position_ids,
     get_vote_dist_for_group as _get_vote_dist_for_group,
     get_overall_vote_dist as _get_overall_vote_dist,
 )
 
-# Simple in-memory cache for group labels with TTL
-_label_cache = {}
+# Group labels and demographics, shared across workers per math_tick
 LABEL_CACHE_TTL = 300  # 5 minutes
+DEMOGRAPHICS_CACHE_TTL = 300  # 5 minutes
+_label_cache = SharedCache("group_labels", ttl=LABEL_CACHE_TTL)
+_demographics_cache = SharedCache("group_demographics", ttl=DEMOGRAPHICS_CACHE_TTL)
 
 # Stats cache max-age in seconds (5 minutes - matches Polis backend cache)
 STATS_CACHE_MAX_AGE = 300
@@ -61,16 +71,16 @@ def _add_stats_cache_headers(stats: StatsResponse):
     computed_at = datetime.now(timezone.utc)
 
     # Build camelCase dict from Model using attribute_map (same logic as JSONEncoder)
-    stats_dict = {}
-    for attr in stats.openapi_types:
-        value = getattr(stats, attr)
-        if value is not None:
-            stats_dict[stats.attribute_map[attr]] = value
+    stats_dict = _model_to_dict(stats)
     stats_dict['computedAt'] = computed_at.isoformat()
+    return _stats_json_response(stats_dict, computed_at)
+
 
+def _stats_json_response(stats_dict: Dict[str, Any], computed_at: datetime):
+    """JSON response for a camelCase stats dict with Last-Modified/max-age headers."""
     response = make_response(jsonify(stats_dict), 200)
-    # Add Last-Modified header (current time since data is computed fresh)
-    # Also add Cache-Control with max-age to allow client caching
+    # Last-Modified is when the stats were computed (snapshot build time for
+    # Polis stats); max-age allows client caching
     response = add_cache_headers(
         response,
         last_modified=computed_at,
@@ -147,32 +157,23 @@ def get_group_demographics(location_id: str, category_id: str, group_id: str, to
     polis_conv_id = conversation["polis_conversation_id"]
 
     try:
-        client = get_client()
-        math_data = client.get_math_data(polis_conv_id)
+        math_data = get_math_data(polis_conv_id)
 
         if not math_data:
             return _empty_demographics(group_id)
 
-        # Extract group member pids
         pca_wrapper = math_data.get("pca", {})
         pca_data = pca_wrapper.get("asPOJO", {}) if isinstance(pca_wrapper, dict) else {}
         group_clusters = pca_data.get("group-clusters", [])
 
-        # Collect pids based on group_id
-        member_pids = []
         group_label = "All"
-
         if group_id == 'all':
-            # Get all pids from all groups
-            for cluster in group_clusters:
-                if cluster:
-                    member_pids.extend(cluster.get("members", []))
+            member_count = sum(len(c.get("members", [])) for c in group_clusters if c)
         else:
-            # Get pids from specific group
             try:
                 gid = int(group_id)
                 if gid < len(group_clusters) and group_clusters[gid]:
-                    member_pids = group_clusters[gid].get("members", [])
+                    member_count = len(group_clusters[gid].get("members", []))
                     labels = ["A", "B", "C", "D", "E", "F", "G", "H"]
                     group_label = labels[gid] if gid < len(labels) else f"Group {gid + 1}"
                 else:
@@ -180,38 +181,23 @@ def get_group_demographics(location_id: str, category_id: str, group_id: str, to
             except ValueError:
                 return ErrorModel(400, "Invalid group ID"), 400
 
-        if not member_pids:
+        if not member_count:
             return _empty_demographics(group_id, group_label)
 
-        # Map pids to user_ids via polis_participant table
-        user_ids = db.execute_query("""
-            SELECT DISTINCT user_id
-            FROM polis_participant
-            WHERE polis_conversation_id = %s
-              AND polis_pid = ANY(%s)
-        """, (polis_conv_id, member_pids))
-
-        user_id_list = [str(u["user_id"]) for u in (user_ids or [])]
-
-        if not user_id_list:
-            return _empty_demographics(group_id, group_label, len(member_pids))
-
-        # Get demographics for these users
-        placeholders = ",".join(["%s"] * len(user_id_list))
-        demographics = db.execute_query(f"""
-            SELECT lean, education, geo_locale, sex, race, age_range, income_range
-            FROM user_demographics
-            WHERE user_id IN ({placeholders})
-        """, tuple(user_id_list))
-
-        # Aggregate demographics
-        return _aggregate_demographics(
-            demographics or [],
-            group_id,
-            group_label,
-            len(member_pids)
+        # Counts for every group come from one query, shared per math_tick
+        cache_key = f"{polis_conv_id}:{math_data.get('math_tick')}"
+        counts_by_group = _demographics_cache.get(
+            cache_key,
+            lambda: _get_demographic_counts_by_group(polis_conv_id, group_clusters),
         )
 
+        if group_id == 'all':
+            counts = _merge_demographic_counts(list(counts_by_group.values()))
+        else:
+            counts = counts_by_group.get(str(gid), {})
+
+        return {**_empty_demographics(group_id, group_label, member_count), **counts}
+
     except PolisError as e:
         print(f"Polis error getting group demographics: {e}", flush=True)
         return _empty_demographics(group_id)
@@ -224,17 +210,22 @@ def get_group_demographics(location_id: str, category_id: str, group_id: str, to
 def _get_cached_group_labels(polis_conv_id: str, math_data: Dict, location_id: str = None, category_id: str = None) -> Dict[str, Dict]:
     """
     Compute group labels from pairwise surveys, with caching.
+
+    Cached in the shared store per math_tick and per pairwise responses
+    version of the location, so every worker computes a given set of labels
+    once and new responses re-rank them immediately.
+
     Returns {group_id: {"label": label_text, "wins": win_count, "rankings": [{"label": str, "wins": int}, ...]}}
     """
-    cache_key = f"labels:{polis_conv_id}"
-    now = time.time()
+    cache_key = f"{polis_conv_id}:{math_data.get('math_tick')}:{stats_responses_version(location_id)}"
+    return _label_cache.get(
+        cache_key,
+        lambda: _compute_group_labels(polis_conv_id, math_data, location_id, category_id),
+    )
 
-    # Check cache
-    if cache_key in _label_cache:
-        cached, timestamp = _label_cache[cache_key]
-        if now - timestamp < LABEL_CACHE_TTL:
-            return cached
 
+def _compute_group_labels(polis_conv_id: str, math_data: Dict, location_id: str = None, category_id: str = None) -> Dict[str, Dict]:
+    """Rank every group's pairwise labels (uncached; see _get_cached_group_labels)."""
     # Find pairwise survey for this location/category combination
     # First try direct polis_conversation_id link, then fall back to location+category match
     survey = db.execute_query("""
@@ -268,7 +259,6 @@ def _get_cached_group_labels(polis_conv_id: str, math_data: Dict, location_id: s
             """, (location_id,), fetchone=True)
 
     if not survey:
-        _label_cache[cache_key] = ({}, now)
         return {}
 
     survey_id = str(survey["id"])
@@ -286,44 +276,16 @@ def _get_cached_group_labels(polis_conv_id: str, math_data: Dict, location_id: s
     """, (survey_id,))
 
     if not all_items:
-        _label_cache[cache_key] = ({}, now)
         return {}
 
     item_ids = [str(it["id"]) for it in all_items]
     item_text_map = {str(it["id"]): it["item_text"] for it in all_items}
 
-    # For each group, compute all labels ranked by Ranked Pairs
-    for group_idx, cluster in enumerate(group_clusters):
-        if not cluster:
-            continue
-
-        group_id = str(group_idx)
-        pids = cluster.get("members", [])
-
-        if not pids:
-            continue
-
-        # Get user_ids for this group's members
-        user_ids = db.execute_query("""
-            SELECT user_id FROM polis_participant
-            WHERE polis_conversation_id = %s AND polis_pid = ANY(%s)
-        """, (polis_conv_id, pids))
-
-        user_id_list = [str(u["user_id"]) for u in (user_ids or [])]
-
-        if not user_id_list:
-            continue
-
-        # Get raw pairwise responses for this group's users
-        responses = db.execute_query("""
-            SELECT winner_item_id, loser_item_id
-            FROM pairwise_response
-            WHERE survey_id = %s::uuid
-              AND user_id = ANY(%s::uuid[])
-        """, (survey_id, user_id_list))
-
-        responses = responses or []
+    # Winner/loser tallies for all groups in one query
+    counts_by_group = _get_pairwise_counts_by_group(polis_conv_id, survey_id, group_clusters)
 
+    # For each group, compute all labels ranked by Ranked Pairs
+    for group_id, responses in counts_by_group.items():
         # Build victory matrix and compute Ranked Pairs ordering
         matrix = build_victory_matrix(item_ids, responses)
         ordering = ranked_pairs_ordering(item_ids, matrix)
@@ -351,8 +313,6 @@ def _get_cached_group_labels(polis_conv_id: str, math_data: Dict, location_id: s
                 "rankings": rankings
             }
 
-    # Update cache
-    _label_cache[cache_key] = (labels, now)
     return labels
 
 
@@ -401,40 +361,7 @@ def get_stats(location_id: str, category_id: str, token_info=None):
     polis_conv_id = conversation["polis_conversation_id"]
 
     try:
-        client = get_client()
-        xid = generate_xid(user_id) if user_id else None
-        math_data = client.get_math_data(polis_conv_id, xid)
-
-        if not math_data:
-            return _get_fallback_stats(location_id, category_id, user_id)
-
-        # Transform Polis data to our format
-        groups = _extract_groups(math_data, polis_conv_id, location_id, category_id)
-        user_position = _extract_user_position(math_data, xid)
-        user_votes = _get_user_votes(user_id, category_id, location_id) if user_id else None
-        user_position_ids = _get_user_position_ids(user_id, category_id, location_id) if user_id else None
-        positions = _extract_positions(math_data, category_id, polis_conv_id, user_position_ids)
-
-        # If Polis hasn't computed any meaningful data yet, use fallback
-        # This happens when there aren't enough votes for clustering
-        if not groups and not positions:
-            fallback = _get_fallback_stats(location_id, category_id, user_id)
-            # Preserve the conversation ID so frontend knows Polis is connected
-            fallback.conversation_id = polis_conv_id
-            fallback.polis_report_url = _build_report_url(polis_conv_id)
-            return _add_stats_cache_headers(fallback)
-
-        stats = StatsResponse(
-            conversation_id=polis_conv_id,
-            polis_report_url=_build_report_url(polis_conv_id),
-            groups=groups,
-            user_position=user_position,
-            positions=positions,
-            user_votes=user_votes,
-            user_position_ids=user_position_ids
-        )
-        return _add_stats_cache_headers(stats)
-
+        return _polis_stats_response(location_id, category_id, user_id, polis_conv_id)
     except PolisError as e:
         print(f"Polis error getting stats: {e}", flush=True)
         return _add_stats_cache_headers(_get_fallback_stats(location_id, category_id, user_id))
@@ -474,43 +401,79 @@ def get_location_stats(location_id: str, token_info=None):
     polis_conv_id = conversation["polis_conversation_id"]
 
     try:
-        client = get_client()
-        xid = generate_xid(user_id) if user_id else None
-        math_data = client.get_math_data(polis_conv_id, xid)
-
-        if not math_data:
-            return _get_fallback_stats(location_id, None, user_id)
-
-        # Transform Polis data to our format
-        groups = _extract_groups(math_data, polis_conv_id, location_id, None)
-        user_position = _extract_user_position(math_data, xid)
-        user_votes = _get_user_votes(user_id, None, location_id) if user_id else None
-        user_position_ids = _get_user_position_ids(user_id, None, location_id) if user_id else None
-        positions = _extract_positions(math_data, None, polis_conv_id, user_position_ids)
-
-        # If Polis hasn't computed any meaningful data yet, use fallback
-        if not groups and not positions:
-            fallback = _get_fallback_stats(location_id, None, user_id)
-            fallback.conversation_id = polis_conv_id
-            fallback.polis_report_url = _build_report_url(polis_conv_id)
-            return _add_stats_cache_headers(fallback)
-
-        stats = StatsResponse(
-            conversation_id=polis_conv_id,
-            polis_report_url=_build_report_url(polis_conv_id),
-            groups=groups,
-            user_position=user_position,
-            positions=positions,
-            user_votes=user_votes,
-            user_position_ids=user_position_ids
-        )
-        return _add_stats_cache_headers(stats)
-
+        return _polis_stats_response(location_id, None, user_id, polis_conv_id)
     except PolisError as e:
         print(f"Polis error getting location stats: {e}", flush=True)
         return _add_stats_cache_headers(_get_fallback_stats(location_id, None, user_id))
 
 
+def _polis_stats_response(
+    location_id: str,
+    category_id: Optional[str],
+    user_id: Optional[str],
+    polis_conv_id: str
+):
+    """
+    Serve Polis stats from the materialized snapshot plus the user's overlay.
+
+    The snapshot (groups, labels, positions, closure counts, report URL) is
+    shared by every user and rebuilt only when the math tick or the
+    location's pairwise responses change; see helpers/stats_snapshot.py.
+    """
+    xid = generate_xid(user_id) if user_id else None
+    math_data = get_math_data(polis_conv_id, xid)
+
+    if not math_data:
+        return _get_fallback_stats(location_id, category_id, user_id)
+
+    snapshot = get_stats_snapshot(
+        location_id, category_id, math_data.get("math_tick"),
+        lambda: _build_stats_snapshot(math_data, polis_conv_id, location_id, category_id)
+    )
+
+    user_position = _extract_user_position(math_data, xid)
+    user_votes = _get_user_votes(user_id, category_id, location_id) if user_id else None
+    user_position_ids = _get_user_position_ids(user_id, category_id, location_id) if user_id else None
+    user_positions = _extract_user_positions(math_data, snapshot["positions"], polis_conv_id, user_position_ids)
+
+    # If Polis hasn't computed any meaningful data yet, use fallback
+    # This happens when there aren't enough votes for clustering
+    if not snapshot["groups"] and not snapshot["positions"] and not user_positions:
+        fallback = _get_fallback_stats(location_id, category_id, user_id)
+        # Preserve the conversation ID so frontend knows Polis is connected
+        fallback.conversation_id = polis_conv_id
+        fallback.polis_report_url = snapshot["polisReportUrl"]
+        return _add_stats_cache_headers(fallback)
+
+    body = overlay_user_stats(snapshot, user_position, user_votes, user_position_ids, user_positions)
+    return _stats_json_response(body, datetime.fromisoformat(snapshot["builtAt"]))
+
+
+def _build_stats_snapshot(
+    math_data: Dict[str, Any],
+    polis_conv_id: str,
+    location_id: str,
+    category_id: Optional[str]
+) -> Dict[str, Any]:
+    """Build the user-independent part of a stats response as a JSON-safe dict."""
+    groups = _extract_groups(math_data, polis_conv_id, location_id, category_id)
+    return {
+        "conversationId": polis_conv_id,
+        "polisReportUrl": _build_report_url(polis_conv_id),
+        "groups": [_model_to_dict(g) for g in groups],
+        "positions": _extract_positions(math_data, category_id, polis_conv_id),
+    }
+
+
+def _model_to_dict(model) -> Dict[str, Any]:
+    """camelCase dict of a generated model's non-None attributes."""
+    return {
+        model.attribute_map[attr]: getattr(model, attr)
+        for attr in model.openapi_types
+        if getattr(model, attr) is not None
+    }
+
+
 def _get_fallback_stats(
     location_id: str,
     category_id: Optional[str],
@@ -538,10 +501,7 @@ def _get_fallback_stats(
                    u.trust_score as creator_trust_score,
                    u.avatar_url as creator_avatar_url,
                    u.avatar_icon_url as creator_avatar_icon_url,
-                   COALESCE((
-                       SELECT COUNT(*) FROM kudos k
-                       WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-                   ), 0) as creator_kudos_count,
+                   COALESCE(u.kudos_received_count, 0) as creator_kudos_count,
                    COALESCE(SUM(CASE WHEN r.response = 'agree' THEN 1 ELSE 0 END), 0) as agree_count,
                    COALESCE(SUM(CASE WHEN r.response = 'disagree' THEN 1 ELSE 0 END), 0) as disagree_count,
                    COALESCE(SUM(CASE WHEN r.response = 'pass' THEN 1 ELSE 0 END), 0) as pass_count
@@ -574,10 +534,7 @@ def _get_fallback_stats(
                    u.trust_score as creator_trust_score,
                    u.avatar_url as creator_avatar_url,
                    u.avatar_icon_url as creator_avatar_icon_url,
-                   COALESCE((
-                       SELECT COUNT(*) FROM kudos k
-                       WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-                   ), 0) as creator_kudos_count,
+                   COALESCE(u.kudos_received_count, 0) as creator_kudos_count,
                    COALESCE(SUM(CASE WHEN r.response = 'agree' THEN 1 ELSE 0 END), 0) as agree_count,
                    COALESCE(SUM(CASE WHEN r.response = 'disagree' THEN 1 ELSE 0 END), 0) as disagree_count,
                    COALESCE(SUM(CASE WHEN r.response = 'pass' THEN 1 ELSE 0 END), 0) as pass_count
@@ -841,15 +798,13 @@ def _extract_user_position(
 def _extract_positions(
     math_data: Dict[str, Any],
     category_id: str,
-    polis_conv_id: str,
-    user_position_ids: Optional[List[str]] = None
+    polis_conv_id: str
 ) -> List[Dict[str, Any]]:
     """
     Extract representative positions for each group from Polis math data.
 
     Uses the repness (representativeness) data to find defining positions.
     Also includes consensus data for majority opinion positions.
-    Also includes user's own positions for the "My Positions" tab.
     Returns positions with vote distributions for ALL groups.
     """
     # Polis returns nested structure: pca.asPOJO contains the actual math data
@@ -891,10 +846,7 @@ def _extract_positions(
             u.trust_score as creator_trust_score,
             u.avatar_url as creator_avatar_url,
             u.avatar_icon_url as creator_avatar_icon_url,
-            COALESCE((
-                SELECT COUNT(*) FROM kudos k
-                WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-            ), 0) as creator_kudos_count
+            COALESCE(u.kudos_received_count, 0) as creator_kudos_count
         FROM polis_comment pc
         JOIN position p ON pc.position_id = p.id
         LEFT JOIN position_category cat ON p.category_id = cat.id
@@ -1055,94 +1007,122 @@ def _extract_positions(
             "consensusScore": round(consensus_score, 3) if consensus_score else None
         })
 
-    # Add user's own positions if not already included
-    # These are needed for the "My Positions" tab
-    if user_position_ids:
-        existing_ids = {p["id"] for p in positions}
-        missing_user_position_ids = [pid for pid in user_position_ids if pid not in existing_ids]
-
-        if missing_user_position_ids:
-            # Fetch user positions from database
-            placeholders = ",".join(["%s"] * len(missing_user_position_ids))
-            user_positions_data = db.execute_query(f"""
-                SELECT
-                    p.id as position_id,
-                    p.statement,
-                    p.category_id,
-                    cat.label as category_label,
-                    p.location_id,
-                    loc.name as location_name,
-                    loc.code as location_short_code,
-                    p.creator_user_id,
-                    u.display_name as creator_display_name,
-                    u.username as creator_username,
-                    u.user_type as creator_user_type,
-                    u.trust_score as creator_trust_score,
-                    u.avatar_url as creator_avatar_url,
-                    u.avatar_icon_url as creator_avatar_icon_url,
-                    COALESCE((
-                        SELECT COUNT(*) FROM kudos k
-                        WHERE k.receiver_user_id = u.id AND k.status = 'sent'
-                    ), 0) as creator_kudos_count,
-                    pc.polis_comment_tid
-                FROM position p
-                LEFT JOIN position_category cat ON p.category_id = cat.id
-                LEFT JOIN location loc ON p.location_id = loc.id
-                LEFT JOIN users u ON p.creator_user_id = u.id
-                LEFT JOIN polis_comment pc ON pc.position_id = p.id
-                    AND pc.polis_conversation_id = %s
-                WHERE p.id IN ({placeholders})
-            """, (polis_conv_id, *missing_user_position_ids))
-
-            for up in (user_positions_data or []):
-                tid = up.get("polis_comment_tid")
-
-                creator = None
-                if up.get("creator_user_id"):
-                    creator = {
-                        "id": str(up["creator_user_id"]),
-                        "displayName": up.get("creator_display_name", "Anonymous"),
-                        "username": up.get("creator_username"),
-                        "userType": up.get("creator_user_type", "normal"),
-                        "trustScore": float(up.get("creator_trust_score", 0) or 0),
-                        "avatarUrl": up.get("creator_avatar_url"),
-                        "avatarIconUrl": up.get("creator_avatar_icon_url"),
-                        "kudosCount": up.get("creator_kudos_count", 0)
-                    }
-
-                # Get vote distributions if we have a tid
-                vote_dist = {"agree": 0, "disagree": 0, "pass": 0}
-                total_votes = 0
-                group_votes_dict = {}
-                if tid is not None:
-                    vote_dist, total_votes = _get_overall_vote_dist(votes_base, group_votes, tid)
-                    for gid in all_group_ids:
-                        group_votes_dict[gid] = _get_vote_dist_for_group(group_votes, tid, gid)
-
-                positions.append({
-                    "id": str(up["position_id"]),
-                    "statement": up["statement"],
-                    "category": {
-                        "id": str(up["category_id"]) if up.get("category_id") else None,
-                        "label": up.get("category_label", "Uncategorized")
-                    },
-                    "location": {
-                        "id": str(up["location_id"]) if up.get("location_id") else None,
-                        "name": up.get("location_name", "Unknown"),
-                        "code": up.get("location_short_code", "")
-                    },
-                    "creator": creator,
-                    "groupId": None,
-                    "voteDistribution": vote_dist,
-                    "totalVotes": total_votes,
-                    "groupVotes": group_votes_dict,
-                    "isDefining": False,
-                    "representativeness": 0,
-                    "consensusType": None,
-                    "consensusScore": None
-                })
-
-    # Add closure counts for all positions
+    _add_closure_counts(positions)
+
+    # Sort by representativeness descending
+    positions.sort(key=lambda p: p["representativeness"], reverse=True)
+
+    return positions
+
+
+def _extract_user_positions(
+    math_data: Dict[str, Any],
+    snapshot_positions: List[Dict[str, Any]],
+    polis_conv_id: str,
+    user_position_ids: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Build the user's own positions that the snapshot does not already list.
+
+    These are needed for the "My Positions" tab. Vote distributions come
+    from the same math data as the snapshot.
+    """
+    pca_wrapper = math_data.get("pca", {})
+    pca_data = pca_wrapper.get("asPOJO", {}) if isinstance(pca_wrapper, dict) else {}
+    group_votes = pca_data.get("group-votes", {})
+    votes_base = pca_data.get("votes-base", {})
+    all_group_ids = list(group_votes.keys())
+
+    existing_ids = {p["id"] for p in snapshot_positions}
+    missing_user_position_ids = [pid for pid in (user_position_ids or []) if pid not in existing_ids]
+    if not missing_user_position_ids:
+        return []
+
+    # Fetch user positions from database
+    placeholders = ",".join(["%s"] * len(missing_user_position_ids))
+    user_positions_data = db.execute_query(f"""
+        SELECT
+            p.id as position_id,
+            p.statement,
+            p.category_id,
+            cat.label as category_label,
+            p.location_id,
+            loc.name as location_name,
+            loc.code as location_short_code,
+            p.creator_user_id,
+            u.display_name as creator_display_name,
+            u.username as creator_username,
+            u.user_type as creator_user_type,
+            u.trust_score as creator_trust_score,
+            u.avatar_url as creator_avatar_url,
+            u.avatar_icon_url as creator_avatar_icon_url,
+            COALESCE(u.kudos_received_count, 0) as creator_kudos_count,
+            pc.polis_comment_tid
+        FROM position p
+        LEFT JOIN position_category cat ON p.category_id = cat.id
+        LEFT JOIN location loc ON p.location_id = loc.id
+        LEFT JOIN users u ON p.creator_user_id = u.id
+        LEFT JOIN polis_comment pc ON pc.position_id = p.id
+            AND pc.polis_conversation_id = %s
+        WHERE p.id IN ({placeholders})
+    """, (polis_conv_id, *missing_user_position_ids))
+
+    positions = []
+    for up in (user_positions_data or []):
+        tid = up.get("polis_comment_tid")
+
+        creator = None
+        if up.get("creator_user_id"):
+            creator = {
+                "id": str(up["creator_user_id"]),
+                "displayName": up.get("creator_display_name", "Anonymous"),
+                "username": up.get("creator_username"),
+                "userType": up.get("creator_user_type", "normal"),
+                "trustScore": float(up.get("creator_trust_score", 0) or 0),
+                "avatarUrl": up.get("creator_avatar_url"),
+                "avatarIconUrl": up.get("creator_avatar_icon_url"),
+                "kudosCount": up.get("creator_kudos_count", 0)
+            }
+
+        # Get vote distributions if we have a tid
+        vote_dist = {"agree": 0, "disagree": 0, "pass": 0}
+        total_votes = 0
+        group_votes_dict = {}
+        if tid is not None:
+            vote_dist, total_votes = _get_overall_vote_dist(votes_base, group_votes, tid)
+            for gid in all_group_ids:
+                group_votes_dict[gid] = _get_vote_dist_for_group(group_votes, tid, gid)
+
+        positions.append({
+            "id": str(up["position_id"]),
+            "statement": up["statement"],
+            "category": {
+                "id": str(up["category_id"]) if up.get("category_id") else None,
+                "label": up.get("category_label", "Uncategorized")
+            },
+            "location": {
+                "id": str(up["location_id"]) if up.get("location_id") else None,
+                "name": up.get("location_name", "Unknown"),
+                "code": up.get("location_short_code", "")
+            },
+            "creator": creator,
+            "groupId": None,
+            "voteDistribution": vote_dist,
+            "totalVotes": total_votes,
+            "groupVotes": group_votes_dict,
+            "isDefining": False,
+            "representativeness": 0,
+            "consensusType": None,
+            "consensusScore": None
+        })
+
+
+    _add_closure_counts(positions)
+    return positions
+
+
+def _add_closure_counts(positions: List[Dict[str, Any]]):
+    """Set closureCount on each position from agreed chat closures."""
     real_position_ids = [p["id"] for p in positions if not p["id"].startswith("polis:")]
     closure_counts = {}
     if real_position_ids:
@@ -1163,11 +1143,6 @@ def _extract_positions(
     for p in positions:
         p["closureCount"] = closure_counts.get(p["id"], 0)
 
-    # Sort by representativeness descending
-    positions.sort(key=lambda p: p["representativeness"], reverse=True)
-
-    return positions
-
 
 
 
@@ -20,6 +20,8 @@ from candid.controllers.helpers.pairwise_graph import (
     find_condorcet_winner,
     ranked_pairs_ordering,
 )
+from candid.controllers.helpers.stats import get_pairwise_counts_by_group
+from candid.controllers.helpers.stats_snapshot import note_responses as note_stats_responses
 def _get_user_card(user_id):
     """Helper to fetch and return a User model for API responses."""
     user = db.execute_query("""
@@ -57,9 +59,8 @@ def _get_group_member_user_ids(polis_conversation_id, group_id):
         return None
 
     try:
-        from candid.controllers.helpers.polis_client import get_client
-        client = get_client()
-        math_data = client.get_math_data(polis_conversation_id)
+        from candid.controllers.helpers.polis_math import get_math_data
+        math_data = get_math_data(polis_conversation_id)
 
         if not math_data:
             return None
@@ -715,9 +716,9 @@ def get_survey_rankings(survey_id, filter_location_id=None, group_id=None, polis
     polis_conv_id = survey["polis_conversation_id"]
     if polis_conv_id:
         try:
-            from candid.controllers.helpers.polis_client import get_client, PolisError
-            client = get_client()
-            math_data = client.get_math_data(polis_conv_id)
+            from candid.controllers.helpers.polis_client import PolisError
+            from candid.controllers.helpers.polis_math import get_math_data
+            math_data = get_math_data(polis_conv_id)
 
             if math_data:
                 pca_wrapper = math_data.get("pca", {})
@@ -725,37 +726,14 @@ def get_survey_rankings(survey_id, filter_location_id=None, group_id=None, polis
                 group_clusters = pca_data.get("group-clusters", [])
                 labels = ["A", "B", "C", "D", "E", "F", "G", "H"]
 
-                for group_idx, cluster in enumerate(group_clusters):
-                    if not cluster:
-                        continue
+                # Winner/loser tallies for all groups in one query
+                counts_by_group = get_pairwise_counts_by_group(polis_conv_id, survey_id, group_clusters)
 
-                    group_id = str(group_idx)
+                for group_id, group_responses in counts_by_group.items():
+                    group_idx = int(group_id)
                     group_label = labels[group_idx] if group_idx < len(labels) else f"Group {group_idx + 1}"
-                    pids = cluster.get("members", [])
+                    pids = group_clusters[group_idx].get("members", [])
 
-                    if not pids:
-                        continue
-
-                    # Get user_ids for this group's members
-                    user_ids = db.execute_query("""
-                        SELECT user_id FROM polis_participant
-                        WHERE polis_conversation_id = %s AND polis_pid = ANY(%s)
-                    """, (polis_conv_id, pids))
-
-                    user_id_list = [str(u["user_id"]) for u in (user_ids or [])]
-
-                    if not user_id_list:
-                        continue
-
-                    # Get raw responses for this group's members
-                    group_raw = db.execute_query("""
-                        SELECT winner_item_id, loser_item_id
-                        FROM pairwise_response
-                        WHERE survey_id = %s::uuid
-                          AND user_id = ANY(%s::uuid[])
-                    """, (survey_id, user_id_list))
-
-                    group_responses = [dict(r) for r in (group_raw or [])]
                     group_victory = build_victory_matrix(item_ids, group_responses)
                     group_condorcet = find_condorcet_winner(item_ids, group_victory)
                     group_order = ranked_pairs_ordering(item_ids, group_victory)
@@ -823,7 +801,7 @@ def respond_to_pairwise(survey_id, body, token_info=None):  # noqa: E501
 
     # Validate survey exists, is pairwise type, and is active
     survey = db.execute_query("""
-        SELECT id, survey_type, status, start_time, end_time
+        SELECT id, survey_type, status, start_time, end_time, location_id
         FROM survey WHERE id = %s
     """, (survey_id,), fetchone=True)
 
@@ -882,6 +860,9 @@ def respond_to_pairwise(survey_id, body, token_info=None):  # noqa: E501
         VALUES (%s, %s, %s, %s, %s)
     """, (response_id, survey_id, user.id, winner_item_id, loser_item_id))
 
+    # Group labels in this location's stats snapshots re-rank on new responses
+    note_stats_responses(survey['location_id'])
+
     return {"success": True}
 
 
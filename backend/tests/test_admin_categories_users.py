@@ -4,6 +4,7 @@ Tests:
 - POST /admin/categories — create category, duplicate, empty label, unauthorized
 - PATCH /admin/users/{userId}/status — ban active user, already banned, unauthorized
 - PATCH /admin/users/{userId}/status — unban banned user, not banned, nonexistent, unauthorized
+- GET /admin/metrics — site admin snapshot, unauthorized
 """
 
 import pytest
@@ -19,6 +20,7 @@ from conftest import (
 
 ADMIN_CATEGORIES_URL = f"{BASE_URL}/admin/categories"
 ADMIN_USERS_URL = f"{BASE_URL}/admin/users"
+ADMIN_METRICS_URL = f"{BASE_URL}/admin/metrics"
 
 
 # ---------------------------------------------------------------------------
@@ -200,3 +202,25 @@ class TestUnbanUser:
             json={"status": "active", "reason": "Test unban"},
         )
         assert resp.status_code in (401, 403)
+
+
+# ---------------------------------------------------------------------------
+# Metrics tests
+# ---------------------------------------------------------------------------
+
+class TestAdminMetrics:
+    """GET /admin/metrics"""
+
+    def test_metrics_admin(self, admin_headers):
+        """Site admin gets the NLP client and embedding cache metrics."""
+        resp = requests.get(ADMIN_METRICS_URL, headers=admin_headers)
+        assert resp.status_code == 200
+        nlp = resp.json()["nlp"]
+        assert nlp["circuitBreaker"] in ("closed", "open", "half_open")
+        assert isinstance(nlp["endpoints"], dict)
+        assert set(nlp["embeddingCache"]) == {"hits", "misses"}
+
+    def test_metrics_unauthorized(self, normal_headers):
+        """Normal user cannot read metrics."""
+        resp = requests.get(ADMIN_METRICS_URL, headers=normal_headers)
+        assert resp.status_code in (401, 403)
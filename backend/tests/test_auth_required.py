@@ -123,6 +123,7 @@ PROTECTED_ENDPOINTS = [
 
     # --- Admin user management ---
     ("PATCH",  f"/admin/users/{_UUID}/status"),
+    ("GET",    "/admin/metrics"),
 
     # --- Admin role management ---
     ("GET",    "/admin/roles"),
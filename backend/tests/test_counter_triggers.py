@@ -2,12 +2,14 @@
 
 Tests trg_response_position_counts (response → position vote counters),
 trg_comment_counts (comment → post.comment_count + comment.child_count),
+trg_kudos_received_count (kudos → users.kudos_received_count),
 and reconcile_counters() function.
 """
 
 import uuid
 import pytest
 from conftest import (
+    CHAT_LOG_1_ID,
     POSITION1_ID,
     NORMAL1_ID,
     NORMAL3_ID,
@@ -15,6 +17,7 @@ from conftest import (
     db_execute,
     db_execute_returning,
     db_query,
+    cleanup_kudos,
 )
 
 
@@ -238,6 +241,65 @@ class TestCommentCountTrigger:
         assert self._get_child_count(parent_id) == 0
 
 
+# ---------------------------------------------------------------------------
+# Kudos received counter trigger
+# ---------------------------------------------------------------------------
+
+class TestKudosReceivedCountTrigger:
+    """trg_kudos_received_count: kudos INSERT/UPDATE/DELETE → users.kudos_received_count."""
+
+    @pytest.fixture(autouse=True)
+    def cleanup(self):
+        """Remove Normal1 → Normal3 kudos on chat log 1 before and after each test."""
+        cleanup_kudos(NORMAL1_ID, CHAT_LOG_1_ID)
+        yield
+        cleanup_kudos(NORMAL1_ID, CHAT_LOG_1_ID)
+
+    def _get_count(self):
+        rows = db_query("SELECT kudos_received_count FROM users WHERE id = %s", (NORMAL3_ID,))
+        return rows[0]["kudos_received_count"]
+
+    def _insert_kudos(self, status):
+        db_execute("""
+            INSERT INTO kudos (sender_user_id, receiver_user_id, chat_log_id, status)
+            VALUES (%s, %s, %s, %s)
+        """, (NORMAL1_ID, NORMAL3_ID, CHAT_LOG_1_ID, status))
+
+    def _set_status(self, status):
+        db_execute(
+            "UPDATE kudos SET status = %s WHERE sender_user_id = %s AND chat_log_id = %s",
+            (status, NORMAL1_ID, CHAT_LOG_1_ID),
+        )
+
+    def test_insert_sent_increments(self):
+        before = self._get_count()
+        self._insert_kudos("sent")
+        assert self._get_count() == before + 1
+
+    def test_insert_dismissed_no_change(self):
+        before = self._get_count()
+        self._insert_kudos("dismissed")
+        assert self._get_count() == before
+
+    def test_dismissed_to_sent_increments(self):
+        before = self._get_count()
+        self._insert_kudos("dismissed")
+        self._set_status("sent")
+        assert self._get_count() == before + 1
+
+    def test_sent_to_dismissed_decrements(self):
+        before = self._get_count()
+        self._insert_kudos("sent")
+        self._set_status("dismissed")
+        assert self._get_count() == before
+
+    def test_delete_sent_decrements(self):
+        before = self._get_count()
+        self._insert_kudos("sent")
+        cleanup_kudos(NORMAL1_ID, CHAT_LOG_1_ID)
+        assert self._get_count() == before
+
+
 # ---------------------------------------------------------------------------
 # Reconciliation function
 # ---------------------------------------------------------------------------
@@ -275,6 +337,21 @@ class TestReconcileCounters:
         counts = get_position_counts(POSITION1_ID)
         assert counts["agree_count"] != 999
 
+    def test_reconcile_fixes_drifted_kudos_count(self):
+        """A corrupted kudos_received_count is recomputed from sent kudos."""
+        expected = db_query(
+            "SELECT COUNT(*) AS cnt FROM kudos WHERE receiver_user_id = %s AND status = 'sent'",
+            (NORMAL5_ID,),
+        )[0]["cnt"]
+        db_execute("UPDATE users SET kudos_received_count = 999 WHERE id = %s", (NORMAL5_ID,))
+
+        results = db_execute_returning("SELECT * FROM reconcile_counters()")
+        result_map = {r["counter_name"]: r["rows_fixed"] for r in results}
+
+        assert result_map["users.kudos_received_count"] >= 1
+        rows = db_query("SELECT kudos_received_count FROM users WHERE id = %s", (NORMAL5_ID,))
+        assert rows[0]["kudos_received_count"] == expected
+
     def test_reconcile_returns_zero_when_no_drift(self):
         """When all counters are correct, reconcile reports zero fixes."""
         # First reconcile to ensure everything is correct
@@ -287,6 +364,7 @@ class TestReconcileCounters:
         assert result_map["position.response_counts"] == 0
         assert result_map["post.comment_count"] == 0
         assert result_map["comment.child_count"] == 0
+        assert result_map["users.kudos_received_count"] == 0
 
     def test_reconcile_returns_all_counter_groups(self):
         """Reconcile returns a row for each counter group."""
@@ -298,4 +376,5 @@ class TestReconcileCounters:
             "comment.child_count",
             "post.vote_counts",
             "comment.vote_counts",
+            "users.kudos_received_count",
         }
@@ -66,9 +66,17 @@ with patch.dict("sys.modules", {
 }):
     pass  # Module is now in sys.modules cache
 
-# Disable Polis and MF worker auto-start
+# Disable Polis, MF, card queue, push dispatcher, feed score refresher and vote
+# reconciler worker auto-start, and the shared cache pub/sub listener thread.
+# With the push outbox off, handlers send notifications inline;
+# test_push_dispatcher.py turns it back on.
 os.environ.setdefault("POLIS_ENABLED", "false")
 os.environ.setdefault("MF_ENABLED", "false")
+os.environ.setdefault("CARD_QUEUE_ENABLED", "false")
+os.environ.setdefault("PUSH_OUTBOX_ENABLED", "false")
+os.environ.setdefault("FEED_SCORE_REFRESH_ENABLED", "false")
+os.environ.setdefault("VOTE_RECONCILE_ENABLED", "false")
+os.environ.setdefault("CACHE_PUBSUB_ENABLED", "false")
 
 # Now add generated to path so 'candid' resolves
 if _GENERATED not in sys.path:
@@ -132,8 +140,16 @@ class MockRedis:
     def get(self, key):
         return self._data.get(key)
 
-    def set(self, key, value):
+    def mget(self, keys):
+        return [self._data.get(k) for k in keys]
+
+    def set(self, key, value, ex=None, nx=False):
+        if nx and key in self._data:
+            return None
         self._data[key] = value
+        if ex is not None:
+            self._ttls[key] = ex
+        return True
 
     def setex(self, key, ttl, value):
         self._data[key] = value
@@ -157,6 +173,126 @@ class MockRedis:
     def publish(self, channel, message):
         return 1  # Simulates 1 subscriber
 
+    def incr(self, key, amount=1):
+        self._data[key] = str(int(self._data.get(key, 0)) + amount)
+        return int(self._data[key])
+
+    def expire(self, key, ttl):
+        if key in self._data:
+            self._ttls[key] = ttl
+            return True
+        return False
+
+    # -- lists --
+
+    def rpush(self, key, *values):
+        self._data.setdefault(key, []).extend(str(v) for v in values)
+        return len(self._data[key])
+
+    def lrange(self, key, start, end):
+        items = self._data.get(key, [])
+        end = len(items) if end == -1 else end + 1
+        return list(items[start:end])
+
+    def ltrim(self, key, start, end):
+        items = self._data.get(key, [])
+        end = len(items) if end == -1 else end + 1
+        self._data[key] = items[start:end]
+        return True
+
+    def llen(self, key):
+        return len(self._data.get(key, []))
+
+    def lrem(self, key, count, value):
+        items = self._data.get(key, [])
+        kept = [v for v in items if v != str(value)]
+        self._data[key] = kept
+        return len(items) - len(kept)
+
+    # -- hashes --
+
+    def hset(self, key, field=None, value=None, mapping=None):
+        h = self._data.setdefault(key, {})
+        if field is not None:
+            h[field] = value
+        h.update(mapping or {})
+        return 1
+
+    def hget(self, key, field):
+        return self._data.get(key, {}).get(field)
+
+    def hmget(self, key, fields):
+        h = self._data.get(key, {})
+        return [h.get(f) for f in fields]
+
+    def hgetall(self, key):
+        return dict(self._data.get(key, {}))
+
+    def hincrby(self, key, field, amount=1):
+        h = self._data.setdefault(key, {})
+        h[field] = str(int(h.get(field, 0)) + amount)
+        return int(h[field])
+
+    def hdel(self, key, *fields):
+        h = self._data.get(key, {})
+        return sum(1 for f in fields if h.pop(f, None) is not None)
+
+    # -- sets --
+
+    def sadd(self, key, *members):
+        s = self._data.setdefault(key, set())
+        before = len(s)
+        s.update(str(m) for m in members)
+        return len(s) - before
+
+    def srem(self, key, *members):
+        s = self._data.get(key, set())
+        before = len(s)
+        s.difference_update(str(m) for m in members)
+        return before - len(s)
+
+    def smembers(self, key):
+        return set(self._data.get(key, set()))
+
+    def spop(self, key, count=None):
+        s = self._data.get(key, set())
+        if count is None:
+            return s.pop() if s else None
+        return [s.pop() for _ in range(min(count, len(s)))]
+
+    # -- sorted sets --
+
+    def zadd(self, key, mapping):
+        z = self._data.setdefault(key, {})
+        added = sum(1 for m in mapping if m not in z)
+        z.update(mapping)
+        return added
+
+    def zrem(self, key, *members):
+        z = self._data.get(key, {})
+        return sum(1 for m in members if z.pop(m, None) is not None)
+
+    def zcard(self, key):
+        return len(self._data.get(key, {}))
+
+    def zscore(self, key, member):
+        return self._data.get(key, {}).get(member)
+
+    def zremrangebyscore(self, key, min_score, max_score):
+        z = self._data.get(key, {})
+        doomed = [m for m, score in z.items() if min_score <= score <= max_score]
+        for m in doomed:
+            del z[m]
+        return len(doomed)
+
+    def zrangebyscore(self, key, min_score, max_score, start=None, num=None):
+        z = self._data.get(key, {})
+        members = [m for m, score in sorted(z.items(), key=lambda kv: kv[1])
+                   if min_score <= score <= max_score]
+        if start is not None and num is not None:
+            members = members[start:start + num]
+        return members
+
 
 class MockPipeline:
     """Pipelines queue commands and return results in order."""
@@ -177,6 +313,16 @@ class MockPipeline:
         self._ops.append(("get", key))
         return self
 
+    def __getattr__(self, name):
+        # Any other MockRedis command is queued and replayed on execute()
+        if name.startswith("_") or not hasattr(self._redis, name):
+            raise AttributeError(name)
+
+        def queue(*args, **kwargs):
+            self._ops.append(("call", name, args, kwargs))
+            return self
+        return queue
+
     def execute(self):
         results = []
         for op in self._ops:
@@ -188,6 +334,8 @@ class MockPipeline:
                 results.append(self._redis.exists(op[1]))
             elif cmd == "get":
                 results.append(self._redis.get(op[1]))
+            elif cmd == "call":
+                results.append(getattr(self._redis, op[1])(*op[2], **op[3]))
         self._ops = []
         return results
 
@@ -202,6 +350,19 @@ def mock_redis():
         yield r
 
 
+@pytest.fixture(autouse=True)
+def shared_cache_redis():
+    """Back the shared cache's and embedding cache's Redis with a fresh MockRedis per test.
+
+    Without this every location/user-context/embedding lookup would try to
+    reach a real Redis, and cached values would leak between tests.
+    """
+    r = MockRedis()
+    with patch("candid.controllers.helpers.shared_cache.get_redis", return_value=r), \
+         patch("candid.controllers.helpers.nlp.get_redis", return_value=r):
+        yield r
+
+
 # ---------------------------------------------------------------------------
 # Mock Config
 # ---------------------------------------------------------------------------
@@ -0,0 +1,107 @@
+"""Local stand-in for the Expo Push API, for dispatcher tests.
+
+Serves POST /send and POST /getReceipts on 127.0.0.1 with an ephemeral port.
+Behaviour is scripted per test:
+
+- ``ticket_errors``:  push token -> Expo ticket error code (e.g. "DeviceNotRegistered")
+- ``receipt_errors``: push token -> Expo receipt error code
+- ``fail_next``:      HTTP status codes returned (in order) before normal service resumes
+
+Every request body is recorded in ``requests`` as (path, parsed JSON).
+"""
+
+import json
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeExpoServer:
+    def __init__(self):
+        self.requests = []
+        self.ticket_errors = {}
+        self.receipt_errors = {}
+        self.fail_next = []
+        self._tickets = {}  # ticket id -> push token
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def sent_messages(self):
+        """All messages received on /send, flattened across batches."""
+        return [m for path, body in self.requests if path == "/send" for m in body]
+
+    # ----- request handling -----
+
+    def _send(self, messages):
+        tickets = []
+        for message in messages:
+            error = self.ticket_errors.get(message["to"])
+            if error:
+                tickets.append({"status": "error", "message": error, "details": {"error": error}})
+                continue
+            ticket_id = uuid.uuid4().hex
+            with self._lock:
+                self._tickets[ticket_id] = message["to"]
+            tickets.append({"status": "ok", "id": ticket_id})
+        return {"data": tickets}
+
+    def _receipts(self, ids):
+        receipts = {}
+        for ticket_id in ids:
+            token = self._tickets.get(ticket_id)
+            if token is None:
+                continue
+            error = self.receipt_errors.get(token)
+            if error:
+                receipts[ticket_id] = {"status": "error", "message": error, "details": {"error": error}}
+            else:
+                receipts[ticket_id] = {"status": "ok"}
+        return {"data": receipts}
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"null")
+                path = self.path.rsplit("/", 1)[-1]
+                fake.requests.append((f"/{path}", body))
+
+                with fake._lock:
+                    status = fake.fail_next.pop(0) if fake.fail_next else 200
+                if status != 200:
+                    payload = {"errors": [{"code": "TEST_FAILURE", "message": "scripted failure"}]}
+                elif path == "send":
+                    payload = fake._send(body)
+                elif path == "getReceipts":
+                    payload = fake._receipts(body["ids"])
+                else:
+                    status, payload = 404, {"errors": [{"code": "NOT_FOUND"}]}
+
+                encoded = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
@@ -24,11 +24,13 @@ US_ANCESTORS = [US_ROOT]
 
 @pytest.fixture(autouse=True)
 def _clear_caches():
-    """Clear location caches before each test."""
-    from candid.controllers.helpers.auth import invalidate_location_cache
+    """Clear location and role caches before each test."""
+    from candid.controllers.helpers.auth import invalidate_location_cache, invalidate_role_cache
     invalidate_location_cache()
+    invalidate_role_cache()
     yield
     invalidate_location_cache()
+    invalidate_role_cache()
 
 
 # ---------------------------------------------------------------------------
@@ -431,6 +433,99 @@ class TestGetHighestRoleAtLocation:
             assert get_highest_role_at_location("user-1", OREGON) is None
 
 
+class TestGetHighestRolesAtLocation:
+    def _db(self, rows):
+        """Mock DB answering the ancestors CTE and the batch role query."""
+        def side_effect(query, params=None, **kwargs):
+            if "WITH RECURSIVE" in query:
+                return [{"id": a} for a in OREGON_ANCESTORS]
+            return rows
+        mock_db = MagicMock()
+        mock_db.execute_query = MagicMock(side_effect=side_effect)
+        return mock_db
+
+    def _role_queries(self, mock_db):
+        return [c for c in mock_db.execute_query.call_args_list if "DISTINCT ON" in c.args[0]]
+
+    def test_single_query_for_many_users(self):
+        mock_db = self._db([
+            {"user_id": "user-1", "role": "admin"},
+            {"user_id": "user-2", "role": "expert"},
+        ])
+        with patch("candid.controllers.helpers.auth.db", mock_db):
+            from candid.controllers.helpers.auth import get_highest_roles_at_location
+            roles = get_highest_roles_at_location(
+                ["user-1", "user-2", "user-3", "user-1"], OREGON, HEALTHCARE_CAT)
+
+        assert roles == {"user-1": "admin", "user-2": "expert", "user-3": None}
+        role_queries = self._role_queries(mock_db)
+        assert len(role_queries) == 1
+        params = role_queries[0].args[1]
+        assert params["user_ids"] == ["user-1", "user-2", "user-3"]
+        assert params["ancestors"] == OREGON_ANCESTORS
+        assert params["location_id"] == OREGON
+        assert params["category_id"] == HEALTHCARE_CAT
+
+    def test_cached_including_users_without_roles(self):
+        mock_db = self._db([{"user_id": "user-1", "role": "moderator"}])
+        with patch("candid.controllers.helpers.auth.db", mock_db):
+            from candid.controllers.helpers.auth import get_highest_roles_at_location
+            get_highest_roles_at_location(["user-1", "user-2"], OREGON)
+            roles = get_highest_roles_at_location(["user-2", "user-1"], OREGON)
+
+        assert roles == {"user-2": None, "user-1": "moderator"}
+        assert len(self._role_queries(mock_db)) == 1
+
+    def test_only_misses_are_queried(self):
+        mock_db = self._db([])
+        with patch("candid.controllers.helpers.auth.db", mock_db):
+            from candid.controllers.helpers.auth import get_highest_roles_at_location
+            get_highest_roles_at_location(["user-1"], OREGON)
+            get_highest_roles_at_location(["user-1", "user-2"], OREGON)
+
+        role_queries = self._role_queries(mock_db)
+        assert [c.args[1]["user_ids"] for c in role_queries] == [["user-1"], ["user-2"]]
+
+    def test_uncached_always_queries(self):
+        mock_db = self._db([{"user_id": "user-1", "role": "moderator"}])
+        with patch("candid.controllers.helpers.auth.db", mock_db):
+            from candid.controllers.helpers.auth import get_highest_roles_at_location
+            get_highest_roles_at_location(["user-1"], OREGON)
+            roles = get_highest_roles_at_location(["user-1", "user-2"], OREGON, cached=False)
+
+        assert roles == {"user-1": "moderator", "user-2": None}
+        role_queries = self._role_queries(mock_db)
+        assert [c.args[1]["user_ids"] for c in role_queries] == [["user-1"], ["user-1", "user-2"]]
+
+    def test_category_is_part_of_cache_key(self):
+        mock_db = self._db([])
+        with patch("candid.controllers.helpers.auth.db", mock_db):
+            from candid.controllers.helpers.auth import get_highest_roles_at_location
+            get_highest_roles_at_location(["user-1"], OREGON)
+            get_highest_roles_at_location(["user-1"], OREGON, HEALTHCARE_CAT)
+
+        assert len(self._role_queries(mock_db)) == 2
+
+    def test_invalidate_role_cache(self):
+        mock_db = self._db([])
+        with patch("candid.controllers.helpers.auth.db", mock_db):
+            from candid.controllers.helpers.auth import (
+                get_highest_roles_at_location, invalidate_role_cache,
+            )
+            get_highest_roles_at_location(["user-1"], OREGON)
+            invalidate_role_cache()
+            get_highest_roles_at_location(["user-1"], OREGON)
+
+        assert len(self._role_queries(mock_db)) == 2
+
+    def test_empty_input_skips_db(self):
+        mock_db = self._db([])
+        with patch("candid.controllers.helpers.auth.db", mock_db):
+            from candid.controllers.helpers.auth import get_highest_roles_at_location
+            assert get_highest_roles_at_location([], OREGON) == {}
+        mock_db.execute_query.assert_not_called()
+
+
 class TestGetUserRoles:
     def test_returns_roles(self):
         mock_db = MagicMock()
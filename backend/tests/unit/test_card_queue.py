@@ -0,0 +1,280 @@
+"""Unit tests for card_queue.py — precomputed per-user card buffer."""
+
+import json
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from .conftest import MockRedis
+
+pytestmark = pytest.mark.unit
+
+CQ = "candid.controllers.helpers.card_queue"
+
+
+def _config(low=2, high=5):
+    cfg = MagicMock()
+    cfg.CARD_QUEUE_LOW_WATER = low
+    cfg.CARD_QUEUE_HIGH_WATER = high
+    cfg.CARD_QUEUE_TTL = 900
+    cfg.CARD_QUEUE_SERVED_TTL = 600
+    return cfg
+
+
+@pytest.fixture
+def cq():
+    """Yield (redis, db, card_queue module) with Redis, DB and config patched."""
+    r = MockRedis()
+    mock_db = MagicMock()
+    with patch(f"{CQ}.get_redis", return_value=r), \
+         patch(f"{CQ}.db", mock_db), \
+         patch(f"{CQ}.config", _config()):
+        from candid.controllers.helpers import card_queue
+        yield r, mock_db, card_queue
+
+
+def _pos(pid):
+    return {"id": pid, "statement": f"Statement {pid}", "category_id": "cat-1"}
+
+
+def _seed(r, user_id, ids, gen="0"):
+    r.rpush(f"card_queue:{user_id}", *ids)
+    r.hset(f"card_queue:{user_id}:cards", mapping={i: json.dumps(_pos(i)) for i in ids})
+    r.set(f"card_queue:{user_id}:gen", gen)
+
+
+def _all_servable(mock_db):
+    """Make the recheck query report every requested position as servable."""
+    mock_db.execute_query.side_effect = lambda sql, params=None, **kw: [
+        {"id": pid} for pid in params[1]
+    ]
+
+
+# ---------------------------------------------------------------------------
+# pop_positions
+# ---------------------------------------------------------------------------
+
+class TestPopPositions:
+    def test_pops_in_order(self, cq):
+        r, mock_db, card_queue = cq
+        _seed(r, "u1", ["p1", "p2", "p3", "p4", "p5"])
+        _all_servable(mock_db)
+
+        result = card_queue.pop_positions("u1", 2)
+
+        assert [p["id"] for p in result] == ["p1", "p2"]
+        assert r.lrange("card_queue:u1", 0, -1) == ["p3", "p4", "p5"]
+        assert r.hget("card_queue:u1:cards", "p1") is None
+
+    def test_marks_popped_as_served(self, cq):
+        r, mock_db, card_queue = cq
+        _seed(r, "u1", ["p1", "p2", "p3"])
+        _all_servable(mock_db)
+
+        card_queue.pop_positions("u1", 2)
+
+        assert r.smembers("card_queue:u1:served") == {"p1", "p2"}
+
+    def test_skips_ids_already_served_inline(self, cq):
+        r, mock_db, card_queue = cq
+        _seed(r, "u1", ["p1", "p2", "p3"])
+        _all_servable(mock_db)
+        card_queue.mark_served("u1", ["p1"])
+
+        result = card_queue.pop_positions("u1", 2)
+
+        assert [p["id"] for p in result] == ["p2"]
+        assert r.hget("card_queue:u1:cards", "p1") is None
+        assert r.lrange("card_queue:u1", 0, -1) == ["p3"]
+
+    def test_filters_unservable(self, cq):
+        r, mock_db, card_queue = cq
+        _seed(r, "u1", ["p1", "p2", "p3"])
+        mock_db.execute_query.return_value = [{"id": "p2"}]
+
+        result = card_queue.pop_positions("u1", 2)
+
+        assert [p["id"] for p in result] == ["p2"]
+
+    def test_empty_buffer_requests_refill(self, cq):
+        r, mock_db, card_queue = cq
+
+        result = card_queue.pop_positions("u1", 3)
+
+        assert result == []
+        assert "u1" in r.smembers("card_queue:refill")
+        mock_db.execute_query.assert_not_called()
+
+    def test_above_low_water_no_refill(self, cq):
+        r, mock_db, card_queue = cq
+        _seed(r, "u1", ["p1", "p2", "p3", "p4", "p5"])
+        _all_servable(mock_db)
+
+        card_queue.pop_positions("u1", 1)
+
+        assert r.smembers("card_queue:refill") == set()
+
+    def test_below_low_water_requests_refill(self, cq):
+        r, mock_db, card_queue = cq
+        _seed(r, "u1", ["p1", "p2", "p3"])
+        _all_servable(mock_db)
+
+        card_queue.pop_positions("u1", 2)
+
+        assert "u1" in r.smembers("card_queue:refill")
+
+    def test_stale_generation_discards_buffer(self, cq):
+        r, mock_db, card_queue = cq
+        _seed(r, "u1", ["p1", "p2", "p3"], gen="0")
+        card_queue.invalidate_all()
+
+        result = card_queue.pop_positions("u1", 2)
+
+        assert result == []
+        assert r.llen("card_queue:u1") == 0
+        assert "u1" in r.smembers("card_queue:refill")
+
+    def test_redis_failure_returns_empty(self, cq):
+        _, _, card_queue = cq
+        with patch(f"{CQ}.get_redis", side_effect=Exception("down")):
+            assert card_queue.pop_positions("u1", 2) == []
+
+
+# ---------------------------------------------------------------------------
+# Invalidation hooks
+# ---------------------------------------------------------------------------
+
+class TestInvalidation:
+    def test_invalidate_user_drops_buffer(self, cq):
+        r, _, card_queue = cq
+        _seed(r, "u1", ["p1", "p2"])
+
+        card_queue.invalidate_user("u1")
+
+        assert r.llen("card_queue:u1") == 0
+        assert r.hgetall("card_queue:u1:cards") == {}
+        assert "u1" in r.smembers("card_queue:refill")
+
+    def test_discard_positions(self, cq):
+        r, _, card_queue = cq
+        _seed(r, "u1", ["p1", "p2", "p3"])
+
+        card_queue.discard_positions("u1", ["p2"])
+
+        assert r.lrange("card_queue:u1", 0, -1) == ["p1", "p3"]
+        assert r.hget("card_queue:u1:cards", "p2") is None
+
+    def test_discard_positions_empty_is_noop(self, cq):
+        r, _, card_queue = cq
+        _seed(r, "u1", ["p1"])
+        card_queue.discard_positions("u1", [])
+        assert r.llen("card_queue:u1") == 1
+
+    def test_invalidate_all_bumps_generation(self, cq):
+        r, _, card_queue = cq
+        card_queue.invalidate_all()
+        card_queue.invalidate_all()
+        assert r.get("card_queue:generation") == "2"
+
+
+# ---------------------------------------------------------------------------
+# refill
+# ---------------------------------------------------------------------------
+
+class TestRefill:
+    def _refill(self, card_queue, positions, location_id="loc-1"):
+        cards_controller = MagicMock()
+        cards_controller._get_user_context.return_value = (location_id, {"cat-1": 3}, 3)
+        with patch.dict("sys.modules", {"candid.controllers.cards_controller": cards_controller}), \
+             patch("candid.controllers.helpers.polis_sync.get_unvoted_positions_for_user",
+                   return_value=positions) as mock_fetch:
+            added = card_queue.refill("u1")
+        return added, mock_fetch
+
+    def test_fills_to_high_water(self, cq):
+        r, _, card_queue = cq
+        added, mock_fetch = self._refill(card_queue, [_pos(f"p{i}") for i in range(10)])
+
+        assert added == 5
+        assert r.lrange("card_queue:u1", 0, -1) == ["p0", "p1", "p2", "p3", "p4"]
+        assert json.loads(r.hget("card_queue:u1:cards", "p0"))["statement"] == "Statement p0"
+        assert mock_fetch.call_args.kwargs["limit"] == 5
+
+    def test_skips_buffered_and_served(self, cq):
+        r, _, card_queue = cq
+        _seed(r, "u1", ["p0"])
+        r.sadd("card_queue:u1:served", "p1")
+
+        added, mock_fetch = self._refill(card_queue, [_pos(f"p{i}") for i in range(10)])
+
+        assert added == 4
+        assert r.lrange("card_queue:u1", 0, -1) == ["p0", "p2", "p3", "p4", "p5"]
+        # Over-fetches by the number of excluded ids
+        assert mock_fetch.call_args.kwargs["limit"] == 4 + 2
+
+    def test_full_buffer_skips_fetch(self, cq):
+        r, _, card_queue = cq
+        _seed(r, "u1", ["p0", "p1", "p2", "p3", "p4"])
+
+        added, mock_fetch = self._refill(card_queue, [])
+
+        assert added == 0
+        mock_fetch.assert_not_called()
+
+    def test_no_location_adds_nothing(self, cq):
+        r, _, card_queue = cq
+        added, mock_fetch = self._refill(card_queue, [], location_id=None)
+
+        assert added == 0
+        mock_fetch.assert_not_called()
+
+    def test_records_current_generation(self, cq):
+        r, _, card_queue = cq
+        card_queue.invalidate_all()
+
+        self._refill(card_queue, [_pos("p0")])
+
+        assert r.get("card_queue:u1:gen") == "1"
+
+
+# ---------------------------------------------------------------------------
+# CardQueueWorker
+# ---------------------------------------------------------------------------
+
+class TestCardQueueWorker:
+    def test_process_batch_refills_pending_users(self, cq):
+        r, _, card_queue = cq
+        r.sadd("card_queue:refill", "u1", "u2")
+
+        with patch(f"{CQ}.refill") as mock_refill:
+            worker = card_queue.CardQueueWorker(batch_size=10)
+            processed = worker.process_batch()
+
+        assert processed == 2
+        assert {c.args[0] for c in mock_refill.call_args_list} == {"u1", "u2"}
+        assert r.smembers("card_queue:refill") == set()
+
+    def test_process_batch_empty(self, cq):
+        _, _, card_queue = cq
+        worker = card_queue.CardQueueWorker()
+        assert worker.process_batch() == 0
+
+    def test_refill_error_does_not_stop_batch(self, cq):
+        r, _, card_queue = cq
+        r.sadd("card_queue:refill", "u1", "u2")
+
+        with patch(f"{CQ}.refill", side_effect=Exception("boom")) as mock_refill:
+            worker = card_queue.CardQueueWorker()
+            assert worker.process_batch() == 2
+        assert mock_refill.call_count == 2
+
+    def test_start_stop(self, cq):
+        _, _, card_queue = cq
+        worker = card_queue.CardQueueWorker()
+        with patch.object(worker, "_run_loop"):
+            worker.start()
+            assert worker._thread is not None
+            assert worker._thread.daemon is True
+            worker.stop()
+        assert worker._running is False
+        assert worker._thread is None
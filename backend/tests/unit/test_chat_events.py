@@ -129,3 +129,23 @@ class TestPublishChatAccepted:
             from candid.controllers.helpers.chat_events import publish_chat_accepted
             result = publish_chat_accepted("c", "r", "u1", "u2", "stmt")
             assert result is False
+
+
+# ---------------------------------------------------------------------------
+# Event IDs (chat-server nodes claim events by ID)
+# ---------------------------------------------------------------------------
+
+class TestEventIds:
+    def test_every_event_has_unique_id(self, redis_and_events):
+        r, events = redis_and_events
+        published = []
+        r.publish = lambda channel, msg: published.append(json.loads(msg)) or 1
+
+        events.publish_chat_request_response("req-1", "accepted", "user-1")
+        events.publish_chat_request_response("req-1", "accepted", "user-1")
+        events.publish_chat_request_received("user-2", {"id": "req-1"})
+        events.publish_chat_accepted("c", "r", "u1", "u2", "stmt")
+
+        ids = [e["eventId"] for e in published]
+        assert all(ids)
+        assert len(set(ids)) == len(ids)
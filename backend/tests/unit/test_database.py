@@ -177,6 +177,58 @@ class TestExecuteQuery:
         cursor.execute.assert_called_once_with("SELECT * FROM users WHERE id = %s", ("u1",))
 
 
+# ---------------------------------------------------------------------------
+# Database.transaction
+# ---------------------------------------------------------------------------
+
+class TestTransaction:
+    _make_db = TestExecuteQuery._make_db
+
+    def test_commits_once_on_success(self):
+        db, pool, conn, cursor = self._make_db()
+
+        with db.transaction() as cur:
+            cur.execute("UPDATE a SET x = 1")
+            cur.execute("UPDATE b SET y = 2")
+
+        assert cursor.execute.call_count == 2
+        conn.commit.assert_called_once()
+        pool.putconn.assert_called_once_with(conn)
+
+    def test_db_error_rolls_back_and_raises(self):
+        import psycopg2
+        from candid.controllers.helpers.database import DatabaseError
+        db, pool, conn, cursor = self._make_db()
+        cursor.execute.side_effect = psycopg2.Error("fail")
+
+        with pytest.raises(DatabaseError):
+            with db.transaction() as cur:
+                cur.execute("UPDATE a SET x = 1")
+
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+        pool.putconn.assert_called_once_with(conn)
+
+    def test_other_error_rolls_back_and_propagates(self):
+        db, pool, conn, cursor = self._make_db()
+
+        with pytest.raises(ValueError):
+            with db.transaction():
+                raise ValueError("bad row")
+
+        conn.rollback.assert_called_once()
+        conn.commit.assert_not_called()
+
+    def test_none_pool_raises(self):
+        from candid.controllers.helpers.database import Database, DatabaseError
+        db = Database.__new__(Database)
+        db.pool = None
+
+        with pytest.raises(DatabaseError):
+            with db.transaction():
+                pass
+
+
 # ---------------------------------------------------------------------------
 # Database.close_db_connection
 # ---------------------------------------------------------------------------
@@ -0,0 +1,94 @@
+"""Unit tests for feed_scores.py — persisted hot/controversial post scores."""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from candid.controllers.helpers.scoring import controversial_score, hot_score
+
+from .conftest import MockRedis
+
+pytestmark = pytest.mark.unit
+
+FS = "candid.controllers.helpers.feed_scores"
+
+NOW = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+
+
+def _config():
+    cfg = MagicMock()
+    cfg.SCORING_HOT_REFRESH_INTERVAL = 300
+    cfg.SCORING_HOT_REFRESH_WINDOW = 168
+    return cfg
+
+
+@pytest.fixture
+def fs():
+    """Yield (redis, db, feed_scores module)."""
+    r = MockRedis()
+    mock_db = MagicMock()
+    with patch(f"{FS}.get_redis", return_value=r), \
+         patch(f"{FS}.db", mock_db), \
+         patch(f"{FS}.config", _config()):
+        from candid.controllers.helpers import feed_scores
+        yield r, mock_db, feed_scores
+
+
+class TestPostScores:
+    def test_matches_scoring_functions(self, fs):
+        _, _, feed_scores = fs
+        created = NOW - timedelta(hours=3)
+
+        hot, controversial = feed_scores.post_scores(12.0, 4.0, created, now=NOW)
+
+        assert hot == hot_score(12.0, 4.0, created, now=NOW)
+        assert controversial == controversial_score(12.0, 4.0)
+
+    def test_no_votes_scores_zero(self, fs):
+        _, _, feed_scores = fs
+        assert feed_scores.post_scores(0, 0, NOW, now=NOW) == (0.0, 0.0)
+
+
+class TestRefreshHotScores:
+    def test_one_bulk_update_for_window(self, fs):
+        _, mock_db, feed_scores = fs
+        created = NOW - timedelta(hours=1)
+        mock_db.execute_query.side_effect = [
+            [
+                {"id": "p1", "weighted_upvotes": 10.0, "weighted_downvotes": 0.0, "created_time": created},
+                {"id": "p2", "weighted_upvotes": 3.0, "weighted_downvotes": 3.0, "created_time": created},
+            ],
+            [{"?column?": 1}, {"?column?": 1}],
+        ]
+
+        assert feed_scores.refresh_hot_scores(now=NOW) == 2
+
+        select_params = mock_db.execute_query.call_args_list[0][0][1]
+        assert select_params == (NOW - timedelta(hours=168),)
+        ids, ups, downs, hots, controversials = mock_db.execute_query.call_args_list[1][0][1]
+        assert ids == ["p1", "p2"]
+        assert ups == [10.0, 3.0] and downs == [0.0, 3.0]
+        assert hots[0] == hot_score(10.0, 0.0, created, now=NOW)
+        assert controversials == [0.0, 6.0]
+
+    def test_skips_update_when_window_empty(self, fs):
+        _, mock_db, feed_scores = fs
+        mock_db.execute_query.return_value = []
+
+        assert feed_scores.refresh_hot_scores(now=NOW) == 0
+        assert mock_db.execute_query.call_count == 1
+
+
+class TestClaimRefresh:
+    def test_once_per_interval(self, fs):
+        r, _, feed_scores = fs
+
+        assert feed_scores._claim_refresh() is True
+        assert feed_scores._claim_refresh() is False
+        assert r._ttls[feed_scores.REFRESH_LOCK_KEY] == 300
+
+    def test_redis_down_skips_refresh(self, fs):
+        _, _, feed_scores = fs
+        with patch(f"{FS}.get_redis", side_effect=ConnectionError("down")):
+            assert feed_scores._claim_refresh() is False
@@ -1,6 +1,5 @@
 """Unit tests for ideological_coords.py — mock DB, Redis, and Polis API."""
 
-import json
 import math
 from unittest.mock import patch, MagicMock
 
@@ -18,31 +17,29 @@ IC = "candid.controllers.helpers.ideological_coords"
 
 
 # ---------------------------------------------------------------------------
-# Helpers: create patched module functions to avoid real DB/Redis
+# Helpers: Polis math payloads as served by the shared math cache
 # ---------------------------------------------------------------------------
 
-class _SimpleRedis:
-    """Minimal in-memory Redis fake for tests."""
-    def __init__(self):
-        self._data = {}
-    def get(self, key):
-        return self._data.get(key)
-    def set(self, key, value):
-        self._data[key] = value
-    def setex(self, key, ttl, value):
-        self._data[key] = value
-    def delete(self, *keys):
-        for k in keys:
-            self._data.pop(k, None)
-
-
-def _make_mock_redis(data=None):
-    """Create a mock Redis instance with optional pre-loaded data."""
-    r = _SimpleRedis()
-    if data:
-        for k, v in data.items():
-            r.set(k, v)
-    return r
+def _math_data(math_tick=42, comps=None, center=None):
+    """Math payload whose base clusters give max_distance 5.0."""
+    return {
+        "pca": {
+            "asPOJO": {
+                "comps": comps or [[1.0, 0.0], [0.0, 1.0]],
+                "center": center or [0.0, 0.0],
+                "base-clusters": {"x": [0.0, 3.0], "y": [0.0, 4.0]},
+            }
+        },
+        "math_tick": math_tick,
+    }
+
+
+@pytest.fixture(autouse=True)
+def clear_pca_cache():
+    from candid.controllers.helpers import ideological_coords
+    ideological_coords._pca_by_conversation.clear()
+    yield
+    ideological_coords._pca_by_conversation.clear()
 
 
 # ---------------------------------------------------------------------------
@@ -107,75 +104,36 @@ class TestProjectUser:
 # ---------------------------------------------------------------------------
 
 class TestGetPcaCache:
-    def test_cache_hit(self):
-        """Returns cached data from Redis."""
-        cache_data = {
-            "comps": [[1, 0], [0, 1]],
-            "center": [0, 0],
-            "max_distance": 5.0,
-            "math_tick": 42,
-        }
-        mock_r = _make_mock_redis({"pca:conv123": json.dumps(cache_data)})
-
-        with patch(f"{IC}.get_redis", return_value=mock_r):
-            from candid.controllers.helpers.ideological_coords import get_pca_cache
-            result = get_pca_cache("conv123")
-
-        assert result == cache_data
-
-    def test_cache_miss_fetches_from_polis(self):
-        """On cache miss, fetches from Polis API and caches."""
-        mock_r = _make_mock_redis()
-        mock_math_data = {
-            "pca": {
-                "asPOJO": {
-                    "comps": [[1, 0], [0, 1]],
-                    "center": [0.5, 0.5],
-                    "base-clusters": {"x": [0.0, 3.0], "y": [0.0, 4.0]},
-                }
-            },
-            "math_tick": 7,
-        }
-        mock_client = MagicMock()
-        mock_client.get_math_data.return_value = mock_math_data
-
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
-             patch(f"{IC}.get_client", return_value=mock_client):
+    def test_derives_components_from_math_cache(self):
+        """PCA components and max_distance come from the shared math payload."""
+        with patch(f"{IC}.get_math_data", return_value=_math_data(7, center=[0.5, 0.5])):
             from candid.controllers.helpers.ideological_coords import get_pca_cache
             result = get_pca_cache("conv456")
 
-        assert result is not None
-        assert result["comps"] == [[1, 0], [0, 1]]
+        assert result["comps"] == [[1.0, 0.0], [0.0, 1.0]]
+        assert result["center"] == [0.5, 0.5]
         assert abs(result["max_distance"] - 5.0) < 1e-9
         assert result["math_tick"] == 7
 
-        # Verify cached
-        cached = mock_r.get("pca:conv456")
-        assert cached is not None
+    def test_reused_until_math_tick_moves(self):
+        """Same tick reuses the derived dict; a new tick rebuilds it."""
+        from candid.controllers.helpers.ideological_coords import get_pca_cache
 
-    def test_polis_no_pca_data(self):
-        """Returns None if Polis has no PCA data yet."""
-        mock_r = _make_mock_redis()
-        mock_client = MagicMock()
-        mock_client.get_math_data.return_value = {}
+        with patch(f"{IC}.get_math_data", return_value=_math_data(7)):
+            first = get_pca_cache("conv1")
+            assert get_pca_cache("conv1") is first
 
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
-             patch(f"{IC}.get_client", return_value=mock_client):
-            from candid.controllers.helpers.ideological_coords import get_pca_cache
-            result = get_pca_cache("conv_empty")
+        with patch(f"{IC}.get_math_data", return_value=_math_data(8, comps=[[0.0, 1.0], [1.0, 0.0]])):
+            updated = get_pca_cache("conv1")
 
-        assert result is None
+        assert updated["math_tick"] == 8
+        assert updated["comps"] == [[0.0, 1.0], [1.0, 0.0]]
 
-    def test_polis_error(self):
-        """Returns None on Polis API error."""
-        mock_r = _make_mock_redis()
-        mock_client = MagicMock()
-        mock_client.get_math_data.side_effect = Exception("connection refused")
-
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
-             patch(f"{IC}.get_client", return_value=mock_client):
+    def test_polis_no_pca_data(self):
+        """Returns None if Polis has no PCA data yet."""
+        with patch(f"{IC}.get_math_data", return_value={}):
             from candid.controllers.helpers.ideological_coords import get_pca_cache
-            result = get_pca_cache("conv_err")
+            result = get_pca_cache("conv_empty")
 
         assert result is None
 
@@ -185,17 +143,9 @@ class TestGetPcaCache:
 # ---------------------------------------------------------------------------
 
 class TestGetOrComputeCoords:
-    def _pca_cache_json(self, math_tick=42):
-        return json.dumps({
-            "comps": [[1.0, 0.0], [0.0, 1.0]],
-            "center": [0.0, 0.0],
-            "max_distance": 5.0,
-            "math_tick": math_tick,
-        })
-
     def test_cache_hit_db(self):
         """Returns cached coords from DB if math_tick matches."""
-        mock_r = _make_mock_redis({"pca:conv1": self._pca_cache_json(42)})
+        math_data = _math_data(42)
         mock_db = MagicMock()
 
         def db_side_effect(sql, params=None, fetchone=False, **kw):
@@ -205,7 +155,7 @@ class TestGetOrComputeCoords:
 
         mock_db.execute_query.side_effect = db_side_effect
 
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
+        with patch(f"{IC}.get_math_data", return_value=math_data), \
              patch(f"{IC}.db", mock_db):
             from candid.controllers.helpers.ideological_coords import get_or_compute_coords
             result = get_or_compute_coords("user1", "conv1")
@@ -214,7 +164,7 @@ class TestGetOrComputeCoords:
 
     def test_cache_miss_computes(self):
         """Computes coords from votes if not cached."""
-        mock_r = _make_mock_redis({"pca:conv2": self._pca_cache_json(42)})
+        math_data = _math_data(42)
         mock_db = MagicMock()
 
         def db_side_effect(sql, params=None, fetchone=False, **kw):
@@ -231,7 +181,7 @@ class TestGetOrComputeCoords:
 
         mock_db.execute_query.side_effect = db_side_effect
 
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
+        with patch(f"{IC}.get_math_data", return_value=math_data), \
              patch(f"{IC}.db", mock_db):
             from candid.controllers.helpers.ideological_coords import get_or_compute_coords
             result = get_or_compute_coords("user2", "conv2")
@@ -243,7 +193,7 @@ class TestGetOrComputeCoords:
 
     def test_stale_math_tick_recomputes(self):
         """Recomputes if DB coords have old math_tick."""
-        mock_r = _make_mock_redis({"pca:conv3": self._pca_cache_json(99)})
+        math_data = _math_data(99)
         mock_db = MagicMock()
 
         def db_side_effect(sql, params=None, fetchone=False, **kw):
@@ -257,7 +207,7 @@ class TestGetOrComputeCoords:
 
         mock_db.execute_query.side_effect = db_side_effect
 
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
+        with patch(f"{IC}.get_math_data", return_value=math_data), \
              patch(f"{IC}.db", mock_db):
             from candid.controllers.helpers.ideological_coords import get_or_compute_coords
             result = get_or_compute_coords("user3", "conv3")
@@ -266,7 +216,7 @@ class TestGetOrComputeCoords:
 
     def test_no_votes_returns_none(self):
         """Returns None if user has no position votes."""
-        mock_r = _make_mock_redis({"pca:conv4": self._pca_cache_json(42)})
+        math_data = _math_data(42)
         mock_db = MagicMock()
 
         def db_side_effect(sql, params=None, fetchone=False, **kw):
@@ -278,7 +228,7 @@ class TestGetOrComputeCoords:
 
         mock_db.execute_query.side_effect = db_side_effect
 
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
+        with patch(f"{IC}.get_math_data", return_value=math_data), \
              patch(f"{IC}.db", mock_db):
             from candid.controllers.helpers.ideological_coords import get_or_compute_coords
             result = get_or_compute_coords("user4", "conv4")
@@ -287,12 +237,7 @@ class TestGetOrComputeCoords:
 
     def test_no_pca_data_returns_none(self):
         """Returns None if Polis has no PCA data."""
-        mock_r = _make_mock_redis()
-        mock_client = MagicMock()
-        mock_client.get_math_data.return_value = {}
-
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
-             patch(f"{IC}.get_client", return_value=mock_client):
+        with patch(f"{IC}.get_math_data", return_value={}):
             from candid.controllers.helpers.ideological_coords import get_or_compute_coords
             result = get_or_compute_coords("user5", "conv_no_pca")
 
@@ -304,14 +249,6 @@ class TestGetOrComputeCoords:
 # ---------------------------------------------------------------------------
 
 class TestGetEffectiveCoords:
-    def _pca_cache_json(self):
-        return json.dumps({
-            "comps": [[1.0, 0.0], [0.0, 1.0]],
-            "center": [0.0, 0.0],
-            "max_distance": 5.0,
-            "math_tick": 42,
-        })
-
     def _setup(self, mock_db_obj, n_comment_votes=0, polis_x=1.0, polis_y=2.0):
         """Configure mock DB for effective coords tests."""
         def db_side_effect(sql, params=None, fetchone=False, **kw):
@@ -324,11 +261,11 @@ class TestGetEffectiveCoords:
 
     def test_pure_polis_zero_comment_votes(self):
         """With 0 comment votes and MF stub -> pure Polis coords."""
-        mock_r = _make_mock_redis({"pca:conv1": self._pca_cache_json()})
+        math_data = _math_data()
         mock_db = MagicMock()
         self._setup(mock_db, n_comment_votes=0)
 
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
+        with patch(f"{IC}.get_math_data", return_value=math_data), \
              patch(f"{IC}.db", mock_db), \
              patch(f"{IC}.mf") as mock_mf:
             mock_mf.get_mf_coords.return_value = None
@@ -340,11 +277,11 @@ class TestGetEffectiveCoords:
 
     def test_blended_half(self):
         """With 15 comment votes -> alpha=0.5."""
-        mock_r = _make_mock_redis({"pca:conv1": self._pca_cache_json()})
+        math_data = _math_data()
         mock_db = MagicMock()
         self._setup(mock_db, n_comment_votes=15)
 
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
+        with patch(f"{IC}.get_math_data", return_value=math_data), \
              patch(f"{IC}.db", mock_db), \
              patch(f"{IC}.mf") as mock_mf:
             mock_mf.get_mf_coords.return_value = (3.0, 4.0)
@@ -356,11 +293,11 @@ class TestGetEffectiveCoords:
 
     def test_pure_mf_30_plus_votes(self):
         """With 30+ comment votes -> alpha=1.0, pure MF."""
-        mock_r = _make_mock_redis({"pca:conv1": self._pca_cache_json()})
+        math_data = _math_data()
         mock_db = MagicMock()
         self._setup(mock_db, n_comment_votes=30)
 
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
+        with patch(f"{IC}.get_math_data", return_value=math_data), \
              patch(f"{IC}.db", mock_db), \
              patch(f"{IC}.mf") as mock_mf:
             mock_mf.get_mf_coords.return_value = (5.0, 6.0)
@@ -372,11 +309,11 @@ class TestGetEffectiveCoords:
 
     def test_mf_none_falls_back_to_polis(self):
         """When MF returns None, use pure Polis regardless of n_comment_votes."""
-        mock_r = _make_mock_redis({"pca:conv1": self._pca_cache_json()})
+        math_data = _math_data()
         mock_db = MagicMock()
         self._setup(mock_db, n_comment_votes=50)
 
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
+        with patch(f"{IC}.get_math_data", return_value=math_data), \
              patch(f"{IC}.db", mock_db), \
              patch(f"{IC}.mf") as mock_mf:
             mock_mf.get_mf_coords.return_value = None
@@ -388,12 +325,7 @@ class TestGetEffectiveCoords:
 
     def test_no_coords_at_all(self):
         """Returns None if user has no Polis coords."""
-        mock_r = _make_mock_redis()
-        mock_client = MagicMock()
-        mock_client.get_math_data.return_value = {}
-
-        with patch(f"{IC}.get_redis", return_value=mock_r), \
-             patch(f"{IC}.get_client", return_value=mock_client):
+        with patch(f"{IC}.get_math_data", return_value={}):
             from candid.controllers.helpers.ideological_coords import get_effective_coords
             result = get_effective_coords("user_new", "conv_empty")
 
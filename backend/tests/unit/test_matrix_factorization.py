@@ -1,6 +1,9 @@
 """Unit tests for matrix_factorization.py — core MF algorithm and DB interactions."""
 
+import importlib.util
 import math
+import os
+import random
 from unittest.mock import patch, MagicMock, call
 
 import numpy as np
@@ -51,16 +54,69 @@ def _make_all_upvote_votes(n_users=20, n_comments=5):
     return votes, n_users, n_comments
 
 
+def _make_polis_test_data_votes(scale=1, seed=0):
+    """Votes from the belief-system fixture in scripts/generate_polis_test_data.py.
+
+    Each belief system contributes `count * scale` users who vote on every
+    position with the script's expected votes and noise. Passes are dropped
+    (MF only sees up/down votes).
+
+    Returns:
+        (votes, n_users, n_items) tuple.
+    """
+    script = os.path.join(os.path.dirname(__file__), "..", "..", "scripts",
+                          "generate_polis_test_data.py")
+    spec = importlib.util.spec_from_file_location("generate_polis_test_data", script)
+    gen = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gen)
+
+    random.seed(seed)
+    votes = []
+    u_idx = 0
+    for belief in gen.BELIEF_SYSTEMS.values():
+        for _ in range(belief["count"] * scale):
+            for i_idx, position in enumerate(gen.POSITIONS):
+                expected = position["votes"][belief["vote_index"]]
+                response = gen.get_vote_response(expected, belief["vote_noise"])
+                if response != "pass":
+                    votes.append((u_idx, i_idx, 1 if response == "agree" else -1))
+            u_idx += 1
+
+    return votes, u_idx, len(gen.POSITIONS)
+
+
+def _mf_config():
+    mock_config = MagicMock()
+    mock_config.MF_LATENT_DIM = 2
+    mock_config.MF_LEARNING_RATE = 0.005
+    mock_config.MF_LAMBDA_REG = 0.02
+    mock_config.MF_LAMBDA_POLIS = 0.1
+    mock_config.MF_MAX_EPOCHS = 300
+    mock_config.MF_CONVERGENCE_TOL = 1e-5
+    return mock_config
+
+
+def _predict_all(model):
+    """Full predicted rating matrix for a fitted model."""
+    return (model["mu"] + model["user_intercepts"][:, None] + model["item_intercepts"][None, :]
+            + model["user_factors"] @ model["item_factors"].T)
+
+
 # ---------------------------------------------------------------------------
 # _fit_mf_model: core math (pure numpy, no mocks)
 # ---------------------------------------------------------------------------
 
 class TestFitMfModel:
-    """Tests for the SGD fitting function."""
+    """Tests for the fitting function, run against both solvers."""
+
+    @pytest.fixture(autouse=True, params=["sgd", "als"])
+    def solver(self, request):
+        self.solver = request.param
 
     def _get_fit(self):
         """Import _fit_mf_model with mocked DB/config."""
         mock_config = MagicMock()
+        mock_config.MF_SOLVER = self.solver
         mock_config.MF_LATENT_DIM = 2
         mock_config.MF_LEARNING_RATE = 0.005
         mock_config.MF_LAMBDA_REG = 0.02
@@ -206,6 +262,41 @@ class TestFitMfModel:
         assert model["item_factors"].shape == (1, 2)
 
 
+class TestSolverEquivalence:
+    """ALS and SGD should fit the same model (up to factor rotation)."""
+
+    def _fit_both(self, votes, n_users, n_items, polis_coords):
+        with patch(f"{MF}.config", _mf_config()):
+            from candid.controllers.helpers.matrix_factorization import _fit_mf_model
+            sgd = _fit_mf_model(votes, n_users, n_items, polis_coords, cfg={"solver": "sgd"})
+            als = _fit_mf_model(votes, n_users, n_items, polis_coords, cfg={"solver": "als"})
+        return sgd, als
+
+    def test_same_loss_and_predictions(self):
+        votes, n_users, n_items = _make_polis_test_data_votes(seed=1)
+        sgd, als = self._fit_both(votes, n_users, n_items, {})
+
+        assert als["final_loss"] <= sgd["final_loss"] * 1.05
+        # Predictions are rotation-invariant, unlike raw factors
+        assert np.corrcoef(_predict_all(sgd).ravel(), _predict_all(als).ravel())[0, 1] > 0.95
+
+    def test_als_keeps_polis_anchor(self):
+        votes, n_users, n_items = _make_two_group_votes(n_left=10, n_right=10)
+        polis_coords = {i: np.array([-1.0 if i < 10 else 1.0, 0.0]) for i in range(n_users)}
+
+        _, als = self._fit_both(votes, n_users, n_items, polis_coords)
+
+        # Anchored users keep Polis's orientation: left negative x, right positive x
+        assert np.all(als["user_factors"][:10, 0] < 0)
+        assert np.all(als["user_factors"][10:, 0] > 0)
+
+    def test_unknown_solver_raises(self):
+        with patch(f"{MF}.config", _mf_config()):
+            from candid.controllers.helpers.matrix_factorization import _fit_mf_model
+            with pytest.raises(ValueError):
+                _fit_mf_model([(0, 0, 1)], 1, 1, {}, cfg={"solver": "lbfgs"})
+
+
 # ---------------------------------------------------------------------------
 # get_mf_coords: DB interaction (mocked)
 # ---------------------------------------------------------------------------
@@ -455,10 +546,20 @@ class TestLoadPolisCoords:
 # ---------------------------------------------------------------------------
 
 class TestStoreMfResults:
-    def test_issues_correct_sql(self):
+    def _store(self, model, idx_maps):
         mock_db = MagicMock()
-        mock_db.execute_query.return_value = {"location_id": "loc1", "category_id": "cat1"}
+        cursor = mock_db.transaction.return_value.__enter__.return_value
+        cursor.fetchone.return_value = {"location_id": "loc1", "category_id": "cat1"}
+
+        with patch(f"{MF}.db", mock_db), \
+             patch(f"{MF}.execute_values") as mock_execute_values, \
+             patch(f"{MF}.config", MagicMock()):
+            from candid.controllers.helpers.matrix_factorization import _store_mf_results
+            store_seconds = _store_mf_results("conv1", model, idx_maps)
 
+        return mock_db, cursor, mock_execute_values, store_seconds
+
+    def _model_and_maps(self):
         model = {
             "user_factors": np.array([[0.1, 0.2], [0.3, 0.4]]),
             "item_intercepts": np.array([0.5, -0.3, 0.1]),
@@ -469,31 +570,288 @@ class TestStoreMfResults:
             "idx_to_user_id": {0: "u1", 1: "u2"},
             "idx_to_item_id": {0: "c:c1", 1: "c:c2", 2: "p:p1"},
             "n_votes": 100,
-            "duration_seconds": 1.5,
+            "load_seconds": 0.5,
+            "fit_seconds": 1.0,
         }
+        return model, idx_maps
 
-        with patch(f"{MF}.db", mock_db), \
-             patch(f"{MF}.config", MagicMock()):
-            from candid.controllers.helpers.matrix_factorization import _store_mf_results
-            _store_mf_results("conv1", model, idx_maps)
+    def test_single_transaction_no_per_row_queries(self):
+        mock_db, _, _, _ = self._store(*self._model_and_maps())
 
-        # Should have called execute_query multiple times:
-        # 2 user updates + 3 item updates (2 comment + 1 post) + 1 bulk vote count + 1 conv lookup + 1 log insert
-        calls = mock_db.execute_query.call_args_list
-        assert len(calls) >= 6
+        mock_db.transaction.assert_called_once()
+        mock_db.execute_query.assert_not_called()
 
-        # Check user coordinate updates
-        user_update_calls = [c for c in calls if "mf_x" in str(c) and "UPDATE user_ideological" in str(c)]
-        assert len(user_update_calls) == 2
+    def test_bulk_loads_rows_into_temp_tables(self):
+        _, _, mock_execute_values, _ = self._store(*self._model_and_maps())
 
-        # Check comment intercept updates (UPDATE comment)
-        comment_update_calls = [c for c in calls if "UPDATE comment" in str(c) and "mf_intercept" in str(c)]
-        assert len(comment_update_calls) == 2
+        user_call, item_call = mock_execute_values.call_args_list
+        assert "mf_user_factors" in user_call.args[1]
+        assert user_call.args[2] == [("u1", 0.1, 0.2), ("u2", 0.3, 0.4)]
+        assert "mf_item_intercepts" in item_call.args[1]
+        assert item_call.args[2] == [("c", "c1", 0.5), ("c", "c2", -0.3), ("p", "p1", 0.1)]
 
-        # Check post intercept updates (UPDATE post)
-        post_update_calls = [c for c in calls if "UPDATE post" in str(c) and "mf_intercept" in str(c)]
-        assert len(post_update_calls) == 1
+    def test_updates_from_temp_tables(self):
+        _, cursor, _, _ = self._store(*self._model_and_maps())
 
-        # Check training log insert
-        log_calls = [c for c in calls if "mf_training_log" in str(c)]
+        sqls = [c.args[0] for c in cursor.execute.call_args_list]
+        assert sum("CREATE TEMP TABLE" in sql and "ON COMMIT DROP" in sql for sql in sqls) == 2
+        assert any("UPDATE user_ideological_coords" in sql and "FROM mf_user_factors" in sql
+                   for sql in sqls)
+        assert any("UPDATE comment" in sql and "FROM mf_item_intercepts" in sql for sql in sqls)
+        assert any("UPDATE post" in sql and "FROM mf_item_intercepts" in sql for sql in sqls)
+
+    def test_logs_phase_timings(self):
+        _, cursor, _, store_seconds = self._store(*self._model_and_maps())
+
+        log_calls = [c for c in cursor.execute.call_args_list if "mf_training_log" in c.args[0]]
         assert len(log_calls) == 1
+        params = log_calls[0].args[1]
+        duration, load_s, fit_s, store_s, mode = params[-5:]
+        assert (load_s, fit_s, store_s) == (0.5, 1.0, store_seconds)
+        assert duration == pytest.approx(1.5 + store_seconds)
+        assert mode == "full"
+        assert params[1:3] == ("loc1", "cat1")
+
+    def test_saves_model_state(self):
+        model, idx_maps = self._model_and_maps()
+        idx_maps["model_state"] = b"npz-bytes"
+        idx_maps["trained_time"] = "t1"
+        idx_maps["mode"] = "incremental"
+        _, cursor, _, _ = self._store(model, idx_maps)
+
+        state_calls = [c for c in cursor.execute.call_args_list if "mf_model_state" in c.args[0]]
+        assert len(state_calls) == 1
+        assert state_calls[0].args[1] == ("conv1", b"npz-bytes", "t1")
+        log_call = [c for c in cursor.execute.call_args_list if "mf_training_log" in c.args[0]][0]
+        assert log_call.args[1][-1] == "incremental"
+
+
+# ---------------------------------------------------------------------------
+# run_factorization: orchestration (mocked phases)
+# ---------------------------------------------------------------------------
+
+class TestRunFactorization:
+    def _vote_data(self, votes, n_users, n_items):
+        user_ids = [f"u{i}" for i in range(n_users)]
+        item_ids = [f"c:i{i}" for i in range(n_items)]
+        return {
+            "votes": votes,
+            "user_id_to_idx": {uid: i for i, uid in enumerate(user_ids)},
+            "idx_to_user_id": dict(enumerate(user_ids)),
+            "item_id_to_idx": {iid: i for i, iid in enumerate(item_ids)},
+            "idx_to_item_id": dict(enumerate(item_ids)),
+            "n_users": n_users,
+            "n_items": n_items,
+        }
+
+    def _run(self, vote_data, state=None, touched=(set(), set()), incremental=False):
+        cfg = _mf_config()
+        cfg.MF_SOLVER = "als"
+        cfg.MF_INCREMENTAL_EPOCHS = 3
+        with patch(f"{MF}.config", cfg), \
+             patch(f"{MF}._db_now", return_value="t1"), \
+             patch(f"{MF}._load_vote_matrix", return_value=vote_data), \
+             patch(f"{MF}._load_polis_coords", return_value={}), \
+             patch(f"{MF}._load_model_state", return_value=state), \
+             patch(f"{MF}._load_touched", return_value=touched) as mock_touched, \
+             patch(f"{MF}._store_mf_results", return_value=0.25) as mock_store:
+            from candid.controllers.helpers.matrix_factorization import run_factorization
+            stats = run_factorization("conv1", incremental=incremental)
+        return stats, mock_store.call_args.args[1], mock_store.call_args.args[2], mock_touched
+
+    def _state_from(self, idx_maps, trained_time="t0"):
+        """Decode the model_state bytes a run handed to the store phase."""
+        import io
+        with np.load(io.BytesIO(idx_maps["model_state"])) as npz:
+            state = {key: npz[key] for key in npz.files}
+        state["mu"] = float(state["mu"])
+        state["trained_time"] = trained_time
+        return state
+
+    def test_passes_phase_timings_to_store(self):
+        votes, n_users, n_items = _make_two_group_votes(n_left=3, n_right=3, n_comments=4)
+        stats, _, idx_maps, _ = self._run(self._vote_data(votes, n_users, n_items))
+
+        assert idx_maps["load_seconds"] >= 0
+        assert idx_maps["fit_seconds"] >= 0
+        assert stats["store_seconds"] == 0.25
+        assert stats["n_votes"] == len(votes)
+
+    def test_watermark_taken_before_votes_are_read(self):
+        votes, n_users, n_items = _make_two_group_votes(n_left=3, n_right=3, n_comments=4)
+        calls = []
+        cfg = _mf_config()
+        cfg.MF_SOLVER = "als"
+        with patch(f"{MF}.config", cfg), \
+             patch(f"{MF}._db_now", side_effect=lambda: calls.append("now") or "t1"), \
+             patch(f"{MF}._load_vote_matrix",
+                   side_effect=lambda conv: calls.append("votes") or self._vote_data(votes, n_users, n_items)), \
+             patch(f"{MF}._load_polis_coords", return_value={}), \
+             patch(f"{MF}._load_model_state", return_value=None), \
+             patch(f"{MF}._store_mf_results", return_value=0.25) as mock_store:
+            from candid.controllers.helpers.matrix_factorization import run_factorization
+            run_factorization("conv1")
+
+        assert calls == ["now", "votes"]
+        assert mock_store.call_args.args[2]["trained_time"] == "t1"
+
+    def test_below_threshold_skips_fit_and_store(self):
+        with patch(f"{MF}._db_now", return_value="t1"), \
+             patch(f"{MF}._load_vote_matrix", return_value=None), \
+             patch(f"{MF}._store_mf_results") as mock_store:
+            from candid.controllers.helpers.matrix_factorization import run_factorization
+            assert run_factorization("conv1") is None
+        mock_store.assert_not_called()
+
+    def test_incremental_without_state_runs_full(self):
+        votes, n_users, n_items = _make_two_group_votes(n_left=3, n_right=3, n_comments=4)
+        stats, _, idx_maps, mock_touched = self._run(
+            self._vote_data(votes, n_users, n_items), incremental=True)
+
+        assert stats["mode"] == "full"
+        assert idx_maps["mode"] == "full"
+        assert len(idx_maps["idx_to_user_id"]) == n_users
+        mock_touched.assert_not_called()
+
+    def test_warm_start_converges_faster(self):
+        votes, n_users, n_items = _make_two_group_votes()
+        vote_data = self._vote_data(votes, n_users, n_items)
+        cold, _, idx_maps, _ = self._run(vote_data)
+
+        warm, _, _, _ = self._run(vote_data, state=self._state_from(idx_maps))
+
+        assert warm["epochs"] < cold["epochs"]
+        assert warm["final_loss"] <= cold["final_loss"] * 1.01
+
+    def test_incremental_refits_only_touched_rows(self):
+        votes, n_users, n_items = _make_two_group_votes(n_left=5, n_right=5, n_comments=6)
+        vote_data = self._vote_data(votes, n_users, n_items)
+        _, full_model, idx_maps, _ = self._run(vote_data)
+        state = self._state_from(idx_maps)
+
+        # u0 flips every vote; only u0 and item i0 are reported as touched
+        flipped = [(u, c, -r if u == 0 else r) for u, c, r in votes]
+        stats, model, idx_maps, mock_touched = self._run(
+            self._vote_data(flipped, n_users, n_items), state=state,
+            touched=({"u0"}, {"c:i0"}), incremental=True)
+
+        assert stats["mode"] == "incremental"
+        assert mock_touched.call_args.args == ("conv1", "t0")
+        assert idx_maps["idx_to_user_id"] == {0: "u0"}
+        assert idx_maps["idx_to_item_id"] == {0: "c:i0"}
+        # Untouched rows and mu are held fixed; touched rows move
+        np.testing.assert_array_equal(model["user_factors"][1:], full_model["user_factors"][1:])
+        np.testing.assert_array_equal(model["item_factors"][1:], full_model["item_factors"][1:])
+        assert model["mu"] == full_model["mu"]
+        assert not np.allclose(model["user_factors"][0], full_model["user_factors"][0])
+        assert stats["epochs"] <= 3
+
+    def test_new_users_are_refit_incrementally(self):
+        votes, n_users, n_items = _make_two_group_votes(n_left=5, n_right=5, n_comments=6)
+        _, _, idx_maps, _ = self._run(self._vote_data(votes, n_users, n_items))
+        state = self._state_from(idx_maps)
+
+        # A new user u10 joins; no votes reported as touched
+        votes = votes + [(n_users, c, 1) for c in range(n_items)]
+        stats, _, idx_maps, _ = self._run(
+            self._vote_data(votes, n_users + 1, n_items), state=state, incremental=True)
+
+        assert idx_maps["idx_to_user_id"] == {n_users: f"u{n_users}"}
+        assert idx_maps["idx_to_item_id"] == {}
+
+
+class TestWarmStartInit:
+    def test_aligns_stored_rows_by_id(self):
+        state = {
+            "mu": 0.2,
+            "user_ids": np.array(["u1", "u0"]),
+            "item_ids": np.array(["c:a"]),
+            "user_intercepts": np.array([0.1, -0.1]),
+            "user_factors": np.array([[1.0, 1.0], [2.0, 2.0]]),
+            "item_intercepts": np.array([0.5]),
+            "item_factors": np.array([[3.0, 3.0]]),
+        }
+        vote_data = {
+            "user_id_to_idx": {"u0": 0, "u1": 1, "u2": 2},
+            "item_id_to_idx": {"c:a": 0, "c:b": 1},
+            "n_users": 3, "n_items": 2,
+        }
+        from candid.controllers.helpers.matrix_factorization import _warm_start_init
+        init = _warm_start_init(state, vote_data, 2)
+
+        assert init["known_users"].tolist() == [True, True, False]
+        assert init["user_factors"][0].tolist() == [2.0, 2.0]
+        assert init["user_intercepts"][1] == 0.1
+        assert init["known_items"].tolist() == [True, False]
+        assert init["mu"] == 0.2
+
+    def test_dimension_change_discards_state(self):
+        state = {
+            "mu": 0.0,
+            "user_ids": np.array(["u0"]), "item_ids": np.array(["c:a"]),
+            "user_intercepts": np.zeros(1), "user_factors": np.zeros((1, 3)),
+            "item_intercepts": np.zeros(1), "item_factors": np.zeros((1, 3)),
+        }
+        vote_data = {"user_id_to_idx": {"u0": 0}, "item_id_to_idx": {"c:a": 0},
+                     "n_users": 1, "n_items": 1}
+        from candid.controllers.helpers.matrix_factorization import _warm_start_init
+        init = _warm_start_init(state, vote_data, 2)
+        assert not init["known_users"].any()
+        assert not init["known_items"].any()
+
+
+class TestLoadModelState:
+    def test_round_trip(self):
+        from candid.controllers.helpers.matrix_factorization import (
+            _serialize_model_state, _load_model_state,
+        )
+        model = {
+            "mu": 0.3,
+            "user_intercepts": np.array([0.1]), "user_factors": np.array([[0.2, 0.4]]),
+            "item_intercepts": np.array([-0.5]), "item_factors": np.array([[0.6, 0.8]]),
+        }
+        vote_data = {"n_users": 1, "n_items": 1,
+                     "idx_to_user_id": {0: "u0"}, "idx_to_item_id": {0: "p:x"}}
+        blob = _serialize_model_state(model, vote_data)
+
+        mock_db = MagicMock()
+        mock_db.execute_query.return_value = {"state": memoryview(blob), "trained_time": "t"}
+        with patch(f"{MF}.db", mock_db):
+            state = _load_model_state("conv1")
+
+        assert state["mu"] == pytest.approx(0.3)
+        assert state["user_ids"].tolist() == ["u0"]
+        assert state["item_factors"].tolist() == [[0.6, 0.8]]
+        assert state["trained_time"] == "t"
+
+    def test_missing_or_corrupt_state(self):
+        from candid.controllers.helpers.matrix_factorization import _load_model_state
+        mock_db = MagicMock()
+        mock_db.execute_query.return_value = None
+        with patch(f"{MF}.db", mock_db):
+            assert _load_model_state("conv1") is None
+        mock_db.execute_query.return_value = {"state": b"not an npz", "trained_time": "t"}
+        with patch(f"{MF}.db", mock_db):
+            assert _load_model_state("conv1") is None
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks: solver wall-clock time and final loss
+# ---------------------------------------------------------------------------
+
+@pytest.mark.benchmark(group="mf_solver")
+@pytest.mark.parametrize("solver,scale", [("sgd", 1), ("als", 1), ("als", 20)])
+def test_bench_fit_mf_model(benchmark, solver, scale):
+    votes, n_users, n_items = _make_polis_test_data_votes(scale=scale)
+
+    with patch(f"{MF}.config", _mf_config()):
+        from candid.controllers.helpers.matrix_factorization import _fit_mf_model
+        model = benchmark.pedantic(
+            _fit_mf_model, args=(votes, n_users, n_items, {}),
+            kwargs={"cfg": {"solver": solver}}, rounds=1 if solver == "sgd" else 3,
+        )
+
+    benchmark.extra_info["n_votes"] = len(votes)
+    benchmark.extra_info["final_loss"] = round(model["final_loss"], 5)
+    benchmark.extra_info["epochs"] = model["epochs"]
+    assert model["final_loss"] < 0.5
@@ -1,5 +1,6 @@
 """Unit tests for mf_worker.py — worker lifecycle and concurrency."""
 
+import os
 import threading
 from unittest.mock import patch, MagicMock, PropertyMock
 
@@ -163,4 +164,149 @@ class TestMFWorkerMaybeTrain:
             worker = MFWorker()
             worker._maybe_train("conv1")
 
+        # No successful full retrain on record -> full retrain
+        mock_train.assert_called_once_with("conv1", incremental=False)
+
+    @pytest.mark.parametrize("due,incremental", [(True, False), (False, True)])
+    def test_incremental_unless_full_retrain_due(self, due, incremental):
+        from datetime import datetime, timezone
+
+        last_time = datetime(2026, 2, 12, 9, 0, 0, tzinfo=timezone.utc)
+        vote_time = datetime(2026, 2, 12, 10, 0, 0, tzinfo=timezone.utc)
+
+        def db_side_effect(sql, params=None, fetchone=False, **kw):
+            if "pg_try_advisory_lock" in sql:
+                return {"acquired": True}
+            if "mf_training_log" in sql and "ORDER BY" in sql:
+                return {"created_time": last_time}
+            if "MAX(latest)" in sql:
+                return {"latest": vote_time}
+            if "mode = 'full'" in sql:
+                return {"due": due}
+            return None
+
+        mock_db = MagicMock()
+        mock_db.execute_query.side_effect = db_side_effect
+
+        with patch(f"{WORKER}.db", mock_db), \
+             patch(f"{WORKER}.config", MagicMock()), \
+             patch(f"{WORKER}.run_factorization") as mock_train:
+            from candid.controllers.helpers.mf_worker import MFWorker
+            worker = MFWorker(train_interval=60, full_retrain_interval=3600)
+            worker._maybe_train("conv1")
+
+        mock_train.assert_called_once_with("conv1", incremental=incremental)
+        due_call = [c for c in mock_db.execute_query.call_args_list if "mode = 'full'" in c.args[0]]
+        assert due_call[0].args[1] == (3600, "conv1")
+
+
+class TestActiveConversations:
+    def test_train_all_trains_each_active_conversation(self):
+        worker = _make_worker()
+        worker._running = True
+        mock_db = MagicMock()
+        mock_db.execute_query.return_value = [
+            {"polis_conversation_id": "conv1"},
+            {"polis_conversation_id": "conv2"},
+        ]
+        with patch(f"{WORKER}.db", mock_db), \
+             patch.object(worker, "_maybe_train") as mock_train:
+            worker._train_all_conversations()
+        assert [c.args[0] for c in mock_train.call_args_list] == ["conv1", "conv2"]
+
+    def test_no_conversations(self):
+        mock_db = MagicMock()
+        mock_db.execute_query.return_value = None
+        with patch(f"{WORKER}.db", mock_db):
+            from candid.controllers.helpers.mf_worker import _active_conversation_ids
+            assert _active_conversation_ids() == []
+
+
+class _InlineExecutor:
+    """Runs submitted tasks synchronously, standing in for the process pool."""
+
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        from concurrent.futures import Future
+        self.submitted.append(args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def _make_pool(**kwargs):
+    mock_config = MagicMock()
+    mock_config.MF_WORKER_PROCESSES = 3
+    mock_config.MF_TRAIN_INTERVAL = 60
+    with patch(f"{WORKER}.config", mock_config):
+        from candid.controllers.helpers.mf_worker import MFProcessPool
+        return MFProcessPool(**kwargs)
+
+
+class TestMFProcessPool:
+    def test_defaults_from_config(self):
+        pool = _make_pool()
+        assert pool.processes == 3
+        assert pool.train_interval == 60
+
+    def test_run_round_submits_one_task_per_conversation(self):
+        pool = _make_pool()
+        executor = _InlineExecutor()
+        with patch(f"{WORKER}._active_conversation_ids", return_value=["conv1", "conv2"]), \
+             patch(f"{WORKER}._train_conversation", side_effect=lambda cid: cid):
+            submitted = pool.run_round(executor)
+        assert submitted == 2
+        assert executor.submitted == [("conv1",), ("conv2",)]
+
+    def test_failed_process_does_not_stop_round(self):
+        pool = _make_pool()
+        executor = _InlineExecutor()
+
+        def train(cid):
+            if cid == "conv1":
+                raise RuntimeError("worker died")
+            return cid
+
+        with patch(f"{WORKER}._active_conversation_ids", return_value=["conv1", "conv2"]), \
+             patch(f"{WORKER}._train_conversation", side_effect=train) as mock_train:
+            assert pool.run_round(executor) == 2
+        assert mock_train.call_count == 2
+
+    def test_run_once_spawns_single_task_processes(self):
+        pool = _make_pool(processes=2, train_interval=1)
+        with patch(f"{WORKER}.ProcessPoolExecutor") as mock_executor_cls, \
+             patch.object(pool, "run_round") as mock_round, \
+             patch.dict("os.environ", {}):
+            pool.run(once=True)
+            assert os.environ["BACKGROUND_WORKERS_ENABLED"] == "false"
+
+        kwargs = mock_executor_cls.call_args.kwargs
+        assert kwargs["max_workers"] == 2
+        assert kwargs["max_tasks_per_child"] == 1
+        assert kwargs["mp_context"].get_start_method() == "spawn"
+        mock_round.assert_called_once_with(mock_executor_cls.return_value)
+        mock_executor_cls.return_value.shutdown.assert_called_once()
+        assert pool._running is False
+
+    def test_train_conversation_uses_advisory_locked_path(self):
+        mock_config = MagicMock()
+        with patch(f"{WORKER}.config", mock_config), \
+             patch(f"{WORKER}.MFWorker._maybe_train") as mock_train:
+            from candid.controllers.helpers.mf_worker import _train_conversation
+            assert _train_conversation("conv1") == "conv1"
         mock_train.assert_called_once_with("conv1")
+
+
+class TestMain:
+    def test_parses_arguments(self):
+        with patch(f"{WORKER}.MFProcessPool") as mock_pool_cls, \
+             patch(f"{WORKER}.signal.signal"):
+            from candid.controllers.helpers.mf_worker import main
+            main(["--processes", "4", "--interval", "30", "--once"])
+        mock_pool_cls.assert_called_once_with(processes=4, train_interval=30)
+        mock_pool_cls.return_value.run.assert_called_once_with(once=True)
@@ -139,13 +139,18 @@ class TestGetContentScope:
             assert cat == HEALTHCARE_CAT
 
 
+def _roles(role):
+    """side_effect for get_highest_roles_at_location giving every user `role`."""
+    return lambda user_ids, location_id, category_id=None, cached=True: {uid: role for uid in user_ids}
+
+
 # ---------------------------------------------------------------------------
 # _determine_actioner_role_level  (extracted to helpers/moderation.py)
 # ---------------------------------------------------------------------------
 
 class TestDetermineActionerRoleLevel:
     def test_returns_role_from_location_scope(self):
-        with patch(f"{MOD_HELPERS}.get_highest_role_at_location", return_value="moderator"):
+        with patch(f"{MOD_HELPERS}.get_highest_roles_at_location", side_effect=_roles("moderator")):
             from candid.controllers.moderation_controller import _determine_actioner_role_level
             assert _determine_actioner_role_level(MOD_USER, OREGON, HEALTHCARE_CAT) == "moderator"
 
@@ -153,7 +158,7 @@ class TestDetermineActionerRoleLevel:
         mock_db = MagicMock()
         mock_db.execute_query = MagicMock(return_value={"role": "facilitator"})
 
-        with patch(f"{MOD_HELPERS}.get_highest_role_at_location", return_value=None), \
+        with patch(f"{MOD_HELPERS}.get_highest_roles_at_location", side_effect=_roles(None)), \
              patch(f"{MOD_HELPERS}.db", mock_db):
             from candid.controllers.moderation_controller import _determine_actioner_role_level
             assert _determine_actioner_role_level(FACILITATOR_USER, None, None) == "facilitator"
@@ -162,12 +167,81 @@ class TestDetermineActionerRoleLevel:
         mock_db = MagicMock()
         mock_db.execute_query = MagicMock(return_value=None)
 
-        with patch(f"{MOD_HELPERS}.get_highest_role_at_location", return_value=None), \
+        with patch(f"{MOD_HELPERS}.get_highest_roles_at_location", side_effect=_roles(None)), \
              patch(f"{MOD_HELPERS}.db", mock_db):
             from candid.controllers.moderation_controller import _determine_actioner_role_level
             assert _determine_actioner_role_level(NORMAL_USER, None, None) is None
 
 
+class TestDetermineActionerRoleLevels:
+    def test_one_uncached_query_per_scope(self):
+        roles = MagicMock(side_effect=_roles("moderator"))
+        with patch(f"{MOD_HELPERS}.get_highest_roles_at_location", roles):
+            from candid.controllers.helpers.moderation import determine_actioner_role_levels
+            levels = determine_actioner_role_levels([
+                (MOD_USER, OREGON, HEALTHCARE_CAT),
+                (PEER_MOD_USER, OREGON, HEALTHCARE_CAT),
+                (MOD_USER, PORTLAND, None),
+            ])
+
+        assert levels == {
+            (MOD_USER, OREGON, HEALTHCARE_CAT): "moderator",
+            (PEER_MOD_USER, OREGON, HEALTHCARE_CAT): "moderator",
+            (MOD_USER, PORTLAND, None): "moderator",
+        }
+        assert roles.call_count == 2
+        assert all(c.kwargs == {"cached": False} for c in roles.call_args_list)
+
+    def test_fallback_batched_for_users_without_scoped_role(self):
+        mock_db = MagicMock()
+        mock_db.execute_query = MagicMock(return_value=[
+            {"user_id": FACILITATOR_USER, "role": "facilitator"},
+        ])
+
+        with patch(f"{MOD_HELPERS}.get_highest_roles_at_location", side_effect=_roles(None)), \
+             patch(f"{MOD_HELPERS}.db", mock_db):
+            from candid.controllers.helpers.moderation import determine_actioner_role_levels
+            levels = determine_actioner_role_levels([
+                (FACILITATOR_USER, OREGON, None),
+                (NORMAL_USER, None, None),
+            ])
+
+        assert levels == {
+            (FACILITATOR_USER, OREGON, None): "facilitator",
+            (NORMAL_USER, None, None): None,
+        }
+        mock_db.execute_query.assert_called_once()
+        assert mock_db.execute_query.call_args.args[1] == ([FACILITATOR_USER, NORMAL_USER],)
+
+
+class TestResolveAppealRouting:
+    def test_routes_resolved_up_front(self):
+        mock_db = MagicMock()
+        mock_db.execute_query = MagicMock(return_value=[
+            {"id": MOD_ACTION_ID, "report_id": REPORT_ID, "responder_user_id": MOD_USER},
+        ])
+        levels = {(MOD_USER, OREGON, None): "moderator"}
+
+        with patch(f"{MOD_HELPERS}.db", mock_db), \
+             patch(f"{MOD_HELPERS}.get_content_scope", return_value=(OREGON, None)), \
+             patch(f"{MOD_HELPERS}.determine_actioner_role_levels", return_value=levels), \
+             patch(f"{MOD_HELPERS}.determine_actioner_role_level") as single, \
+             patch(f"{MOD_HELPERS}.find_peer_reviewers", return_value=[PEER_MOD_USER]):
+            from candid.controllers.helpers.moderation import (
+                resolve_appeal_routing, should_show_appeal_to_reviewer,
+            )
+            routing = resolve_appeal_routing([MOD_ACTION_ID, MOD_ACTION_ID])
+            appeal_data = {"originalAction": {"responder": {"id": MOD_USER}}}
+            shown = should_show_appeal_to_reviewer(
+                appeal_data, PEER_MOD_USER, {"mod_action_id": MOD_ACTION_ID}, routing)
+
+        assert routing[MOD_ACTION_ID]["actioner_level"] == "moderator"
+        assert shown is True
+        # The mod action lookup is not repeated per appeal
+        mock_db.execute_query.assert_called_once()
+        single.assert_not_called()
+
+
 # ---------------------------------------------------------------------------
 # _find_appeal_reviewers  (extracted to helpers/moderation.py)
 # ---------------------------------------------------------------------------
@@ -325,25 +399,25 @@ class TestFindPeerReviewers:
 
 class TestCanReviewAppealAtScope:
     def test_moderator_can_review_facilitator_action(self):
-        with patch(f"{MOD_HELPERS}.get_highest_role_at_location", return_value="moderator"):
+        with patch(f"{MOD_HELPERS}.get_highest_roles_at_location", side_effect=_roles("moderator")):
             from candid.controllers.moderation_controller import _can_review_appeal_at_scope
             assert _can_review_appeal_at_scope(
                 MOD_USER, OREGON, HEALTHCARE_CAT, "facilitator") is True
 
     def test_facilitator_cannot_review_moderator_action(self):
-        with patch(f"{MOD_HELPERS}.get_highest_role_at_location", return_value="facilitator"):
+        with patch(f"{MOD_HELPERS}.get_highest_roles_at_location", side_effect=_roles("facilitator")):
             from candid.controllers.moderation_controller import _can_review_appeal_at_scope
             assert _can_review_appeal_at_scope(
                 FACILITATOR_USER, OREGON, HEALTHCARE_CAT, "moderator") is False
 
     def test_same_tier_cannot_review(self):
-        with patch(f"{MOD_HELPERS}.get_highest_role_at_location", return_value="moderator"):
+        with patch(f"{MOD_HELPERS}.get_highest_roles_at_location", side_effect=_roles("moderator")):
             from candid.controllers.moderation_controller import _can_review_appeal_at_scope
             assert _can_review_appeal_at_scope(
                 MOD_USER, OREGON, None, "moderator") is False
 
     def test_admin_can_review_any_lower_tier(self):
-        with patch(f"{MOD_HELPERS}.get_highest_role_at_location", return_value="admin"):
+        with patch(f"{MOD_HELPERS}.get_highest_roles_at_location", side_effect=_roles("admin")):
             from candid.controllers.moderation_controller import _can_review_appeal_at_scope
             assert _can_review_appeal_at_scope(
                 ADMIN_USER, OREGON, None, "assistant_moderator") is True
@@ -7,6 +7,15 @@ import requests.exceptions
 pytestmark = pytest.mark.unit
 
 
+@pytest.fixture(autouse=True)
+def _reset_client():
+    """Each test starts with a closed breaker and empty latency histograms."""
+    from candid.controllers.helpers.nlp import reset_client_stats
+    reset_client_stats()
+    yield
+    reset_client_stats()
+
+
 # ---------------------------------------------------------------------------
 # get_embeddings / get_embedding
 # ---------------------------------------------------------------------------
@@ -18,24 +27,25 @@ class TestGetEmbeddings:
 
     def test_success(self):
         mock_resp = MagicMock()
+        mock_resp.status_code = 200
         mock_resp.json.return_value = {"embeddings": [[0.1, 0.2], [0.3, 0.4]]}
         mock_resp.raise_for_status = MagicMock()
 
-        with patch("candid.controllers.helpers.nlp.requests.post", return_value=mock_resp):
+        with patch("candid.controllers.helpers.nlp._session.request", return_value=mock_resp):
             from candid.controllers.helpers.nlp import get_embeddings
             result = get_embeddings(["hello", "world"])
             assert len(result) == 2
             assert result[0] == [0.1, 0.2]
 
     def test_connection_error_returns_none(self):
-        with patch("candid.controllers.helpers.nlp.requests.post",
+        with patch("candid.controllers.helpers.nlp._session.request",
                     side_effect=requests.exceptions.ConnectionError("conn failed")):
             from candid.controllers.helpers.nlp import get_embeddings
             result = get_embeddings(["hello"])
             assert result is None
 
     def test_timeout_returns_none(self):
-        with patch("candid.controllers.helpers.nlp.requests.post",
+        with patch("candid.controllers.helpers.nlp._session.request",
                     side_effect=requests.exceptions.Timeout("timeout")):
             from candid.controllers.helpers.nlp import get_embeddings
             result = get_embeddings(["hello"])
@@ -43,7 +53,7 @@ class TestGetEmbeddings:
 
     def test_http_error_raises(self):
         from candid.controllers.helpers.nlp import NLPServiceError
-        with patch("candid.controllers.helpers.nlp.requests.post",
+        with patch("candid.controllers.helpers.nlp._session.request",
                     side_effect=requests.exceptions.HTTPError("500")):
             from candid.controllers.helpers.nlp import get_embeddings
             with pytest.raises(NLPServiceError):
@@ -53,21 +63,94 @@ class TestGetEmbeddings:
 class TestGetEmbedding:
     def test_single_embedding(self):
         mock_resp = MagicMock()
+        mock_resp.status_code = 200
         mock_resp.json.return_value = {"embeddings": [[0.5, 0.6]]}
         mock_resp.raise_for_status = MagicMock()
 
-        with patch("candid.controllers.helpers.nlp.requests.post", return_value=mock_resp):
+        with patch("candid.controllers.helpers.nlp._session.request", return_value=mock_resp):
             from candid.controllers.helpers.nlp import get_embedding
             result = get_embedding("test")
             assert result == [0.5, 0.6]
 
     def test_service_unavailable_returns_none(self):
-        with patch("candid.controllers.helpers.nlp.requests.post",
+        with patch("candid.controllers.helpers.nlp._session.request",
                     side_effect=requests.exceptions.ConnectionError()):
             from candid.controllers.helpers.nlp import get_embedding
             assert get_embedding("test") is None
 
 
+# ---------------------------------------------------------------------------
+# Embedding cache
+# ---------------------------------------------------------------------------
+
+def _embed_response(vectors):
+    mock_resp = MagicMock()
+    mock_resp.status_code = 200
+    mock_resp.json.return_value = {"embeddings": vectors}
+    mock_resp.raise_for_status = MagicMock()
+    return mock_resp
+
+
+class TestEmbeddingCache:
+    def test_key_ignores_whitespace_differences(self):
+        from candid.controllers.helpers.nlp import embedding_cache_key
+        assert embedding_cache_key("  Taxes   should\nrise ") == embedding_cache_key("Taxes should rise")
+        assert embedding_cache_key("Taxes should rise") != embedding_cache_key("Taxes should fall")
+
+    def test_key_includes_model(self):
+        from candid.controllers.helpers.nlp import embedding_cache_key, Config
+        key = embedding_cache_key("text")
+        with patch.object(Config, "NLP_EMBEDDING_MODEL", "other-model"):
+            assert embedding_cache_key("text") != key
+
+    def test_miss_then_hit(self, shared_cache_redis):
+        from candid.controllers.helpers.nlp import get_embeddings, embedding_cache_stats
+        with patch("candid.controllers.helpers.nlp._session.request",
+                   return_value=_embed_response([[0.25, 0.5]])) as mock_post:
+            assert get_embeddings(["hello"]) == [[0.25, 0.5]]
+            assert get_embeddings(["hello "]) == [[0.25, 0.5]]
+
+        assert mock_post.call_count == 1
+        assert embedding_cache_stats() == {"hits": 1, "misses": 1}
+
+    def test_only_uncached_texts_are_sent(self, shared_cache_redis):
+        from candid.controllers.helpers.nlp import get_embeddings
+        with patch("candid.controllers.helpers.nlp._session.request",
+                   return_value=_embed_response([[1.0]])):
+            get_embeddings(["a"])
+        with patch("candid.controllers.helpers.nlp._session.request",
+                   return_value=_embed_response([[2.0]])) as mock_post:
+            result = get_embeddings(["a", "b", "b"])
+
+        assert mock_post.call_args.kwargs["json"] == {"texts": ["b"]}
+        assert result == [[1.0], [2.0], [2.0]]
+
+    def test_stored_as_float32_with_ttl(self, shared_cache_redis):
+        import base64
+        from candid.controllers.helpers.nlp import get_embeddings, embedding_cache_key, Config
+        with patch("candid.controllers.helpers.nlp._session.request",
+                   return_value=_embed_response([[0.1] * 384])):
+            get_embeddings(["x"])
+
+        key = embedding_cache_key("x")
+        assert len(base64.b64decode(shared_cache_redis.get(key))) == 384 * 4
+        assert shared_cache_redis._ttls[key] == Config.NLP_EMBED_CACHE_TTL
+
+    def test_redis_down_falls_back_to_service(self):
+        from candid.controllers.helpers.nlp import get_embeddings
+        with patch("candid.controllers.helpers.nlp.get_redis", side_effect=Exception("down")), \
+             patch("candid.controllers.helpers.nlp._session.request",
+                   return_value=_embed_response([[0.5]])):
+            assert get_embeddings(["x"]) == [[0.5]]
+
+    def test_service_unavailable_is_not_cached(self, shared_cache_redis):
+        from candid.controllers.helpers.nlp import get_embeddings, embedding_cache_key
+        with patch("candid.controllers.helpers.nlp._session.request",
+                   side_effect=requests.exceptions.ConnectionError()):
+            assert get_embeddings(["x"]) is None
+        assert shared_cache_redis.get(embedding_cache_key("x")) is None
+
+
 # ---------------------------------------------------------------------------
 # compute_similarity
 # ---------------------------------------------------------------------------
@@ -79,16 +162,17 @@ class TestComputeSimilarity:
 
     def test_success(self):
         mock_resp = MagicMock()
+        mock_resp.status_code = 200
         mock_resp.json.return_value = {"scores": [0.95, 0.60, 0.30]}
         mock_resp.raise_for_status = MagicMock()
 
-        with patch("candid.controllers.helpers.nlp.requests.post", return_value=mock_resp):
+        with patch("candid.controllers.helpers.nlp._session.request", return_value=mock_resp):
             from candid.controllers.helpers.nlp import compute_similarity
             scores = compute_similarity("query", ["a", "b", "c"])
             assert scores == [0.95, 0.60, 0.30]
 
     def test_connection_error_returns_none(self):
-        with patch("candid.controllers.helpers.nlp.requests.post",
+        with patch("candid.controllers.helpers.nlp._session.request",
                     side_effect=requests.exceptions.ConnectionError()):
             from candid.controllers.helpers.nlp import compute_similarity
             assert compute_similarity("q", ["a"]) is None
@@ -101,17 +185,18 @@ class TestComputeSimilarity:
 class TestCheckNSFW:
     def test_safe_image(self):
         mock_resp = MagicMock()
+        mock_resp.status_code = 200
         mock_resp.json.return_value = {"is_safe": True, "nsfw_score": 0.1}
         mock_resp.raise_for_status = MagicMock()
 
-        with patch("candid.controllers.helpers.nlp.requests.post", return_value=mock_resp):
+        with patch("candid.controllers.helpers.nlp._session.request", return_value=mock_resp):
             from candid.controllers.helpers.nlp import check_nsfw
             result = check_nsfw("base64data")
             assert result["is_safe"] is True
 
     def test_fail_open_on_connection_error(self):
         """NSFW check should fail open (allow) if service unavailable."""
-        with patch("candid.controllers.helpers.nlp.requests.post",
+        with patch("candid.controllers.helpers.nlp._session.request",
                     side_effect=requests.exceptions.ConnectionError()):
             from candid.controllers.helpers.nlp import check_nsfw
             result = check_nsfw("base64data")
@@ -119,7 +204,7 @@ class TestCheckNSFW:
             assert result["nsfw_score"] == 0.0
 
     def test_fail_open_on_timeout(self):
-        with patch("candid.controllers.helpers.nlp.requests.post",
+        with patch("candid.controllers.helpers.nlp._session.request",
                     side_effect=requests.exceptions.Timeout()):
             from candid.controllers.helpers.nlp import check_nsfw
             result = check_nsfw("base64data")
@@ -133,6 +218,7 @@ class TestCheckNSFW:
 class TestProcessAvatar:
     def test_success(self):
         mock_resp = MagicMock()
+        mock_resp.status_code = 200
         mock_resp.json.return_value = {
             "is_safe": True,
             "full_base64": "full_data",
@@ -141,7 +227,7 @@ class TestProcessAvatar:
         }
         mock_resp.raise_for_status = MagicMock()
 
-        with patch("candid.controllers.helpers.nlp.requests.post", return_value=mock_resp):
+        with patch("candid.controllers.helpers.nlp._session.request", return_value=mock_resp):
             from candid.controllers.helpers.nlp import process_avatar
             result = process_avatar("base64data")
             assert result["is_safe"] is True
@@ -149,7 +235,7 @@ class TestProcessAvatar:
 
     def test_service_unavailable_returns_unsafe(self):
         """Avatar processing fails closed (reject) if service unavailable."""
-        with patch("candid.controllers.helpers.nlp.requests.post",
+        with patch("candid.controllers.helpers.nlp._session.request",
                     side_effect=requests.exceptions.ConnectionError()):
             from candid.controllers.helpers.nlp import process_avatar
             result = process_avatar("base64data")
@@ -157,7 +243,7 @@ class TestProcessAvatar:
             assert result["error"] == "Service unavailable"
 
     def test_timeout_returns_unsafe(self):
-        with patch("candid.controllers.helpers.nlp.requests.post",
+        with patch("candid.controllers.helpers.nlp._session.request",
                     side_effect=requests.exceptions.Timeout()):
             from candid.controllers.helpers.nlp import process_avatar
             result = process_avatar("base64data")
@@ -173,21 +259,137 @@ class TestHealthCheck:
     def test_healthy(self):
         mock_resp = MagicMock()
         mock_resp.status_code = 200
+        mock_resp.status_code = 200
 
-        with patch("candid.controllers.helpers.nlp.requests.get", return_value=mock_resp):
+        with patch("candid.controllers.helpers.nlp._session.request", return_value=mock_resp):
             from candid.controllers.helpers.nlp import health_check
             assert health_check() is True
 
     def test_unhealthy(self):
         mock_resp = MagicMock()
+        mock_resp.status_code = 200
         mock_resp.status_code = 503
 
-        with patch("candid.controllers.helpers.nlp.requests.get", return_value=mock_resp):
+        with patch("candid.controllers.helpers.nlp._session.request", return_value=mock_resp):
             from candid.controllers.helpers.nlp import health_check
             assert health_check() is False
 
     def test_connection_error(self):
-        with patch("candid.controllers.helpers.nlp.requests.get",
+        with patch("candid.controllers.helpers.nlp._session.request",
                     side_effect=requests.exceptions.ConnectionError()):
             from candid.controllers.helpers.nlp import health_check
             assert health_check() is False
+
+
+# ---------------------------------------------------------------------------
+# Connection pool, circuit breaker, latency histograms
+# ---------------------------------------------------------------------------
+
+class TestPooledSession:
+    def test_adapter_pool_and_retries_from_config(self):
+        from candid.controllers.helpers.nlp import _build_session, Config
+        adapter = _build_session().get_adapter("http://nlp:5001/embed")
+        assert adapter._pool_maxsize == Config.NLP_POOL_MAXSIZE
+        assert adapter.max_retries.connect == Config.NLP_MAX_RETRIES
+        assert adapter.max_retries.read == 0
+        assert 503 in adapter.max_retries.status_forcelist
+
+    def test_calls_go_through_shared_session(self):
+        with patch("candid.controllers.helpers.nlp._session.request",
+                   return_value=_embed_response([[0.5]])) as mock_request:
+            from candid.controllers.helpers.nlp import get_embeddings
+            get_embeddings(["pooled"])
+        assert mock_request.call_args.args == ("POST", "http://nlp:5001/embed")
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures_and_fails_fast(self):
+        from candid.controllers.helpers.nlp import compute_similarity, client_stats, Config
+        with patch("candid.controllers.helpers.nlp._session.request",
+                   side_effect=requests.exceptions.ConnectionError()) as mock_request:
+            for _ in range(Config.NLP_BREAKER_FAILURES):
+                assert compute_similarity("q", ["a"]) is None
+            assert client_stats()["circuit_breaker"] == "open"
+
+            # Further calls degrade the same way without touching the network
+            assert compute_similarity("q", ["a"]) is None
+        assert mock_request.call_count == Config.NLP_BREAKER_FAILURES
+
+    def test_success_resets_failure_count(self):
+        from candid.controllers.helpers.nlp import CircuitBreaker
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+    def test_half_open_lets_one_trial_through(self):
+        from candid.controllers.helpers.nlp import CircuitBreaker
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        with patch("candid.controllers.helpers.nlp.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+            assert breaker.allow() is False
+        with patch("candid.controllers.helpers.nlp.time.monotonic", return_value=131.0):
+            assert breaker.state == "half_open"
+            assert breaker.allow() is True
+            assert breaker.allow() is False
+            breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_trial_reopens(self):
+        from candid.controllers.helpers.nlp import CircuitBreaker
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+        with patch("candid.controllers.helpers.nlp.time.monotonic", return_value=100.0):
+            breaker.record_failure()
+        with patch("candid.controllers.helpers.nlp.time.monotonic", return_value=131.0):
+            assert breaker.allow() is True
+            breaker.record_failure()
+            assert breaker.state == "open"
+
+    def test_server_errors_count_as_failures(self):
+        from candid.controllers.helpers.nlp import check_nsfw, NLPServiceError, _breaker
+        mock_resp = MagicMock()
+        mock_resp.status_code = 500
+        mock_resp.raise_for_status.side_effect = requests.exceptions.HTTPError("500")
+        with patch("candid.controllers.helpers.nlp._session.request", return_value=mock_resp):
+            with pytest.raises(NLPServiceError):
+                check_nsfw("base64data")
+        assert _breaker._failures == 1
+
+    def test_health_check_bypasses_breaker(self):
+        from candid.controllers.helpers.nlp import health_check, _breaker
+        for _ in range(_breaker.failure_threshold):
+            _breaker.record_failure()
+        mock_resp = MagicMock()
+        mock_resp.status_code = 200
+        with patch("candid.controllers.helpers.nlp._session.request", return_value=mock_resp):
+            assert health_check() is True
+
+
+class TestLatencyHistograms:
+    def test_records_per_endpoint(self):
+        from candid.controllers.helpers.nlp import get_embeddings, compute_similarity, client_stats
+        mock_resp = MagicMock()
+        mock_resp.status_code = 200
+        mock_resp.json.return_value = {"embeddings": [[0.1]], "scores": [0.9]}
+        with patch("candid.controllers.helpers.nlp._session.request", return_value=mock_resp):
+            get_embeddings(["one"])
+            compute_similarity("q", ["a"])
+            compute_similarity("q", ["b"])
+
+        endpoints = client_stats()["endpoints"]
+        assert endpoints["/embed"]["count"] == 1
+        assert endpoints["/similarity"]["count"] == 2
+        assert sum(endpoints["/similarity"]["buckets"].values()) == 2
+
+    def test_bucketing_and_errors(self):
+        from candid.controllers.helpers.nlp import LatencyHistogram
+        hist = LatencyHistogram()
+        hist.observe(3)
+        hist.observe(5)
+        hist.observe(60000, error=True)
+        snap = hist.snapshot()
+        assert snap["buckets"]["5"] == 2
+        assert snap["buckets"]["+Inf"] == 1
+        assert snap["errors"] == 1
+        assert snap["count"] == 3
@@ -251,6 +251,15 @@ class TestBuildVictoryMatrix:
         matrix = build_victory_matrix(["A", "B"], [])
         assert matrix["A"]["B"] == 0
 
+    def test_counted_responses(self):
+        responses = [
+            {"winner_item_id": "A", "loser_item_id": "B", "n": 5},
+            {"winner_item_id": "B", "loser_item_id": "A"},
+        ]
+        matrix = build_victory_matrix(["A", "B"], responses)
+        assert matrix["A"]["B"] == 5
+        assert matrix["B"]["A"] == 1
+
 
 # ---------------------------------------------------------------------------
 # find_condorcet_winner
@@ -263,6 +263,68 @@ class TestGetXidToken:
 
 
 
+# ---------------------------------------------------------------------------
+# PolisClient.get_participant_pid / get_next_comment
+# ---------------------------------------------------------------------------
+
+class TestGetParticipantPid:
+    def test_lookup_cached_after_first_call(self):
+        from candid.controllers.helpers.polis_client import PolisClient
+        mock_db = MagicMock()
+        mock_db.execute_query.return_value = {"polis_pid": 7}
+        with patch("candid.controllers.helpers.polis_client.db", mock_db):
+            client = PolisClient()
+            assert client.get_participant_pid("conv-1", "candid:user-1") == 7
+            assert client.get_participant_pid("conv-1", "candid:user-1") == 7
+        assert mock_db.execute_query.call_count == 1
+
+    def test_unknown_participant_not_cached(self):
+        from candid.controllers.helpers.polis_client import PolisClient
+        mock_db = MagicMock()
+        mock_db.execute_query.side_effect = [None, {"polis_pid": 3}]
+        with patch("candid.controllers.helpers.polis_client.db", mock_db):
+            client = PolisClient()
+            assert client.get_participant_pid("conv-1", "candid:user-1") is None
+            assert client.get_participant_pid("conv-1", "candid:user-1") == 3
+
+    def test_least_recently_used_evicted_past_maxsize(self):
+        from candid.controllers.helpers.polis_client import PolisClient
+        mock_db = MagicMock()
+        mock_db.execute_query.side_effect = lambda sql, params, **kw: {"polis_pid": int(params[0][-1])}
+        with patch("candid.controllers.helpers.polis_client.db", mock_db):
+            client = PolisClient()
+            client._pids_maxsize = 2
+            client.get_participant_pid("conv-1", "candid:user-1")
+            client.get_participant_pid("conv-1", "candid:user-2")
+            client.get_participant_pid("conv-1", "candid:user-1")  # refresh user-1
+            client.get_participant_pid("conv-1", "candid:user-3")
+        assert list(client._pids) == [("conv-1", "candid:user-1"), ("conv-1", "candid:user-3")]
+
+    def test_next_comment_with_pid_skips_lookup(self):
+        from candid.controllers.helpers.polis_client import PolisClient
+        mock_db = MagicMock()
+        with patch("candid.controllers.helpers.polis_client.db", mock_db):
+            client = PolisClient()
+            client._xid_tokens["conv-1"] = {"candid:user-1": "tok"}
+            with patch.object(client, "_request", return_value={"tid": 4}) as mock_req:
+                result = client.get_next_comment("conv-1", "candid:user-1", pid=9)
+        assert result == {"tid": 4}
+        assert mock_req.call_args.kwargs["params"]["not_voted_by_pid"] == 9
+        mock_db.execute_query.assert_not_called()
+
+    def test_math_pca_not_modified_returns_none(self):
+        from candid.controllers.helpers.polis_client import PolisClient
+        client = PolisClient()
+
+        mock_resp = MagicMock()
+        mock_resp.status_code = 304
+        mock_resp.content = b""
+
+        with patch.object(client.session, "request", return_value=mock_resp) as mock_req:
+            assert client.get_math_pca("conv-1", math_tick=12) is None
+        assert mock_req.call_args.kwargs["params"]["math_tick"] == 12
+
+
 # ---------------------------------------------------------------------------
 # PolisClient.clear_user_token
 # ---------------------------------------------------------------------------
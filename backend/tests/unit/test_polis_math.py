@@ -0,0 +1,182 @@
+"""Unit tests for polis_math.py — shared Redis cache of Polis conversation math."""
+
+import json
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from .conftest import MockRedis
+
+pytestmark = pytest.mark.unit
+
+PM = "candid.controllers.helpers.polis_math"
+
+
+def _config():
+    cfg = MagicMock()
+    cfg.POLIS_MATH_POLL_INTERVAL = 15
+    cfg.POLIS_MATH_WATCH_TTL = 3600
+    cfg.POLIS_MATH_CACHE_TTL = 86400
+    return cfg
+
+
+def _pojo(math_tick, members=(1, 2)):
+    return {"math_tick": math_tick, "group-clusters": [{"id": 0, "members": list(members)}]}
+
+
+@pytest.fixture
+def pm():
+    """Yield (redis, polis client, polis_math module) with a clean local copy."""
+    r = MockRedis()
+    client = MagicMock()
+    with patch(f"{PM}.get_redis", return_value=r), \
+         patch(f"{PM}.get_client", return_value=client), \
+         patch(f"{PM}.config", _config()):
+        from candid.controllers.helpers import polis_math
+        polis_math._local.clear()
+        yield r, client, polis_math
+        polis_math._local.clear()
+
+
+# ---------------------------------------------------------------------------
+# Reads
+# ---------------------------------------------------------------------------
+
+class TestGetMath:
+    def test_first_read_fetches_once_and_caches(self, pm):
+        r, client, polis_math = pm
+        client.get_math_pca.return_value = _pojo(5)
+
+        math = polis_math.get_math("conv-1")
+
+        assert math == {"pca": {"asPOJO": _pojo(5)}, "math_tick": 5}
+        client.get_math_pca.assert_called_once_with("conv-1", -1)
+        assert r.get("polis:math:conv-1:tick") == "5"
+        assert json.loads(r.get("polis:math:conv-1:5")) == math
+        assert r.zscore("polis:math:watched", "conv-1") is not None
+
+    def test_reads_shared_copy_without_polis(self, pm):
+        r, client, polis_math = pm
+        math = {"pca": {"asPOJO": _pojo(3)}, "math_tick": 3}
+        r.set("polis:math:conv-1:tick", "3")
+        r.set("polis:math:conv-1:3", json.dumps(math))
+
+        assert polis_math.get_math("conv-1") == math
+        client.get_math_pca.assert_not_called()
+
+    def test_same_tick_served_from_process_copy(self, pm):
+        r, client, polis_math = pm
+        r.set("polis:math:conv-1:tick", "3")
+        r.set("polis:math:conv-1:3", json.dumps({"pca": {}, "math_tick": 3}))
+
+        first = polis_math.get_math("conv-1")
+        r.delete("polis:math:conv-1:3")
+
+        assert polis_math.get_math("conv-1") is first
+
+    def test_cold_read_while_another_process_polls(self, pm):
+        r, client, polis_math = pm
+        r.set("polis:math:poll:conv-1", "1")
+
+        assert polis_math.get_math("conv-1") == {}
+        client.get_math_pca.assert_not_called()
+
+    def test_polis_failure_returns_empty(self, pm):
+        r, client, polis_math = pm
+        client.get_math_pca.side_effect = Exception("connection refused")
+
+        assert polis_math.get_math("conv-1") == {}
+
+    def test_redis_failure_falls_back_to_process_copy(self, pm):
+        r, client, polis_math = pm
+        client.get_math_pca.return_value = _pojo(5)
+        math = polis_math.get_math("conv-1")
+
+        with patch(f"{PM}.get_redis", side_effect=ConnectionError("redis down")):
+            assert polis_math.get_math("conv-1") == math
+
+
+class TestGetMathData:
+    def test_adds_participant_pid(self, pm):
+        r, client, polis_math = pm
+        client.get_math_pca.return_value = _pojo(5)
+        client.get_participant_pid.return_value = 2
+
+        data = polis_math.get_math_data("conv-1", "candid:user-1")
+
+        assert data["ptpt"] == {"pid": 2}
+        assert data["math_tick"] == 5
+        # The shared copy is not mutated
+        assert "ptpt" not in polis_math.get_math("conv-1")
+
+    def test_unknown_participant_gets_plain_math(self, pm):
+        r, client, polis_math = pm
+        client.get_math_pca.return_value = _pojo(5)
+        client.get_participant_pid.return_value = None
+
+        data = polis_math.get_math_data("conv-1", "candid:user-1")
+
+        assert "ptpt" not in data
+
+    def test_no_math_skips_pid_lookup(self, pm):
+        r, client, polis_math = pm
+        client.get_math_pca.return_value = None
+
+        assert polis_math.get_math_data("conv-1", "candid:user-1") == {}
+        client.get_participant_pid.assert_not_called()
+
+
+# ---------------------------------------------------------------------------
+# Polling
+# ---------------------------------------------------------------------------
+
+class TestPoll:
+    def test_conditional_fetch_passes_cached_tick(self, pm):
+        r, client, polis_math = pm
+        r.set("polis:math:conv-1:tick", "3")
+        r.set("polis:math:conv-1:3", json.dumps({"pca": {}, "math_tick": 3}))
+        client.get_math_pca.return_value = None  # 304 Not Modified
+
+        assert polis_math.poll("conv-1") is False
+        client.get_math_pca.assert_called_once_with("conv-1", 3)
+        assert r._ttls["polis:math:conv-1:3"] == 86400
+
+    def test_new_tick_replaces_cached_copy(self, pm):
+        r, client, polis_math = pm
+        r.set("polis:math:conv-1:tick", "3")
+        r.set("polis:math:conv-1:3", json.dumps({"pca": {}, "math_tick": 3}))
+        client.get_math_pca.return_value = _pojo(4, members=(7,))
+
+        assert polis_math.poll("conv-1") is True
+        assert r.get("polis:math:conv-1:tick") == "4"
+        assert r._ttls["polis:math:conv-1:3"] == polis_math.OLD_TICK_TTL
+        assert polis_math.get_math("conv-1")["pca"]["asPOJO"]["group-clusters"][0]["members"] == [7]
+
+    def test_one_fetch_per_interval(self, pm):
+        r, client, polis_math = pm
+        client.get_math_pca.return_value = None
+
+        polis_math.poll("conv-1")
+        polis_math.poll("conv-1")
+
+        assert client.get_math_pca.call_count == 1
+
+    def test_poll_watched_skips_idle_conversations(self, pm):
+        r, client, polis_math = pm
+        now = time.time()
+        r.zadd("polis:math:watched", {"conv-active": now - 60, "conv-idle": now - 7200})
+        client.get_math_pca.return_value = _pojo(1)
+
+        assert polis_math.poll_watched(now) == 1
+        client.get_math_pca.assert_called_once_with("conv-active", -1)
+        assert r.zscore("polis:math:watched", "conv-idle") is None
+
+    def test_poll_watched_continues_after_failure(self, pm):
+        r, client, polis_math = pm
+        now = time.time()
+        r.zadd("polis:math:watched", {"conv-a": now - 2, "conv-b": now - 1})
+        client.get_math_pca.side_effect = [Exception("timeout"), _pojo(2)]
+
+        assert polis_math.poll_watched(now) == 1
+        assert r.get("polis:math:conv-b:tick") == "2"
@@ -1,7 +1,12 @@
 """Unit tests for polis_sync.py — sync queue and vote mapping."""
 
 import json
+import random
+import threading
+import time
 from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -628,3 +633,216 @@ class TestSyncPositionToConvGroup:
                 "loc-1", None, "USA", None, errors
             )
             assert count == 0
+
+
+# ---------------------------------------------------------------------------
+# get_unvoted_positions_for_user
+# ---------------------------------------------------------------------------
+
+def _sync_config(**overrides):
+    cfg = MagicMock(POLIS_ENABLED=True, POLIS_FETCH_CONCURRENCY=4)
+    for key, value in overrides.items():
+        setattr(cfg, key, value)
+    return cfg
+
+
+def _mapped(tids, category_id):
+    return [{"id": f"pos-{tid}", "category_id": category_id} for tid in tids]
+
+
+def _math(priorities):
+    return {"pca": {"asPOJO": {"comment-priorities": {str(t): p for t, p in priorities.items()}}},
+            "math_tick": 1}
+
+
+class TestGetUnvotedPositionsForUser:
+    def _run(self, client, priorities, conversations=None, voted=None, limit=4, cfg=None,
+             comment_priorities=None):
+        if conversations is None:
+            conversations = {cid: {"polis_conversation_id": f"conv-{cid}"} for cid in priorities}
+        mock_db = MagicMock()
+        mock_db.execute_query.return_value = [{"polis_comment_tid": t} for t in (voted or [])]
+        with patch("candid.controllers.helpers.polis_sync.config", cfg or _sync_config()), \
+             patch("candid.controllers.helpers.polis_sync.db", mock_db), \
+             patch("candid.controllers.helpers.polis_sync.get_client", return_value=client), \
+             patch("candid.controllers.helpers.polis_sync.get_math",
+                   return_value=_math(comment_priorities or {})) as mock_math, \
+             patch("candid.controllers.helpers.polis_sync.get_oldest_active_conversation",
+                   side_effect=lambda loc, cid: conversations.get(cid)), \
+             patch("candid.controllers.helpers.polis_sync._batch_polis_comments_to_positions",
+                   side_effect=_mapped), \
+             patch("candid.controllers.helpers.polis_sync._get_unvoted_positions_from_db",
+                   return_value=[{"id": "db-pos"}]) as mock_db_fallback:
+            from candid.controllers.helpers.polis_sync import get_unvoted_positions_for_user
+            result = get_unvoted_positions_for_user("user-1", "loc-1", priorities, limit=limit)
+        self.mock_math = mock_math
+        return result, mock_db_fallback
+
+    def test_remaining_tids_drawn_from_local_priorities(self):
+        client = MagicMock()
+        client.get_next_comment.return_value = {"tid": 1}
+        result, _ = self._run(client, {"cat-1": 3}, voted=[3],
+                              comment_priorities={1: 5.0, 2: 1.0, 3: 1.0, 4: 1.0})
+
+        assert {p["id"] for p in result} == {"pos-1", "pos-2", "pos-4"}
+        # One nextComment round trip for the whole category
+        assert client.get_next_comment.call_count == 1
+
+    def test_priorities_read_from_shared_math(self):
+        client = MagicMock()
+        client.get_next_comment.return_value = {"tid": 1}
+
+        self._run(client, {"cat-1": 3}, limit=2, comment_priorities={1: 1.0, 2: 1.0})
+
+        self.mock_math.assert_called_once_with("conv-cat-1")
+        client.get_math_data.assert_not_called()
+
+    def test_no_priorities_falls_back_to_next_comment(self):
+        client = MagicMock()
+        client.get_next_comment.side_effect = [{"tid": 1}, {"tid": 2}, None]
+        client.get_participant_pid.return_value = 42
+
+        result, _ = self._run(client, {"cat-1": 3})
+
+        assert [p["id"] for p in result] == ["pos-1", "pos-2"]
+        # Follow-up calls reuse the resolved pid and exclude fetched tids
+        follow_up = client.get_next_comment.call_args_list[1]
+        assert follow_up.kwargs["pid"] == 42
+        assert follow_up.kwargs["without_tids"] == [1, 2]
+        client.get_participant_pid.assert_called_once()
+
+    def test_categories_returned_in_priority_order(self):
+        client = MagicMock()
+        client.get_next_comment.side_effect = lambda conv, xid, **kw: {"tid": int(conv[-1])}
+
+        result, _ = self._run(client, {"cat-1": 1, "cat-2": 5, "cat-3": 3}, limit=9,
+                              cfg=_sync_config(POLIS_FETCH_CONCURRENCY=3))
+
+        categories = [p["category_id"] for p in result]
+        assert categories == ["cat-2"] * 5 + ["cat-3"] * 3 + ["cat-1"]
+
+    def test_no_conversation_falls_back_to_db(self):
+        client = MagicMock()
+        result, mock_db_fallback = self._run(client, {"cat-1": 3}, conversations={})
+
+        assert result == [{"id": "db-pos"}]
+        client.get_next_comment.assert_not_called()
+        mock_db_fallback.assert_called_once()
+
+    def test_polis_error_falls_back_to_db(self):
+        from candid.controllers.helpers.polis_client import PolisError
+        client = MagicMock()
+        client.get_next_comment.side_effect = PolisError("down")
+
+        result, mock_db_fallback = self._run(client, {"cat-1": 3})
+
+        assert result == [{"id": "db-pos"}]
+
+    def test_zero_priorities_returns_empty(self):
+        client = MagicMock()
+        result, _ = self._run(client, {"cat-1": 0})
+        assert result == []
+
+
+class TestWeightedSample:
+    def test_distinct_keys(self):
+        from candid.controllers.helpers.polis_sync import _weighted_sample
+        sample = _weighted_sample({i: 1.0 for i in range(10)}, 5)
+        assert len(sample) == 5
+        assert len(set(sample)) == 5
+
+    def test_k_larger_than_population(self):
+        from candid.controllers.helpers.polis_sync import _weighted_sample
+        assert sorted(_weighted_sample({1: 1.0, 2: 2.0}, 5)) == [1, 2]
+
+    def test_heavy_weight_usually_first(self):
+        from candid.controllers.helpers.polis_sync import _weighted_sample
+        firsts = [_weighted_sample({1: 100.0, 2: 1.0}, 1)[0] for _ in range(200)]
+        assert firsts.count(1) > 180
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks (stub Polis server with simulated network latency)
+# ---------------------------------------------------------------------------
+
+STUB_POLIS_LATENCY = 0.005  # seconds per request
+
+
+class _StubPolisHandler(BaseHTTPRequestHandler):
+    """Minimal Polis API: nextComment."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(STUB_POLIS_LATENCY)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.endswith("/nextComment"):
+            without = {int(t) for t in query.get("without", [])}
+            unvoted = [t for t in range(50) if t not in without]
+            body = {"tid": random.choice(unvoted), "remaining": len(unvoted), "total": 50}
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture(scope="module")
+def stub_polis():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubPolisHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+@pytest.mark.benchmark(group="unvoted_positions")
+@pytest.mark.parametrize("mode", ["sequential", "batched"])
+def test_bench_get_unvoted_positions(benchmark, stub_polis, mode):
+    from candid.controllers.helpers.polis_client import PolisClient
+    from candid.controllers.helpers import polis_sync
+
+    batched = mode == "batched"
+    math = _math({t: 1.0 + t % 5 for t in range(50)}) if batched else {}
+    host, port = stub_polis.server_address
+    client = PolisClient(base_url=f"http://{host}:{port}/api/v3", timeout=5)
+    categories = {f"cat-{i}": 5 - i for i in range(4)}
+    for cid in categories:
+        client._xid_tokens.setdefault(f"conv-{cid}", {})["candid:user-1"] = "token"
+        client._pids[(f"conv-{cid}", "candid:user-1")] = 7
+
+    cfg = _sync_config(POLIS_FETCH_CONCURRENCY=8 if batched else 1)
+    samples = []
+
+    def fetch():
+        start = time.perf_counter()
+        result = polis_sync.get_unvoted_positions_for_user("user-1", "loc-1", categories, limit=12)
+        samples.append(time.perf_counter() - start)
+        return result
+
+    with patch("candid.controllers.helpers.polis_sync.config", cfg), \
+         patch("candid.controllers.helpers.polis_sync.db", MagicMock(**{"execute_query.return_value": []})), \
+         patch("candid.controllers.helpers.polis_sync.get_client", return_value=client), \
+         patch("candid.controllers.helpers.polis_sync.get_math", return_value=math), \
+         patch("candid.controllers.helpers.polis_sync.get_oldest_active_conversation",
+               side_effect=lambda loc, cid: {"polis_conversation_id": f"conv-{cid}"}), \
+         patch("candid.controllers.helpers.polis_sync._batch_polis_comments_to_positions",
+               side_effect=_mapped):
+        result = benchmark.pedantic(fetch, rounds=20, warmup_rounds=1)
+
+    assert len(result) == 12
+    benchmark.extra_info["p50_ms"] = round(_percentile(samples, 50) * 1000, 2)
+    benchmark.extra_info["p99_ms"] = round(_percentile(samples, 99) * 1000, 2)
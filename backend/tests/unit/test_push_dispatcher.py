@@ -0,0 +1,225 @@
+"""Unit tests for push_dispatcher.py — push outbox and batched Expo dispatcher."""
+
+import json
+import time
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from .conftest import MockRedis
+from .fake_expo import FakeExpoServer
+
+pytestmark = pytest.mark.unit
+
+PD = "candid.controllers.helpers.push_dispatcher"
+PN = "candid.controllers.helpers.push_notifications"
+
+
+def _config(url, batch_size=100):
+    cfg = MagicMock()
+    cfg.PUSH_OUTBOX_ENABLED = True
+    cfg.EXPO_PUSH_API_URL = url
+    cfg.PUSH_BATCH_SIZE = batch_size
+    cfg.PUSH_SEND_TIMEOUT = 5
+    cfg.PUSH_MAX_ATTEMPTS = 3
+    cfg.PUSH_RETRY_BASE_DELAY = 30
+    cfg.PUSH_RECEIPT_DELAY = 900
+    return cfg
+
+
+@pytest.fixture
+def expo():
+    server = FakeExpoServer().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def pd(expo):
+    """Yield (redis, db, push_dispatcher module) wired to the fake Expo server."""
+    r = MockRedis()
+    mock_db = MagicMock()
+    cfg = _config(expo.url)
+    with patch(f"{PD}.get_redis", return_value=r), \
+         patch(f"{PD}.db", mock_db), \
+         patch(f"{PD}.config", cfg), \
+         patch(f"{PN}.config", cfg):
+        from candid.controllers.helpers import push_dispatcher
+        yield r, mock_db, push_dispatcher
+
+
+def _message(token, title="Hi"):
+    return {"to": token, "sound": "default", "title": title, "body": "body"}
+
+
+def _counter_calls(mock_db):
+    return [c for c in mock_db.execute_query.call_args_list
+            if "notifications_sent_today" in c[0][0]]
+
+
+# ---------------------------------------------------------------------------
+# Handlers enqueue instead of calling Expo
+# ---------------------------------------------------------------------------
+
+class TestEnqueue:
+    def test_queue_push_notification_does_not_call_expo(self, pd, expo):
+        r, mock_db, _ = pd
+        from candid.controllers.helpers.push_notifications import send_chat_request_notification
+
+        with patch(f"{PN}.urllib.request.urlopen") as mock_open:
+            assert send_chat_request_notification("tok-1", "Alice", "Statement",
+                                                  db=mock_db, recipient_user_id="u1") is True
+
+        mock_open.assert_not_called()
+        assert expo.requests == []
+        entry = json.loads(r.lrange("push:outbox", 0, -1)[0])
+        assert entry["message"]["to"] == "tok-1"
+        assert entry["message"]["title"] == "Alice wants to chat"
+        assert entry["user_id"] == "u1"
+        mock_db.execute_query.assert_not_called()
+
+    def test_falls_back_to_inline_send_when_redis_down(self, pd):
+        _, _, push_dispatcher = pd
+        from candid.controllers.helpers.push_notifications import queue_push_notification
+
+        with patch.object(push_dispatcher, "get_redis", side_effect=Exception("down")), \
+             patch(f"{PN}.send_push_notification", return_value=True) as mock_send:
+            assert queue_push_notification("tok-1", "T", "B") is True
+        mock_send.assert_called_once()
+
+
+# ---------------------------------------------------------------------------
+# Batched sending
+# ---------------------------------------------------------------------------
+
+class TestDispatch:
+    def test_sends_in_batches_of_batch_size(self, pd, expo):
+        r, mock_db, push_dispatcher = pd
+        for i in range(250):
+            push_dispatcher.enqueue(_message(f"tok-{i}"), f"u{i % 3}")
+
+        worker = push_dispatcher.PushDispatcher()
+        claimed = [worker.process_batch() for _ in range(4)]
+
+        assert claimed == [100, 100, 50, 0]
+        sends = [body for path, body in expo.requests if path == "/send"]
+        assert [len(b) for b in sends] == [100, 100, 50]
+        assert [m["to"] for m in expo.sent_messages()] == [f"tok-{i}" for i in range(250)]
+
+    def test_counters_updated_once_per_batch(self, pd):
+        r, mock_db, push_dispatcher = pd
+        for uid in ["u1", "u1", "u2"]:
+            push_dispatcher.enqueue(_message(f"tok-{uid}"), uid)
+
+        push_dispatcher.PushDispatcher().process_batch()
+
+        calls = _counter_calls(mock_db)
+        assert len(calls) == 1
+        params = calls[0][0][1]
+        assert dict(zip(params[2], params[3])) == {"u1": 2, "u2": 1}
+
+    def test_tickets_recorded_for_receipt_check(self, pd):
+        r, _, push_dispatcher = pd
+        push_dispatcher.enqueue(_message("tok-1"), "u1")
+        push_dispatcher.PushDispatcher().process_batch()
+        assert r.zcard("push:receipts") == 1
+        ticket_id = r.zrangebyscore("push:receipts", 0, time.time())[0]
+        assert r.hget("push:receipt_tokens", ticket_id) == "tok-1"
+
+
+# ---------------------------------------------------------------------------
+# Retries
+# ---------------------------------------------------------------------------
+
+class TestRetries:
+    def test_server_error_schedules_retry_with_backoff(self, pd, expo):
+        r, mock_db, push_dispatcher = pd
+        expo.fail_next = [503]
+        push_dispatcher.enqueue(_message("tok-1"), "u1")
+
+        push_dispatcher.PushDispatcher().process_batch()
+
+        assert r.llen("push:outbox") == 0
+        retries = r.zrangebyscore("push:retry", 0, float("inf"))
+        assert len(retries) == 1
+        assert json.loads(retries[0])["attempts"] == 1
+        assert _counter_calls(mock_db) == []
+
+    def test_due_retry_is_resent(self, pd, expo):
+        r, mock_db, push_dispatcher = pd
+        expo.fail_next = [503]
+        push_dispatcher.enqueue(_message("tok-1"), "u1")
+        worker = push_dispatcher.PushDispatcher()
+        worker.process_batch()
+
+        with patch(f"{PD}.time.time", return_value=time.time() + 31):
+            assert worker.process_batch() == 1
+
+        assert [m["to"] for m in expo.sent_messages()] == ["tok-1", "tok-1"]
+        assert r.zcard("push:retry") == 0
+        assert len(_counter_calls(mock_db)) == 1
+
+    def test_rate_limited_ticket_retried_individually(self, pd, expo):
+        r, _, push_dispatcher = pd
+        expo.ticket_errors["tok-2"] = "MessageRateExceeded"
+        push_dispatcher.enqueue(_message("tok-1"), "u1")
+        push_dispatcher.enqueue(_message("tok-2"), "u2")
+
+        push_dispatcher.PushDispatcher().process_batch()
+
+        retries = [json.loads(m) for m in r.zrangebyscore("push:retry", 0, float("inf"))]
+        assert [e["message"]["to"] for e in retries] == ["tok-2"]
+
+    def test_dropped_after_max_attempts(self, pd):
+        r, _, push_dispatcher = pd
+        entry = {"id": "x", "message": _message("tok-1"), "user_id": "u1", "attempts": 2}
+        push_dispatcher._schedule_retry([entry], "test", time.time())
+        assert r.zcard("push:retry") == 0
+
+    def test_unreachable_expo_schedules_retry(self, pd):
+        r, _, push_dispatcher = pd
+        push_dispatcher.enqueue(_message("tok-1"), "u1")
+        with patch.object(push_dispatcher.config, "EXPO_PUSH_API_URL", "http://127.0.0.1:1"):
+            push_dispatcher.PushDispatcher().process_batch()
+        assert r.zcard("push:retry") == 1
+
+
+# ---------------------------------------------------------------------------
+# Unregistered devices and receipts
+# ---------------------------------------------------------------------------
+
+class TestDeviceNotRegistered:
+    def test_ticket_error_clears_token(self, pd, expo):
+        _, mock_db, push_dispatcher = pd
+        expo.ticket_errors["tok-dead"] = "DeviceNotRegistered"
+        push_dispatcher.enqueue(_message("tok-dead"), "u1")
+
+        push_dispatcher.PushDispatcher().process_batch()
+
+        clear = [c for c in mock_db.execute_query.call_args_list if "push_token = NULL" in c[0][0]]
+        assert clear[0][0][1] == (["tok-dead"],)
+        assert _counter_calls(mock_db) == []
+
+    def test_receipt_error_clears_token(self, pd, expo):
+        r, mock_db, push_dispatcher = pd
+        expo.receipt_errors["tok-gone"] = "DeviceNotRegistered"
+        push_dispatcher.enqueue(_message("tok-ok"), "u1")
+        push_dispatcher.enqueue(_message("tok-gone"), "u2")
+        push_dispatcher.PushDispatcher().process_batch()
+
+        # Not due yet
+        assert push_dispatcher.check_receipts() == 0
+
+        assert push_dispatcher.check_receipts(time.time() + 901) == 2
+        assert r.zcard("push:receipts") == 0
+        clear = [c for c in mock_db.execute_query.call_args_list if "push_token = NULL" in c[0][0]]
+        assert clear[0][0][1] == (["tok-gone"],)
+
+    def test_receipt_fetch_failure_requeues_tickets(self, pd, expo):
+        r, _, push_dispatcher = pd
+        push_dispatcher.enqueue(_message("tok-1"), "u1")
+        push_dispatcher.PushDispatcher().process_batch()
+
+        expo.fail_next = [500]
+        assert push_dispatcher.check_receipts(time.time() + 901) == 0
+        assert r.zcard("push:receipts") == 1
@@ -437,12 +437,9 @@ class TestDrainNotificationQueue:
         mock_db.execute_query.side_effect = [
             user_row,       # SELECT user
             queued,         # SELECT queue
-            None,           # UPDATE counter
-            None,           # DELETE q1
-            user_row,       # Refresh user
-            None,           # UPDATE counter
-            None,           # DELETE q2
-            user_row,       # Refresh user
+            None,           # UPDATE counter (inline send)
+            None,           # UPDATE counter (inline send)
+            None,           # DELETE q1, q2
         ]
 
         with patch("candid.controllers.helpers.push_notifications.urllib.request.urlopen") as mock_open:
@@ -455,6 +452,29 @@ class TestDrainNotificationQueue:
             self._call(USER_ID, mock_db)
 
         assert mock_open.call_count == 2
+        delete_call = mock_db.execute_query.call_args_list[-1]
+        assert "DELETE FROM notification_queue" in delete_call[0][0]
+        assert delete_call[0][1] == (["q1", "q2"],)
+
+    def test_fetches_at_most_remaining_daily_quota(self):
+        from datetime import date
+        mock_db = MagicMock()
+        mock_db.execute_query.side_effect = [
+            self._make_user_row(notifications_sent_today=8, notifications_sent_date=date.today()),
+            [],
+        ]
+        self._call(USER_ID, mock_db)
+        select_call = mock_db.execute_query.call_args_list[1]
+        assert "LIMIT" in select_call[0][0]
+        assert select_call[0][1] == (USER_ID, 2)  # normal cap is 10
+
+    def test_keeps_queue_when_over_daily_cap(self):
+        from datetime import date
+        mock_db = MagicMock()
+        mock_db.execute_query.return_value = self._make_user_row(
+            notifications_sent_today=10, notifications_sent_date=date.today())
+        self._call(USER_ID, mock_db)
+        assert mock_db.execute_query.call_count == 1
 
     def test_does_nothing_when_queue_empty(self):
         mock_db = MagicMock()
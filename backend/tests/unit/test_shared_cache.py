@@ -0,0 +1,264 @@
+"""Unit tests for shared_cache.py — two-tier LRU + Redis cache."""
+
+import json
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+SC = "candid.controllers.helpers.shared_cache"
+
+
+def _config(local_ttl=60, maxsize=100):
+    cfg = MagicMock()
+    cfg.CACHE_LOCAL_TTL = local_ttl
+    cfg.CACHE_LOCAL_MAXSIZE = maxsize
+    cfg.CACHE_PUBSUB_ENABLED = False
+    return cfg
+
+
+@pytest.fixture
+def sc(shared_cache_redis):
+    """Yield (redis, shared_cache module) with config patched."""
+    with patch(f"{SC}.config", _config()):
+        from candid.controllers.helpers import shared_cache
+        yield shared_cache_redis, shared_cache
+
+
+class TestGet:
+    def test_miss_calls_loader_and_fills_both_tiers(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_fill", ttl=300)
+        loader = MagicMock(return_value={"a": 1})
+
+        assert cache.get("k", loader) == {"a": 1}
+
+        loader.assert_called_once()
+        assert json.loads(r.get("cache:t_fill:0:k")) == {"a": 1}
+        assert r._ttls["cache:t_fill:0:k"] == 300
+
+    def test_local_hit_skips_redis_and_loader(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_local", ttl=300)
+        cache.get("k", lambda: [1, 2])
+
+        loader = MagicMock()
+        with patch(f"{SC}.get_redis", side_effect=AssertionError("no redis")):
+            assert cache.get("k", loader) == [1, 2]
+        loader.assert_not_called()
+
+    def test_redis_hit_skips_loader(self, sc):
+        r, shared_cache = sc
+        r.set("cache:t_redis:0:k", json.dumps(["from-redis"]))
+        cache = shared_cache.SharedCache("t_redis", ttl=300)
+        loader = MagicMock()
+
+        assert cache.get("k", loader) == ["from-redis"]
+        loader.assert_not_called()
+
+    def test_none_is_not_cached(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_none", ttl=300)
+        loader = MagicMock(return_value=None)
+
+        assert cache.get("k", loader) is None
+        assert cache.get("k", loader) is None
+        assert loader.call_count == 2
+
+    def test_redis_failure_falls_back_to_loader(self, sc):
+        _, shared_cache = sc
+        cache = shared_cache.SharedCache("t_down", ttl=300)
+        with patch(f"{SC}.get_redis", side_effect=Exception("down")):
+            assert cache.get("k", lambda: "fresh") == "fresh"
+            # Still served from the local tier
+            assert cache.get("k", MagicMock()) == "fresh"
+
+    def test_local_tier_is_lru_bounded(self, sc):
+        _, shared_cache = sc
+        cache = shared_cache.SharedCache("t_lru", ttl=300, maxsize=2)
+        cache.get("a", lambda: 1)
+        cache.get("b", lambda: 2)
+        cache.get("a", lambda: 1)  # touch a
+        cache.get("c", lambda: 3)
+
+        assert list(cache._local) == ["a", "c"]
+
+    def test_local_ttl_expiry(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_ttl", ttl=300, local_ttl=10)
+        with patch(f"{SC}.time.time", return_value=1000.0):
+            cache.get("k", lambda: "v1")
+        r.set("cache:t_ttl:0:k", json.dumps("v2"))
+        with patch(f"{SC}.time.time", return_value=1011.0):
+            assert cache.get("k", MagicMock()) == "v2"
+
+    def test_invalidation_during_load_skips_write(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_race", ttl=300)
+
+        def loader():
+            cache.invalidate("k")
+            return "stale"
+
+        assert cache.get("k", loader) == "stale"
+        assert r.get("cache:t_race:0:k") is None
+        assert cache.get("k", lambda: "fresh") == "fresh"
+
+    def test_namespace_invalidation_during_load_skips_write(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_race_ns", ttl=300)
+
+        def loader():
+            shared_cache.invalidate("t_race_ns")
+            return "stale"
+
+        assert cache.get("k", loader) == "stale"
+        assert r.get("cache:t_race_ns:0:k") is None
+        assert cache.get("k", lambda: "fresh") == "fresh"
+
+
+class TestGetMany:
+    def test_loader_called_once_with_all_misses(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_many", ttl=300)
+        cache.get("a", lambda: 1)
+        r.set("cache:t_many:0:b", json.dumps(2))
+        loader = MagicMock(return_value={"c": 3, "d": None})
+
+        result = cache.get_many(["a", "b", "c", "d", "a"], loader)
+
+        assert result == {"a": 1, "b": 2, "c": 3}
+        loader.assert_called_once_with(["c", "d"])
+        assert json.loads(r.get("cache:t_many:0:c")) == 3
+        assert r.get("cache:t_many:0:d") is None
+
+    def test_invalidation_during_load_skips_that_key(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_many_race", ttl=300)
+
+        def loader(keys):
+            shared_cache.invalidate("t_many_race", "a")
+            return {"a": "stale", "b": 2}
+
+        assert cache.get_many(["a", "b"], loader) == {"a": "stale", "b": 2}
+        assert r.get("cache:t_many_race:0:a") is None
+        assert json.loads(r.get("cache:t_many_race:0:b")) == 2
+
+    def test_all_local_hits_skip_redis(self, sc):
+        _, shared_cache = sc
+        cache = shared_cache.SharedCache("t_many_local", ttl=300)
+        cache.get_many(["a"], lambda keys: {"a": 1})
+        with patch(f"{SC}.get_redis", side_effect=AssertionError("no redis")):
+            assert cache.get_many(["a"], MagicMock()) == {"a": 1}
+
+    def test_redis_failure_falls_back_to_loader(self, sc):
+        _, shared_cache = sc
+        cache = shared_cache.SharedCache("t_many_down", ttl=300)
+        with patch(f"{SC}.get_redis", side_effect=Exception("down")):
+            assert cache.get_many(["a"], lambda keys: {"a": 1}) == {"a": 1}
+
+
+class TestInvalidate:
+    def test_key_invalidation_drops_both_tiers(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_key", ttl=300)
+        cache.get("k", lambda: "old")
+
+        with patch.object(r, "publish", wraps=r.publish) as mock_publish:
+            cache.invalidate("k")
+
+        assert r.get("cache:t_key:0:k") is None
+        assert cache.get("k", lambda: "new") == "new"
+        channel, message = mock_publish.call_args.args
+        assert channel == "cache:invalidate"
+        assert json.loads(message) == {"namespace": "t_key", "key": "k"}
+
+    def test_namespace_invalidation_bumps_version(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_ns", ttl=300)
+        cache.get("k", lambda: "old")
+
+        cache.invalidate()
+
+        assert r.get("cache:t_ns:version") == "1"
+        assert cache.get("k", lambda: "new") == "new"
+        assert json.loads(r.get("cache:t_ns:1:k")) == "new"
+
+    def test_invalidate_by_name(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_named", ttl=300)
+        cache.get("k", lambda: "old")
+
+        shared_cache.invalidate("t_named")
+
+        assert cache.get("k", lambda: "new") == "new"
+
+    def test_invalidate_unknown_namespace_bumps_redis_version(self, sc):
+        r, shared_cache = sc
+        shared_cache.invalidate("t_elsewhere")
+        assert r.get("cache:t_elsewhere:version") == "1"
+
+    def test_redis_failure_still_clears_local(self, sc):
+        _, shared_cache = sc
+        cache = shared_cache.SharedCache("t_inv_down", ttl=300)
+        cache.get("k", lambda: "old")
+        with patch(f"{SC}.get_redis", side_effect=Exception("down")):
+            cache.invalidate("k")
+            assert cache.get("k", lambda: "new") == "new"
+
+
+class TestHandleMessage:
+    def test_message_from_other_worker_drops_local_key(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_msg", ttl=300)
+        cache.get("k", lambda: "old")
+        cache.get("other", lambda: "keep")
+        # Another worker replaced the value in Redis
+        r.set("cache:t_msg:0:k", json.dumps("new"))
+
+        shared_cache.handle_message(json.dumps({"namespace": "t_msg", "key": "k"}))
+
+        assert cache.get("k", MagicMock()) == "new"
+        assert "other" in cache._local
+
+    def test_namespace_message_clears_local_and_version(self, sc):
+        r, shared_cache = sc
+        cache = shared_cache.SharedCache("t_msg_ns", ttl=300)
+        cache.get("k", lambda: "old")
+        r.incr("cache:t_msg_ns:version")
+
+        shared_cache.handle_message(json.dumps({"namespace": "t_msg_ns", "key": None}))
+
+        assert cache.get("k", lambda: "new") == "new"
+        assert json.loads(r.get("cache:t_msg_ns:1:k")) == "new"
+
+    def test_malformed_message_ignored(self, sc):
+        _, shared_cache = sc
+        shared_cache.handle_message("not json")
+
+
+class TestInvalidationListener:
+    def test_applies_published_messages(self, sc):
+        _, shared_cache = sc
+        cache = shared_cache.SharedCache("t_listen", ttl=300)
+        cache.get("k", lambda: "old")
+
+        listener = shared_cache.InvalidationListener()
+        pubsub = MagicMock()
+
+        def get_message(timeout):
+            listener._running = False
+            return {"type": "message",
+                    "data": json.dumps({"namespace": "t_listen", "key": "k"})}
+
+        pubsub.get_message.side_effect = get_message
+        redis_client = MagicMock()
+        redis_client.pubsub.return_value = pubsub
+        listener._running = True
+        with patch(f"{SC}.get_redis", return_value=redis_client):
+            listener._run_loop()
+
+        pubsub.subscribe.assert_called_once_with("cache:invalidate")
+        pubsub.close.assert_called_once()
+        assert "k" not in cache._local
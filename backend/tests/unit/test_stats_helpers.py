@@ -5,7 +5,8 @@ from unittest.mock import patch, MagicMock
 
 from candid.controllers.helpers.stats import (
     empty_demographics,
-    aggregate_demographics,
+    group_assignment,
+    merge_demographic_counts,
     get_vote_dist_for_group,
     get_overall_vote_dist,
 )
@@ -37,48 +38,6 @@ class TestEmptyDemographics:
             assert result[key] == {}
 
 
-class TestAggregateDemographics:
-    def test_empty_list(self):
-        result = aggregate_demographics([], "0", "A", 5)
-        assert result["respondentCount"] == 0
-        assert result["lean"] == {}
-
-    def test_single_respondent(self):
-        data = [{"lean": "left", "sex": "female", "education": "college"}]
-        result = aggregate_demographics(data, "0", "A", 10)
-        assert result["respondentCount"] == 1
-        assert result["lean"] == {"left": 1}
-        assert result["sex"] == {"female": 1}
-        assert result["education"] == {"college": 1}
-        assert result["race"] == {}
-
-    def test_multiple_respondents(self):
-        data = [
-            {"lean": "left", "sex": "male"},
-            {"lean": "right", "sex": "female"},
-            {"lean": "left", "sex": "male"},
-        ]
-        result = aggregate_demographics(data, "1", "B", 20)
-        assert result["respondentCount"] == 3
-        assert result["lean"] == {"left": 2, "right": 1}
-        assert result["sex"] == {"male": 2, "female": 1}
-
-    def test_none_values_skipped(self):
-        data = [
-            {"lean": None, "sex": "male"},
-            {"lean": "center", "sex": None},
-        ]
-        result = aggregate_demographics(data, "0", "A", 5)
-        assert result["lean"] == {"center": 1}
-        assert result["sex"] == {"male": 1}
-
-    def test_preserves_group_metadata(self):
-        result = aggregate_demographics([], "2", "C", 100)
-        assert result["groupId"] == "2"
-        assert result["groupLabel"] == "C"
-        assert result["memberCount"] == 100
-
-
 class TestGetVoteDistForGroup:
     def test_basic_distribution(self):
         group_votes = {
@@ -201,3 +160,78 @@ class TestGetUserPositionIds:
         with patch(f"{STATS_HELPERS}.db", mock_db):
             from candid.controllers.helpers.stats import get_user_position_ids
             assert get_user_position_ids("user1", "cat1", "loc1") == []
+
+
+class TestGroupAssignment:
+    def test_flattens_clusters(self):
+        clusters = [{"id": 0, "members": [1, 2]}, None, {"id": 2, "members": [5]}]
+        assert group_assignment(clusters) == ([1, 2, 5], [0, 0, 2])
+
+    def test_empty(self):
+        assert group_assignment([]) == ([], [])
+
+
+class TestGetDemographicCountsByGroup:
+    def test_one_query_for_all_groups(self):
+        mock_db = MagicMock()
+        mock_db.execute_query = MagicMock(return_value=[
+            {"group_idx": 0, "field": "respondentCount", "value": "", "n": 3},
+            {"group_idx": 0, "field": "lean", "value": "left", "n": 2},
+            {"group_idx": 0, "field": "lean", "value": "right", "n": 1},
+            {"group_idx": 1, "field": "respondentCount", "value": "", "n": 1},
+            {"group_idx": 1, "field": "sex", "value": "female", "n": 1},
+        ])
+
+        with patch(f"{STATS_HELPERS}.db", mock_db):
+            from candid.controllers.helpers.stats import get_demographic_counts_by_group
+            result = get_demographic_counts_by_group(
+                "conv1", [{"members": [1, 2, 3]}, {"members": [4]}]
+            )
+
+        mock_db.execute_query.assert_called_once()
+        params = mock_db.execute_query.call_args[0][1]
+        assert params == ([1, 2, 3, 4], [0, 0, 0, 1], "conv1")
+        assert result["0"]["respondentCount"] == 3
+        assert result["0"]["lean"] == {"left": 2, "right": 1}
+        assert result["0"]["race"] == {}
+        assert result["1"]["sex"] == {"female": 1}
+
+    def test_no_members_skips_query(self):
+        mock_db = MagicMock()
+        with patch(f"{STATS_HELPERS}.db", mock_db):
+            from candid.controllers.helpers.stats import get_demographic_counts_by_group
+            assert get_demographic_counts_by_group("conv1", [{"members": []}]) == {}
+        mock_db.execute_query.assert_not_called()
+
+
+class TestMergeDemographicCounts:
+    def test_sums_groups(self):
+        merged = merge_demographic_counts([
+            {"respondentCount": 2, "lean": {"left": 2}},
+            {"respondentCount": 1, "lean": {"left": 1}, "sex": {"male": 1}},
+        ])
+        assert merged["respondentCount"] == 3
+        assert merged["lean"] == {"left": 3}
+        assert merged["sex"] == {"male": 1}
+        assert merged["incomeRange"] == {}
+
+
+class TestGetPairwiseCountsByGroup:
+    def test_groups_without_responses_kept_empty(self):
+        mock_db = MagicMock()
+        mock_db.execute_query = MagicMock(return_value=[
+            {"group_idx": 0, "winner_item_id": "a", "loser_item_id": "b", "n": 4},
+            {"group_idx": 1, "winner_item_id": None, "loser_item_id": None, "n": 0},
+        ])
+
+        with patch(f"{STATS_HELPERS}.db", mock_db):
+            from candid.controllers.helpers.stats import get_pairwise_counts_by_group
+            result = get_pairwise_counts_by_group(
+                "conv1", "survey1", [{"members": [1]}, {"members": [2]}]
+            )
+
+        mock_db.execute_query.assert_called_once()
+        assert result == {
+            "0": [{"winner_item_id": "a", "loser_item_id": "b", "n": 4}],
+            "1": [],
+        }
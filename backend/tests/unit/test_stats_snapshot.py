@@ -0,0 +1,109 @@
+"""Unit tests for stats_snapshot.py — materialized stats snapshots and user overlay."""
+
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+SS = "candid.controllers.helpers.stats_snapshot"
+
+
+@pytest.fixture
+def ss(shared_cache_redis):
+    """Yield (redis, stats_snapshot module) sharing the shared cache's MockRedis."""
+    with patch(f"{SS}.get_redis", return_value=shared_cache_redis):
+        from candid.controllers.helpers import stats_snapshot
+        stats_snapshot._snapshot_cache.drop_local()
+        yield shared_cache_redis, stats_snapshot
+        stats_snapshot._snapshot_cache.drop_local()
+
+
+def _snapshot(**extra):
+    return {
+        "conversationId": "conv-1",
+        "polisReportUrl": "/api/v1/stats/report/r1",
+        "groups": [{"id": "0", "label": "A", "memberCount": 3}],
+        "positions": [{"id": "pos-1", "representativeness": 0.9}],
+        **extra,
+    }
+
+
+class TestGetSnapshot:
+    def test_built_once_per_math_tick(self, ss):
+        r, stats_snapshot = ss
+        builder = MagicMock(side_effect=lambda: _snapshot())
+
+        first = stats_snapshot.get_snapshot("loc-1", "cat-1", 7, builder)
+        second = stats_snapshot.get_snapshot("loc-1", "cat-1", 7, builder)
+
+        assert builder.call_count == 1
+        assert second == first
+        assert first["mathTick"] == 7
+        assert "builtAt" in first
+
+    def test_new_math_tick_rebuilds(self, ss):
+        r, stats_snapshot = ss
+        builder = MagicMock(side_effect=lambda: _snapshot())
+
+        stats_snapshot.get_snapshot("loc-1", "cat-1", 7, builder)
+        rebuilt = stats_snapshot.get_snapshot("loc-1", "cat-1", 8, builder)
+
+        assert builder.call_count == 2
+        assert rebuilt["mathTick"] == 8
+
+    def test_new_responses_rebuild_only_that_location(self, ss):
+        r, stats_snapshot = ss
+        builder = MagicMock(side_effect=lambda: _snapshot())
+
+        stats_snapshot.get_snapshot("loc-1", None, 7, builder)
+        stats_snapshot.get_snapshot("loc-2", None, 7, builder)
+        stats_snapshot.note_responses("loc-1")
+        stats_snapshot.get_snapshot("loc-1", None, 7, builder)
+        stats_snapshot.get_snapshot("loc-2", None, 7, builder)
+
+        assert builder.call_count == 3
+
+    def test_location_wide_and_category_snapshots_are_separate(self, ss):
+        r, stats_snapshot = ss
+        builder = MagicMock(side_effect=lambda: _snapshot())
+
+        stats_snapshot.get_snapshot("loc-1", None, 7, builder)
+        stats_snapshot.get_snapshot("loc-1", "cat-1", 7, builder)
+
+        assert builder.call_count == 2
+
+    def test_redis_down_still_builds(self, ss):
+        r, stats_snapshot = ss
+        with patch(f"{SS}.get_redis", side_effect=ConnectionError("down")):
+            snapshot = stats_snapshot.get_snapshot("loc-1", None, 7, _snapshot)
+        assert snapshot["conversationId"] == "conv-1"
+
+
+class TestOverlayUserFields:
+    def test_user_fields_added_without_touching_snapshot(self, ss):
+        r, stats_snapshot = ss
+        snapshot = _snapshot(builtAt="2026-01-01T00:00:00+00:00")
+        mine = {"id": "pos-mine", "representativeness": 0}
+
+        body = stats_snapshot.overlay_user_fields(
+            snapshot,
+            user_position={"x": 1.0, "y": 2.0, "groupId": "0"},
+            user_votes={"pos-1": "agree"},
+            user_position_ids=["pos-mine"],
+            user_positions=[mine],
+        )
+
+        assert [p["id"] for p in body["positions"]] == ["pos-1", "pos-mine"]
+        assert body["userVotes"] == {"pos-1": "agree"}
+        assert body["userPosition"]["groupId"] == "0"
+        assert body["computedAt"] == "2026-01-01T00:00:00+00:00"
+        assert [p["id"] for p in snapshot["positions"]] == ["pos-1"]
+
+    def test_anonymous_omits_user_fields(self, ss):
+        r, stats_snapshot = ss
+        body = stats_snapshot.overlay_user_fields(_snapshot(builtAt="t"))
+
+        for key in ("userPosition", "userVotes", "userPositionIds"):
+            assert key not in body
+        assert body["groups"] == _snapshot()["groups"]
@@ -0,0 +1,103 @@
+"""Unit tests for vector_search.py — HNSW candidate search helpers."""
+
+from contextlib import contextmanager
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+pytestmark = pytest.mark.unit
+
+VS = "candid.controllers.helpers.vector_search"
+
+
+def _config(ef_search=100, overfetch=10):
+    cfg = MagicMock()
+    cfg.VECTOR_EF_SEARCH = ef_search
+    cfg.VECTOR_SEARCH_OVERFETCH = overfetch
+    return cfg
+
+
+def _db_with_cursor(cur):
+    mock_db = MagicMock()
+
+    @contextmanager
+    def transaction():
+        yield cur
+
+    mock_db.transaction = transaction
+    return mock_db
+
+
+class TestCandidateLimit:
+    def test_overfetches(self):
+        with patch(f"{VS}.config", _config(overfetch=10)):
+            from candid.controllers.helpers.vector_search import candidate_limit
+            assert candidate_limit(5) == 50
+
+    def test_capped_at_max_ef_search(self):
+        with patch(f"{VS}.config", _config(overfetch=10)):
+            from candid.controllers.helpers.vector_search import candidate_limit, MAX_EF_SEARCH
+            assert candidate_limit(500) == MAX_EF_SEARCH
+
+    def test_at_least_one(self):
+        with patch(f"{VS}.config", _config()):
+            from candid.controllers.helpers.vector_search import candidate_limit
+            assert candidate_limit(0) == 1
+
+
+class TestWiden:
+    def test_doubles(self):
+        from candid.controllers.helpers.vector_search import widen
+        assert widen(200) == 400
+
+    def test_capped_at_max_ef_search(self):
+        from candid.controllers.helpers.vector_search import widen, MAX_EF_SEARCH
+        assert widen(800) == MAX_EF_SEARCH
+
+
+class TestEfSearchFor:
+    def test_uses_configured_value_when_larger(self):
+        with patch(f"{VS}.config", _config(ef_search=100)):
+            from candid.controllers.helpers.vector_search import ef_search_for
+            assert ef_search_for(50) == 100
+
+    def test_raised_to_cover_k(self):
+        with patch(f"{VS}.config", _config(ef_search=40)):
+            from candid.controllers.helpers.vector_search import ef_search_for
+            assert ef_search_for(200) == 200
+
+    def test_capped(self):
+        with patch(f"{VS}.config", _config(ef_search=5000)):
+            from candid.controllers.helpers.vector_search import ef_search_for, MAX_EF_SEARCH
+            assert ef_search_for(10) == MAX_EF_SEARCH
+
+
+class TestExecuteSearch:
+    def test_sets_ef_search_locally_then_runs_query(self):
+        cur = MagicMock()
+        cur.fetchall.return_value = [{"id": "p1"}]
+        with patch(f"{VS}.config", _config(ef_search=40)), \
+             patch(f"{VS}.db", _db_with_cursor(cur)):
+            from candid.controllers.helpers.vector_search import execute_search
+            result = execute_search("SELECT 1", ("a",), 120)
+
+        assert result == [{"id": "p1"}]
+        first, second = cur.execute.call_args_list
+        assert "set_config('hnsw.ef_search', %s, true)" in first.args[0]
+        assert first.args[1] == ("120",)
+        assert second.args == ("SELECT 1", ("a",))
+
+    def test_database_error_returns_none(self):
+        from candid.controllers.helpers.database import DatabaseError
+        mock_db = MagicMock()
+        mock_db.transaction.side_effect = DatabaseError("boom")
+        with patch(f"{VS}.config", _config()), patch(f"{VS}.db", mock_db):
+            from candid.controllers.helpers.vector_search import execute_search
+            assert execute_search("SELECT 1", (), 10) is None
+
+    def test_candidates_sql_is_index_shaped(self):
+        """The candidate query must stay a bare ORDER BY distance LIMIT k."""
+        from candid.controllers.helpers.vector_search import CANDIDATES_SQL
+        normalized = " ".join(CANDIDATES_SQL.split())
+        assert "ORDER BY embedding <=> %s::vector LIMIT %s" in normalized
+        assert ">=" not in normalized
@@ -0,0 +1,195 @@
+"""Unit tests for vote_counters.py — delta vote counters and drift reconciliation."""
+
+from datetime import datetime, timezone
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from candid.controllers.helpers.scoring import wilson_score
+
+from .conftest import MockRedis
+
+pytestmark = pytest.mark.unit
+
+VC = "candid.controllers.helpers.vote_counters"
+
+CREATED = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+
+def _config():
+    cfg = MagicMock()
+    cfg.VOTE_RECONCILE_INTERVAL = 3600
+    return cfg
+
+
+@pytest.fixture
+def vc():
+    """Yield (redis, db, vote_counters module)."""
+    r = MockRedis()
+    mock_db = MagicMock()
+    with patch(f"{VC}.get_redis", return_value=r), \
+         patch(f"{VC}.db", mock_db), \
+         patch(f"{VC}.config", _config()):
+        from candid.controllers.helpers import vote_counters
+        yield r, mock_db, vote_counters
+
+
+def _counters(up=1, down=0, weighted_up=1.5, weighted_down=0.0):
+    return {
+        "upvote_count": up, "downvote_count": down,
+        "weighted_upvotes": weighted_up, "weighted_downvotes": weighted_down,
+        "created_time": CREATED,
+    }
+
+
+class TestCastVote:
+    def test_single_statement_applies_delta(self, vc):
+        _, mock_db, vote_counters = vc
+        mock_db.execute_query.return_value = _counters()
+
+        counters = vote_counters.cast_vote("post", "p1", "u1", "upvote", 1.5, None)
+
+        assert counters == _counters()
+        mock_db.execute_query.assert_called_once()
+        sql, params = mock_db.execute_query.call_args[0]
+        assert "FOR UPDATE" in sql
+        assert "INSERT INTO post_vote" in sql
+        assert "UPDATE post t SET" in sql
+        assert "upvote_count = t.upvote_count + delta.up" in sql
+        assert "COUNT(" not in sql
+        assert params[0:2] == ("p1", "u1")
+        assert params[3:] == ("p1", "u1", "upvote", 1.5, None, "p1")
+
+    def test_marks_item_for_reconciliation(self, vc):
+        r, _, vote_counters = vc
+        vote_counters.cast_vote("post", "p1", "u1", "upvote", 1.5, None)
+
+        assert r.smembers("votes:touched:post") == {"p1"}
+
+    def test_comment_targets_comment_tables(self, vc):
+        _, mock_db, vote_counters = vc
+        vote_counters.cast_vote("comment", "c1", "u1", "downvote", 1.0, "spam")
+
+        sql = mock_db.execute_query.call_args[0][0]
+        assert "INSERT INTO comment_vote" in sql
+        assert "ON CONFLICT (comment_id, user_id)" in sql
+        assert "UPDATE comment t SET" in sql
+
+
+class TestRemoveVote:
+    def test_delete_and_subtract_in_one_statement(self, vc):
+        _, mock_db, vote_counters = vc
+        mock_db.execute_query.return_value = _counters(up=0, weighted_up=0.0)
+
+        counters = vote_counters.remove_vote("post", "p1", "u1")
+
+        assert counters["upvote_count"] == 0
+        sql, params = mock_db.execute_query.call_args[0]
+        assert "DELETE FROM post_vote" in sql
+        assert "-1 AS sign" in sql
+        assert params == ("p1", "u1", "p1")
+
+    def test_marks_item_for_reconciliation(self, vc):
+        r, _, vote_counters = vc
+        vote_counters.remove_vote("comment", "c1", "u1")
+
+        assert r.smembers("votes:touched:comment") == {"c1"}
+
+
+class TestWriteScores:
+    def test_conditional_on_returned_counters(self, vc):
+        _, mock_db, vote_counters = vc
+        mock_db.execute_query.return_value = {"?column?": 1}
+
+        assert vote_counters.write_scores("post", "p1", _counters(), {"score": 0.4, "hot_score": 0.1})
+
+        sql, params = mock_db.execute_query.call_args[0]
+        assert "score = %s, hot_score = %s" in sql
+        assert params == (0.4, 0.1, "p1", 1.5, 0.0)
+
+    def test_skipped_when_counters_moved(self, vc):
+        _, mock_db, vote_counters = vc
+        mock_db.execute_query.return_value = None
+
+        assert vote_counters.write_scores("comment", "c1", _counters(), {"score": 0.4}) is False
+
+
+class TestReconcile:
+    def test_repairs_drifted_counters_and_scores(self, vc):
+        r, mock_db, vote_counters = vc
+        r.sadd("votes:touched:comment", "c1", "c2")
+        mock_db.execute_query.side_effect = [
+            [{
+                "id": "c1", "up_count": 2, "down_count": 1,
+                "weighted_up": 3.0, "weighted_down": 1.0,
+                "created_time": CREATED, "stored_up": 4.0, "stored_down": 1.0,
+            }],
+            [{"?column?": 1}],
+        ]
+
+        assert vote_counters.reconcile("comment") == 1
+
+        drift_params = mock_db.execute_query.call_args_list[0][0][1]
+        assert sorted(drift_params[0]) == ["c1", "c2"]
+        assert r.smembers("votes:touched:comment") == set()
+        sql, params = mock_db.execute_query.call_args_list[1][0]
+        assert "UPDATE comment t SET" in sql
+        assert "hot_score" not in sql
+        ids, ups, downs, w_ups, w_downs, stored_ups, stored_downs, scores = params
+        assert ids == ["c1"] and ups == [2] and downs == [1]
+        assert stored_ups == [4.0]
+        assert scores == [wilson_score(3.0, 1.0)]
+
+    def test_post_repair_includes_feed_scores(self, vc):
+        r, mock_db, vote_counters = vc
+        r.sadd("votes:touched:post", "p1")
+        mock_db.execute_query.side_effect = [
+            [{
+                "id": "p1", "up_count": 0, "down_count": 0,
+                "weighted_up": 0, "weighted_down": 0,
+                "created_time": CREATED, "stored_up": 1.0, "stored_down": 0.0,
+            }],
+            [{"?column?": 1}],
+        ]
+
+        assert vote_counters.reconcile("post") == 1
+
+        sql, params = mock_db.execute_query.call_args_list[1][0]
+        assert "hot_score = v.hot, controversial_score = v.controversial" in sql
+        assert params[-2:] == ([0.0], [0.0])
+
+    def test_no_drift_no_update(self, vc):
+        r, mock_db, vote_counters = vc
+        r.sadd("votes:touched:post", "p1")
+        r.sadd("votes:touched:comment", "c1")
+        mock_db.execute_query.return_value = []
+
+        assert vote_counters.reconcile_all() == {"post": 0, "comment": 0}
+        assert mock_db.execute_query.call_count == 2
+
+    def test_untouched_items_not_queried(self, vc):
+        _, mock_db, vote_counters = vc
+
+        assert vote_counters.reconcile_all() == {"post": 0, "comment": 0}
+        mock_db.execute_query.assert_not_called()
+
+    def test_failed_check_requeues_items(self, vc):
+        r, mock_db, vote_counters = vc
+        r.sadd("votes:touched:post", "p1")
+        mock_db.execute_query.side_effect = RuntimeError("db down")
+
+        with pytest.raises(RuntimeError):
+            vote_counters.reconcile("post")
+        assert r.smembers("votes:touched:post") == {"p1"}
+
+    def test_claim_once_per_interval(self, vc):
+        r, _, vote_counters = vc
+
+        assert vote_counters._claim_reconcile() is True
+        assert vote_counters._claim_reconcile() is False
+        assert r._ttls[vote_counters.RECONCILE_LOCK_KEY] == 3600
+
+    def test_redis_down_skips_reconcile(self, vc):
+        _, _, vote_counters = vc
+        with patch(f"{VC}.get_redis", side_effect=ConnectionError("down")):
+            assert vote_counters._claim_reconcile() is False
@@ -208,12 +208,38 @@ describe('event listeners', () => {
     expect(typeof cleanup).toBe('function')
   })
 
+  it('onReconnected returns noop cleanup when no socket', () => {
+    const cleanup = socketModule.onReconnected(jest.fn())
+    expect(typeof cleanup).toBe('function')
+  })
+
   it('onAgreedPosition returns noop cleanup when no socket', () => {
     const cleanup = socketModule.onAgreedPosition(jest.fn())
     expect(typeof cleanup).toBe('function')
   })
 })
 
+describe('getMessagePage', () => {
+  it('requests a page with get_messages instead of re-joining', async () => {
+    mockSocket.connected = true
+    mockOn.mockImplementation((event, handler) => {
+      if (event === 'authenticated') handler({ userId: 'u1', activeChats: [] })
+    })
+    await socketModule.connectSocket()
+    mockEmit.mockImplementation((event, data, ack) => ack({
+      status: 'ok', messages: [{ id: 'm1' }], firstIndex: 0, messageCount: 3,
+    }))
+
+    const page = await socketModule.getMessagePage('chat-1', { beforeIndex: 1 })
+
+    expect(mockEmit).toHaveBeenCalledWith(
+      'get_messages', { chatId: 'chat-1', beforeIndex: 1 }, expect.any(Function)
+    )
+    expect(page.messages).toEqual([{ id: 'm1' }])
+    expect(page.firstIndex).toBe(0)
+  })
+})
+
 describe('emit functions without connection', () => {
   it('joinChat throws when not connected', async () => {
     await expect(socketModule.joinChat('chat-1')).rejects.toThrow('Not connected')
@@ -31,6 +31,8 @@ import Header from '../../../components/Header'
 import api, { translateError } from '../../../lib/api'
 import {
   joinChat,
+  getMessagePage,
+  onReconnected,
   sendMessage,
   onMessage,
   sendTyping,
@@ -127,6 +129,39 @@ function parseHistoricalMessages(chatLog) {
   return historicalMessages
 }
 
+/**
+ * Format a message from the chat server's history (join_chat / get_messages),
+ * flagging proposal messages.
+ */
+function parseLiveMessage(msg) {
+  const isProposalType = ['proposed', 'accepted', 'rejected', 'modified'].includes(msg.type)
+  if (!isProposalType) return msg
+  return {
+    ...msg,
+    isProposal: true,
+    // Ensure we have all necessary proposal fields with snake_case fallbacks
+    proposalId: msg.proposal_id || msg.proposalId || msg.id,
+    isClosure: msg.is_closure || msg.isClosure || false,
+    parentId: msg.parent_id || msg.parentId || null,
+  }
+}
+
+function byTimestamp(a, b) {
+  const timeA = new Date(a.timestamp || a.sendTime || 0).getTime()
+  const timeB = new Date(b.timestamp || b.sendTime || 0).getTime()
+  return timeA - timeB
+}
+
+/**
+ * Add messages to the list, skipping ones already shown (matched by id).
+ */
+function mergeMessages(prev, incoming, { prepend = false } = {}) {
+  const seen = new Set(prev.map(m => m.id))
+  const fresh = incoming.filter(m => !seen.has(m.id))
+  if (fresh.length === 0) return prev
+  return prepend ? [...fresh, ...prev].sort(byTimestamp) : [...prev, ...fresh]
+}
+
 export default function ChatScreen() {
   const colors = useThemeColors()
   const styles = useMemo(() => createStyles(colors), [colors])
@@ -182,6 +217,9 @@ export default function ChatScreen() {
   const otherTypingTimeoutRef = useRef(null) // Delay before hiding other user's typing indicator
   const lastSentReadReceiptRef = useRef(null) // Track last read receipt we sent to avoid duplicates
   const visibleMessageIdsRef = useRef(new Set()) // Track which messages are currently visible on screen
+  // Server history cursor: index of the oldest loaded message and messages seen so far
+  const historyRef = useRef({ firstIndex: 0, messageCount: 0 })
+  const loadingOlderRef = useRef(false)
 
   // Animated values for typing dots
   const dot1Anim = useRef(new Animated.Value(0)).current
@@ -299,13 +337,34 @@ export default function ChatScreen() {
     }
   }, [otherUserTyping])
 
-  // Handle scroll to track if user is near bottom
+  // Load the page of history before the oldest loaded message
+  const loadOlderMessages = useCallback(async () => {
+    const { firstIndex } = historyRef.current
+    if (firstIndex <= 0 || loadingOlderRef.current || isHistoricalView) return
+
+    loadingOlderRef.current = true
+    try {
+      const page = await getMessagePage(chatId, { beforeIndex: firstIndex })
+      historyRef.current.firstIndex = page.firstIndex || 0
+      const older = (page.messages || []).map(parseLiveMessage)
+      setMessages(prev => mergeMessages(prev, older, { prepend: true }))
+    } catch (err) {
+      console.error('Failed to load older messages:', err)
+    } finally {
+      loadingOlderRef.current = false
+    }
+  }, [chatId, isHistoricalView])
+
+  // Handle scroll to track if user is near bottom, and load older messages near the top
   const handleScroll = useCallback((event) => {
     const { layoutMeasurement, contentOffset, contentSize } = event.nativeEvent
     const paddingToBottom = 100 // Consider "near bottom" if within 100px
     isNearBottomRef.current =
       layoutMeasurement.height + contentOffset.y >= contentSize.height - paddingToBottom
-  }, [])
+    if (contentOffset.y < 200 && !isNearBottomRef.current) {
+      loadOlderMessages()
+    }
+  }, [loadOlderMessages])
 
   // Join chat and set up listeners
   useEffect(() => {
@@ -314,6 +373,7 @@ export default function ChatScreen() {
     let cleanupStatus = null
     let cleanupReadReceipt = null
     let cleanupAgreedPosition = null
+    let cleanupReconnected = null
 
     async function initChat() {
       try {
@@ -364,24 +424,15 @@ export default function ChatScreen() {
         // Join the chat room
         let joinResponse
         try {
+          // Returns the latest page of history; older pages load on scroll
           joinResponse = await joinChat(chatId)
-          // Process messages to detect and properly format proposal messages
           const rawMessages = joinResponse.messages || []
-          const processedMessages = rawMessages.map(msg => {
-            // Check if this is a proposal message by its type
-            const isProposalType = ['proposed', 'accepted', 'rejected', 'modified'].includes(msg.type)
-            if (isProposalType) {
-              return {
-                ...msg,
-                isProposal: true,
-                // Ensure we have all necessary proposal fields with snake_case fallbacks
-                proposalId: msg.proposal_id || msg.proposalId || msg.id,
-                isClosure: msg.is_closure || msg.isClosure || false,
-                parentId: msg.parent_id || msg.parentId || null,
-              }
-            }
-            return msg
-          })
+          historyRef.current = {
+            firstIndex: joinResponse.firstIndex || 0,
+            messageCount: joinResponse.messageCount ?? rawMessages.length,
+          }
+          // Process messages to detect and properly format proposal messages
+          const processedMessages = rawMessages.map(parseLiveMessage)
 
           // Also check if agreedPositions are returned separately and need to be merged
           const agreedPositions = joinResponse.agreedPositions || []
@@ -398,11 +449,7 @@ export default function ChatScreen() {
           }))
 
           // Merge messages and proposals, sorted by timestamp
-          const allMessages = [...processedMessages, ...proposalMessages].sort((a, b) => {
-            const timeA = new Date(a.timestamp || a.sendTime || 0).getTime()
-            const timeB = new Date(b.timestamp || b.sendTime || 0).getTime()
-            return timeA - timeB
-          })
+          const allMessages = [...processedMessages, ...proposalMessages].sort(byTimestamp)
 
           setMessages(allMessages)
         } catch (joinErr) {
@@ -465,7 +512,27 @@ export default function ChatScreen() {
           }
 
           // Add message
-          setMessages(prev => [...prev, message])
+          historyRef.current.messageCount += 1
+          setMessages(prev => mergeMessages(prev, [message]))
+        })
+
+        // Rooms are lost on reconnect: re-join and fetch only the messages missed
+        cleanupReconnected = onReconnected(async () => {
+          try {
+            const response = await joinChat(chatId, { fromIndex: historyRef.current.messageCount })
+            let missed = response.messages || []
+            let next = (response.firstIndex || 0) + missed.length
+            while (next < response.messageCount) {
+              const page = await getMessagePage(chatId, { fromIndex: next })
+              if (!page.messages?.length) break
+              missed = [...missed, ...page.messages]
+              next = page.firstIndex + page.messages.length
+            }
+            historyRef.current.messageCount = Math.max(historyRef.current.messageCount, next)
+            setMessages(prev => mergeMessages(prev, missed.map(parseLiveMessage)))
+          } catch (err) {
+            console.error('Failed to rejoin chat:', err)
+          }
         })
 
         // Set up typing listener with delay before hiding
@@ -615,6 +682,7 @@ export default function ChatScreen() {
       if (cleanupStatus) cleanupStatus()
       if (cleanupReadReceipt) cleanupReadReceipt()
       if (cleanupAgreedPosition) cleanupAgreedPosition()
+      if (cleanupReconnected) cleanupReconnected()
       if (typingTimeoutRef.current) {
         clearTimeout(typingTimeoutRef.current)
       }
@@ -1504,6 +1572,7 @@ export default function ChatScreen() {
           keyboardDismissMode="interactive"
           onScroll={handleScroll}
           scrollEventThrottle={100}
+          maintainVisibleContentPosition={{ minIndexForVisible: 0 }}
           onViewableItemsChanged={onViewableItemsChanged}
           viewabilityConfig={viewabilityConfig}
           removeClippedSubviews={Platform.OS !== 'web'}
@@ -160,16 +160,20 @@ export function onChatStarted(handler) {
 
 /**
  * Join a chat room.
+ * History is paged: without a cursor the most recent page is returned.
  * @param {string} chatId - Chat log ID
- * @returns {Promise<Object>} - Join response with messages and agreed positions
+ * @param {Object} [cursor] - History cursor
+ * @param {number} [cursor.fromIndex] - Return messages from this index (pass the last messageCount to get only new ones)
+ * @param {number} [cursor.beforeIndex] - Return the page before this index (pass firstIndex to load older messages)
+ * @returns {Promise<Object>} - Join response with messages, firstIndex, messageCount and agreed positions
  */
-export async function joinChat(chatId) {
+export async function joinChat(chatId, cursor = {}) {
   if (!socket?.connected) {
     throw new Error('Not connected to chat server')
   }
 
   return new Promise((resolve, reject) => {
-    socket.emit('join_chat', { chatId }, (response) => {
+    socket.emit('join_chat', { chatId, ...cursor }, (response) => {
       if (response?.status === 'joined') {
         resolve(response)
       } else {
@@ -179,6 +183,48 @@ export async function joinChat(chatId) {
   })
 }
 
+/**
+ * Fetch a page of chat history without re-joining the room.
+ * @param {string} chatId - Chat log ID
+ * @param {Object} cursor - History cursor, as for joinChat
+ * @param {number} [cursor.beforeIndex] - Return the page before this index (pass firstIndex to load older messages)
+ * @param {number} [cursor.fromIndex] - Return messages from this index onwards
+ * @returns {Promise<Object>} - { messages, firstIndex, messageCount }
+ */
+export async function getMessagePage(chatId, cursor) {
+  if (!socket?.connected) {
+    throw new Error('Not connected to chat server')
+  }
+
+  return new Promise((resolve, reject) => {
+    socket.emit('get_messages', { chatId, ...cursor }, (response) => {
+      if (response?.status === 'ok') {
+        resolve(response)
+      } else {
+        reject(new Error(response?.message || 'Failed to load messages'))
+      }
+    })
+  })
+}
+
+/**
+ * Set up listener for the socket being re-authenticated after a reconnect.
+ * Chat rooms are not kept across reconnects, so open chats must re-join.
+ * @param {Function} handler - Called with the session data
+ * @returns {Function} - Cleanup function
+ */
+export function onReconnected(handler) {
+  if (!socket) {
+    console.warn('[Socket] Cannot set up listener - not connected')
+    return () => {}
+  }
+
+  socket.on('authenticated', handler)
+  return () => {
+    if (socket) socket.off('authenticated', handler)
+  }
+}
+
 /**
  * Send a message in a chat.
  * @param {string} chatId - Chat log ID
@@ -402,6 +448,8 @@ export default {
   onChatRequestReceived,
   onChatStarted,
   joinChat,
+  getMessagePage,
+  onReconnected,
   sendMessage,
   onMessage,
   sendTyping,